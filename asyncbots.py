@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import threading
+import time
+
+import res
+import objects
+import brain
+import game
+from res import Strings as String
+
+# An asynchronous bot has "async def say(value: str, deadline: float)": deadline is time.monotonic() when the move
+# must be made. It may await I/O, a pool or asyncio.sleep(0) meanwhile; at the deadline it is cancelled, and a bot
+# that has get_best() (an anytime bot) plays the best point it has found so far
+
+_loop = None  # Event loop of the synchronous adapters, in a thread of its own
+_loop_lock = threading.Lock()
+
+
+def is_async(bot):
+    """
+    :return: bool - the bot's say is a coroutine function
+    """
+    import inspect
+
+    return inspect.iscoroutinefunction(getattr(bot, "say", None))
+
+
+def get_free_point(defence: objects.Player):
+    """
+    :return: tuple - a random point that has not been shot, the move of a bot that has found none in time
+    """
+    size = defence.get_rules().size
+    free = [(x, y) for x in range(1, size + 1) for y in range(1, size + 1) if not defence.is_shot(x, y)]
+    return random.choice(free) if free else (1, 1)
+
+
+async def get_move(bot, value: str, budget: float = res.ASYNC_MOVE_BUDGET, fallback=None):
+    """
+    Asks a bot for a shot, a synchronous bot is answered at once
+    :param bot: object - a bot with say(value) or async say(value, deadline)
+    :param value: str - the command
+    :param budget: float - seconds of the move
+    :param fallback: callable - returns the point if the bot has found none in time
+    :return: tuple - (x, y)
+    """
+    if not is_async(bot):
+        return bot.say(value)
+    try:
+        return await asyncio.wait_for(bot.say(value, time.monotonic() + budget), budget)
+    except asyncio.TimeoutError:
+        best = bot.get_best() if hasattr(bot, "get_best") else None
+        if best is None:
+            if fallback is None:
+                raise
+            best = fallback()
+        return best
+
+
+async def fire_salvo(bot, defence: objects.Player, amount: int, results: list, budget: float = res.ASYNC_MOVE_BUDGET):
+    """
+    game.fire_salvo for any bot, every shot of an asynchronous bot has its own budget
+    :return: tuple - (list of (x, y), list of results, seconds the bot took)
+    """
+    if not is_async(bot) or hasattr(bot, "say_salvo"):
+        return game.fire_salvo(bot, defence, amount, results)
+    points = []
+    shots = []
+    decision_time = 0
+    message = game.MESSAGES[results[-1]] if results else String.GameFrame.BOT_SHOOT
+    for _ in range(amount):
+        begin = time.perf_counter()
+        x, y = await get_move(bot, message, budget, lambda: get_free_point(defence))
+        decision_time += time.perf_counter() - begin
+        points.append((x, y))
+        shots.extend(defence.receive_salvo([(x, y)]))
+        if not defence.is_some_ships_placed():
+            break
+        message = game.MESSAGES[shots[-1]]
+    return points, shots, decision_time
+
+
+async def play_game(battle: game.Game, bots: tuple, budget: float = res.ASYNC_MOVE_BUDGET,
+                    max_shots: int = res.SPECTATE_MAX_SHOTS):
+    """
+    Plays a game of two bots, synchronous or not; cancelling the task cancels the move that is being made
+    :param battle: Game
+    :param bots: tuple - the bots of PLAYER and ENEMY
+    :return: int - the winner, None for a draw
+    """
+    while not battle.is_over() and len(battle.get_history()) < max_shots:
+        side = battle.get_turn()
+        defence = battle.get_player(1 - side)
+        if defence.get_rules().salvo is not None:
+            points, results, decision_time = await fire_salvo(bots[side], defence, battle.get_salvo_size(),
+                                                              battle.get_results(side), budget)
+            battle.end_salvo(points, results, decision_time)
+        else:
+            begin = time.perf_counter()
+            x, y = await get_move(bots[side], battle.get_message(), budget, lambda: get_free_point(defence))
+            battle.shoot(x, y, time.perf_counter() - begin)
+        await asyncio.sleep(0)  # The other games go on between two moves of a synchronous bot
+    return battle.get_winner()
+
+
+def get_loop():
+    """
+    Starts the event loop of the synchronous adapters on the first call
+    :return: asyncio.AbstractEventLoop
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async bots", daemon=True).start()
+    return _loop
+
+
+class SyncBot(object):
+    """
+    An asynchronous bot with the synchronous say(value), for the tools that play move by move.
+    The moves are made on an event loop of their own, so it works inside a running loop too
+    """
+
+    def __init__(self, bot, budget: float = res.ASYNC_MOVE_BUDGET):
+        self.bot = bot
+        self.budget = budget
+
+    def say(self, value: str):
+        return asyncio.run_coroutine_threadsafe(get_move(self.bot, value, self.budget), get_loop()).result()
+
+    def __getattr__(self, name: str):  # get_state, set_state and the rest of the bot
+        return getattr(self.bot, name)
+
+
+def get_sync_bot(bot, budget: float = res.ASYNC_MOVE_BUDGET):
+    """
+    :return: object - the bot, an asynchronous one in a SyncBot
+    """
+    return SyncBot(bot, budget) if is_async(bot) else bot
+
+
+class TkRunner(object):
+    """
+    Runs the moves of asynchronous bots in the Tk event loop: an asyncio loop of its own is run
+    for one round of its ready callbacks at every after() tick, until the move is made
+    """
+
+    def __init__(self, widget, period: int = res.ASYNC_PUMP_TIME):
+        """
+        :param widget: tkinter widget - whose after() drives the loop
+        :param period: int - ms between two rounds
+        """
+        self.__widget = widget
+        self.__period = period
+        self.__loop = asyncio.new_event_loop()
+        self.__task = None
+        self.__on_done = None
+        self.__job = None
+
+    def start(self, coroutine, on_done):
+        """
+        Cancels the move that is running and starts the coroutine
+        :param coroutine: coroutine - a move, get_move or fire_salvo
+        :param on_done: callable - takes the result of the coroutine
+        :return: None
+        """
+        self.cancel()
+        self.__task = self.__loop.create_task(coroutine)
+        self.__on_done = on_done
+        self.__pump()
+
+    def __pump(self):
+        self.__job = None
+        self.__loop.call_soon(self.__loop.stop)
+        self.__loop.run_forever()
+        if not self.__task.done():
+            self.__job = self.__widget.after(self.__period, self.__pump)
+            return
+        task, self.__task = self.__task, None
+        if not task.cancelled():
+            self.__on_done(task.result())  # An error of the bot goes to Tk like one of a synchronous bot
+
+    def is_running(self):
+        return self.__task is not None
+
+    def cancel(self):
+        """
+        Cancels the move, the game has been abandoned
+        :return: None
+        """
+        if self.__job is not None:
+            self.__widget.after_cancel(self.__job)
+            self.__job = None
+        if self.__task is not None:
+            task, self.__task = self.__task, None
+            task.cancel()
+            self.__loop.call_soon(self.__loop.stop)
+            self.__loop.run_forever()  # Lets the bot handle the cancellation
+
+    def close(self):
+        self.cancel()
+        self.__loop.close()
+
+
+async def play_games(games: int, names: tuple, budget: float):
+    """
+    Plays the games at the same time in one event loop
+    :return: tuple - (list of winners, amount of moves)
+    """
+    import registry
+
+    battles = [game.Game(brain.get_random_player(), brain.get_random_player()) for _ in range(games)]
+    players = [(registry.create_bot(names[0], asynchronous=True), registry.create_bot(names[1], asynchronous=True))
+               for _ in range(games)]
+    winners = await asyncio.gather(*(play_game(battle, bots, budget) for battle, bots in zip(battles, players)))
+    return winners, sum(len(battle.get_history()) for battle in battles)
+
+
+def bench(games: int, names: tuple, budget: float):
+    """
+    Headless games of the bots in one event loop
+    :return: None
+    """
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # Bots print every shot
+        begin = time.perf_counter()
+        winners, moves = asyncio.run(play_games(games, names, budget))
+        elapsed = time.perf_counter() - begin
+    print("%s vs %s, %d games at once: %d - %d, %d draws; %d moves in %.2f s (%.0f moves/s)" % (
+        names[0], names[1], games, winners.count(game.PLAYER), winners.count(game.ENEMY), winners.count(None),
+        moves, elapsed, moves / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless games of asynchronous and synchronous bots")
+    parser.add_argument("--bots", nargs=2, default=("DensityBot", "HardBot"))
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=res.ASYNC_MOVE_BUDGET, help="seconds per move")
+    args = parser.parse_args()
+    bench(args.games, tuple(args.bots), args.budget)
+
+
+if __name__ == "__main__":
+    main()
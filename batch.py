@@ -0,0 +1,223 @@
+import argparse
+import time
+
+import numpy as np
+
+import res
+import objects
+import brain
+
+SIZE = res.BOARD_SIZE
+CELLS = SIZE * SIZE
+SHIPS = len(res.LIST_OF_SHIPS) + 1  # Ship ids 1..10, 0 is water
+WORDS = 2  # uint64 words of the shot mask of a board, bit CELLS is the place of the shots out of the map
+
+# Results of a shot, the same meaning as objects.MISS, HIT, DESTROYED, REPEATED; WIN is the last ship destroyed
+MISS = 0
+HIT = 1
+SINK = 2
+WIN = 3
+REPEATED = 4
+RESULTS = {MISS: objects.MISS, HIT: objects.HIT, SINK: objects.DESTROYED, WIN: objects.DESTROYED,
+           REPEATED: objects.REPEATED}
+
+
+def get_rectangles():
+    """
+    The points around a ship: a ship is straight, so they are the rectangle around its first and last cell
+    :return: numpy array - (first cell, last cell, WORDS) uint64 bit masks of the cells of the rectangle
+    """
+    first = np.arange(CELLS)[:, None, None]
+    last = np.arange(CELLS)[None, :, None]
+    cell = np.arange(CELLS + 1)[None, None, :]
+    inside = (cell // SIZE >= first // SIZE - 1) & (cell // SIZE <= last // SIZE + 1) & \
+             (cell % SIZE >= first % SIZE - 1) & (cell % SIZE <= last % SIZE + 1) & (cell < CELLS)
+    inside = np.concatenate([inside, np.zeros((CELLS, CELLS, WORDS * 64 - CELLS - 1), np.bool_)], 2)
+    return np.packbits(inside, 2, "little").view("<u8")
+
+
+RECTANGLES = get_rectangles()
+
+
+class BatchBoards(object):
+    """
+    The fleets of N games in flat numpy arrays, shot at all at once:
+    ship ids of every cell, health of every ship, a bit mask of shot cells and ships left of every game.
+    The rules are the rules of objects.Player.receive_shot, the points around a destroyed ship count as shot.
+    """
+
+    def __init__(self, grids: np.ndarray):
+        """
+        :param grids: numpy array - (N, CELLS) ship id of every cell, cell = (x - 1) * SIZE + (y - 1)
+        """
+        grids = np.asarray(grids, np.int8).reshape(-1, CELLS)
+        count = len(grids)
+        self.__count = count
+        # Every game has one more cell, the place of the shots out of the map: no ship and always shot
+        self.__base = np.arange(count, dtype=np.uint64) * np.uint64(CELLS + 1)
+        self.__grid = np.zeros((count, CELLS + 1), np.int8)
+        self.__grid[:, :CELLS] = grids
+        self.__grid = self.__grid.reshape(-1)
+        self.__words = np.arange(count, dtype=np.uint64) * np.uint64(WORDS)
+        self.__shots = np.zeros((count, WORDS), np.uint64)
+        self.__shots[:, CELLS // 64] = np.uint64(1) << np.uint64(CELLS % 64)
+        self.__shots = self.__shots.reshape(-1)
+
+        # Every ship: its health and the mask of the points around it, marked at once when it is destroyed
+        self.__health = np.zeros(count * SHIPS, np.int8)
+        self.__around = np.zeros((count * SHIPS, WORDS), np.uint64)
+        for begin in range(0, count, 1 << 16):  # In chunks to bound the memory
+            rows = grids[begin:begin + (1 << 16)]
+            cells = np.flatnonzero(rows)
+            ships = cells // CELLS * SHIPS + rows.reshape(-1)[cells]
+            cells %= CELLS
+            first = np.full(len(rows) * SHIPS, CELLS - 1, np.intp)
+            last = np.zeros(len(rows) * SHIPS, np.intp)
+            np.minimum.at(first, ships, cells)
+            np.maximum.at(last, ships, cells)
+            self.__health[begin * SHIPS:(begin + len(rows)) * SHIPS] = np.bincount(ships, minlength=len(rows) * SHIPS)
+            self.__around[begin * SHIPS:(begin + len(rows)) * SHIPS] = RECTANGLES[first, last]
+        self.__around = self.__around.reshape(-1)
+        self.__alive = np.count_nonzero(self.__health.reshape(count, SHIPS), 1).astype(np.int8)
+
+    @staticmethod
+    def from_players(players: list):
+        """
+        :param players: list of Player - fleets that have not been shot at
+        :return: BatchBoards
+        """
+        grids = np.zeros((len(players), CELLS), np.int8)
+        for i, player in enumerate(players):
+            for x in range(1, SIZE + 1):
+                for y in range(1, SIZE + 1):
+                    point = player.get_point_on_map(x, y)
+                    if point != 0 and point != '.':
+                        grids[i, (x - 1) * SIZE + y - 1] = point
+        return BatchBoards(grids)
+
+    def __len__(self):
+        return self.__count
+
+    # Views of the state, nothing is copied; they follow every shot but cannot be written to
+    @staticmethod
+    def __view(array: np.ndarray, shape: tuple):
+        view = array.reshape(shape)
+        view.flags.writeable = False
+        return view
+
+    def get_grids(self):
+        """
+        :return: numpy array - (N, SIZE, SIZE) ship id of every cell [game, x - 1, y - 1]
+        """
+        view = self.__grid.reshape(self.__count, CELLS + 1)[:, :CELLS].reshape(self.__count, SIZE, SIZE)
+        view.flags.writeable = False
+        return view
+
+    def get_shot_masks(self):
+        """
+        :return: numpy array - (N, WORDS) uint64, bit cell % 64 of word cell // 64 is set for every shot cell
+        """
+        return self.__view(self.__shots, (self.__count, WORDS))
+
+    def get_shots(self):
+        """
+        :return: numpy array - (N, SIZE, SIZE) True for every shot cell, unpacked from the masks (a copy)
+        """
+        bits = np.unpackbits(self.__shots.view(np.uint8).reshape(self.__count, -1), 1, bitorder="little")
+        return bits[:, :CELLS].reshape(self.__count, SIZE, SIZE).view(np.bool_)
+
+    def get_health(self):
+        """
+        :return: numpy array - (N, SHIPS) cells left of every ship, index 0 is unused
+        """
+        return self.__view(self.__health, (self.__count, SHIPS))
+
+    def get_alive(self):
+        """
+        :return: numpy array - (N,) ships left in every game, 0 when the game is over
+        """
+        return self.__view(self.__alive, (self.__count,))
+
+    def shoot(self, cells: np.ndarray):
+        """
+        Shoots once at every game
+        :param cells: numpy array - (N,) cell of every shot, (x - 1) * SIZE + (y - 1); any other value is out of the map
+        :return: numpy array - (N,) int8 MISS, HIT, SINK, WIN or REPEATED
+        """
+        index = np.minimum(np.asarray(cells).astype(np.uint64), np.uint64(CELLS))  # Negative values wrap around too
+        bits = np.left_shift(np.uint64(1), index & np.uint64(63))
+        words = index >> np.uint64(6)
+        words += self.__words
+        shots = self.__shots[words]
+        fresh = (shots & bits) == 0
+        shots |= bits
+        self.__shots[words] = shots
+
+        index += self.__base
+        ship = self.__grid[index]
+        hit = ship > 0
+        hit &= fresh
+        codes = np.where(fresh, hit.view(np.int8), np.int8(REPEATED))  # HIT is 1 and MISS is 0
+
+        games = np.flatnonzero(hit)
+        if len(games):
+            health = games * SHIPS + ship[games]
+            self.__health[health] -= 1
+            sunk = self.__health[health] == 0
+            if sunk.any():
+                games, health = games[sunk], health[sunk]
+                self.__alive[games] -= 1
+                codes[games] = np.where(self.__alive[games] == 0, WIN, SINK)
+                for word in range(WORDS):  # The points around the destroyed ship
+                    self.__shots[games * WORDS + word] |= self.__around[health * WORDS + word]
+        return codes
+
+
+def random_grids(count: int, pool: int = 1000, seed: int = None):
+    """
+    Fleets for benchmarks: brain.get_random_player is slow, so a pool of its fleets is reused
+    :param count: int - amount of fleets
+    :param pool: int - amount of different fleets
+    :return: numpy array - (count, CELLS) ship ids
+    """
+    players = [brain.get_random_player() for _ in range(min(pool, count))]
+    grids = BatchBoards.from_players(players).get_grids().reshape(-1, CELLS)
+    return grids[np.random.default_rng(seed).integers(len(grids), size=count)]
+
+
+def bench(sizes: list, steps: int):
+    """
+    Shoots every board of N games in a sweep without repeats and reports shots/sec for every N
+    :return: None
+    """
+    # One game through objects.Player for comparison
+    players = [brain.get_random_player() for _ in range(200)]
+    begin = time.perf_counter()
+    for player in players:
+        for cell in range(CELLS):
+            player.receive_shot(cell // SIZE + 1, cell % SIZE + 1)
+    print("objects.Player: %12.0f shots/sec" % (len(players) * CELLS / (time.perf_counter() - begin)))
+
+    for size in sizes:
+        boards = BatchBoards(random_grids(size))
+        offsets = np.random.default_rng().integers(CELLS, size=size)
+        cells = np.empty(size, np.intp)
+        begin = time.perf_counter()
+        for step in range(steps):
+            np.add(offsets, step * 37, out=cells)  # 37 and 100 are coprime, so no cell is shot twice
+            np.remainder(cells, CELLS, out=cells)
+            boards.shoot(cells)
+        elapsed = time.perf_counter() - begin
+        print("N = %8d:     %12.0f shots/sec" % (size, size * steps / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized engine for many games at once")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1, 10, 100, 1000, 10000, 100000, 1000000])
+    parser.add_argument("--steps", type=int, default=CELLS)
+    args = parser.parse_args()
+    bench(args.sizes, args.steps)
+
+
+if __name__ == "__main__":
+    main()
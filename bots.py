@@ -1,18 +1,25 @@
+import res
 from res import Strings as String
 import random as rd
 import datetime as dt
 from collections import deque
-import numpy as np
-import os
-import json
+
+import endgame
+from rules import Rules, DEFAULT_RULES
 
 class EasyBot:
     """
     EasyBot shoots randomly without any strategy.
     It does not remember previous shots, so it can repeat coordinates.
     """
+    def __init__(self, rules: Rules = DEFAULT_RULES):
+        self.size = rules.size
+
     def say(self, value: str):
-        return rd.randint(0, 9), rd.randint(0, 9)  # rd coordinates in a 10x10 grid
+        return rd.randint(1, self.size), rd.randint(1, self.size)  # rd coordinates in the grid
+
+    def say_salvo(self, results: list, amount: int):
+        return [self.say(String.GameFrame.BOT_SHOOT) for _ in range(amount)]
 
 
 class MediumBot:
@@ -20,9 +27,12 @@ class MediumBot:
     MediumBot avoids duplicate shots and has basic hit-follow-up logic.
     It shoots nearby cells if it gets a hit.
     """
-    def __init__(self):
+    def __init__(self, rules: Rules = DEFAULT_RULES):
+        self.size = rules.size
         self.previous_shots = set()
         self.to_follow_up = []  # Cells to target after a hit
+        self.last_salvo = []
+        self.last_shot = ()  # Empty before the first shot
 
     def say(self, value: str):
         if value == "hit" or value == "destroyed":
@@ -33,40 +43,83 @@ class MediumBot:
             target = self.to_follow_up.pop(0)
             if target not in self.previous_shots:
                 self.previous_shots.add(target)
+                self.last_shot = target
                 return target
 
         # rd guess if no cells to follow up
-        while True:
-            x, y = rd.randint(0, 9), rd.randint(0, 9)
-            if (x, y) not in self.previous_shots:
-                self.previous_shots.add((x, y))
-                return x, y
+        self.last_shot = self._random_shoot()
+        return self.last_shot
+
+    def say_salvo(self, results: list, amount: int):
+        """
+        Follows up every hit of the previous salvo.
+        """
+        for point, result in zip(self.last_salvo, results):
+            if result == "hit" or result == "destroyed":
+                self._add_adjacent_cells(point)
+        amount = min(amount, self.size * self.size - len(self.previous_shots))
+        self.last_salvo = [self.say(String.GameFrame.BOT_SHOOT) for _ in range(amount)]
+        return self.last_salvo
+
+    def get_state(self):
+        """
+        :return: bytes - the shots and the cells to follow up, for a saved game (savegame.py)
+        """
+        import savegame
+
+        return savegame.pack_bot_state(self.last_shot, (sorted(self.previous_shots), self.to_follow_up,
+                                                         self.last_salvo))
+
+    def set_state(self, state: bytes):
+        """
+        :param state: bytes - made by get_state
+        :return: None
+        """
+        import savegame
+
+        last_shot, (shots, self.to_follow_up, self.last_salvo), _ = savegame.unpack_bot_state(state)
+        self.previous_shots = set(shots)
+        self.last_shot = tuple(last_shot)
 
-    def _add_adjacent_cells(self):
+    def _add_adjacent_cells(self, last: tuple = None):
         """
-        Add adjacent cells (up, down, left, right) of the last shot to the follow-up list.
+        Add adjacent cells (up, down, left, right) of the last shot (or the given one) to the follow-up list.
         """
-        if self.previous_shots:
-            last_x, last_y = max(self.previous_shots)
+        last = last or self.last_shot
+        if last:
+            last_x, last_y = last
             possible_moves = [(last_x - 1, last_y), (last_x + 1, last_y),
                               (last_x, last_y - 1), (last_x, last_y + 1)]
             for move in possible_moves:
-                if 0 <= move[0] < 10 and 0 <= move[1] < 10:  # Ensure within grid
+                if 1 <= move[0] <= self.size and 1 <= move[1] <= self.size:  # Ensure within grid
                     self.to_follow_up.append(move)
 
+    def _random_shoot(self):
+        """
+        :return: tuple - a random point of the grid (1..size) that has not been shot, any point if all have been
+        """
+        if len(self.previous_shots) >= self.size * self.size:
+            return rd.randint(1, self.size), rd.randint(1, self.size)
+        while True:
+            x, y = rd.randint(1, self.size), rd.randint(1, self.size)  # rd coordinates in the grid
+            if (x, y) not in self.previous_shots:
+                self.previous_shots.add((x, y))
+                return x, y
+
 class HardBot(object):
 
-    def __init__(self):
+    def __init__(self, rules: Rules = DEFAULT_RULES):
+        self.__size = rules.size
         self.__x = 0
         self.__y = 0
         self.__last_ship = []
         self.__time = 0
-        self.__prob_map = [[0 for _ in range(12)] for _ in range(12)]
+        self.__prob_map = [[0 for _ in range(self.__size + 2)] for _ in range(self.__size + 2)]
         self.__total_shots = 0
         self.__hunt_mode = True
 
         # Initialize hit map
-        self.__mp = [[False for _ in range(12)] for _ in range(12)]
+        self.__mp = [[False for _ in range(self.__size + 2)] for _ in range(self.__size + 2)]
 
     def say(self, sms: str):
         """
@@ -92,6 +145,26 @@ class HardBot(object):
         print(">>> Bot1: shoot #%d - (%d, %d)" % (self.__time, result[0], result[1]))
         return result
 
+    def get_state(self):
+        """
+        :return: bytes - what the bot knows about the enemy's map, for a saved game (savegame.py)
+        """
+        import savegame
+
+        return savegame.pack_bot_state((self.__x, self.__y, self.__time, self.__total_shots, self.__hunt_mode),
+                                       (self.__last_ship,), (self.__mp, self.__prob_map))
+
+    def set_state(self, state: bytes):
+        """
+        :param state: bytes - made by get_state
+        :return: None
+        """
+        import savegame
+
+        numbers, (self.__last_ship,), (self.__mp, self.__prob_map) = savegame.unpack_bot_state(state)
+        self.__x, self.__y, self.__time, self.__total_shots, hunt_mode = numbers
+        self.__hunt_mode = bool(hunt_mode)
+
     def __shoot(self):
         """
         Calls when the bot receives "shoot" command
@@ -106,7 +179,8 @@ class HardBot(object):
         """
         Hunt mode: select cells in a checkerboard pattern for efficiency.
         """
-        candidates = [(x, y) for x in range(1, 11) for y in range(1, 11) if not self.__mp[y][x] and (x + y) % 2 == 0]
+        candidates = [(x, y) for x in range(1, self.__size + 1) for y in range(1, self.__size + 1)
+                      if not self.__mp[y][x] and (x + y) % 2 == 0]
         if candidates:
             self.__x, self.__y = rd.choice(candidates)
         else:
@@ -119,8 +193,8 @@ class HardBot(object):
 
     def __random_shoot(self):
         while True:
-            x = self.__rd(1, 10)
-            y = self.__rd(1, 10)
+            x = self.__rd(1, self.__size)
+            y = self.__rd(1, self.__size)
             if not self.__mp[y][x]:
                 return x, y
 
@@ -153,7 +227,7 @@ class HardBot(object):
         rd.shuffle(directions)
         for dx, dy in directions:
             nx, ny = self.__last_ship[0][0] + dx, self.__last_ship[0][1] + dy
-            if 1 <= nx <= 10 and 1 <= ny <= 10 and not self.__mp[ny][nx]:
+            if 1 <= nx <= self.__size and 1 <= ny <= self.__size and not self.__mp[ny][nx]:
                 return nx, ny
         return self.__random_shoot()
 
@@ -163,7 +237,7 @@ class HardBot(object):
         """
         xes = sorted([ship[0] for ship in self.__last_ship])
         for nx in [xes[0] - 1, xes[-1] + 1]:
-            if 1 <= nx <= 10 and not self.__mp[self.__last_ship[0][1]][nx]:
+            if 1 <= nx <= self.__size and not self.__mp[self.__last_ship[0][1]][nx]:
                 return nx, self.__last_ship[0][1]
         return self.__random_shoot()
 
@@ -173,7 +247,7 @@ class HardBot(object):
         """
         yes = sorted([ship[1] for ship in self.__last_ship])
         for ny in [yes[0] - 1, yes[-1] + 1]:
-            if 1 <= ny <= 10 and not self.__mp[ny][self.__last_ship[0][0]]:
+            if 1 <= ny <= self.__size and not self.__mp[ny][self.__last_ship[0][0]]:
                 return self.__last_ship[0][0], ny
         return self.__random_shoot()
 
@@ -185,7 +259,7 @@ class HardBot(object):
         for x, y in self.__last_ship:
             for dx, dy in [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]:
                 nx, ny = x + dx, y + dy
-                if 1 <= nx <= 10 and 1 <= ny <= 10:
+                if 1 <= nx <= self.__size and 1 <= ny <= self.__size:
                     self.__mp[ny][nx] = True
 
         self.__last_ship = []
@@ -197,8 +271,8 @@ class HardBot(object):
         """
         Updates the probability map based on current hits and misses.
         """
-        for y in range(1, 11):
-            for x in range(1, 11):
+        for y in range(1, self.__size + 1):
+            for x in range(1, self.__size + 1):
                 if self.__mp[y][x]:
                     self.__prob_map[y][x] = 0
                 else:
@@ -215,7 +289,7 @@ class HardBot(object):
                 fits = True
                 for i in range(ship_len):
                     nx, ny = x + i * dx, y + i * dy
-                    if not (1 <= nx <= 10 and 1 <= ny <= 10) or self.__mp[ny][nx]:
+                    if not (1 <= nx <= self.__size and 1 <= ny <= self.__size) or self.__mp[ny][nx]:
                         fits = False
                         break
                 if fits:
@@ -235,7 +309,7 @@ class HardBot(object):
             for dx, dy in [(1, 0), (0, 1)]:
                 for i in range(ship_len):
                     nx, ny = x - i * dx, y - i * dy
-                    if 1 <= nx <= 10 and 1 <= ny <= 10 and not self.__mp[ny][nx]:
+                    if 1 <= nx <= self.__size and 1 <= ny <= self.__size and not self.__mp[ny][nx]:
                         self.__prob_map[ny][nx] = max(0, self.__prob_map[ny][nx] + adjustment)
 
     @staticmethod
@@ -245,15 +319,16 @@ class HardBot(object):
 
     def __print_map(self):
         print("\nTime:", self.__time)
-        for i in range(1, 11):
-            for j in range(1, 11):
+        for i in range(1, self.__size + 1):
+            for j in range(1, self.__size + 1):
                 print(self.__mp[i][j], end=" ")
             print()
 
 class Fati(object):
 
-    def __init__(self):
+    def __init__(self, rules: Rules = DEFAULT_RULES):
 
+        self.__size = rules.size
         self.__x = 0
         self.__y = 0
         self.__last_ship = []
@@ -261,9 +336,9 @@ class Fati(object):
 
         # Setting up an empty array
         self.__mp = []  # True if the field is hit else False
-        for y in range(12):
+        for y in range(self.__size + 2):
             row = []
-            for x in range (12):
+            for x in range(self.__size + 2):
                 row.append(False)
             self.__mp.append(row)
 
@@ -289,14 +364,31 @@ class Fati(object):
         print(">>> Bot1: shoot #%d - (%d, %d)" % (self.__time, result[0], result[1]))
         return result
 
+    def get_state(self):
+        """
+        :return: bytes - what the bot knows about the enemy's map, for a saved game (savegame.py)
+        """
+        import savegame
+
+        return savegame.pack_bot_state((self.__x, self.__y, self.__time), (self.__last_ship,), (self.__mp,))
+
+    def set_state(self, state: bytes):
+        """
+        :param state: bytes - made by get_state
+        :return: None
+        """
+        import savegame
+
+        (self.__x, self.__y, self.__time), (self.__last_ship,), (self.__mp,) = savegame.unpack_bot_state(state)
+
     def __shoot(self):
         """
         Calls when the bot receives "shoot" command
         :return: tuple of two ints - x and y, coordinate of the bot's chose
         """
         if not self.__last_ship:
-            x = self.__rd(1, 10)
-            y = self.__rd(1, 10)
+            x = self.__rd(1, self.__size)
+            y = self.__rd(1, self.__size)
 
             if not self.__mp[y][x]:
                 self.__x = x
@@ -343,13 +435,13 @@ class Fati(object):
         if where == 1 and self.__last_ship[0][1] > 1:
             result = self.__last_ship[0][0], self.__last_ship[0][1] - 1
 
-        elif where == 2 and self.__last_ship[0][1] < 10:
+        elif where == 2 and self.__last_ship[0][1] < self.__size:
             result = self.__last_ship[0][0], self.__last_ship[0][1] + 1
 
         elif where == 3 and self.__last_ship[0][0] > 1:
             result = self.__last_ship[0][0] - 1, self.__last_ship[0][1]
 
-        elif where == 4 and self.__last_ship[0][0] < 10:
+        elif where == 4 and self.__last_ship[0][0] < self.__size:
             result = self.__last_ship[0][0] + 1, self.__last_ship[0][1]
 
         if result is not None and not self.__mp[result[1]][result[0]]:
@@ -373,7 +465,7 @@ class Fati(object):
         if which == 1 and left > 1:
             result = left - 1, self.__last_ship[0][1]
 
-        if which == 2 and right < 10:
+        if which == 2 and right < self.__size:
             result = right + 1, self.__last_ship[0][1]
 
         if result is not None and not self.__mp[result[1]][result[0]]:
@@ -396,7 +488,7 @@ class Fati(object):
         if which == 3 and top > 1:
             result = self.__last_ship[0][0], top - 1
 
-        if which == 4 and bottom < 10:
+        if which == 4 and bottom < self.__size:
             result = self.__last_ship[0][0], bottom + 1
 
         if result is not None and not self.__mp[result[1]][result[0]]:
@@ -437,20 +529,23 @@ class Fati(object):
 
     def __print_map(self):
         print("\n Time:", self.__time)
-        for i in range(1, 11):
-            for j in range(1, 11):
+        for i in range(1, self.__size + 1):
+            for j in range(1, self.__size + 1):
                 print(self.__mp[i][j], end=" ")
             print()
 
 class BattleshipBot:
-    def __init__(self):
+    def __init__(self, rules: Rules = DEFAULT_RULES):
+        self.__size = rules.size
         self.__x = 0
         self.__y = 0
         self.__last_ship = []
         self.__time = 0
         self.__hunt_mode = True
-        self.__mp = [[False for _ in range(12)] for _ in range(12)]  # Track visited cells
-        self.__Q_map = [[0 for _ in range(12)] for _ in range(12)]  # Q-values for reinforcement learning
+        self.__mp = [[False for _ in range(self.__size + 2)] for _ in range(self.__size + 2)]  # Track visited cells
+        import qlearning  # Deferred, numpy is only needed once the bot is chosen
+
+        self.__learner = qlearning.QLearner(self.__size)  # Q-values per symmetry class and the replay buffer
         self.__total_shots = 0
         self.__sequential_index = 0  # Index for sequential targeting
         self.__sequential_mode = False  # Toggle for sequential shooting
@@ -458,13 +553,26 @@ class BattleshipBot:
         self.__checkboard_index = 0  # Index for checkboard targeting
 
         # Ship information
-        self.__ship_lengths = [4, 3, 3, 2, 2, 2, 1, 1, 1, 1]
-        self.__remaining_ships = {4: 1, 3: 2, 2: 3, 1: 4}  # Dynamic tracking
+        self.__ship_lengths = list(rules.fleet)
+        self.__remaining_ships = {tp: rules.get_amount(tp) for tp in set(rules.fleet)}  # Dynamic tracking
+        # Exact play once few fleets fit what has been seen, the solver knows only the standard board
+        self.__endgame = endgame.EndgameSolver() if rules.is_standard() else None
 
         # Reinforcement data file
-        self.__reinforcement_file = "reinforcement_data.json"
+        self.__reinforcement_file = "reinforcement_data.json" if rules.is_standard() else \
+            "reinforcement_data_%d.json" % rules.size
         self.load_reinforcement_data()
 
+    @staticmethod
+    def warm_up(rules: Rules = DEFAULT_RULES):
+        """
+        Imports NumPy and the Q-learning modules (registry.py)
+        :param rules: Rules - size of the board and the fleet
+        :return: None
+        """
+        import qlearning
+        import qstore
+
     def set_sequential_mode(self, mode: bool):
         """Set the mode for sequential shooting."""
         self.__sequential_mode = mode
@@ -479,20 +587,22 @@ class BattleshipBot:
 
         if sms == String.GameFrame.BOT_SHOOT:
             print("Bot is trying to shoot...")
+            if self.__time != 0:
+                self.__reward(res.Q_MISS_REWARD)  # The last shot missed
             result = self.__shoot()
         elif sms == String.GameFrame.BOT_HIT:
             if self.__time != 0:
                 self.__last_ship.append((self.__x, self.__y))
                 self.__hunt_mode = False
-                self.__reward(10)  # Reward for a hit
+                self.__reward(res.Q_HIT_REWARD)
             result = self.__hit()
         elif sms == String.GameFrame.BOT_DESTROYED:
             self.__last_ship.append((self.__x, self.__y))
             self.__update_remaining_ships()
-            self.__reward(50)  # High reward for destroying a ship
+            self.__reward(res.Q_DESTROYED_REWARD)
             result = self.__destroyed()
         else:
-            self.__reward(-1)  # Small penalty for invalid action
+            self.__reward(res.Q_MISS_REWARD)  # Small penalty for invalid action
 
         if result is None:
             print(f"Error: Failed to compute a valid move for sms: {sms}")
@@ -503,6 +613,33 @@ class BattleshipBot:
         self.__total_shots += 1
         return result
 
+    def get_state(self):
+        """
+        The Q-values are not a part of it, they are kept in the reinforcement data store
+        :return: bytes - what the bot knows about the enemy's map, for a saved game (savegame.py)
+        """
+        import savegame
+
+        numbers = (self.__x, self.__y, self.__time, self.__hunt_mode, self.__total_shots, self.__sequential_index,
+                   self.__sequential_mode, self.__checkboard_mode, self.__checkboard_index)
+        remaining = sorted(self.__remaining_ships.items())
+        return savegame.pack_bot_state(numbers, (self.__last_ship, remaining), (self.__mp,))
+
+    def set_state(self, state: bytes):
+        """
+        :param state: bytes - made by get_state
+        :return: None
+        """
+        import savegame
+
+        numbers, (self.__last_ship, remaining), (self.__mp,) = savegame.unpack_bot_state(state)
+        self.__x, self.__y, self.__time, hunt_mode, self.__total_shots, self.__sequential_index, \
+            sequential_mode, checkboard_mode, self.__checkboard_index = numbers
+        self.__hunt_mode = bool(hunt_mode)
+        self.__sequential_mode = bool(sequential_mode)
+        self.__checkboard_mode = bool(checkboard_mode)
+        self.__remaining_ships = dict(remaining)
+
     def __shoot(self):
         if self.__hunt_mode:
             return self.__hunt()
@@ -510,9 +647,12 @@ class BattleshipBot:
             return self.__hit()
 
     def __hunt(self):
-        max_q = max(self.__Q_map[y][x] for y in range(1, 11) for x in range(1, 11) if not self.__mp[y][x])
-        candidates = [(x, y) for x in range(1, 11) for y in range(1, 11)
-                      if not self.__mp[y][x] and self.__Q_map[y][x] == max_q]
+        if self.__endgame_shoot():
+            return self.__x, self.__y
+        q_map = self.__learner.table.get_grid()  # Symmetric, [x][y] is [y][x]
+        free = [(x, y) for x in range(1, self.__size + 1) for y in range(1, self.__size + 1) if not self.__mp[y][x]]
+        max_q = max((q_map[x][y] for x, y in free), default=0)
+        candidates = [(x, y) for x, y in free if q_map[x][y] == max_q]
 
         if candidates and max_q > 0:
             self.__x, self.__y = rd.choice(candidates)
@@ -528,9 +668,9 @@ class BattleshipBot:
         return self.__x, self.__y
 
     def __sequential_shoot(self):
-        while self.__sequential_index < 100:
-            x = self.__sequential_index % 10 + 1
-            y = self.__sequential_index // 10 + 1
+        while self.__sequential_index < self.__size * self.__size:
+            x = self.__sequential_index % self.__size + 1
+            y = self.__sequential_index // self.__size + 1
             self.__sequential_index += 1
 
             if not self.__mp[y][x]:
@@ -540,13 +680,13 @@ class BattleshipBot:
 
         # Reset if all cells are visited (should not happen normally)
         self.__sequential_index = 0
-        self.__mp = [[False for _ in range(12)] for _ in range(12)]
+        self.__mp = [[False for _ in range(self.__size + 2)] for _ in range(self.__size + 2)]
         return self.__sequential_shoot()
 
     def __checkboard_shoot(self):
         # First pass: Checkboard pattern
-        for y in range(1, 11):  # Rows
-            for x in range(1, 11):  # Columns
+        for y in range(1, self.__size + 1):  # Rows
+            for x in range(1, self.__size + 1):  # Columns
                 # Checkboard pattern: (x + y) % 2 == 0
                 if (x + y) % 2 == 0 and not self.__mp[y][x]:
                     self.__x, self.__y = x, y
@@ -554,19 +694,21 @@ class BattleshipBot:
                     return x, y
 
         # Second pass: Fill remaining cells
-        for y in range(1, 11):  # Rows
-            for x in range(1, 11):  # Columns
+        for y in range(1, self.__size + 1):  # Rows
+            for x in range(1, self.__size + 1):  # Columns
                 if not self.__mp[y][x]:
                     self.__x, self.__y = x, y
                     self.__mp[y][x] = True
                     return x, y
 
         # Reset if all cells are visited (should not happen normally)
-        self.__mp = [[False for _ in range(12)] for _ in range(12)]
+        self.__mp = [[False for _ in range(self.__size + 2)] for _ in range(self.__size + 2)]
         return self.__checkboard_shoot()
 
 
     def __hit(self):
+        if self.__endgame_shoot():
+            return self.__x, self.__y
         result = ()
         if len(self.__last_ship) == 1:
             result = self.__get_one_of_four()
@@ -583,60 +725,63 @@ class BattleshipBot:
         for x, y in self.__last_ship:
             for dx, dy in [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]:
                 nx, ny = x + dx, y + dy
-                if 1 <= nx <= 10 and 1 <= ny <= 10:
+                if 1 <= nx <= self.__size and 1 <= ny <= self.__size:
                     self.__mp[ny][nx] = True
         self.__last_ship = []
         self.__hunt_mode = True
         return self.__shoot()
 
+    def __endgame_shoot(self):
+        """
+        Asks the endgame solver for the shot, the heuristics are used if it has not found one in time
+        :return: True if the solver has chosen the shot
+        """
+        if self.__endgame is None:
+            return False
+        shots = endgame.get_mask([(x, y) for y in range(1, self.__size + 1) for x in range(1, self.__size + 1) if self.__mp[y][x]])
+        point = self.__endgame.get_shot(shots, endgame.get_mask(self.__last_ship), self.__remaining_ships)
+        if point is None:
+            return False
+        self.__x, self.__y = point
+        self.__mp[self.__y][self.__x] = True
+        return True
+
     def __get_one_of_four(self):
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         rd.shuffle(directions)
         for dx, dy in directions:
             nx, ny = self.__last_ship[0][0] + dx, self.__last_ship[0][1] + dy
-            if 1 <= nx <= 10 and 1 <= ny <= 10 and not self.__mp[ny][nx]:
+            if 1 <= nx <= self.__size and 1 <= ny <= self.__size and not self.__mp[ny][nx]:
                 return nx, ny
         return self.__random_shoot()
 
     def __get_right_or_left(self):
         xes = sorted([ship[0] for ship in self.__last_ship])
         for nx in [xes[0] - 1, xes[-1] + 1]:
-            if 1 <= nx <= 10 and not self.__mp[self.__last_ship[0][1]][nx]:
+            if 1 <= nx <= self.__size and not self.__mp[self.__last_ship[0][1]][nx]:
                 return nx, self.__last_ship[0][1]
         return self.__random_shoot()
 
     def __get_top_or_bottom(self):
         yes = sorted([ship[1] for ship in self.__last_ship])
         for ny in [yes[0] - 1, yes[-1] + 1]:
-            if 1 <= ny <= 10 and not self.__mp[ny][self.__last_ship[0][0]]:
+            if 1 <= ny <= self.__size and not self.__mp[ny][self.__last_ship[0][0]]:
                 return self.__last_ship[0][0], ny
         return self.__random_shoot()
 
     def __random_shoot(self):
-        available_cells = [(x, y) for y in range(1, 11) for x in range(1, 11) if not self.__mp[y][x]]
+        available_cells = [(x, y) for y in range(1, self.__size + 1) for x in range(1, self.__size + 1) if not self.__mp[y][x]]
 
         if not available_cells:
-            self.__mp = [[False for _ in range(12)] for _ in range(12)]
-            self.__Q_map = [[0 for _ in range(12)] for _ in range(12)]
+            self.__mp = [[False for _ in range(self.__size + 2)] for _ in range(self.__size + 2)]
             return (1, 1)
 
         return rd.choice(available_cells)
 
     def __reward(self, value):
-    # Give reward to the current cell
-        self.__Q_map[self.__y][self.__x] += value  # Full reward for the current position
-
-        # Distribute reward to neighboring cells
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                nx, ny = self.__x + dx, self.__y + dy
-                if 1 <= nx <= 10 and 1 <= ny <= 10:
-                    # Decay reward based on distance from current position
-                    distance = abs(dx) + abs(dy)
-                    if distance > 0:
-                        self.__Q_map[ny][nx] += value / (1 + distance)  # Decay reward for neighbors
-
-        self.save_reinforcement_data()  # Save Q-map after updating
+        # The reward of the last shot teaches every point symmetric to it, and is kept for replay
+        self.__learner.remember(self.__time, self.__x, self.__y, value)
+        self.save_reinforcement_data()  # Share the Q-values after updating
 
 
     def __update_remaining_ships(self):
@@ -647,16 +792,295 @@ class BattleshipBot:
                 del self.__remaining_ships[ship_len]
 
     def load_reinforcement_data(self):
-        try:
-            with open(self.__reinforcement_file, "r") as file:
-                self.__Q_map = json.load(file)
-            print("Reinforcement data loaded:", self.__Q_map)
-        except FileNotFoundError:
-            self.__Q_map = [[0 for _ in range(12)] for _ in range(12)]
+        """
+        Opens the store shared by every process playing the bot (qstore.py); a new store starts from the JSON file
+        :return: None
+        """
+        import json  # Deferred, json is only needed once the bot is chosen
+        import os
+        import qstore
+
+        path = os.path.splitext(self.__reinforcement_file)[0]
+        values = self.__learner.table.values
+        if not os.path.exists(path + qstore.MASTER):
+            try:
+                with open(self.__reinforcement_file, "r") as file:
+                    self.__learner.table.set_rows(json.load(file))
+            except (FileNotFoundError, ValueError):
+                self.__learner.table.clear()
+        self.__store = qstore.QStore(path, len(values), values)
+        self.__store.load(values)
+        print("Reinforcement data loaded:", self.get_reinforcement_data())
 
     def save_reinforcement_data(self):
-        with open(self.__reinforcement_file, "w") as file:
-            json.dump(self.__Q_map, file)
+        """
+        Appends what the bot has learned since the last call to its log of the store and takes
+        what the other processes have learned. The JSON file is never written
+        :return: None
+        """
+        self.__store.sync(self.__learner.table.values)
+
+    def get_endgame_telemetry(self):
+        """
+        :return: str - what the endgame solver has done so far (EndgameSolver.get_telemetry), None off the standard board
+        """
+        return self.__endgame.get_telemetry() if self.__endgame is not None else None
 
     def get_reinforcement_data(self):
-        return self.__Q_map
\ No newline at end of file
+        return self.__learner.table.get_rows()
+
+
+class InfoBot(object):
+    """
+    Shoots the point whose outcome tells the most about the enemy fleet, estimated from sampled fleets (infogain.py)
+    """
+
+    def __init__(self, rules: Rules = DEFAULT_RULES):
+        import infogain  # Deferred, numpy and the process pool are only needed once the bot is chosen
+
+        if not rules.is_standard():
+            raise ValueError("InfoBot plays only on the standard board")
+
+        self.__size = rules.size
+        self.__estimator = infogain.get_estimator()
+        self.__observer = infogain.Observer()
+        self.__x = 0
+        self.__y = 0
+        self.__time = 0
+        self.__salvo = []  # Points of the last salvo
+
+    @staticmethod
+    def warm_up(rules: Rules = DEFAULT_RULES):
+        """
+        Starts the process pool and fills the caches of the sampler with one move on an empty board (registry.py)
+        :param rules: Rules - size of the board and the fleet
+        :return: None
+        """
+        import infogain
+
+        observer = infogain.Observer()
+        infogain.get_estimator().get_shot(observer.shots, observer.hits, observer.remaining)
+
+    def say(self, sms: str):
+        """
+        :param sms: str - the command, what should do the bot
+        :return: tuple of two int - (x, y) coordinates
+        """
+        if self.__time != 0:
+            if sms == String.GameFrame.BOT_HIT:
+                self.__observer.hit(self.__x, self.__y)
+            elif sms == String.GameFrame.BOT_DESTROYED:
+                self.__observer.destroyed(self.__x, self.__y)
+
+        observer = self.__observer
+        result = self.__estimator.get_shot(observer.shots, observer.hits, observer.remaining)
+        if result is None:  # No fleet agrees with what has been seen
+            result = rd.choice([(x, y) for x in range(1, self.__size + 1) for y in range(1, self.__size + 1)
+                                if not observer.shots >> (x - 1) * self.__size + y - 1 & 1])
+        self.__x, self.__y = result
+        observer.shot(self.__x, self.__y)
+
+        self.__time += 1
+        print(">>> InfoBot: shoot #%d - (%d, %d); %s" % (self.__time, result[0], result[1],
+                                                        self.__estimator.get_telemetry()))
+        return result
+
+    def say_salvo(self, results: list, amount: int):
+        """
+        Aims the whole salvo at the most informative points of one estimate
+        :param results: list - results of the previous salvo
+        :param amount: int - shots of the salvo
+        :return: list of tuples - (x, y) of every shot
+        """
+        observer = self.__observer
+        for (x, y), result in zip(self.__salvo, results):
+            if result == String.GameFrame.BOT_HIT:
+                observer.hit(x, y)
+            elif result == String.GameFrame.BOT_DESTROYED:
+                observer.destroyed(x, y)
+
+        points = self.__estimator.get_shots(observer.shots, observer.hits, observer.remaining, amount)
+        free = [(x, y) for x in range(1, self.__size + 1) for y in range(1, self.__size + 1)
+                if not observer.shots >> (x - 1) * self.__size + y - 1 & 1 and (x, y) not in points]
+        rd.shuffle(free)
+        points += free[:amount - len(points)]  # No fleet agrees with what has been seen, or too few points
+        for x, y in points:
+            observer.shot(x, y)
+        self.__salvo = points
+
+        self.__time += len(points)
+        print(">>> InfoBot: salvo of %d up to shot #%d; %s" % (len(points), self.__time,
+                                                              self.__estimator.get_telemetry()))
+        return points
+
+    def get_state(self):
+        """
+        :return: bytes - what the bot has seen of the enemy fleet, for a saved game (savegame.py)
+        """
+        import savegame
+
+        observer = self.__observer
+        points = [[(cell // self.__size + 1, cell % self.__size + 1) for cell in range(self.__size * self.__size)
+                   if mask >> cell & 1] for mask in (observer.shots, observer.hits)]
+        remaining = sorted(observer.remaining.items())
+        return savegame.pack_bot_state((self.__x, self.__y, self.__time), (points[0], points[1], remaining,
+                                                                           self.__salvo))
+
+    def set_state(self, state: bytes):
+        """
+        :param state: bytes - made by get_state
+        :return: None
+        """
+        import savegame
+        import infogain
+
+        (self.__x, self.__y, self.__time), (shots, hits, remaining, self.__salvo), _ = \
+            savegame.unpack_bot_state(state)
+        self.__observer = infogain.Observer()
+        for x, y in shots:
+            self.__observer.shot(x, y)
+        for x, y in hits:
+            self.__observer.hit(x, y)
+        self.__observer.remaining = dict(remaining)
+
+
+class DensityBot(object):
+    """
+    An anytime asynchronous bot (asyncbots.py): hunts the point that the most placements of the ships afloat cover.
+    The placements are counted line by line and the best point so far is kept, so the bot has an answer at the deadline
+    """
+    FREE, MISSED, HIT, SUNK = 0, 1, 2, 3
+
+    def __init__(self, rules: Rules = DEFAULT_RULES):
+        self.__size = rules.size
+        self.__remaining = {tp: rules.get_amount(tp) for tp in set(rules.fleet)}
+        self.__map = [[self.FREE if 0 < x <= self.__size and 0 < y <= self.__size else self.MISSED
+                       for y in range(self.__size + 2)] for x in range(self.__size + 2)]  # [x][y], a missed border
+        self.__x = 0
+        self.__y = 0
+        self.__time = 0
+        self.__best = None
+
+    async def say(self, sms: str, deadline: float):
+        """
+        :param sms: str - the command, what should do the bot
+        :param deadline: float - time.monotonic() of the end of the move
+        :return: tuple of two int - (x, y) coordinates
+        """
+        import asyncio
+        import time
+
+        if self.__time != 0 and self.__map[self.__x][self.__y] != self.SUNK:  # Told twice after a resumed move
+            if sms == String.GameFrame.BOT_HIT:
+                self.__map[self.__x][self.__y] = self.HIT
+            elif sms == String.GameFrame.BOT_DESTROYED:
+                self.__sink(self.__x, self.__y)
+            else:
+                self.__map[self.__x][self.__y] = self.MISSED
+
+        free = [(x, y) for x in range(1, self.__size + 1) for y in range(1, self.__size + 1)
+                if self.__map[x][y] == self.FREE]
+        self.__best = rd.choice(free) if free else (1, 1)
+        targets = self.__get_targets()
+        if targets:
+            self.__best = rd.choice(targets)
+            return self.get_best()
+
+        density = [[0] * (self.__size + 2) for _ in range(self.__size + 2)]
+        most = 0
+        for x in range(1, self.__size + 1):
+            for tp, amount in self.__remaining.items():
+                if amount:
+                    self.__count(density, x, tp, amount)
+            for point in free:
+                if density[point[0]][point[1]] > most:
+                    most = density[point[0]][point[1]]
+                    self.__best = point
+            await asyncio.sleep(0)  # Other moves and the GUI go on, the move may be cancelled here
+            if time.monotonic() >= deadline:
+                break
+        return self.get_best()
+
+    def get_best(self):
+        """
+        The move at the deadline: the best point found so far, taken as the shot
+        :return: tuple of two int - (x, y) coordinates
+        """
+        self.__x, self.__y = self.__best
+        self.__time += 1
+        print(">>> DensityBot: shoot #%d - (%d, %d)" % (self.__time, self.__x, self.__y))
+        return self.__best
+
+    def get_state(self):
+        """
+        :return: bytes - what the bot knows about the enemy's map, for a saved game (savegame.py)
+        """
+        import savegame
+
+        return savegame.pack_bot_state((self.__x, self.__y, self.__time), (sorted(self.__remaining.items()),),
+                                       (self.__map,))
+
+    def set_state(self, state: bytes):
+        """
+        :param state: bytes - made by get_state
+        :return: None
+        """
+        import savegame
+
+        (self.__x, self.__y, self.__time), (remaining,), (self.__map,) = savegame.unpack_bot_state(state)
+        self.__remaining = dict(remaining)
+
+    def __count(self, density: list, x: int, tp: int, amount: int):
+        """
+        Adds the placements of a ship of the type that lie along line x or begin on it
+        :return: None
+        """
+        mp = self.__map
+        for y in range(1, self.__size - tp + 2):
+            if all(mp[x][y + i] == self.FREE for i in range(tp)):
+                for i in range(tp):
+                    density[x][y + i] += amount
+        if tp == 1 or x + tp - 1 > self.__size:  # A submarine is placed once
+            return
+        for y in range(1, self.__size + 1):
+            if all(mp[x + i][y] == self.FREE for i in range(tp)):
+                for i in range(tp):
+                    density[x + i][y] += amount
+
+    def __get_targets(self):
+        """
+        :return: list - free points next to the hits of a ship afloat, along its line if it has two hits
+        """
+        mp = self.__map
+        hits = [(x, y) for x in range(1, self.__size + 1) for y in range(1, self.__size + 1) if mp[x][y] == self.HIT]
+        targets = [(x + dx, y + dy) for x, y in hits for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if mp[x + dx][y + dy] == self.FREE]
+        if len(hits) > 1 and len({x for x, _ in hits}) == 1:
+            targets = [point for point in targets if point[0] == hits[0][0]] or targets
+        elif len(hits) > 1 and len({y for _, y in hits}) == 1:
+            targets = [point for point in targets if point[1] == hits[0][1]] or targets
+        return targets
+
+    def __sink(self, x: int, y: int):
+        """
+        Marks the destroyed ship that has the point and the water around it
+        :return: None
+        """
+        mp = self.__map
+        mp[x][y] = self.HIT
+        ship = []
+        stack = [(x, y)]
+        while stack:
+            cx, cy = stack.pop()
+            if mp[cx][cy] != self.HIT:
+                continue
+            mp[cx][cy] = self.SUNK
+            ship.append((cx, cy))
+            stack.extend(((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)))
+        for cx, cy in ship:
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    if mp[cx + dx][cy + dy] == self.FREE:
+                        mp[cx + dx][cy + dy] = self.MISSED
+        if self.__remaining.get(len(ship)):
+            self.__remaining[len(ship)] -= 1
@@ -1,41 +1,74 @@
 import random
 import datetime
+import json
 
 import objects
+import res
+from rules import Rules, DEFAULT_RULES
 
+_hard_fleets = None  # Fleets of the library of placement.py, loaded on the first draw
 
-def get_random_player():
+
+def get_random_player(rules: Rules = DEFAULT_RULES):
     """
     Creates a Player object with a random map
+    :param rules: Rules - size of the board and the fleet
     :return: Player
     """
-    player = objects.Player()
-    ships = objects.get_list_of_ships()
+    player = objects.Player(rules)
+    ships = rules.fleet
 
     j = 0
     for ship in ships:
         i = 0
         j += 1
-        while not __is_added(player, ship):
+        while not __is_added(player, ship, rules):
             i += 1
 
     return player
 
 
-def __is_added(player, ship):
+def get_hard_player(rules: Rules = DEFAULT_RULES):
+    """
+    Creates a Player object with a fleet drawn from the library of hard fleets (placement.py),
+    with a random map if there is no library or the board is not the standard one
+    :param rules: Rules - size of the board and the fleet
+    :return: Player
+    """
+    global _hard_fleets
+    if not rules.is_standard():
+        return get_random_player(rules)
+    if _hard_fleets is None:
+        try:
+            with open(res.Strings.FLEET_LIBRARY) as file:
+                _hard_fleets = [fleet["ships"] for fleet in json.load(file)["fleets"]]
+        except (OSError, ValueError, KeyError):
+            _hard_fleets = []
+    if not _hard_fleets:
+        return get_random_player(rules)
+
+    player = objects.Player(rules)
+    for tp, orientation, x, y in random.choice(_hard_fleets):
+        player.add_ship(objects.Ship(tp, orientation, x, y, rules))
+    return player
+
+
+def __is_added(player, ship, rules):
     """
     :param player: Player - an object Player
-    :param ship: Ship - a ship that has to be tried to put on the map of Player
+    :param ship: int - type of a ship that has to be tried to put on the map of Player
+    :param rules: Rules - size of the board
     :return: True if the given ship has been put successfully
     """
     random.seed(datetime.datetime.now().microsecond)
 
+    size = rules.size
     orientation = random.randint(1, 2)
     if orientation == objects.HORIZONTAL:
-        x = random.randint(1, 11 - ship)
-        y = random.randint(1, 10)
+        x = random.randint(1, size + 1 - ship)
+        y = random.randint(1, size)
     else:
-        x = random.randint(1, 10)
-        y = random.randint(1, 11 - ship)
+        x = random.randint(1, size)
+        y = random.randint(1, size + 1 - ship)
 
-    return player.add_ship(objects.Ship(ship, orientation, x, y))
+    return player.add_ship(objects.Ship(ship, orientation, x, y, rules))
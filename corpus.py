@@ -0,0 +1,394 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+import res
+import objects
+import gamelog
+
+# The records of gamelog.py as numpy types
+LOG_RECORD = np.dtype([("kind", "u1"), ("side", "u1"), ("x", "u1"), ("y", "u1"), ("a", "u1"), ("b", "u1"),
+                       ("move", "<u2"), ("game", "<u4"), ("value", "<u4")])
+LOG_INDEX = np.dtype([("first", "<u8"), ("moves", "<u4"), ("winner", "u1"), ("turn", "u1"), ("places", "u1"),
+                      ("humans", "u1")])
+assert LOG_RECORD.itemsize == gamelog.RECORD.size and LOG_INDEX.itemsize == gamelog.INDEX.size
+
+SIZE = res.BOARD_SIZE
+CELLS = SIZE * SIZE
+FLEET = len(res.LIST_OF_SHIPS)
+MAX_TYPE = max(res.LIST_OF_SHIPS)
+OUT_OF_MAP = 255  # Cell of a shot out of the map
+NONE = 0xFFFF  # A shooter without any hit
+KINDS = gamelog.END + 1
+CHUNK = 1 << 15  # Games consolidated at once, bounds the memory of every step
+SHOT_CHUNK = 1 << 24  # Shots counted at once
+
+# Columns, name -> (dtype, values per game); the values of both sides follow each other.
+# fleet - the number of the ship (1..FLEET) on every cell, 0 for water.
+# ships - every ship as ((type - 1) * 2 + orientation - 1) * CELLS + first cell.
+# first_hit, first_hit_cell - the shot of every shooter that hit first, NONE and OUT_OF_MAP without a hit.
+# to_sink - shots of the shooter from the first hit on an enemy ship (by number) to its sink, 0 if not sunk.
+GAME_COLUMNS = {"fleet": ("u1", 2 * CELLS), "ships": ("<u2", 2 * FLEET), "first_hit": ("<u2", 2),
+                "first_hit_cell": ("u1", 2), "to_sink": ("<u2", 2 * FLEET), "moves": ("<u4", 1),
+                "winner": ("u1", 1), "humans": ("u1", 1)}
+# name -> dtype, one value per shot; sorted by game and shooter, move keeps the order of the game
+SHOT_COLUMNS = {"cell": "u1", "side": "u1", "result": "u1", "move": "<u2", "time": "<u4"}
+
+
+class Corpus(object):
+    """
+    Recorded games as memory-mapped columns: one file per column, one meta.json with the counts.
+    Queries go through the games chunk by chunk, so the corpus never has to fit into memory,
+    and their results are cached per version of the corpus.
+    """
+
+    def __init__(self, path: str = res.Strings.CORPUS):
+        """
+        :param path: str - directory of the corpus, created by the first consolidate()
+        """
+        self.__path = path
+        self.__meta = {"version": 0, "games": 0, "shots": 0, "logs": {}}
+        if os.path.exists(self.__file("meta.json")):
+            with open(self.__file("meta.json")) as file:
+                self.__meta = json.load(file)
+        self.__open()
+
+    def __file(self, name: str):
+        return os.path.join(self.__path, name)
+
+    def __open(self):
+        """
+        Maps the columns, only as many values as the meta counts: a consolidation that broke off is not seen
+        :return: None
+        """
+        self.__columns = {}
+        games, shots = self.__meta["games"], self.__meta["shots"]
+        for name, (dtype, width) in GAME_COLUMNS.items():
+            self.__columns[name] = self.__map(name, dtype, (games, width) if width > 1 else (games,))
+        for name, dtype in SHOT_COLUMNS.items():
+            self.__columns[name] = self.__map(name, dtype, (shots,))
+        self.__offsets = np.zeros(games + 1, np.int64)  # First shot of every game
+        np.cumsum(self.__columns["moves"], out=self.__offsets[1:])
+
+    def __map(self, name: str, dtype: str, shape: tuple):
+        """
+        :return: numpy array - read-only memmap of the column, an empty array if it has no values
+        """
+        if shape[0] == 0:
+            return np.zeros(shape, dtype)
+        return np.memmap(self.__file(name), dtype, "r", shape=shape)
+
+    def __len__(self):
+        return self.__meta["games"]
+
+    def get_version(self):
+        """
+        :return: int - grows with every consolidation that adds games
+        """
+        return self.__meta["version"]
+
+    # Consolidation
+    def consolidate(self, log_path: str):
+        """
+        Appends the games of the log that have not been consolidated yet.
+        Columns are appended first and meta.json is replaced last, so an interrupted run changes nothing.
+        :param log_path: str - log written by gamelog.GameLogWriter
+        :return: int - amount of added games
+        """
+        key = os.path.abspath(log_path)
+        done = self.__meta["logs"].get(key, 0)
+        index = self.__map_log(log_path + ".idx", LOG_INDEX)
+        records = self.__map_log(log_path, LOG_RECORD)
+        if len(index) <= done:
+            return 0
+
+        os.makedirs(self.__path, exist_ok=True)
+        files = {name: open(self.__file(name), "ab") for name in list(GAME_COLUMNS) + list(SHOT_COLUMNS)}
+        for name, file in files.items():  # Drops the tail of an interrupted run
+            dtype, width = GAME_COLUMNS[name] if name in GAME_COLUMNS else (SHOT_COLUMNS[name], 1)
+            count = self.__meta["games"] if name in GAME_COLUMNS else self.__meta["shots"]
+            file.truncate(count * width * np.dtype(dtype).itemsize)
+
+        added = shots = 0
+        for begin in range(done, len(index), CHUNK):
+            columns = self.__convert(index[begin:begin + CHUNK], records)
+            if columns is None:
+                continue
+            for name, values in columns.items():
+                files[name].write(values.tobytes())
+            added += len(columns["moves"])
+            shots += len(columns["cell"])
+        for file in files.values():
+            file.close()
+
+        self.__meta["games"] += added
+        self.__meta["shots"] += shots
+        self.__meta["logs"][key] = len(index)
+        self.__meta["version"] += 1
+        with open(self.__file("meta.json.tmp"), "w") as file:
+            json.dump(self.__meta, file)
+        os.replace(self.__file("meta.json.tmp"), self.__file("meta.json"))
+        self.__open()
+        return added
+
+    @staticmethod
+    def __map_log(path: str, dtype: np.dtype):
+        """
+        :return: numpy array - read-only memmap of a log file
+        """
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < dtype.itemsize:
+            return np.zeros(0, dtype)
+        return np.memmap(path, dtype, "r", shape=(size // dtype.itemsize,))
+
+    @staticmethod
+    def __convert(index: np.ndarray, records: np.ndarray):
+        """
+        Turns a chunk of logged games into columns, games without a complete fleet are skipped.
+        The per-game summaries that the queries need (first hits, shots to sink) are worked out here once,
+        so that the queries read a few values per game instead of every shot.
+        :param index: numpy array - entries of the log index
+        :param records: numpy array - the whole log
+        :return: dict - name -> values of every column, None if no game is left
+        """
+        index = index[index["places"] == 2 * FLEET]
+        games = len(index)
+        if games == 0:
+            return None
+
+        # Records of the games only, whatever lies between them (a write that broke off) is left out
+        first = index["first"].astype(np.int64)
+        length = index["places"].astype(np.int64) + index["moves"] + 2
+        position = np.repeat(first - first[0] - (np.cumsum(length) - length), length) + np.arange(length.sum())
+        chunk = records[first[0]:first[-1] + length[-1]][position]
+
+        # Fleets: every placement is spread over the cells of its ship
+        places = chunk[chunk["kind"] == gamelog.PLACE]
+        start = (places["x"].astype(np.int64) - 1) * SIZE + places["y"] - 1
+        ships = ((places["a"].astype(np.int64) - 1) * 2 + places["b"] - 1) * CELLS + start
+        length = places["a"].astype(np.int64)
+        place = np.repeat(np.arange(len(places)), length)
+        step = np.arange(len(place)) - np.repeat(np.cumsum(length) - length, length)
+        step *= np.where(places["b"][place] == objects.HORIZONTAL, SIZE, 1)  # Along x or along y
+        side = places["side"][place].astype(np.int64)
+        fleet = np.zeros((games, 2 * CELLS), np.uint8)
+        fleet[place // (2 * FLEET), side * CELLS + start[place] + step] = place % FLEET + 1
+
+        # Shots, sorted by game and shooter; the order of every shooter's shots is kept
+        shots = chunk[(chunk["kind"] >= gamelog.MISS) & (chunk["kind"] <= gamelog.REPEATED)]
+        game = np.repeat(np.arange(games), index["moves"])
+        key = game * 2 + shots["side"]
+        order = np.argsort(key, kind="stable")
+        shots, game, key = shots[order], game[order], key[order]
+        on_map = (shots["x"] >= 1) & (shots["x"] <= SIZE) & (shots["y"] >= 1) & (shots["y"] <= SIZE)
+        cell = np.where(on_map, (shots["x"].astype(np.int64) - 1) * SIZE + shots["y"] - 1, OUT_OF_MAP)
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        ordinal = np.arange(len(key)) - np.repeat(starts, np.diff(np.r_[starts, len(key)]))
+
+        # The first hit of every shooter
+        hit = (shots["kind"] == gamelog.HIT) | (shots["kind"] == gamelog.SINK)
+        first = np.flatnonzero(hit)[np.r_[True, key[hit][1:] != key[hit][:-1]]]
+        first_hit = np.full(games * 2, NONE, np.uint16)
+        first_hit[key[first]] = ordinal[first]
+        first_hit_cell = np.full(games * 2, OUT_OF_MAP, np.uint8)
+        first_hit_cell[key[first]] = cell[first]
+
+        # Shots from the first hit on a ship to its sink, the first occurrence of a ship is its first hit
+        hit = np.flatnonzero(hit)
+        ship = fleet.reshape(games, 2, CELLS)[game[hit], 1 - shots["side"][hit], cell[hit]].astype(np.int64)
+        group = key[hit] * FLEET + ship - 1
+        groups, first = np.unique(group, return_index=True)
+        sunk = shots["kind"][hit] == gamelog.SINK
+        to_sink = np.zeros(games * 2 * FLEET, np.uint16)
+        to_sink[group[sunk]] = ordinal[hit][sunk] - ordinal[hit][first][np.searchsorted(groups, group[sunk])] + 1
+
+        return {"fleet": fleet, "ships": ships.astype(np.uint16).reshape(games, 2 * FLEET),
+                "first_hit": first_hit.reshape(games, 2), "first_hit_cell": first_hit_cell.reshape(games, 2),
+                "to_sink": to_sink.reshape(games, 2 * FLEET), "moves": index["moves"], "winner": index["winner"],
+                "humans": index["humans"], "cell": cell.astype(np.uint8), "side": shots["side"],
+                "result": shots["kind"], "move": shots["move"], "time": shots["value"]}
+
+    # Queries
+    def __cached(self, name: str, compute):
+        """
+        :param name: str - name of the query with its parameters
+        :param compute: callable - computes the result, dict of numpy arrays
+        :return: dict - the result, computed once per version of the corpus
+        """
+        path = self.__file(os.path.join("cache", "%s-v%d.npz" % (name, self.get_version())))
+        if os.path.exists(path):
+            with np.load(path) as cached:
+                return dict(cached)
+        result = compute()
+        if len(self):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(path, **result)
+        return result
+
+    def __chunks(self, column: str, chunk: int = CHUNK):
+        """
+        :param column: str - name of a game column
+        :return: generator - the column chunk by chunk, read from the file only now
+        """
+        values = self.__columns[column]
+        for begin in range(0, len(values), chunk):
+            yield np.asarray(values[begin:begin + chunk])
+
+    def __human_sides(self):
+        """
+        :return: tuple - (games, sides) of the sides played by humans, they are few
+        """
+        humans = np.asarray(self.__columns["humans"])
+        games = np.flatnonzero(humans)
+        sides = (humans[games, None] >> np.arange(2)) & 1 == 1
+        return np.repeat(games, 2)[sides.ravel()], np.tile(np.arange(2), len(games))[sides.ravel()]
+
+    def placement_heatmaps(self, humans_only: bool = False):
+        """
+        :param humans_only: bool - counts only the fleets arranged by humans
+        :return: numpy array - (type, x, y) share of the fleets that have a ship of the type on the cell,
+                 index 0 of the type is unused
+        """
+        def compute():
+            size = MAX_TYPE * 2 * CELLS
+            if humans_only:
+                games, sides = self.__human_sides()
+                ships = self.__columns["ships"].reshape(-1, 2, FLEET)[games, sides]
+                starts, fleets = np.bincount(ships.ravel(), minlength=size), len(ships)
+            else:
+                starts, fleets = np.zeros(size, np.int64), 2 * len(self)
+                for ships in self.__chunks("ships"):
+                    starts += np.bincount(ships.ravel(), minlength=size)
+
+            # Ships counted by their first cell are spread over the cells they cover
+            starts = starts.reshape(MAX_TYPE, 2, SIZE, SIZE)
+            heatmaps = np.zeros((MAX_TYPE + 1, SIZE, SIZE))
+            for tp in range(1, MAX_TYPE + 1):
+                for i in range(tp):
+                    heatmaps[tp, i:, :] += starts[tp - 1, objects.HORIZONTAL - 1, :SIZE - i, :]
+                    heatmaps[tp, :, i:] += starts[tp - 1, objects.VERTICAL - 1, :, :SIZE - i]
+            return {"heatmaps": heatmaps / max(fleets, 1)}
+
+        return self.__cached("placement-humans" if humans_only else "placement", compute)["heatmaps"]
+
+    def first_hits(self):
+        """
+        :return: tuple - (share of the first hits of every cell (x, y),
+                          histogram of the shots a shooter made before its first hit, the last bin collects
+                          everything longer; a shooter that has not hit at all is not counted)
+        """
+        def compute():
+            cells = np.zeros(CELLS + 1, np.int64)
+            before = np.zeros(CELLS + 2, np.int64)
+            for first_hit, first_hit_cell in zip(self.__chunks("first_hit"), self.__chunks("first_hit_cell")):
+                cells += np.bincount(np.minimum(first_hit_cell.ravel(), CELLS), minlength=CELLS + 1)
+                before += np.bincount(np.minimum(first_hit.ravel(), CELLS + 1), minlength=CELLS + 2)
+            return {"cells": (cells[:CELLS] / max(cells[:CELLS].sum(), 1)).reshape(SIZE, SIZE),
+                    "before": before[:CELLS + 1]}  # Without the last bin, the shooters without a hit
+
+        result = self.__cached("first-hits", compute)
+        return result["cells"], result["before"]
+
+    def shots_to_sink(self):
+        """
+        Shots of the shooter from its first hit on a ship to the sink, both included
+        :return: numpy array - (length of the ship, shots) histogram, the last column collects everything longer
+        """
+        def compute():
+            histogram = np.zeros((MAX_TYPE + 1) * (CELLS + 1), np.int64)
+            for ships, to_sink in zip(self.__chunks("ships"), self.__chunks("to_sink")):
+                # The ships of the shooter's opponent
+                length = ships.reshape(-1, 2, FLEET)[:, ::-1].reshape(-1, 2 * FLEET) // (2 * CELLS) + 1
+                sunk = to_sink > 0
+                histogram += np.bincount(length[sunk].astype(np.intp) * (CELLS + 1) + np.minimum(to_sink[sunk], CELLS),
+                                         minlength=len(histogram))
+            return {"histogram": histogram.reshape(MAX_TYPE + 1, CELLS + 1)}
+
+        return self.__cached("shots-to-sink", compute)["histogram"]
+
+    def bot_efficiency(self):
+        """
+        Shots of the bots by cell: all shots are counted, then the few shots of humans are taken away
+        :return: dict - "shots", "hits" and "wasted" (REPEATED) per cell (x, y),
+                 "efficiency" - hits / shots, "out_of_map" - shots out of the map
+        """
+        def compute():
+            size = (OUT_OF_MAP + 1) * KINDS
+            counts = np.zeros(size, np.int64)
+            cells, results = self.__columns["cell"], self.__columns["result"]
+            for begin in range(0, len(cells), SHOT_CHUNK):
+                code = np.asarray(cells[begin:begin + SHOT_CHUNK]).astype(np.intp) * KINDS
+                code += results[begin:begin + SHOT_CHUNK]
+                counts += np.bincount(code, minlength=size)
+
+            # Shots of the sides played by humans
+            games, sides = self.__human_sides()
+            for game, side in zip(games, sides):
+                shots = slice(self.__offsets[game], self.__offsets[game + 1])
+                human = np.asarray(self.__columns["side"][shots]) == side
+                code = np.asarray(cells[shots])[human].astype(np.intp) * KINDS + results[shots][human]
+                counts -= np.bincount(code, minlength=size)
+
+            counts = counts.reshape(OUT_OF_MAP + 1, KINDS)
+            shots = counts.sum(1)
+            hits = counts[:, gamelog.HIT] + counts[:, gamelog.SINK]
+            wasted = counts[:, gamelog.REPEATED]
+            return {"shots": shots[:CELLS].reshape(SIZE, SIZE), "hits": hits[:CELLS].reshape(SIZE, SIZE),
+                    "wasted": wasted[:CELLS].reshape(SIZE, SIZE), "out_of_map": shots[OUT_OF_MAP],
+                    "efficiency": (hits[:CELLS] / np.maximum(shots[:CELLS], 1)).reshape(SIZE, SIZE)}
+
+        return self.__cached("bot-efficiency", compute)
+
+
+def print_grid(title: str, grid: np.ndarray, pattern: str = "%5.2f"):
+    """
+    :param grid: numpy array - (x, y) values, printed with y as rows like objects.Player.show_map
+    :return: None
+    """
+    print(title)
+    for y in range(SIZE):
+        print(" ".join(pattern % grid[x, y] for x in range(SIZE)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics over the recorded games")
+    parser.add_argument("--corpus", default=res.Strings.CORPUS, help="directory of the corpus")
+    parser.add_argument("--log", nargs="*", default=[], help="game logs to consolidate into the corpus")
+    parser.add_argument("--humans", action="store_true", help="placement heatmaps of human fleets only")
+    args = parser.parse_args()
+
+    corpus = Corpus(args.corpus)
+    for log in args.log:
+        begin = time.perf_counter()
+        added = corpus.consolidate(log)
+        print("%s: %d games added in %.2f s" % (log, added, time.perf_counter() - begin))
+    print("%d games, version %d" % (len(corpus), corpus.get_version()))
+
+    begin = time.perf_counter()
+    heatmaps = corpus.placement_heatmaps(args.humans)
+    for tp, name in res.Strings.StatusFrame.SHIPS:
+        print_grid("\nPlacement of %s (share of fleets):" % name, heatmaps[tp])
+
+    cells, before = corpus.first_hits()
+    print_grid("\nFirst hits (share):", cells)
+    shots = np.arange(len(before))
+    print("Shots before the first hit: mean %.1f" % (np.sum(shots * before) / max(before.sum(), 1)))
+
+    histogram = corpus.shots_to_sink()
+    for length in range(1, MAX_TYPE + 1):
+        total = histogram[length].sum()
+        mean = np.sum(np.arange(CELLS + 1) * histogram[length]) / max(total, 1)
+        print("Shots to sink a ship of %d: mean %.2f over %d ships" % (length, mean, total))
+
+    efficiency = corpus.bot_efficiency()
+    print_grid("\nBot efficiency (hits / shots):", efficiency["efficiency"])
+    print_grid("\nBot wasted shots:", efficiency["wasted"], "%5d")
+    print("Bot shots out of the map: %d" % efficiency["out_of_map"])
+    print("\nQueries: %.2f s" % (time.perf_counter() - begin))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import argparse
+import random
+import time
+
+import res
+import brain
+from snapshot import SIZE, CELLS, get_cell, get_around, Snapshot
+
+
+class Timeout(Exception):
+    """
+    The deadline of the move has passed, the search is abandoned
+    """
+
+
+def get_mask(points: list):
+    """
+    :param points: list - (x, y) of points
+    :return: int - bit mask of the points, for EndgameSolver.get_shot
+    """
+    mask = 0
+    for x, y in points:
+        mask |= 1 << get_cell(x, y)
+    return mask
+
+
+def get_placements(length: int, free: int, hits: int):
+    """
+    :param length: int - length of the ship
+    :param free: int - bit mask of the points where a ship may be
+    :param hits: int - bit mask of the points hit in ships that are not destroyed
+    :return: list - bit masks of every place of the ship in the free points, not made only of hits
+    """
+    placements = []
+    for x in range(1, SIZE + 1):
+        for y in range(1, SIZE + 1):
+            for dx, dy in ((1, 0), (0, 1)) if length > 1 else ((1, 0),):
+                if x + dx * (length - 1) > SIZE or y + dy * (length - 1) > SIZE:
+                    continue
+                mask = 0
+                for i in range(length):
+                    mask |= 1 << get_cell(x + dx * i, y + dy * i)
+                if mask & free == mask and mask & ~hits:
+                    placements.append(mask)
+    return placements
+
+
+def get_groups(hits: int):
+    """
+    :param hits: int - bit mask of the hit points
+    :return: list - bit masks of the groups of hits that touch each other, even by a corner
+    """
+    groups = []
+    while hits:
+        group = hits & -hits
+        while True:
+            grown = get_around(group) & hits
+            if grown == group:
+                break
+            group = grown
+        groups.append(group)
+        hits &= ~group
+    return groups
+
+
+class EndgameSolver(object):
+    """
+    Plays the end of a game exactly: when the fleets that agree with everything seen are few,
+    all of them are enumerated and the shot with the least expected amount of shots until the last ship
+    is destroyed is found by exhaustive search. Results are kept in a table keyed by the observed state
+    (shot points, hits of ships that are not destroyed, lengths of the ships left), so the following moves
+    and games that reach the same state are free.
+    """
+
+    def __init__(self, threshold: int = res.ENDGAME_THRESHOLD, deadline: float = res.ENDGAME_DEADLINE,
+                 table_size: int = res.ENDGAME_TABLE_SIZE):
+        """
+        :param threshold: int - the solver gives up if there are more fleets than this
+        :param deadline: float - seconds one move may take
+        :param table_size: int - states kept in the table, it is cleared when full
+        """
+        self.__threshold = threshold
+        self.__deadline = deadline
+        self.__table_size = table_size
+        self.__table = {}  # observed state -> (expected shots, best point)
+        self.__halos = {}  # ship mask -> the ship and the points around it
+        self.__end = 0
+        self.stats = {"calls": 0, "solved": 0, "too_many": 0, "timeouts": 0, "inconsistent": 0,
+                      "fleets": 0, "time": 0.0, "max_time": 0.0}
+
+    def get_shot(self, shots: int, hits: int, remaining: dict):
+        """
+        :param shots: int - bit mask of the shot points, the points around destroyed ships included
+        :param hits: int - bit mask of the hit points of ships that are not destroyed
+        :param remaining: dict - length -> amount of ships that are not destroyed
+        :return: tuple - (x, y) of the best shot, None if there are too many fleets or the deadline has passed
+        """
+        begin = time.perf_counter()
+        self.__end = begin + self.__deadline
+        self.stats["calls"] += 1
+        lengths = tuple(sorted((length for length, amount in remaining.items() for _ in range(amount)), reverse=True))
+        point = None
+        try:
+            fleets = self.__enumerate(shots, hits, lengths)
+            if fleets is None:
+                self.stats["too_many"] += 1
+            elif not fleets:
+                self.stats["inconsistent"] += 1  # What the bot has seen does not agree with its fleet
+            else:
+                self.stats["fleets"] = max(self.stats["fleets"], len(fleets))
+                cell = self.__solve(shots, hits, lengths, fleets)[1]
+                point = cell // SIZE + 1, cell % SIZE + 1
+                self.stats["solved"] += 1
+        except Timeout:
+            self.stats["timeouts"] += 1
+
+        elapsed = time.perf_counter() - begin
+        self.stats["time"] += elapsed
+        self.stats["max_time"] = max(self.stats["max_time"], elapsed)
+        return point
+
+    def get_telemetry(self):
+        """
+        :return: str - calls, outcomes, time and size of the table
+        """
+        stats = self.stats
+        return "endgame: %d calls, %d solved, %d too many fleets, %d timeouts, %d inconsistent; " \
+               "%.1f ms avg, %.1f ms max; %d fleets max; table %d states" % (
+                   stats["calls"], stats["solved"], stats["too_many"], stats["timeouts"], stats["inconsistent"],
+                   stats["time"] * 1000 / max(stats["calls"], 1), stats["max_time"] * 1000, stats["fleets"],
+                   len(self.__table))
+
+    def __check_time(self):
+        if time.perf_counter() > self.__end:
+            raise Timeout()
+
+    def __get_halo(self, ship: int):
+        halo = self.__halos.get(ship)
+        if halo is None:
+            halo = self.__halos[ship] = get_around(ship)
+        return halo
+
+    def __enumerate(self, shots: int, hits: int, lengths: tuple):
+        """
+        Every group of touching hits belongs to one ship, so the ships of the hits are placed first
+        and the others away from the hits
+        :return: list - every fleet that agrees with the observed state as a tuple of ship masks,
+        None if there are more than the threshold
+        """
+        free = ((1 << CELLS) - 1) & ~shots | hits
+        placements = {length: get_placements(length, free, hits) for length in set(lengths)}
+        groups = get_groups(hits)
+        covers = [[(length, ship) for length in sorted(placements) for ship in placements[length]
+                   if ship & group == group] for group in groups]
+        fleets = []
+
+        def cover(index: int, ships: tuple, blocked: int, rest: tuple):
+            if index == len(covers):
+                place(0, 0, ships, blocked, rest)
+                return
+            if groups[index] & blocked:  # In a ship with a gap, as hits at 1 and 3 of a cruiser
+                cover(index + 1, ships, blocked, rest)
+                return
+            self.__check_time()
+            for length, ship in covers[index]:
+                # A hit next to the ship and not in it could not be in any other ship
+                if length in rest and not ship & blocked and not hits & ~ship & self.__get_halo(ship):
+                    left = list(rest)
+                    left.remove(length)
+                    cover(index + 1, ships + (ship,), blocked | self.__get_halo(ship), tuple(left))
+
+        def place(index: int, first: int, ships: tuple, blocked: int, rest: tuple):
+            if index == len(rest):
+                fleets.append(ships)
+                if len(fleets) > self.__threshold:
+                    raise OverflowError()
+                return
+            self.__check_time()
+            options = placements[rest[index]]
+            same = index + 1 < len(rest) and rest[index + 1] == rest[index]
+            # Ships of the same length are placed in increasing order, so every fleet is found once
+            for i in range(first, len(options)):
+                ship = options[i]
+                if not ship & (blocked | hits):
+                    place(index + 1, i + 1 if same else 0, ships + (ship,), blocked | self.__get_halo(ship), rest)
+
+        try:
+            cover(0, (), 0, lengths)
+        except OverflowError:
+            return None
+        return fleets
+
+    def __solve(self, shots: int, hits: int, lengths: tuple, fleets: list):
+        """
+        :param fleets: list - every fleet that agrees with the observed state
+        :return: tuple - (expected amount of shots until every ship is destroyed, the best cell)
+        """
+        if not lengths:
+            return 0.0, None
+        key = (shots, hits, lengths)
+        known = self.__table.get(key)
+        if known is not None:
+            return known
+        self.__check_time()
+
+        # The points that may hold a ship, the likeliest first: a good shot found early prunes the rest
+        counts = [0] * CELLS
+        for fleet in fleets:
+            left = self.__left(fleet, shots)
+            while left:
+                bit = left & -left
+                counts[bit.bit_length() - 1] += 1
+                left ^= bit
+        candidates = sorted((cell for cell in range(CELLS) if counts[cell]), key=lambda cell: -counts[cell])
+
+        best = float("inf"), None
+        for cell in candidates:
+            bit = 1 << cell
+            # Split the fleets by what the shot would show
+            outcomes = {}
+            for fleet in fleets:
+                for ship in fleet:
+                    if ship & bit:
+                        if ship & ~(shots | bit):
+                            state = shots | bit, hits | bit, lengths
+                        else:
+                            rest = list(lengths)
+                            rest.remove(bin(ship).count("1"))
+                            state = shots | bit | self.__get_halo(ship), hits & ~ship, tuple(rest)
+                        break
+                else:
+                    state = shots | bit, hits, lengths
+                outcomes.setdefault(state, []).append(fleet)
+
+            # Every point of a ship left has to be shot, so that is a lower bound of every outcome
+            bounds = {state: min(bin(self.__left(fleet, state[0])).count("1") for fleet in group)
+                      for state, group in outcomes.items()}
+            expected = 1.0 + sum(len(group) * bounds[state] for state, group in outcomes.items()) / len(fleets)
+            if expected >= best[0]:
+                continue
+            for state, group in outcomes.items():
+                expected += len(group) * (self.__solve(*state, group)[0] - bounds[state]) / len(fleets)
+                if expected >= best[0]:
+                    break
+            else:
+                best = expected, cell
+
+        if len(self.__table) >= self.__table_size:
+            self.__table.clear()
+        self.__table[key] = best
+        return best
+
+    @staticmethod
+    def __left(fleet: tuple, shots: int):
+        """
+        :return: int - bit mask of the points of the fleet that have not been shot
+        """
+        left = 0
+        for ship in fleet:
+            left |= ship
+        return left & ~shots
+
+
+def get_observation(state: Snapshot):
+    """
+    What the shooter knows about the fleet of the snapshot
+    :param state: Snapshot
+    :return: tuple - (shot points, hits of ships that are not destroyed, length -> amount of ships left)
+    """
+    hits = 0
+    remaining = {}
+    for ship in state.fleet.masks[1:]:
+        if ship & ~state.shots:
+            hits |= ship & state.shots
+            length = bin(ship).count("1")
+            remaining[length] = remaining.get(length, 0) + 1
+    return state.shots, hits, remaining
+
+
+def bench(positions: int, ships: int, threshold: int, deadline: float):
+    """
+    Endgames of random fleets: the solver against shooting random points that may hold a ship
+    :param positions: int - amount of endgames
+    :param ships: int - the endgame starts when this amount of ships is left
+    :return: None
+    """
+    solver = EndgameSolver(threshold, deadline)
+    total = {"solver": 0, "random": 0}
+    for _ in range(positions):
+        state = Snapshot.from_player(brain.get_random_player())
+        cells = list(range(CELLS))
+        random.shuffle(cells)
+        for cell in cells:
+            if state.alive <= ships:
+                break
+            state = state.shoot(cell // SIZE + 1, cell % SIZE + 1)[0]
+
+        for name in total:
+            current = state
+            while not current.is_over():
+                point = solver.get_shot(*get_observation(current)) if name == "solver" else None
+                if point is None:
+                    free = [cell for cell in range(CELLS) if not current.shots >> cell & 1]
+                    cell = random.choice(free)
+                    point = cell // SIZE + 1, cell % SIZE + 1
+                current = current.shoot(*point)[0]
+                total[name] += 1
+    print("shots to finish: solver %.2f, random %.2f" % (total["solver"] / positions, total["random"] / positions))
+    print(solver.get_telemetry())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact endgame solver")
+    parser.add_argument("--positions", type=int, default=100)
+    parser.add_argument("--ships", type=int, default=2, help="the endgame starts with this amount of ships left")
+    parser.add_argument("--threshold", type=int, default=res.ENDGAME_THRESHOLD)
+    parser.add_argument("--deadline", type=float, default=res.ENDGAME_DEADLINE)
+    args = parser.parse_args()
+    bench(args.positions, args.ships, args.threshold, args.deadline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+import argparse
+import contextlib
+import os
+import shlex
+import subprocess
+import sys
+import time
+import weakref
+
+from exceptions import EngineException
+from res import MyExceptions as Errors
+from res import Strings as String
+import res
+import brain
+import game
+
+# Protocol, one command per line (see README):
+#   host                                   engine
+#   battleship <version>                   [id name <name>] ... battleshipok
+#   board <size>
+#   fleet <type> <type> ...
+#   isready                                readyok
+#   newgame <slot>
+#   shoot | hit | destroyed <slot>         move <slot> <x> <y>
+#   endgame <slot>
+#   quit
+# Moves are answered in the order of the requests, so the host can send many before reading.
+MESSAGES = (String.GameFrame.BOT_SHOOT, String.GameFrame.BOT_HIT, String.GameFrame.BOT_DESTROYED)
+BATCH = 512  # requests in flight per engine, keeps both pipes below their buffer size
+
+_engines = {}  # command -> Engine, running across games
+
+
+class Engine(object):
+    """
+    An external bot process. It is started once and plays any number of games,
+    every game has its own slot so that one process can play many of them at the same time.
+    """
+
+    def __init__(self, command):
+        """
+        :param command: str or list - the executable and its arguments
+        """
+        if isinstance(command, str):
+            command = shlex.split(command)
+        self.command = command
+        self.name = os.path.basename(command[0])
+
+        self.__process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=65536)
+        self.__stdin = self.__process.stdin
+        self.__stdout = self.__process.stdout
+        self.__slots = 0
+        self.__free = []  # Slots of finished games
+        self.__pending = 0  # Requests sent but not answered yet
+        self.__handshake()
+
+    def __handshake(self):
+        """
+        Checks the protocol version and tells the engine the rules
+        :return: None
+        """
+        self.__send("battleship %d" % res.ENGINE_PROTOCOL)
+        self.flush()
+        while True:
+            words = self.__read()
+            if words[0] == b"battleshipok":
+                break
+            if words[:2] == [b"id", b"name"] and len(words) > 2:
+                self.name = b" ".join(words[2:]).decode()
+            # Anything else is informational and ignored, as in UCI
+
+        self.__send("board %d" % res.BOARD_SIZE)
+        self.__send("fleet " + " ".join(str(tp) for tp in res.LIST_OF_SHIPS))
+        self.sync()
+
+    def is_alive(self):
+        """
+        :return: True if the process is running
+        """
+        return self.__process.poll() is None
+
+    def sync(self):
+        """
+        Waits until the engine has processed everything sent so far
+        :return: None
+        """
+        if self.__pending:
+            raise EngineException("Engine %s has unanswered moves" % self.name, Errors.ENGINE_ERROR)
+        self.__send("isready")
+        self.flush()
+        while self.__read() != [b"readyok"]:
+            pass
+
+    def new_game(self):
+        """
+        :return: int - the slot of the new game
+        """
+        if self.__free:
+            slot = self.__free.pop()
+        else:
+            slot = self.__slots
+            self.__slots += 1
+        self.__send("newgame %d" % slot)
+        return slot
+
+    def end_game(self, slot: int):
+        """
+        Lets the engine forget the game, the slot is reused by the next one
+        :return: None
+        """
+        if self.is_alive():
+            self.__send("endgame %d" % slot)
+            self.__free.append(slot)
+
+    def request(self, slot: int, value: str):
+        """
+        Asks for a move without waiting for it, the request is sent by flush()
+        :param slot: int - the game
+        :param value: str - "shoot", "hit" or "destroyed"
+        :return: None
+        """
+        if value not in MESSAGES:
+            raise EngineException("Unknown message " + str(value), Errors.ENGINE_ERROR)
+        self.__send("%s %d" % (value, slot))
+        self.__pending += 1
+
+    def flush(self):
+        """
+        :return: None - sends the buffered commands
+        """
+        try:
+            self.__stdin.flush()
+        except OSError:
+            raise EngineException("Engine %s has exited" % self.name, Errors.ENGINE_ERROR)
+
+    def read_move(self):
+        """
+        Waits for the answer to the oldest request
+        :return: tuple - (slot, x, y)
+        """
+        words = self.__read()
+        if len(words) != 4 or words[0] != b"move":
+            raise EngineException("Engine %s answered %r" % (self.name, b" ".join(words)), Errors.ENGINE_ERROR)
+        self.__pending -= 1
+        return int(words[1]), int(words[2]), int(words[3])
+
+    def ask(self, slot: int, value: str):
+        """
+        Sends one request and waits for its answer
+        :return: tuple - (x, y)
+        """
+        self.request(slot, value)
+        self.flush()
+        answered, x, y = self.read_move()
+        if answered != slot:
+            raise EngineException("Engine %s answered for game %d" % (self.name, answered), Errors.ENGINE_ERROR)
+        return x, y
+
+    def close(self):
+        """
+        Asks the engine to quit and kills it if it does not
+        :return: None
+        """
+        try:
+            self.__send("quit")
+            self.flush()
+            self.__stdin.close()
+            self.__process.wait(timeout=1)
+        except (OSError, EngineException, subprocess.TimeoutExpired):
+            self.__process.kill()
+            self.__process.wait()
+
+    def __send(self, line: str):
+        """
+        :return: None - buffers the line
+        """
+        try:
+            self.__stdin.write(line.encode() + b"\n")
+        except OSError:
+            raise EngineException("Engine %s has exited" % self.name, Errors.ENGINE_ERROR)
+
+    def __read(self):
+        """
+        :return: list - words of the next non-empty line
+        """
+        while True:
+            line = self.__stdout.readline()
+            if not line:
+                raise EngineException("Engine %s has exited" % self.name, Errors.ENGINE_ERROR)
+            words = line.split()
+            if words:
+                return words
+
+
+class EngineBot(object):
+    """
+    One game against an engine, it can be used wherever a bot of bots.py is used
+    """
+
+    def __init__(self, engine: Engine):
+        """
+        :param engine: Engine - the running engine
+        """
+        self.__engine = engine
+        self.__slot = engine.new_game()
+        weakref.finalize(self, engine.end_game, self.__slot)
+
+    def say(self, value: str):
+        """
+        :param value: str - "shoot", "hit" or "destroyed"
+        :return: tuple - (x, y)
+        """
+        return self.__engine.ask(self.__slot, value)
+
+
+def get_engine(command: str):
+    """
+    Starts the engine on the first call, later calls return the same process
+    :param command: str - the executable and its arguments
+    :return: Engine
+    """
+    engine = _engines.get(command)
+    if engine is None or not engine.is_alive():
+        engine = _engines[command] = Engine(command)
+    return engine
+
+
+def create_bot(name: str):
+    """
+    :param name: str - "engine:<command>"
+    :return: EngineBot
+    """
+    return EngineBot(get_engine(name[len(res.ENGINE_PREFIX):]))
+
+
+def play_batch(first: Engine, second: Engine, games: int):
+    """
+    Plays the games side by side: every round sends one request per running game,
+    then reads all answers, so the pipes are crossed once per round instead of once per move
+    :param first: Engine - plays the PLAYER side
+    :param second: Engine - plays the ENEMY side, can be the same engine as first
+    :param games: int - amount of games
+    :return: tuple - (list of winners, None for a draw; amount of moves)
+    """
+    engines = (first, second)
+    battles = [game.Game(brain.get_random_player(), brain.get_random_player()) for _ in range(games)]
+    slots = [(first.new_game(), second.new_game()) for _ in range(games)]
+    winners = [None] * games
+    running = list(range(games))
+    moves = 0
+
+    while running:
+        for begin in range(0, len(running), BATCH):
+            chunk = running[begin:begin + BATCH]
+            for i in chunk:
+                side = battles[i].get_turn()
+                engines[side].request(slots[i][side], battles[i].get_message())
+            for engine in engines:
+                engine.flush()
+            for i in chunk:
+                side = battles[i].get_turn()
+                slot, x, y = engines[side].read_move()
+                if slot != slots[i][side]:
+                    raise EngineException("Engine %s answered for game %d" % (engines[side].name, slot),
+                                          Errors.ENGINE_ERROR)
+                battles[i].shoot(x, y)
+        moves += len(running)
+
+        still_running = []
+        for i in running:
+            if battles[i].is_over() or len(battles[i].get_history()) >= res.SPECTATE_MAX_SHOTS:
+                winners[i] = battles[i].get_winner()
+                first.end_game(slots[i][0])
+                second.end_game(slots[i][1])
+            else:
+                still_running.append(i)
+        running = still_running
+
+    return winners, moves
+
+
+# Engine side
+class Sweep(object):
+    """
+    Shoots the cells one after another. It costs nothing, so benchmarks with it measure the protocol only.
+    """
+
+    def __init__(self):
+        self.__next = 0
+
+    def say(self, value: str):
+        i = self.__next % (res.BOARD_SIZE * res.BOARD_SIZE)
+        self.__next += 1
+        return i // res.BOARD_SIZE + 1, i % res.BOARD_SIZE + 1
+
+
+def get_bot_class(name: str):
+    """
+    :param name: str - Sweep or a bot of the registry (registry.py)
+    :return: class
+    """
+    if name == "Sweep":
+        return Sweep
+    import registry
+
+    return registry.get_bot_class(name)
+
+
+def serve(name: str):
+    """
+    Runs a bot as an engine on stdin/stdout until "quit" or the end of the input.
+    All complete lines of one read are answered with one write, which keeps pipelined requests cheap.
+    :param name: str - Sweep or a bot of the registry (registry.py)
+    :return: None
+    """
+    import asyncbots
+
+    bot_class = get_bot_class(name)
+    bots = {}
+    rest = b""
+
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # Bots print every shot
+        while True:
+            data = os.read(0, 65536)
+            if not data:
+                return
+            lines = (rest + data).split(b"\n")
+            rest = lines.pop()
+            out = []
+
+            for line in lines:
+                words = line.split()
+                if not words:
+                    continue
+                command = words[0]
+                if command in (b"shoot", b"hit", b"destroyed"):
+                    x, y = bots[words[1]].say(command.decode())
+                    out.append(b"move %s %d %d\n" % (words[1], x, y))
+                elif command == b"newgame":
+                    bots[words[1]] = asyncbots.get_sync_bot(bot_class())
+                elif command == b"endgame":
+                    bots.pop(words[1], None)
+                elif command == b"isready":
+                    out.append(b"readyok\n")
+                elif command == b"battleship":
+                    out.append(b"id name %s\nbattleshipok\n" % name.encode())
+                elif command in (b"board", b"fleet"):
+                    rules = [int(word) for word in words[1:]]
+                    if rules != ([res.BOARD_SIZE] if command == b"board" else list(res.LIST_OF_SHIPS)):
+                        sys.stderr.write("Unsupported rules: %s\n" % line.decode())
+                elif command == b"quit":
+                    os.write(1, b"".join(out))
+                    return
+
+            if out:
+                os.write(1, b"".join(out))
+
+
+def get_serve_command(name: str):
+    """
+    :param name: str - Sweep or a bot of the registry (registry.py)
+    :return: list - command that runs the bot as an engine
+    """
+    return [sys.executable, os.path.abspath(__file__), "--serve", name]
+
+
+def bench(moves: int, games: int):
+    """
+    Measures the per-move cost of the protocol with the Sweep engine
+    :return: None
+    """
+    engine = Engine(get_serve_command("Sweep"))
+
+    slot = engine.new_game()
+    engine.ask(slot, String.GameFrame.BOT_SHOOT)
+    begin = time.perf_counter()
+    for _ in range(moves):
+        engine.ask(slot, String.GameFrame.BOT_SHOOT)
+    ping_pong = (time.perf_counter() - begin) / moves
+    engine.end_game(slot)
+
+    begin = time.perf_counter()
+    winners, batch_moves = play_batch(engine, engine, games)
+    batch = (time.perf_counter() - begin) / batch_moves
+    engine.close()
+
+    # The same games in-process, what is left is the cost of the rules
+    begin = time.perf_counter()
+    local_moves = 0
+    for _ in range(games):
+        battle = game.Game(brain.get_random_player(), brain.get_random_player())
+        sweeps = Sweep(), Sweep()
+        while not battle.is_over() and len(battle.get_history()) < res.SPECTATE_MAX_SHOTS:
+            battle.play_bot(sweeps[battle.get_turn()])
+            local_moves += 1
+    # Players are created in both loops, so they cancel out
+    local = (time.perf_counter() - begin) / local_moves
+
+    print("ping-pong:  %.1f us/move (one request per round trip)" % (ping_pong * 1e6))
+    print("pipelined:  %.1f us/move over %d games, %.1f us/move of which is IPC" %
+          (batch * 1e6, games, (batch - local) * 1e6))
+    print("in-process: %.1f us/move" % (local * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="External bot engines over stdin/stdout")
+    parser.add_argument("--serve", metavar="BOT", help="runs Sweep or a bot of the registry as an engine")
+    parser.add_argument("--match", nargs=2, metavar="COMMAND", help="plays two engines against each other")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--bench", action="store_true", help="measures the per-move cost of the protocol")
+    parser.add_argument("--moves", type=int, default=20000, help="requests of the ping-pong benchmark")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+    elif args.match:
+        first, second = Engine(args.match[0]), Engine(args.match[1])
+        begin = time.perf_counter()
+        winners, moves = play_batch(first, second, args.games)
+        elapsed = time.perf_counter() - begin
+        first.close()
+        second.close()
+        print("%s: %d, %s: %d, draws: %d" % (first.name, winners.count(game.PLAYER), second.name,
+                                              winners.count(game.ENEMY), winners.count(None)))
+        print("%d moves in %.2f s (%.1f us/move)" % (moves, elapsed, elapsed / moves * 1e6))
+    elif args.bench:
+        bench(args.moves, args.games)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,11 @@ class ShipException(Exception):
         super(ShipException, self).__init__(msg)
 
         self.errors = errors
+
+
+class EngineException(Exception):
+
+    def __init__(self, msg, errors):
+        super(EngineException, self).__init__(msg)
+
+        self.errors = errors
@@ -1,22 +1,29 @@
+import contextlib
+import os
+import time
 from tkinter import *
 from tkinter import messagebox as msg
 from res import Strings as String
 from res import Colors as Color
-from res import BOT_SHOOT_TIME
+from res import BOT_SHOOT_TIME, PREVIEW_REFRESH_TIME
+import res
 import objects
 import brain
+import game
 
 
 class MapBuilder(object):
 
-    def __init__(self, context, master, width_and_height):
+    def __init__(self, context, master, width_and_height, size: int = res.BOARD_SIZE):
         """
         init the map
         :param context: Main - context
         :param: tkinter master - container
         :param width_and_height: int - width of a single grid (default(1))
+        :param size: int - width and height of the map in grids
         """
         self.__context = context
+        self.__size = size
         self.__frame_map = Frame(master)
         self.__buttons = self.__create_frame(self.__frame_map, width_and_height)
         self.__player = None
@@ -59,24 +66,23 @@ class MapBuilder(object):
 
     def __create_frame(self, root, width_and_height):  # Creating MapFrame getting
         """
-        Creates a map (10x10), private
+        Creates a map (size x size), private
         :param root: tkinter object (master, Frame) - container
         :param width_and_height: int - width end height of a single grid
         :return: list of tkinter Buttons
         """
         print("MapBuilder: map created")
         buttons = [None]
-        letter_coordinates = "ABCDEFGHIJ"
 
-        for y in range(1, 11):
+        for y in range(1, self.__size + 1):
 
             Label(root,
                   text=str(y)).grid(row=y, column=0)
             Label(root,
-                  text=letter_coordinates[y-1]).grid(row=0, column=y)
+                  text=self.__get_letter_coordinate(y)).grid(row=0, column=y)
 
             row_buttons = [None]
-            for x in range(1, 11):
+            for x in range(1, self.__size + 1):
                 bt = Button(root,
                             text="",
                             width=width_and_height,
@@ -96,6 +102,18 @@ class MapBuilder(object):
 
         return buttons
 
+    @staticmethod
+    def __get_letter_coordinate(x: int):
+        """
+        :param x: int - X coordinate
+        :return: str - letters of the column: A..Z, then AA, AB and so on
+        """
+        letters = ""
+        while x > 0:
+            x, rest = divmod(x - 1, 26)
+            letters = chr(ord("A") + rest) + letters
+        return letters
+
     def __on_button_clicked(self, x, y):
         """
         Map click listener, private
@@ -119,7 +137,7 @@ class MapBuilder(object):
         Shows player's map on this map
         :return: None
         """
-        for i in range(1, 11):
+        for i in range(1, self.__player.get_rules().ships + 1):
             ship = self.__player.get_ship(i)
             if ship is not None:
                 for j in range(ship.get_type()):
@@ -134,13 +152,19 @@ class MapBuilder(object):
         """
         return self.__buttons[y][x]
 
+    def get_size(self):
+        """
+        :return: int - width and height of the map in grids
+        """
+        return self.__size
+
     def refresh(self):
         """
         Makes a map as normal
         :return: None
         """
-        for y in range(1, 11):
-            for x in range(1, 11):
+        for y in range(1, self.__size + 1):
+            for x in range(1, self.__size + 1):
                 self.__buttons[y][x].config(bg=Color.MAP_COLOR)
 
     def clickable(self, state: bool):
@@ -152,8 +176,8 @@ class MapBuilder(object):
             bt_state = NORMAL
         else:
             bt_state = DISABLED
-        for y in range(1, 11):
-            for x in range(1, 11):
+        for y in range(1, self.__size + 1):
+            for x in range(1, self.__size + 1):
                 self.__buttons[y][x].config(state=bt_state)
 
     def get_frame(self):
@@ -171,14 +195,13 @@ class StatusBuilder(object):
         self.__player = player
 
         # Attributes
-        self.__label_battleship = None
-        self.__label_cruiser = None
-        self.__label_destroyer = None
-        self.__label_submarine = None
+        self.__labels = {}  # type -> label, a label for every type of the fleet of the rules
+        self.__shown = {}  # type -> amount on its label
 
         # Frame status
         self.__frame = Frame(master)
         self.__create_frame(self.__frame, title)
+        player.add_sink_listener(self.__on_ship_sunk)
 
     def __create_frame(self, root, title: str):
         """
@@ -196,51 +219,44 @@ class StatusBuilder(object):
               pady=7,
               font="time 14 bold").pack(anchor=W)
 
-        # Battleship
-        self.__label_battleship = Label(root,
-                                        text=String.StatusFrame.SHIPS[0][1]+": ",
-                                        padx=7,
-                                        pady=3,
-                                        font="time 10 italic")
-        self.__label_battleship.pack(anchor=W)
-
-        # Cruiser
-        self.__label_cruiser = Label(root,
-                                     text=String.StatusFrame.SHIPS[1][1] + ": ",
-                                     padx=7,
-                                     pady=3,
-                                     font="time 10 italic")
-        self.__label_cruiser.pack(anchor=W)
-
-        # Destroyer
-        self.__label_destroyer = Label(root,
-                                       text=String.StatusFrame.SHIPS[2][1] + ": ",
-                                       padx=7,
-                                       pady=3,
-                                       font="time 10 italic")
-        self.__label_destroyer.pack(anchor=W)
-
-        # Submarine
-        self.__label_submarine = Label(root,
-                                       text=String.StatusFrame.SHIPS[3][1] + ": ",
-                                       padx=7,
-                                       pady=3,
-                                       font="time 10 italic")
-        self.__label_submarine.pack(anchor=W)
+        # A label per type of ship, the largest first
+        for tp in sorted(set(self.__player.get_rules().fleet), reverse=True):
+            self.__labels[tp] = Label(root,
+                                      text=self.__get_name(tp) + ": ",
+                                      padx=7,
+                                      pady=3,
+                                      font="time 10 italic")
+            self.__labels[tp].pack(anchor=W)
+
+    @staticmethod
+    def __get_name(tp: int):
+        """
+        :return: str - name of the type of ship
+        """
+        return dict(String.StatusFrame.SHIPS).get(tp, String.StatusFrame.SHIP_OF % tp)
 
     def refresh(self):
         """
-        Refreshes the table of ships
+        Refreshes the table of ships, only the labels whose amount has changed
         :return: None
         """
-        self.__label_battleship.config(text=String.StatusFrame.SHIPS[0][1]+": "
-                                       + str(1 - self.__player.get_non_placed_amount(4)))
-        self.__label_cruiser.config(text=String.StatusFrame.SHIPS[1][1] + ": "
-                                    + str(2 - self.__player.get_non_placed_amount(3)))
-        self.__label_destroyer.config(text=String.StatusFrame.SHIPS[2][1] + ": "
-                                      + str(3 - self.__player.get_non_placed_amount(2)))
-        self.__label_submarine.config(text=String.StatusFrame.SHIPS[3][1] + ": "
-                                      + str(4 - self.__player.get_non_placed_amount(1)))
+        types = self.__player.fleet_status().types
+        for tp, label in self.__labels.items():
+            amount = types[tp] if tp < len(types) else 0
+            if self.__shown.get(tp) != amount:
+                self.__shown[tp] = amount
+                label.config(text=self.__get_name(tp) + ": " + str(amount))
+
+    def __on_ship_sunk(self, ship_id: int, ship: objects.Ship):
+        """
+        Sink listener of the player: only the label of the ship's type changes
+        :return: None
+        """
+        tp = ship.get_type()
+        amount = self.__player.fleet_status().types[tp]
+        if self.__shown.get(tp) != amount:
+            self.__shown[tp] = amount
+            self.__labels[tp].config(text=self.__get_name(tp) + ": " + str(amount))
 
     def get_frame(self):
         """
@@ -256,8 +272,31 @@ class MenuFrame(object):
         :param context: Main object
         """
         self.__context = context
+        self.__bot_name = None
+        self.__bot_menu = None
         self.__frame = self.__create_frame(self.__context.get_root())
 
+    def __fill_bots(self):
+        """
+        Lists the bots when the menu is opened the first time, the plugins are not looked for at start up
+        :return: None
+        """
+        menu = self.__bot_menu["menu"]
+        menu.configure(postcommand="")
+        menu.delete(0, END)
+        for info in self.__context.get_bots():
+            menu.add_command(label=String.MenuFrame.BOT_OPTION % (info.name, info.difficulty),
+                             command=lambda name=info.name: self.__on_bot_chosen(name))
+
+    def __on_bot_chosen(self, name: str):
+        """
+        Handles the choice of the bot
+        :param name: str - the bot of the next games
+        :return: None
+        """
+        self.__bot_name.set(name)
+        self.__context.on_bot_chosen(name)
+
     def __on_start_button_pressed(self):  # Button to start new game
         """
         Handles Start button's click events
@@ -266,6 +305,14 @@ class MenuFrame(object):
         print("The game has started...")
         self.__context.on_start_arrange_button_pressed()
 
+    def __on_resume_button_pressed(self):  # Button to go on with the saved game
+        """
+        Handles Resume button's click events
+        :return: None
+        """
+        print("MenuFrame: Resume button pressed")
+        self.__context.on_resume_button_pressed()
+
     def __on_help_button_pressed(self):  # Button to show help section
         """
         Handles Help button's click events
@@ -274,6 +321,14 @@ class MenuFrame(object):
         print("MenuFrame: Help button pressed")
         self.__context.on_help_button_pressed()
 
+    def __on_spectate_button_pressed(self):  # Button to watch two bots
+        """
+        Handles Spectate button's click events
+        :return: None
+        """
+        print("MenuFrame: Spectate button pressed")
+        self.__context.on_spectate_button_pressed()
+
     def __on_exit_button_pressed(self):  # Button to show exit dialog
         """
         Handles Exit button's click events
@@ -307,12 +362,24 @@ class MenuFrame(object):
                                padx=4,
                                takefocus="tab",
                                command=self.__on_start_button_pressed)
+        # Resume button
+        bt_resume = Button(frame,
+                           text=String.MenuFrame.BUTTON_RESUME,
+                           width=20,
+                           padx=4,
+                           command=self.__on_resume_button_pressed)
         # Help button
         bt_help = Button(frame,
                          text=String.MenuFrame.BUTTON_HELP,
                          width=20,
                          padx=4,
                          command=self.__on_help_button_pressed)
+        # Spectate button
+        bt_spectate = Button(frame,
+                             text=String.MenuFrame.BUTTON_SPECTATE,
+                             width=20,
+                             padx=4,
+                             command=self.__on_spectate_button_pressed)
         # Exit button
         bt_exit = Button(frame,
                          text=String.MenuFrame.BUTTON_EXIT,
@@ -320,9 +387,20 @@ class MenuFrame(object):
                          padx=4,
                          command=self.__on_exit_button_pressed)
 
+        # Bot chooser
+        fr_bot = Frame(frame, pady=5)
+        Label(fr_bot, text=String.MenuFrame.LABEL_BOT).pack(side="left")
+        self.__bot_name = StringVar(fr_bot, self.__context.get_bot_name())
+        self.__bot_menu = OptionMenu(fr_bot, self.__bot_name, self.__context.get_bot_name())
+        self.__bot_menu["menu"].configure(postcommand=self.__fill_bots)
+        self.__bot_menu.pack(side="left")
+
         # Packing buttons
         bt_start_game.pack()
+        fr_bot.pack()
+        bt_resume.pack()
         bt_help.pack()
+        bt_spectate.pack()
         bt_exit.pack()
 
         return frame
@@ -332,6 +410,7 @@ class MenuFrame(object):
         Places the frame on the root (attaches)
         :return: None
         """
+        self.__bot_name.set(self.__context.get_bot_name())  # A resumed game may have changed it
         self.__frame.place(relx=0.17,
                            rely=0.3,
                            anchor=CENTER)
@@ -354,6 +433,7 @@ class ArrangeFrame(object):
 
     def __init__(self, context):
         self.__context = context
+        self.__rules = context.get_rules()
         self.__chosen_ship = IntVar()
         self.__chosen_ship.set(4)
 
@@ -392,8 +472,14 @@ class ArrangeFrame(object):
         self.__create_special_frame(self.__frame_special)
 
         # Player object
-        self.__player = objects.Player()
-        self.__can_ship_be_put = True
+        self.__player = objects.Player(self.__rules)
+
+        # Hover preview
+        self.__preview_mask = None  # Validity mask of the chosen ship type and orientation
+        self.__preview_job = None  # Pending repaint of the preview
+        self.__hovered = None  # Point the mouse is on
+        self.__active_point = None  # Point whose active background is set
+        self.__painted = {}  # Points painted by the preview: (x, y) -> color
 
     def on_point_clicked(self, x, y):
         """
@@ -409,11 +495,12 @@ class ArrangeFrame(object):
                 orientation = 2
 
             ship_is_added = False
-            possible = self.__can_ship_be_put  # Checks weather the chosen ship can be put
+            possible = self.__get_preview_mask()[y][x][0]  # Checks weather the chosen ship can be put
             if possible:
-                ship = objects.Ship(self.__chosen_ship.get(), orientation, x, y)
+                ship = objects.Ship(self.__chosen_ship.get(), orientation, x, y, self.__rules)
                 ship_is_added = self.__player.add_ship(ship)
                 if ship_is_added:
+                    self.__invalidate_preview_mask()
 
                     if self.__chosen_ship.get() > 1 and \
                             self.__player.get_non_placed_amount(self.__chosen_ship.get()) == 0:
@@ -432,6 +519,7 @@ class ArrangeFrame(object):
 
             if self.__player.is_completed():
                 self.__show_warning(String.StatusFrame.WARNING_CAN_START, "green")
+            self.__schedule_preview()
         else:
             print("StatusFrame: all", self.__chosen_ship.get(), "type ships are added")
             self.__show_warning(String.StatusFrame.WARNING_ALL_SHIPS_PUT
@@ -445,58 +533,8 @@ class ArrangeFrame(object):
         :param y: int - y coordinate of the clicked button
         :return: None
         """
-        # Checks weather there is enough ship in chosen type to put
-        if self.__player.get_non_placed_amount(self.__chosen_ship.get()) > 0:
-
-            if self.__orientation:  # orientation is horizontal
-                if x + self.__chosen_ship.get() > 11:
-                    end_x = 11
-                    self.__can_ship_be_put = False
-                    color = Color.ERROR_COLOR
-                else:
-                    end_x = x + self.__chosen_ship.get()
-                    self.__can_ship_be_put = True
-                    color = Color.SHIP_COLOR
-
-                # Setting up active background (the button that is the mouse on it)
-                if self.__player.get_point_on_map(x, y) != 0:
-                    event.widget.config(activebackground=Color.ERROR_COLOR)
-                else:
-                    event.widget.config(activebackground=color)
-
-                for i in range(x, end_x):
-                    point = self.__player.get_point_on_map(i, y)
-                    if point != 0:  # is not possible to put on this point
-                        self.__map.get_button(i, y).config(bg=Color.ERROR_COLOR)
-                    else:
-                        self.__map.get_button(i, y).config(bg=color)
-
-            else:  # orientation is vertical
-
-                if y + self.__chosen_ship.get() > 11:
-                    end_y = 11
-                    self.__can_ship_be_put = False
-                    color = Color.ERROR_COLOR
-                else:
-                    end_y = y + self.__chosen_ship.get()
-                    self.__can_ship_be_put = True
-                    color = Color.SHIP_COLOR
-
-                # Setting up active background (the button that is the mouse on it)
-                if self.__player.get_point_on_map(x, y) != 0:
-                    event.widget.config(activebackground=Color.ERROR_COLOR)
-                else:
-                    event.widget.config(activebackground=color)
-
-                for i in range(y, end_y):
-                    point = self.__player.get_point_on_map(x, i)
-                    if point != 0:  # is not possible to put on this point
-                        self.__map.get_button(x, i).config(bg=Color.ERROR_COLOR)
-                    else:
-                        self.__map.get_button(x, i).config(bg=color)
-        else:
-            if self.__player.get_point_on_map(x, y) not in ('.', 0):
-                event.widget.config(activebackground=Color.SHIP_COLOR)
+        self.__hovered = x, y
+        self.__schedule_preview()
 
     def on_mouse_leaved(self, event, x, y):
         """
@@ -506,40 +544,9 @@ class ArrangeFrame(object):
         :param y: int - y coordinate of the clicked button
         :return: None
         """
-        event.widget.config(activebackground=Color.MAP_COLOR)
-
-        if self.__orientation:  # is horizontal
-            if x + self.__chosen_ship.get() > 10:
-                end_x = 11
-                self.__can_ship_be_put = False
-            else:
-                end_x = x + self.__chosen_ship.get()
-                self.__can_ship_be_put = True
-
-            for i in range(x, end_x):
-                point = self.__player.get_point_on_map(i, y)  # Checks weather point is not a ship
-                if point == '.' or point == 0:  # is empty point
-                    self.__map.get_button(i, y).config(bg=Color.MAP_COLOR)
-                else:  # is a ship
-                    if self.__map.get_button(i, y).cget("bg") == Color.ERROR_COLOR:  # Checks weather point is ship
-                        self.__map.get_button(i, y).config(bg=Color.SHIP_COLOR)
-
-        else:  # orientation is vertical
-
-            if y + self.__chosen_ship.get() > 10:
-                end_y = 11
-                self.__can_ship_be_put = False
-            else:
-                end_y = y + self.__chosen_ship.get()
-                self.__can_ship_be_put = True
-
-            for i in range(y, end_y):
-                point = self.__player.get_point_on_map(x, i)  # Checks weather point is not a ship
-                if point == '.' or point == 0:  # is empty point
-                    self.__map.get_button(x, i).config(bg=Color.MAP_COLOR)
-                else:  # is a ship
-                    if self.__map.get_button(x, i).cget("bg") == Color.ERROR_COLOR:  # Checks weather point is ship
-                        self.__map.get_button(x, i).config(bg=Color.SHIP_COLOR)
+        if self.__hovered == (x, y):
+            self.__hovered = None
+            self.__schedule_preview()
 
     def on_mouse_right_clicked(self, event, x, y):
         """
@@ -549,9 +556,117 @@ class ArrangeFrame(object):
         :param y: int - y coordinate of the clicked button
         :return: None
         """
-        self.on_mouse_leaved(event, x, y)
         self.__on_change_button_pressed()
-        self.on_mouse_entered(event, x, y)
+        self.__hovered = x, y
+        self.__schedule_preview()
+
+    def __get_preview_mask(self):
+        """
+        Gives the placement validity mask of the chosen ship type and orientation,
+        builds it only if it was invalidated since the last call
+        :return: list of lists - mask[y][x] = (fits, ((x, y), color) cells, active background)
+        """
+        if self.__preview_mask is None:
+            self.__preview_mask = self.__build_preview_mask()
+        return self.__preview_mask
+
+    def __invalidate_preview_mask(self):
+        """
+        Calls when a ship is placed, removed or rotated
+        :return: None
+        """
+        self.__preview_mask = None
+
+    def __build_preview_mask(self):
+        """
+        Computes the preview of the chosen ship for every point of the map
+        :return: list of lists - mask[y][x] = (fits, ((x, y), color) cells, active background)
+        """
+        tp = self.__chosen_ship.get()
+        available = self.__player.get_non_placed_amount(tp) > 0
+        size = self.__rules.size
+        mask = [[None for _ in range(size + 1)] for _ in range(size + 1)]
+
+        for y in range(1, size + 1):
+            for x in range(1, size + 1):
+                if not available:  # Only marks the ship under the mouse
+                    if self.__player.get_point_on_map(x, y) not in ('.', 0):
+                        mask[y][x] = (False, (), Color.SHIP_COLOR)
+                    else:
+                        mask[y][x] = (False, (), Color.MAP_COLOR)
+                    continue
+
+                if self.__orientation:  # orientation is horizontal
+                    fits = x + tp <= size + 1
+                    points = [(i, y) for i in range(x, min(x + tp, size + 1))]
+                else:  # orientation is vertical
+                    fits = y + tp <= size + 1
+                    points = [(x, i) for i in range(y, min(y + tp, size + 1))]
+
+                color = Color.SHIP_COLOR if fits else Color.ERROR_COLOR
+                cells = tuple((point, Color.ERROR_COLOR if self.__player.get_point_on_map(*point) != 0 else color)
+                              for point in points)
+                mask[y][x] = (fits, cells, cells[0][1])
+
+        return mask
+
+    def __schedule_preview(self):
+        """
+        Coalesces hover events, the preview is repainted at most once per frame
+        :return: None
+        """
+        if self.__preview_job is None:
+            self.__preview_job = self.__frame_map.after(PREVIEW_REFRESH_TIME, self.__repaint_preview)
+
+    def __repaint_preview(self):
+        """
+        Repaints only the buttons whose preview color has changed
+        :return: None
+        """
+        self.__preview_job = None
+
+        wanted = {}
+        active = None
+        if self.__hovered is not None:
+            x, y = self.__hovered
+            fits, cells, active = self.__get_preview_mask()[y][x]
+            wanted = dict(cells)
+
+        # Restores the points that are not previewed anymore
+        for (x, y) in self.__painted:
+            if (x, y) not in wanted:
+                self.__map.get_button(x, y).config(bg=self.__get_base_color(x, y))
+
+        for (x, y), color in wanted.items():
+            if self.__painted.get((x, y)) != color:
+                self.__map.get_button(x, y).config(bg=color)
+        self.__painted = wanted
+
+        # Setting up active background (the button that is the mouse on it)
+        if self.__active_point is not None and self.__active_point != self.__hovered:
+            self.__map.get_button(*self.__active_point).config(activebackground=Color.MAP_COLOR)
+        if self.__hovered is not None:
+            self.__map.get_button(*self.__hovered).config(activebackground=active)
+        self.__active_point = self.__hovered
+
+    def __get_base_color(self, x, y):
+        """
+        :param x: int - x coordinate of the point
+        :param y: int - y coordinate of the point
+        :return: str - color of the point without any preview
+        """
+        if self.__player.get_point_on_map(x, y) in ('.', 0):  # is empty point
+            return Color.MAP_COLOR
+        return Color.SHIP_COLOR
+
+    def __reset_preview(self):
+        """
+        Forgets the painted preview after the whole map has been repainted
+        :return: None
+        """
+        self.__painted = {}
+        self.__invalidate_preview_mask()
+        self.__schedule_preview()
 
     def __on_change_button_pressed(self):
         """
@@ -564,16 +679,17 @@ class ArrangeFrame(object):
         self.__frame_of_orientation = \
             self.__draw_ship(self.__frame_status, self.__chosen_ship.get(), self.__orientation)
         self.__frame_of_orientation.pack()
+        self.__invalidate_preview_mask()
 
     def __on_random_button_pressed(self):
         """
         Calls when random button is clicked
         :return: None
         """
-        self.__player = brain.get_random_player()
+        self.__player = brain.get_random_player(self.__rules)
         self.__map.refresh()
-        for y in range(1, 11):
-            for x in range(1, 11):
+        for y in range(1, self.__rules.size + 1):
+            for x in range(1, self.__rules.size + 1):
                 point = self.__player.get_point_on_map(x, y)
                 if point != 0 and point != '.':  # is ship
                     self.__map.get_button(x, y).config(bg=Color.SHIP_COLOR)
@@ -581,6 +697,7 @@ class ArrangeFrame(object):
         # Refresh status frame
         self.__orientation = not self.__orientation
         self.__on_change_button_pressed()
+        self.__reset_preview()
 
     def __on_back_menu_button_pressed(self):
         """
@@ -613,12 +730,13 @@ class ArrangeFrame(object):
 
             if is_player_agree:
                 self.__player = None
-                self.__player = objects.Player()
+                self.__player = objects.Player(self.__rules)
                 self.__map.refresh()
                 self.__show_warning(String.StatusFrame.WARNING_SHIPS_CLEARED, "green")
 
                 # Refresh status frame
                 self.__on_ship_chosen()
+                self.__reset_preview()
         else:
             self.__show_warning(String.StatusFrame.WARNING_EMPTY_MAP, "red")
 
@@ -748,7 +866,7 @@ class ArrangeFrame(object):
         Creates Ships choosing frame
         :return: tkinter Frame - created Frame
         """
-        self.__map = MapBuilder(self, root, 2)
+        self.__map = MapBuilder(self, root, 2, self.__rules.size)
 
         # Map
         self.__map.get_frame().pack()
@@ -854,9 +972,29 @@ class ArrangeFrame(object):
 class GameFrame(object):
     time = 0
 
-    def __init__(self, context, player: objects.Player, enemy: objects.Player):
+    def __init__(self, context, player: objects.Player, enemy: objects.Player, remote=None, recorder=None,
+                 turn: int = game.PLAYER, enemy_results: list = None):
+        """
+        :param context: Main object
+        :param player: Player - the player
+        :param enemy: Player - the enemy, with a remote opponent only its ships are counted
+        :param remote: RemoteGame - connection to the server that plays the enemy, None for the local bot
+        :param recorder: GameRecorder - writes the shots to the game log, None to not record
+        :param turn: int - the side that shoots first, a resumed game (savegame.py) may go on with the enemy
+        :param enemy_results: list - results of the enemy's last turn in a resumed game
+        """
         self.__context = context
         self.__last_hit_field = "", ""
+        self.__remote = remote
+        self.__shot_pending = False  # The player's shot has been sent to the server
+        self.__enemy_shots = set()  # Points of the enemy map that have been drawn, with a remote opponent
+        self.__recorder = recorder
+        self.__decision_time = 0  # Seconds the bot took for its last shot
+        self.__request_time = 0  # When the bot was asked for it
+        self.__salvo = player.get_rules().salvo is not None  # Every turn is a salvo (Rules.salvo)
+        self.__targets = []  # Points of the player's salvo aimed so far
+        self.__enemy_results = list(enemy_results or [])  # Results of the enemy's last turn (salvo)
+        self.__displaced = False  # The player has left the game, the enemy's scheduled turn is dropped
 
         # Creating players
         self.__player = player
@@ -874,6 +1012,8 @@ class GameFrame(object):
         self.__map_enemy = None
         self.__create_enemy_frame(self.__frame_enemy)
         self.__map_enemy.set_player(self.__enemy)  # Sets the enemy to the created map
+        self.__show_shots(self.__player, self.__map_player)  # A resumed game has been shot at already
+        self.__show_shots(self.__enemy, self.__map_enemy)
 
         # Player status frame
         self.__frame_status_player = Frame(self.__context.get_root())
@@ -889,11 +1029,20 @@ class GameFrame(object):
         self.__frame_bar = Frame(self.__context.get_root())
         self.__label_turn = None
         self.__label_warning = None
+        self.__label_rtt = None
         self.__create_bar_frame(self.__frame_bar)
 
         # Turn value
-        self.__is_turn_of_player = True  # True if player's turn else False
+        # True if player's turn else False, the server tells who starts
+        self.__is_turn_of_player = remote is None and turn == game.PLAYER
         self.__set_turn(self.__is_turn_of_player)  # Setting turns label
+        if remote is None and turn == game.ENEMY:  # The enemy goes on with its turn
+            self.__let_enemy_shoot(game.MESSAGES[self.__enemy_results[-1]] if self.__enemy_results
+                                   else String.GameFrame.BOT_SHOOT)
+
+        if remote is not None:
+            remote.start(self.on_remote_message, player.get_fleet())
+            self.__set_warning(String.GameFrame.WARNING_WAITING_SERVER, "blue")
 
     def on_point_clicked(self, x, y):
         """
@@ -902,11 +1051,18 @@ class GameFrame(object):
         :param y: int - Y coordinate of the clicked grid
         :return: None
         """
-        if self.__is_turn_of_player:
+        if self.__is_turn_of_player and not self.__shot_pending:
             self.time += 1
             print("Player shoot #%d" % self.time, (x, y))
             self.__last_hit_field = x, y
-            self.__hit_point(x, y, self.__enemy, self.__map_enemy)
+            if self.__salvo:
+                self.__aim(x, y)
+            elif self.__remote is None:
+                self.__hit_point(x, y, self.__enemy, self.__map_enemy)
+            elif self.__remote.shoot(x, y):  # The result comes in on_remote_message
+                self.__shot_pending = True
+            else:
+                self.__set_warning(String.GameFrame.WARNING_CONNECTION_LOST, "red")
         else:
             self.__set_warning(String.GameFrame.WARNING_TURN_OF_ENEMY, "red")
 
@@ -925,7 +1081,20 @@ class GameFrame(object):
         :param sms: str - the message that have to be sent to enemy
         :return: None
         """
-        coord: tuple = self.__context.get_shoot(sms)
+        if self.__displaced:
+            return
+        self.__request_time = time.perf_counter()
+        self.__context.request_shoot(sms, self.__player, self.__on_enemy_shoot)
+
+    def __on_enemy_shoot(self, coord: tuple):
+        """
+        Calls when the enemy has chosen its shot, at once for a synchronous bot
+        :param coord: tuple of two ints - (x, y)
+        :return: None
+        """
+        if self.__displaced:
+            return
+        self.__decision_time = time.perf_counter() - self.__request_time
         '''
         if len(coord) != 2 or type(coord[0]) is not int or type(coord[1]) is not int \
                 or self.__map_player.get_button(coord[0], coord[1]).cget("state") == DISABLED \
@@ -940,6 +1109,146 @@ class GameFrame(object):
         else:
             print("GameFrame: enemy tries to shoot while it is player's turn")
 
+    def __aim(self, x: int, y: int):
+        """
+        Adds the point to the player's salvo, fires it when all of its shots are aimed
+        :return: None
+        """
+        if (x, y) in self.__targets or self.__enemy.is_shot(x, y):
+            return
+        self.__targets.append((x, y))
+        self.__map_enemy.get_button(x, y).config(text="o",
+                                                 state=DISABLED)
+
+        size = self.__enemy.get_rules().size
+        free = size * size - self.__enemy.get_shot_amount()
+        amount = min(self.__player.get_rules().get_salvo(self.__player.get_alive_amount()), free)
+        if len(self.__targets) < amount:
+            self.__set_warning(String.GameFrame.WARNING_SALVO_AIMED % (len(self.__targets), amount), "blue")
+            return
+
+        points, self.__targets = self.__targets, []
+        results = self.__enemy.receive_salvo(points)
+        self.__show_salvo(points, results, self.__enemy, self.__map_enemy)
+        self.__end_salvo(points, results, self.__enemy)
+
+    def __get_salvo_from_enemy(self):
+        """
+        Calls when the enemy fires its salvo
+        :return: None
+        """
+        if self.__displaced:
+            return
+        amount = self.__enemy.get_rules().get_salvo(self.__enemy.get_alive_amount())
+        self.__context.request_salvo(self.__player, amount, self.__enemy_results, self.__on_enemy_salvo)
+
+    def __on_enemy_salvo(self, salvo: tuple):
+        """
+        Calls when the enemy's salvo has been aimed and resolved
+        :param salvo: tuple - (list of (x, y), list of results, seconds the bot took), see game.fire_salvo
+        :return: None
+        """
+        if self.__displaced:
+            return
+        points, results, self.__decision_time = salvo
+        self.__enemy_results = results
+        if points:
+            self.__last_hit_field = points[-1]
+        self.__show_salvo(points, results, self.__player, self.__map_player)
+        self.__end_salvo(points, results, self.__player)
+
+    def __show_salvo(self, points: list, results: list, defence: objects.Player, mp: MapBuilder):
+        """
+        Draws all the results of a salvo at once, the warning is refreshed once
+        :param points: list - (x, y) of every shot
+        :param results: list - objects.MISS, HIT, DESTROYED or REPEATED of every shot
+        :param defence: Player - a player whose map is hit
+        :param mp: MapBuilder - Player's map
+        :return: None
+        """
+        rules = defence.get_rules()
+        for (x, y), result in zip(points, results):
+            if result == objects.HIT:
+                mp.get_button(x, y).config(text="",
+                                           bg=Color.DESTROYED_PART,
+                                           state=DISABLED)
+            elif result == objects.DESTROYED:
+                mp.get_button(x, y).config(text="",
+                                           state=DISABLED)
+                points_of_ship = defence.get_ship_points(x, y)
+                if len(points_of_ship) == 1 or points_of_ship[0][1] == points_of_ship[1][1]:
+                    orientation = objects.HORIZONTAL
+                else:
+                    orientation = objects.VERTICAL
+                ship = objects.Ship(len(points_of_ship), orientation, points_of_ship[0][0], points_of_ship[0][1], rules)
+                self.__ship_destroyed(ship, mp)
+            elif result == objects.MISS:  # A repeated shot (or one out of the map) has been drawn already
+                mp.get_button(x, y).config(text="*",
+                                           bg=Color.BROKEN_POINT,
+                                           state=DISABLED)
+
+        destroyed = results.count(objects.DESTROYED)  # The status panels follow the sinkings themselves
+        self.__set_warning(String.GameFrame.WARNING_SALVO % (results.count(objects.HIT) + destroyed, destroyed),
+                           "blue")
+
+    def __end_salvo(self, points: list, results: list, defence: objects.Player):
+        """
+        Records the salvo and passes the turn
+        :return: None
+        """
+        side = game.PLAYER if defence is self.__enemy else game.ENEMY
+        if self.__recorder is not None:
+            for i, ((x, y), result) in enumerate(zip(points, results)):
+                self.__recorder.shot(side, x, y, result, i == len(results) - 1,
+                                     self.__decision_time if side == game.ENEMY and i == 0 else 0)
+
+        if not defence.is_some_ships_placed():
+            self.__show_result_of_battle(defence)  # Shows the results of the battle
+            return
+
+        self.__is_turn_of_player = not self.__is_turn_of_player  # Changes the turn
+        self.__set_turn(self.__is_turn_of_player)
+        if defence is self.__enemy:  # Letting to enemy to shoot
+            self.__let_enemy_shoot()
+
+    def __let_enemy_shoot(self, sms: str = String.GameFrame.BOT_SHOOT):
+        """
+        Schedules the enemy's turn
+        :param sms: str - the command to the bot in the classic game, "shoot" starts a new turn
+        :return: None
+        """
+        if self.__salvo:
+            self.__map_enemy.get_button(1, 1).after(BOT_SHOOT_TIME["shoot"], self.__get_salvo_from_enemy)
+            return
+        if sms == String.GameFrame.BOT_SHOOT:
+            self.__enemy_results = []
+        self.__map_enemy.get_button(1, 1).after(BOT_SHOOT_TIME[sms], lambda: self.__get_shoot_from_enemy(sms))
+
+    def __show_shots(self, defence: objects.Player, mp: MapBuilder):
+        """
+        Draws every point that has been shot, for a resumed game
+        :param defence: Player - a player whose map is drawn
+        :param mp: MapBuilder - Player's map
+        :return: None
+        """
+        size = mp.get_size()
+        for x in range(1, size + 1):
+            for y in range(1, size + 1):
+                if not defence.is_shot(x, y):
+                    continue
+                point = defence.get_point_on_map(x, y)
+                if point == 0 or point == '.':
+                    mp.get_button(x, y).config(text="*",
+                                               bg=Color.BROKEN_POINT,
+                                               state=DISABLED)
+                elif defence.get_ship(point) is not None:
+                    mp.get_button(x, y).config(bg=Color.DESTROYED_PART,
+                                               state=DISABLED)
+                else:
+                    mp.get_button(x, y).config(text="X",
+                                               bg=Color.DESTROYED_SHIP,
+                                               state=DISABLED)
+
     def __create_player_frame(self, root):
         """
         Creates players map
@@ -947,7 +1256,7 @@ class GameFrame(object):
         :return: None
         """
         print("GameFrame: player map created")
-        self.__map_player = MapBuilder(self, root, 1)
+        self.__map_player = MapBuilder(self, root, 1, self.__player.get_rules().size)
         self.__map_player.clickable(False)
         self.__map_player.get_frame().pack()
 
@@ -957,7 +1266,7 @@ class GameFrame(object):
         :param root: tkinter master - container that the frame must be in
         :return: None
         """
-        self.__map_enemy = MapBuilder(self, root, 2)
+        self.__map_enemy = MapBuilder(self, root, 2, self.__enemy.get_rules().size)
         self.__map_enemy.get_frame().pack()
 
     def __create_status_player_frame(self, root):
@@ -1011,6 +1320,14 @@ class GameFrame(object):
                                      font="time 12 bold italic")
         self.__label_warning.pack(side="left")
 
+        # Round trip to the server
+        if self.__remote is not None:
+            self.__label_rtt = Label(root,
+                                     text=String.GameFrame.RTT_UNKNOWN,
+                                     width=14,
+                                     padx=4)
+            self.__label_rtt.pack(side="left")
+
     def __set_turn(self, turn: bool):
         """
         :param turn: bool - Player's turn if True else Enemy's turn
@@ -1056,48 +1373,144 @@ class GameFrame(object):
         :return: None
         """
         point = defence.get_point_on_map(x, y)
+        ship = defence.get_ship(point) if point != 0 and point != '.' else None  # Getting the ship at the point
+        result = defence.receive_shot(x, y)
+        self.__show_shot(x, y, result, ship, defence, mp)
+        if defence is self.__player:
+            self.__enemy_results.append(result)
+
+        if self.__recorder is not None:
+            if defence is self.__enemy:
+                self.__recorder.shot(game.PLAYER, x, y, result, result in (objects.MISS, objects.REPEATED))
+            else:
+                self.__recorder.shot(game.ENEMY, x, y, result, result in (objects.MISS, objects.REPEATED),
+                                     self.__decision_time)
 
-        if point != 0 and point != '.':  # Checks whether the player hit a ship
-            ship = defence.get_ship(point)  # Getting the ship at the chosen point
-
-            destroyed = ship.hit(x, y)  # Hits the ship
-            if destroyed:
-                if ship.get_status():
-                    print(ship, "\n")
-                    mp.get_button(x, y).config(bg=Color.DESTROYED_PART,
-                                               state=DISABLED)
-                    self.__set_warning(String.GameFrame.WARNING_HIT, "blue")
+        if result in (objects.MISS, objects.REPEATED):
+            self.__is_turn_of_player = not self.__is_turn_of_player  # Changes the turn
+            self.__set_turn(self.__is_turn_of_player)
 
-                    if defence is self.__player:  # Letting to enemy know that he hit
-                        mp.get_button(1, 1).after(BOT_SHOOT_TIME["hit"], lambda: self.__get_shoot_from_enemy(String.GameFrame.BOT_HIT))
+            if defence is self.__enemy:  # Letting to enemy to shoot
+                self.__let_enemy_shoot()
 
-                else:
-                    mp.get_button(x, y).config(state=DISABLED)
-                    self.__ship_destroyed(ship, mp)
-                    self.__set_warning(String.GameFrame.WARNING_SHIP_DESTROYED, "green")
+        elif not defence.is_some_ships_placed():
+            self.__show_result_of_battle(defence)  # Shows the results of the battle
 
-                    defence.remove_ship(point)  # Removes the destroyed ship from the player's list
+        elif defence is self.__player:  # Letting to enemy know that he hit or destroyed
+            sms = String.GameFrame.BOT_HIT if result == objects.HIT else String.GameFrame.BOT_DESTROYED
+            mp.get_button(1, 1).after(BOT_SHOOT_TIME[sms], lambda: self.__get_shoot_from_enemy(sms))
 
-                    if defence is self.__player:  # Letting to enemy know that he destroyed
-                        self.__status_player.refresh()
-                        mp.get_button(1, 1).after(BOT_SHOOT_TIME["destroyed"], lambda: self.__get_shoot_from_enemy(String.GameFrame.BOT_DESTROYED))  # Refreshes status
-                    else:
-                        self.__status_enemy.refresh()  # Refreshes status
+    def __show_shot(self, x: int, y: int, result: str, ship: objects.Ship, defence: objects.Player, mp: MapBuilder):
+        """
+        Draws the result of a shot
+        :param x: int - X coordinate
+        :param y: int - Y coordinate
+        :param result: str - objects.MISS, HIT, DESTROYED or REPEATED
+        :param ship: Ship - the ship at the point, None if there is no ship
+        :param defence: Player - a player whose map is hit
+        :param mp: MapBuilder - Player's map
+        :return: None
+        """
+        if result == objects.HIT:
+            print(ship, "\n")
+            mp.get_button(x, y).config(bg=Color.DESTROYED_PART,
+                                       state=DISABLED)
+            self.__set_warning(String.GameFrame.WARNING_HIT, "blue")
 
-                    if not defence.is_some_ships_placed():
-                        self.__show_result_of_battle(defence)  # Shows the results of the battle
+        elif result == objects.DESTROYED:
+            mp.get_button(x, y).config(state=DISABLED)
+            self.__ship_destroyed(ship, mp)
+            self.__set_warning(String.GameFrame.WARNING_SHIP_DESTROYED, "green")
 
         else:
-            self.__is_turn_of_player = not self.__is_turn_of_player  # Changes the turn
+            self.__set_warning(String.GameFrame.WARNING_MISS, "red")
+            if result == objects.MISS:  # A repeated shot, or one out of the map, keeps what is drawn there
+                mp.get_button(x, y).config(text="*",
+                                           bg=Color.BROKEN_POINT,
+                                           state=DISABLED)
+
+    def on_remote_message(self, message: dict):
+        """
+        Applies a message of the server, called from the Tk loop
+        :param message: dict - the message
+        :return: None
+        """
+        kind = message.get("type")
+
+        if kind == "start" or kind == "turn":
+            self.__is_turn_of_player = message.get("turn", message.get("yours"))
             self.__set_turn(self.__is_turn_of_player)
 
-            self.__set_warning(String.GameFrame.WARNING_MISS, "red")
-            mp.get_button(x, y).config(text="*",
-                                       bg=Color.BROKEN_POINT,
-                                       state=DISABLED)
+        elif kind == "result":
+            self.__last_hit_field = message["x"], message["y"]
+            if message["by"] == "you":
+                self.__shot_pending = False
+                self.__show_remote_shot(message["x"], message["y"], message["result"], message.get("ship"))
+            else:
+                self.__show_remote_enemy_shot(message["x"], message["y"])
+
+        elif kind == "state":  # Resync after a reconnection
+            self.__shot_pending = False
+            for shot in message["received"]:
+                if not self.__player.is_shot(shot[0], shot[1]):
+                    self.__show_remote_enemy_shot(shot[0], shot[1])
+            for shot in message["shots"]:
+                if (shot[0], shot[1]) not in self.__enemy_shots:
+                    self.__show_remote_shot(shot[0], shot[1], shot[2], shot[3] if len(shot) > 3 else None)
+            self.__is_turn_of_player = message["turn"]
+            self.__set_turn(self.__is_turn_of_player)
 
-            if defence is self.__enemy:  # Letting to enemy to shoot
-                mp.get_button(1, 1).after(BOT_SHOOT_TIME["shoot"], lambda: self.__get_shoot_from_enemy(String.GameFrame.BOT_SHOOT))
+        elif kind == "over":
+            loser = self.__enemy if message["winner"] == "you" else self.__player
+            self.__show_result_of_battle(loser)
+            return
+
+        elif kind == "error":
+            self.__shot_pending = False
+            self.__set_warning(message.get("message", ""), "red")
+
+        elif kind == "disconnected":
+            self.__shot_pending = False
+            self.__set_warning(String.GameFrame.WARNING_CONNECTION_LOST, "red")
+
+        if self.__remote.rtt is None:
+            self.__label_rtt.config(text=String.GameFrame.RTT_UNKNOWN)
+        else:
+            self.__label_rtt.config(text=String.GameFrame.RTT % self.__remote.rtt)
+
+    def __show_remote_shot(self, x: int, y: int, result: str, points: list):
+        """
+        Draws the result of the player's shot that the server has resolved
+        :param points: list - [x, y] of the destroyed ship, None if nothing is destroyed
+        :return: None
+        """
+        self.__enemy_shots.add((x, y))
+        ship = None
+        if result == objects.DESTROYED:
+            points = sorted(points)
+            if len(points) == 1 or points[0][1] == points[1][1]:
+                orientation = objects.HORIZONTAL
+            else:
+                orientation = objects.VERTICAL
+            ship = objects.Ship(len(points), orientation, points[0][0], points[0][1])
+
+            # Counts the destroyed ship on the enemy's fleet
+            for i in range(1, self.__enemy.get_rules().ships + 1):
+                if self.__enemy.get_ship(i) is not None and self.__enemy.get_ship(i).get_type() == len(points):
+                    self.__enemy.remove_ship(i)
+                    break
+
+        self.__show_shot(x, y, result, ship, self.__enemy, self.__map_enemy)
+
+    def __show_remote_enemy_shot(self, x: int, y: int):
+        """
+        Applies the enemy's shot that the server has resolved to the player's map
+        :return: None
+        """
+        point = self.__player.get_point_on_map(x, y)
+        ship = self.__player.get_ship(point) if point != 0 and point != '.' else None
+        result = self.__player.receive_shot(x, y)
+        self.__show_shot(x, y, result, ship, self.__player, self.__map_player)
 
     @staticmethod
     def __ship_destroyed(ship: objects.Ship, mp: MapBuilder):
@@ -1106,6 +1519,7 @@ class GameFrame(object):
         :param mp: MapBuilder - a map that the ship is placed
         :return: None
         """
+        size = mp.get_size()
         for i in range(ship.get_type()):
             x = ship.get_x_at(i)
             y = ship.get_y_at(i)
@@ -1114,7 +1528,7 @@ class GameFrame(object):
                                        bg=Color.DESTROYED_SHIP)
 
             # Automatically hitting adjacent points
-            if x < 10 and mp.get_button(x + 1, y).cget("bg") == Color.MAP_COLOR:
+            if x < size and mp.get_button(x + 1, y).cget("bg") == Color.MAP_COLOR:
                 mp.get_button(x + 1, y).config(bg=Color.BROKEN_POINT,
                                                text="*",
                                                state=DISABLED)
@@ -1122,7 +1536,7 @@ class GameFrame(object):
                 mp.get_button(x - 1, y).config(bg=Color.BROKEN_POINT,
                                                text="*",
                                                state=DISABLED)
-            if y < 10 and mp.get_button(x, y + 1).cget("bg") == Color.MAP_COLOR:
+            if y < size and mp.get_button(x, y + 1).cget("bg") == Color.MAP_COLOR:
                 mp.get_button(x, y + 1).config(bg=Color.BROKEN_POINT,
                                                text="*",
                                                state=DISABLED)
@@ -1130,7 +1544,7 @@ class GameFrame(object):
                 mp.get_button(x, y - 1).config(bg=Color.BROKEN_POINT,
                                                text="*",
                                                state=DISABLED)
-            if x < 10 and y < 10 and mp.get_button(x + 1, y + 1).cget("bg") == Color.MAP_COLOR:
+            if x < size and y < size and mp.get_button(x + 1, y + 1).cget("bg") == Color.MAP_COLOR:
                 mp.get_button(x + 1, y + 1).config(bg=Color.BROKEN_POINT,
                                                    text="*",
                                                    state=DISABLED)
@@ -1138,11 +1552,11 @@ class GameFrame(object):
                 mp.get_button(x - 1, y - 1).config(bg=Color.BROKEN_POINT,
                                                    text="*",
                                                    state=DISABLED)
-            if x > 1 and y < 10 and mp.get_button(x - 1, y + 1).cget("bg") == Color.MAP_COLOR:
+            if x > 1 and y < size and mp.get_button(x - 1, y + 1).cget("bg") == Color.MAP_COLOR:
                 mp.get_button(x - 1, y + 1).config(bg=Color.BROKEN_POINT,
                                                    text="*",
                                                    state=DISABLED)
-            if x < 10 and y > 1 and mp.get_button(x + 1, y - 1).cget("bg") == Color.MAP_COLOR:
+            if x < size and y > 1 and mp.get_button(x + 1, y - 1).cget("bg") == Color.MAP_COLOR:
                 mp.get_button(x + 1, y - 1).config(bg=Color.BROKEN_POINT,
                                                    text="*",
                                                    state=DISABLED)
@@ -1168,11 +1582,23 @@ class GameFrame(object):
                                rely=0.03,
                                anchor=NW)
 
+    def get_state(self):
+        """
+        :return: tuple - (player, enemy, side to shoot, results of the enemy's last turn) of a game against
+        the local bot that goes on, None if it is over or played on a server
+        """
+        if self.__remote is not None or not self.__player.is_some_ships_placed() \
+                or not self.__enemy.is_some_ships_placed():
+            return None
+        turn = game.PLAYER if self.__is_turn_of_player else game.ENEMY
+        return self.__player, self.__enemy, turn, self.__enemy_results
+
     def displace_frame(self):
         """
         Displace the frame from the map
         :return: None
         """
+        self.__displaced = True
         self.__frame_player.place_forget()
         self.__frame_enemy.place_forget()
         self.__frame_status_player.place_forget()
@@ -1191,6 +1617,323 @@ class GameFrame(object):
         self.__frame_bar.destroy()
 
 
+class SpectateFrame(object):
+
+    def __init__(self, context):
+        """
+        Two bots play each other, the boards show only the latest state
+        :param context: Main object
+        """
+        self.__context = context
+        self.__rules = context.get_rules()
+        self.__quiet = open(os.devnull, "w")  # Bots print every shot, which would slow the simulation down
+
+        # Bots
+        self.__bot_names = [StringVar(), StringVar()]
+        self.__bot_choices = [info.name for info in context.get_bots()]
+        self.__bot_names[0].set(self.__bot_choices[0])
+        self.__bot_names[1].set(self.__bot_choices[1])
+        self.__bots = None
+        self.__game = None
+        self.__shots = 0  # Shots of the current game
+        self.__repeated = [0, 0]  # Repeated shots of each side in a row
+
+        # Score
+        self.__games = 0
+        self.__wins = [0, 0]
+        self.__draws = 0
+        self.__total_shots = 0
+        self.__started = time.perf_counter()
+
+        # Simulation and rendering
+        self.__speed = IntVar()
+        self.__speed.set(3)
+        self.__credit = 0.0  # Shots that are due at the chosen speed
+        self.__last_tick = time.perf_counter()
+        self.__version = 0  # Increases with every shot
+        self.__rendered_version = -1
+        self.__drawn = ({}, {})  # (x, y) -> (color, text) of each map
+        self.__sim_job = None
+        self.__render_job = None
+
+        # Map frames
+        self.__frame_maps = Frame(self.__context.get_root())
+        self.__maps = [None, None]
+        self.__labels = [None, None]
+        self.__create_maps_frame(self.__frame_maps)
+
+        # Bar frame
+        self.__frame_bar = Frame(self.__context.get_root())
+        self.__label_speed = None
+        self.__label_score = None
+        self.__create_bar_frame(self.__frame_bar)
+
+        self.__new_game()
+
+    def on_point_clicked(self, x, y):
+        """
+        The maps are not clickable while spectating
+        :return: None
+        """
+        pass
+
+    def __create_maps_frame(self, root):
+        """
+        Creates the maps of both bots
+        :param root: tkinter master - container
+        :return: None
+        """
+        for side in (game.PLAYER, game.ENEMY):
+            frame = Frame(root, padx=20)
+            OptionMenu(frame, self.__bot_names[side], *self.__bot_choices, command=lambda e: self.__on_bot_chosen()).pack()
+            self.__labels[side] = Label(frame, font="time 12 bold")
+            self.__labels[side].pack()
+
+            self.__maps[side] = MapBuilder(self, frame, 2, self.__rules.size)
+            self.__maps[side].clickable(False)
+            self.__maps[side].get_frame().pack()
+            frame.pack(side="left")
+
+    def __create_bar_frame(self, root):
+        """
+        Creates the bar frame
+        :param root: tkinter master - container
+        :return: None
+        """
+        root.config(padx=2,
+                    pady=2)
+
+        # Back to menu button
+        Button(root,
+               text=String.StatusFrame.BUTTON_BACK_MENU,
+               bg=Color.SHIP_COLOR,
+               command=self.__on_back_menu_button_clicked).pack(side="left")
+
+        # Speed slider
+        Label(root,
+              text=String.SpectateFrame.SPEED,
+              padx=10).pack(side="left")
+        Scale(root,
+              from_=0,
+              to=len(res.SPECTATE_SPEEDS) - 1,
+              orient=HORIZONTAL,
+              showvalue=0,
+              variable=self.__speed,
+              command=lambda e: self.__on_speed_changed()).pack(side="left")
+        self.__label_speed = Label(root,
+                                   width=12,
+                                   anchor=W)
+        self.__label_speed.pack(side="left")
+        self.__on_speed_changed()
+
+        # Score label
+        self.__label_score = Label(root,
+                                   padx=10,
+                                   fg=Color.SHIP_COLOR,
+                                   font="time 11 bold")
+        self.__label_score.pack(side="left")
+
+    def __on_back_menu_button_clicked(self):
+        """
+        Stops the simulation and goes to the menu
+        :return: None
+        """
+        self.__stop()
+        self.__context.on_spectate_back_button_pressed()
+
+    def __on_bot_chosen(self):
+        """
+        Calls when another bot is chosen, the score starts again
+        :return: None
+        """
+        self.__games = 0
+        self.__wins = [0, 0]
+        self.__draws = 0
+        self.__total_shots = 0
+        self.__started = time.perf_counter()
+        self.__new_game()
+
+    def __on_speed_changed(self):
+        """
+        Calls when the speed slider is moved
+        :return: None
+        """
+        speed = res.SPECTATE_SPEEDS[self.__speed.get()]
+        if speed is None:
+            self.__label_speed.config(text=String.SpectateFrame.SPEED_MAX)
+        else:
+            self.__label_speed.config(text=String.SpectateFrame.SPEED_VALUE % speed)
+        self.__credit = 0.0
+
+    def __new_game(self):
+        """
+        Starts a new game with freshly created bots
+        :return: None
+        """
+        if self.__game is not None:
+            self.__game.end_record()  # The previous game, finished or abandoned
+        names = [name.get() for name in self.__bot_names]
+        self.__bots = [self.__context.create_bot(name) for name in names]
+        player, enemy = brain.get_random_player(self.__rules), brain.get_random_player(self.__rules)
+        self.__game = game.Game(player, enemy, recorder=self.__context.create_recorder(player, enemy))
+        self.__shots = 0
+        self.__repeated = [0, 0]
+        self.__version += 1
+
+        for side in (game.PLAYER, game.ENEMY):
+            self.__labels[side].config(text=names[side])
+
+    def __step(self):
+        """
+        Plays one shot (or one salvo), starts the next game when this one is over
+        :return: None
+        """
+        side = self.__game.get_turn()
+        try:
+            if self.__rules.salvo is None:
+                results = [self.__game.play_bot(self.__bots[side])[2]]
+            else:
+                results = [result for _, _, result in self.__game.play_salvo(self.__bots[side])]
+        except Exception as e:  # A broken bot must not stop the spectating
+            print(String.SpectateFrame.BOT_FAILED % (self.__bot_names[side].get(), e))
+            self.__finish_game(1 - side)
+            return
+
+        self.__shots += len(results)
+        self.__total_shots += len(results)
+        self.__version += 1
+        if results.count(objects.REPEATED) == len(results):  # Nothing new, an empty salvo too
+            self.__repeated[side] += max(len(results), 1)
+        else:
+            self.__repeated[side] = 0
+
+        if self.__game.is_over():
+            self.__finish_game(self.__game.get_winner())
+        elif self.__repeated[side] >= res.SPECTATE_MAX_REPEATED:  # The bot is stuck, the game would not end
+            print(String.SpectateFrame.BOT_STUCK % self.__bot_names[side].get())
+            self.__finish_game(1 - side)
+        elif self.__shots >= res.SPECTATE_MAX_SHOTS:
+            self.__finish_game(None)
+
+    def __finish_game(self, winner):
+        """
+        :param winner: int - side of the winner, None if it is a draw
+        :return: None
+        """
+        self.__games += 1
+        if winner is None:
+            self.__draws += 1
+        else:
+            self.__wins[winner] += 1
+        self.__new_game()
+
+    def __simulate(self):
+        """
+        Plays the shots that are due at the chosen speed, within a time budget per tick
+        :return: None
+        """
+        now = time.perf_counter()
+        speed = res.SPECTATE_SPEEDS[self.__speed.get()]
+        deadline = now + res.SPECTATE_BUDGET / 1000
+
+        with contextlib.redirect_stdout(self.__quiet):
+            if speed is None:  # As fast as possible
+                while time.perf_counter() < deadline:
+                    self.__step()
+                delay = 1
+            else:
+                self.__credit = min(self.__credit + (now - self.__last_tick) * speed, speed)
+                while self.__credit >= 1 and time.perf_counter() < deadline:
+                    self.__step()
+                    self.__credit -= 1
+                delay = max(1, min(res.SPECTATE_FRAME_TIME, int(1000 / speed)))
+
+        self.__last_tick = now
+        self.__sim_job = self.__frame_bar.after(delay, self.__simulate)
+
+    def __render(self):
+        """
+        Draws the latest state of the boards once per frame, intermediate states are skipped
+        :return: None
+        """
+        if self.__rendered_version != self.__version:
+            self.__rendered_version = self.__version
+            for side in (game.PLAYER, game.ENEMY):
+                self.__render_map(self.__game.get_player(side), self.__maps[side], self.__drawn[side])
+
+            elapsed = max(time.perf_counter() - self.__started, 0.001)
+            self.__label_score.config(text=String.SpectateFrame.SCORE % (
+                self.__games + 1, self.__bot_names[0].get(), self.__wins[0], self.__wins[1],
+                self.__bot_names[1].get(), self.__draws, self.__total_shots / elapsed))
+
+        self.__render_job = self.__frame_bar.after(res.SPECTATE_FRAME_TIME, self.__render)
+
+    @staticmethod
+    def __render_map(player: objects.Player, mp: MapBuilder, drawn: dict):
+        """
+        Reconfigures only the buttons whose look has changed
+        :param player: Player - the player whose map is drawn
+        :param mp: MapBuilder - the map
+        :param drawn: dict - (x, y) -> (color, text) that is on the map now
+        :return: None
+        """
+        for y in range(1, mp.get_size() + 1):
+            for x in range(1, mp.get_size() + 1):
+                point = player.get_point_on_map(x, y)
+                is_ship = point != 0 and point != '.'
+                if not player.is_shot(x, y):
+                    look = (Color.SHIP_COLOR if is_ship else Color.MAP_COLOR), ""
+                elif not is_ship:
+                    look = Color.BROKEN_POINT, "*"
+                elif player.get_ship(point) is not None:
+                    look = Color.DESTROYED_PART, ""
+                else:
+                    look = Color.DESTROYED_SHIP, "X"
+
+                if drawn.get((x, y)) != look:
+                    drawn[(x, y)] = look
+                    mp.get_button(x, y).config(bg=look[0], text=look[1])
+
+    def __stop(self):
+        """
+        Cancels the scheduled simulation and rendering
+        :return: None
+        """
+        if self.__sim_job is not None:
+            self.__frame_bar.after_cancel(self.__sim_job)
+            self.__sim_job = None
+        if self.__render_job is not None:
+            self.__frame_bar.after_cancel(self.__render_job)
+            self.__render_job = None
+
+    def place_frame(self):
+        """
+        Places the frame onto the root and starts the simulation
+        :return: None
+        """
+        self.__frame_bar.place(relx=0.05,
+                               rely=0.03,
+                               anchor=NW)
+        self.__frame_maps.place(relx=0.5,
+                                rely=0.95,
+                                anchor=S)
+        self.__last_tick = time.perf_counter()
+        self.__sim_job = self.__frame_bar.after(1, self.__simulate)
+        self.__render_job = self.__frame_bar.after(res.SPECTATE_FRAME_TIME, self.__render)
+
+    def destroy_frame(self):
+        """
+        Stops the simulation and destroys this frame
+        :return: None
+        """
+        self.__stop()
+        if self.__game is not None:
+            self.__game.end_record()
+        self.__frame_bar.destroy()
+        self.__frame_maps.destroy()
+        self.__quiet.close()
+
+
 class HelpFrame(object):
 
     def __init__(self, context):
@@ -0,0 +1,222 @@
+import time
+
+from res import Strings as String
+import objects
+
+PLAYER = 0
+ENEMY = 1
+
+MESSAGES = {objects.MISS: String.GameFrame.BOT_SHOOT, objects.REPEATED: String.GameFrame.BOT_SHOOT,
+            objects.HIT: String.GameFrame.BOT_HIT, objects.DESTROYED: String.GameFrame.BOT_DESTROYED}
+
+
+def fire_salvo(bot, defence: objects.Player, amount: int, results: list):
+    """
+    Asks a bot for a salvo and resolves it. A bot with say_salvo(results, amount) aims every shot of the salvo
+    at once and the salvo is resolved in one call; a bot with say() only is told the result of every shot
+    before it aims the next one.
+    :param bot: object - a bot with say_salvo(results: list, amount: int) or say(value: str)
+    :param defence: Player - the player that is shot at
+    :param amount: int - shots of the salvo
+    :param results: list - results of the bot's previous salvo, empty before the first one
+    :return: tuple - (list of (x, y), list of results, seconds the bot took)
+    """
+    if hasattr(bot, "say_salvo"):
+        begin = time.perf_counter()
+        points = [tuple(point) for point in bot.say_salvo(results, amount)[:amount]]
+        decision_time = time.perf_counter() - begin
+        return points, defence.receive_salvo(points), decision_time
+
+    points = []
+    shots = []
+    decision_time = 0
+    message = MESSAGES[results[-1]] if results else String.GameFrame.BOT_SHOOT
+    for _ in range(amount):
+        begin = time.perf_counter()
+        x, y = bot.say(message)
+        decision_time += time.perf_counter() - begin
+        points.append((x, y))
+        shots.extend(defence.receive_salvo([(x, y)]))
+        if not defence.is_some_ships_placed():
+            break
+        message = MESSAGES[shots[-1]]
+    return points, shots, decision_time
+
+
+class Game(object):
+    """
+    Rules of a battle between two players without any GUI.
+    The shooter keeps the turn after a hit and loses it after a miss; with salvo rules (Rules.salvo)
+    the shooter fires a salvo and the turn passes.
+    """
+
+    def __init__(self, player: objects.Player, enemy: objects.Player, turn: int = PLAYER, recorder=None):
+        """
+        :param player: Player - the first player (side PLAYER)
+        :param enemy: Player - the second player (side ENEMY)
+        :param turn: int - the side that shoots first
+        :param recorder: GameRecorder - writes the game to a log (gamelog.py), None to not record
+        """
+        self.__players = (player, enemy)
+        self.__turn = turn
+        self.__winner = None
+        self.__history = []  # (side, x, y, result)
+        self.__messages = [String.GameFrame.BOT_SHOOT, String.GameFrame.BOT_SHOOT]  # Next bot command of each side
+        self.__salvos = [[], []]  # Results of the last turn (salvo) of each side
+        self.__recorder = recorder
+
+    def get_player(self, side: int):
+        """
+        :param side: int - PLAYER or ENEMY
+        :return: Player
+        """
+        return self.__players[side]
+
+    def get_turn(self):
+        """
+        :return: int - the side that shoots now
+        """
+        return self.__turn
+
+    def get_winner(self):
+        """
+        :return: int - the side that won, None if the battle goes on
+        """
+        return self.__winner
+
+    def is_over(self):
+        """
+        :return: True if one of the fleets has been destroyed
+        """
+        return self.__winner is not None
+
+    def get_history(self):
+        """
+        :return: list of tuples - (side, x, y, result) of every shot
+        """
+        return self.__history
+
+    def get_message(self):
+        """
+        :return: str - the command for the bot of the side whose turn it is
+        """
+        return self.__messages[self.__turn]
+
+    def get_results(self, side: int):
+        """
+        :param side: int - PLAYER or ENEMY
+        :return: list - results of the shots of the side's last turn (salvo), empty before its first one
+        """
+        return self.__salvos[side]
+
+    def restore(self, history: list, results: tuple, winner: int = None):
+        """
+        Goes on with a saved game (savegame.py), the players must already have received the shots
+        :param history: list - (side, x, y, result) of every shot, may be empty if it has not been kept
+        :param results: tuple - results of the last turn of each side
+        :param winner: int - the side that won, None if the battle goes on
+        :return: None
+        """
+        self.__history = list(history)
+        self.__winner = winner
+        self.__salvos = [list(results[0]), list(results[1])]
+        self.__messages = [MESSAGES[shots[-1]] if shots else String.GameFrame.BOT_SHOOT for shots in self.__salvos]
+
+    def shoot(self, x: int, y: int, decision_time: float = 0):
+        """
+        The side whose turn it is shoots at the opponent
+        :param x: int - X coordinate
+        :param y: int - Y coordinate
+        :param decision_time: float - seconds the bot took to choose the point, recorded with the shot
+        :return: str - objects.MISS, HIT, DESTROYED or REPEATED
+        """
+        side = self.__turn
+        defence = self.__players[1 - side]
+        result = defence.receive_shot(x, y)
+        if not self.__history or self.__history[-1][0] != side:  # The first shot of the turn
+            self.__salvos[side] = []
+        self.__salvos[side].append(result)
+        self.__history.append((side, x, y, result))
+
+        if result == objects.HIT:
+            self.__messages[side] = String.GameFrame.BOT_HIT
+        elif result == objects.DESTROYED:
+            self.__messages[side] = String.GameFrame.BOT_DESTROYED
+            if not defence.is_some_ships_placed():
+                self.__winner = side
+        else:  # A miss or a wasted shot passes the turn
+            self.__messages[side] = String.GameFrame.BOT_SHOOT
+            self.__turn = 1 - side
+
+        if self.__recorder is not None:
+            self.__recorder.shot(side, x, y, result, self.__turn != side, decision_time)
+        return result
+
+    def get_salvo_size(self):
+        """
+        :return: int - shots of the salvo of the side whose turn it is, 1 in the classic game
+        """
+        shooter = self.__players[self.__turn]
+        return shooter.get_rules().get_salvo(shooter.get_alive_amount())
+
+    def shoot_salvo(self, points: list, decision_time: float = 0):
+        """
+        The side whose turn it is fires a salvo at the opponent, then the turn passes
+        :param points: list - (x, y) of every shot
+        :param decision_time: float - seconds the bot took to aim the salvo
+        :return: list - objects.MISS, HIT, DESTROYED or REPEATED of every shot
+        """
+        results = self.__players[1 - self.__turn].receive_salvo(points)
+        self.end_salvo(points, results, decision_time)
+        return results
+
+    def play_salvo(self, bot):
+        """
+        Asks the bot of the current side for a salvo and resolves it (fire_salvo)
+        :param bot: object - a bot with say_salvo(results: list, amount: int) or say(value: str)
+        :return: list of tuples - (x, y, result) of every shot
+        """
+        side = self.__turn
+        points, results, decision_time = fire_salvo(bot, self.__players[1 - side], self.get_salvo_size(),
+                                                    self.__salvos[side])
+        self.end_salvo(points, results, decision_time)
+        return [(x, y, result) for (x, y), result in zip(points, results)]
+
+    def end_salvo(self, points: list, results: list, decision_time: float):
+        """
+        Records a salvo resolved by fire_salvo and passes the turn
+        :return: None
+        """
+        side = self.__turn
+        if not self.__players[1 - side].is_some_ships_placed():
+            self.__winner = side
+        else:
+            self.__turn = 1 - side
+        self.__salvos[side] = results
+        self.__messages[side] = MESSAGES[results[-1]] if results else String.GameFrame.BOT_SHOOT
+
+        for i, ((x, y), result) in enumerate(zip(points, results)):
+            self.__history.append((side, x, y, result))
+            if self.__recorder is not None:
+                self.__recorder.shot(side, x, y, result, i == len(results) - 1 and self.__turn != side,
+                                     decision_time if i == 0 else 0)
+
+    def play_bot(self, bot):
+        """
+        Asks the bot of the current side for a shot and resolves it
+        :param bot: object - a bot with say(value: str)
+        :return: tuple - (x, y, result)
+        """
+        begin = time.perf_counter()
+        x, y = bot.say(self.get_message())
+        return x, y, self.shoot(x, y, time.perf_counter() - begin)
+
+    def end_record(self):
+        """
+        Writes the recorded game to the log, an unfinished game is written as abandoned
+        :return: int - number of the game in the log, None if the game is not recorded
+        """
+        if self.__recorder is None:
+            return None
+        recorder, self.__recorder = self.__recorder, None
+        return recorder.end()
@@ -0,0 +1,392 @@
+import argparse
+import contextlib
+import mmap
+import os
+import struct
+import time
+
+import res
+import objects
+import brain
+import game
+
+# Every event is one fixed-width record: kind, side, x, y, a, b, move, game, value
+RECORD = struct.Struct("<BBBBBBHII")
+# Sidecar index, one entry per game: first record, moves, winner, first turn, placements, humans
+INDEX = struct.Struct("<QIBBBB")
+
+# Kinds of the records
+START = 0  # a - side that shoots first, b - humans, value - unix time
+PLACE = 1  # a - type, b - orientation
+MISS = 2  # a - TURN_CHANGED, value - decision time of a bot in us (0 for a human)
+HIT = 3
+SINK = 4
+REPEATED = 5
+END = 6  # a - winner, b - moves between checkpoints (0 for none), value - amount of moves
+CHECKPOINT = 7  # After END: side - the side whose shot points these are, move - the move they are before,
+# x, y, a, b and value - 8 bytes of the bitset of the shot points of the (size + 2) ** 2 map
+
+TURN_CHANGED = 1
+NO_WINNER = 255  # The game has been abandoned
+
+# Every CHECKPOINT_MOVES moves both sides' shot points are written, a position is replayed from the nearest one
+CHECKPOINT_MOVES = 32
+CHECKPOINT_RECORDS = ((res.BOARD_SIZE + 2) ** 2 + 63) // 64  # Records of a side, the board of the log is 10x10
+
+RESULT_KINDS = {objects.MISS: MISS, objects.HIT: HIT, objects.DESTROYED: SINK, objects.REPEATED: REPEATED}
+KIND_RESULTS = {kind: result for result, kind in RESULT_KINDS.items()}
+
+
+class GameLogWriter(object):
+    """
+    Appends games to the log. A game is kept by its recorder until it ends
+    and then written with one write, so the records of a game are contiguous even
+    if several games are played at the same time, and a move can be found from the index alone.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: str - the log, the index is written next to it (path + ".idx")
+        """
+        self.__log = open(path, "ab")
+        self.__index = open(path + ".idx", "ab")
+        self.__records = self.__log.tell() // RECORD.size
+        self.__games = self.__index.tell() // INDEX.size
+
+    def begin(self, player: objects.Player, enemy: objects.Player, turn: int = game.PLAYER, humans: int = 0):
+        """
+        :param player: Player - the side PLAYER, with all ships placed
+        :param enemy: Player - the side ENEMY, with all ships placed
+        :param turn: int - the side that shoots first
+        :param humans: int - bit 1 << side is set for every side played by a human
+        :return: GameRecorder
+        """
+        return GameRecorder(self, player, enemy, turn, humans)
+
+    def commit(self, records: list, moves: int, winner: int, turn: int, places: int, humans: int):
+        """
+        Writes a finished game, the log before the index so that the index never points past the log
+        :param records: list - the records packed without the game number
+        :return: int - number of the game
+        """
+        number = self.__games
+        self.__log.write(b"".join(RECORD.pack(*record[:7], number, record[7]) for record in records))
+        self.__log.flush()
+        self.__index.write(INDEX.pack(self.__records, moves, winner, turn, places, humans))
+        self.__index.flush()
+
+        self.__records += len(records)
+        self.__games += 1
+        return number
+
+    def close(self):
+        """
+        :return: None
+        """
+        self.__log.close()
+        self.__index.close()
+
+
+class GameRecorder(object):
+    """
+    Collects the events of one game
+    """
+
+    def __init__(self, writer: GameLogWriter, player: objects.Player, enemy: objects.Player, turn: int, humans: int):
+        self.__writer = writer
+        self.__turn = turn
+        self.__humans = humans
+        self.__records = [(START, 0, 0, 0, turn, humans, 0, int(time.time()))]
+        for side, fleet in enumerate((player.get_fleet(), enemy.get_fleet())):
+            for tp, orientation, x, y in fleet:
+                self.__records.append((PLACE, side, x, y, tp, orientation, 0, 0))
+        self.__places = len(self.__records) - 1
+        self.__moves = 0
+        self.__sunk = [0, 0]  # Ships destroyed by each side
+        self.__fleet = len(player.get_fleet())
+        self.__winner = None
+
+        # The shot points of both sides as bitsets, kept from the shots alone for the checkpoints
+        self.__size = player.get_rules().size
+        self.__period = CHECKPOINT_MOVES if self.__size == res.BOARD_SIZE else 0
+        self.__shots = [0, 0]
+        self.__ships = [{}, {}]  # (x, y) -> points of the ship
+        for side, fleet in enumerate((player.get_fleet(), enemy.get_fleet())):
+            for tp, orientation, x, y in fleet:
+                dx, dy = (1, 0) if orientation == objects.HORIZONTAL else (0, 1)
+                points = [(x + dx * i, y + dy * i) for i in range(tp)]
+                for point in points:
+                    self.__ships[side][point] = points
+        self.__checkpoints = []
+
+    def shot(self, side: int, x: int, y: int, result: str, turn_changed: bool, decision_time: float = 0):
+        """
+        :param side: int - the side that has shot
+        :param result: str - objects.MISS, HIT, DESTROYED or REPEATED
+        :param turn_changed: bool - the other side shoots next
+        :param decision_time: float - seconds the bot thought, 0 for a human
+        :return: None
+        """
+        kind = RESULT_KINDS[result]
+        self.__records.append((kind, side, x, y, TURN_CHANGED if turn_changed else 0, 0, self.__moves,
+                               min(int(decision_time * 1000000), 0xFFFFFFFF)))
+        self.__moves += 1
+        if kind == SINK:
+            self.__sunk[side] += 1
+            if self.__sunk[side] == self.__fleet:
+                self.__winner = side
+
+        if self.__period:
+            self.__mark(1 - side, x, y, kind)
+            if self.__moves % self.__period == 0:
+                self.__checkpoint()
+
+    def __mark(self, defence: int, x: int, y: int, kind: int):
+        """
+        Marks the shot point, and the points around a destroyed ship, as objects.Player does
+        :return: None
+        """
+        if kind == REPEATED:
+            return
+        side = self.__size + 2
+        self.__shots[defence] |= 1 << x * side + y
+        if kind == SINK:
+            for sx, sy in self.__ships[defence][(x, y)]:
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        self.__shots[defence] |= 1 << (sx + dx) * side + sy + dy
+
+    def __checkpoint(self):
+        """
+        Adds the records of the shot points of both sides before the next move
+        :return: None
+        """
+        for side in (game.PLAYER, game.ENEMY):
+            data = self.__shots[side].to_bytes(CHECKPOINT_RECORDS * 8, "little")
+            for i in range(0, len(data), 8):
+                self.__checkpoints.append((CHECKPOINT, side, *data[i:i + 4], self.__moves,
+                                           int.from_bytes(data[i + 4:i + 8], "little")))
+
+    def end(self):
+        """
+        Writes the game, without a winner if it has been abandoned
+        :return: int - number of the game in the log
+        """
+        winner = NO_WINNER if self.__winner is None else self.__winner
+        self.__records.append((END, 0, 0, 0, winner, self.__period, self.__moves, self.__moves))
+        self.__records.extend(self.__checkpoints)
+        return self.__writer.commit(self.__records, self.__moves, winner, self.__turn, self.__places, self.__humans)
+
+
+class GameLog(object):
+    """
+    Reads a log through mmap: nothing is loaded up front and any move of any game is found in O(1).
+    Games written after the log has been opened are not seen.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: str - the log written by GameLogWriter
+        """
+        self.__files = [open(path, "rb"), open(path + ".idx", "rb")]
+        self.__log = self.__map(self.__files[0])
+        self.__index = self.__map(self.__files[1])
+
+    @staticmethod
+    def __map(file):
+        """
+        :return: mmap, or empty bytes for an empty file which cannot be mapped
+        """
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.__index) // INDEX.size
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self.get_game(number)
+
+    def get_game(self, number: int):
+        """
+        :param number: int - number of the game
+        :return: GameReplay
+        """
+        if not 0 <= number < len(self):
+            raise IndexError("game %d is not in the log" % number)
+        first, moves, winner, turn, places, humans = INDEX.unpack_from(self.__index, number * INDEX.size)
+        return GameReplay(number, self.__log, first, moves, winner, turn, places, humans)
+
+    def events(self, chunk: int = 65536):
+        """
+        :param chunk: int - records unpacked at once
+        :return: generator - every record of the log, unpacked lazily
+        """
+        end = len(self.__log) // RECORD.size * RECORD.size
+        for begin in range(0, end, chunk * RECORD.size):
+            yield from RECORD.iter_unpack(self.__log[begin:min(begin + chunk * RECORD.size, end)])
+
+    def close(self):
+        """
+        :return: None
+        """
+        for mapped in (self.__log, self.__index):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+        for file in self.__files:
+            file.close()
+
+
+class GameReplay(object):
+    """
+    One game of the log, its records are read only when they are asked for
+    """
+
+    def __init__(self, number: int, log, first: int, moves: int, winner: int, turn: int, places: int, humans: int):
+        """
+        :param log: mmap - the whole log
+        :param first: int - number of the first record of the game
+        """
+        self.number = number
+        self.moves = moves
+        self.turn = turn  # Side that shot first
+        self.humans = humans  # Bit 1 << side for every side played by a human
+        self.winner = None if winner == NO_WINNER else winner
+        self.__log = log
+        self.__begin = first * RECORD.size
+        self.__places = places
+
+    def __read(self, first: int, amount: int):
+        """
+        :param first: int - record of the game to start with, 0 is START
+        :param amount: int - amount of records
+        :return: bytes
+        """
+        begin = self.__begin + first * RECORD.size
+        return self.__log[begin:begin + amount * RECORD.size]
+
+    def events(self):
+        """
+        :return: generator - (kind, side, x, y, a, b, move, game, value) of every record of the game
+        """
+        return RECORD.iter_unpack(self.__read(0, self.__places + self.moves + 2))
+
+    def get_move(self, move: int):
+        """
+        :param move: int - number of the move, from 0
+        :return: tuple - (side, x, y, result, turn_changed, decision time in us)
+        """
+        if not 0 <= move < self.moves:
+            raise IndexError("move %d is not in game %d" % (move, self.number))
+        kind, side, x, y, flags, _, _, _, value = RECORD.unpack(self.__read(1 + self.__places + move, 1))
+        return side, x, y, KIND_RESULTS[kind], bool(flags & TURN_CHANGED), value
+
+    def get_players(self, move: int = 0):
+        """
+        Rebuilds both players as they were before the move, from this game's records only:
+        from the nearest checkpoint before it, the moves after the checkpoint are replayed
+        :param move: int - number of the move, self.moves gives the final position
+        :return: tuple - (player, enemy)
+        """
+        move = min(move, self.moves)
+        players = objects.Player(), objects.Player()
+        for _, side, x, y, tp, orientation, _, _, _ in RECORD.iter_unpack(self.__read(1, self.__places)):
+            players[side].add_ship(objects.Ship(tp, orientation, x, y))
+
+        start, shots = self.__get_checkpoint(move)
+        if shots is not None:
+            restored = objects.Player(), objects.Player()
+            for side in (game.PLAYER, game.ENEMY):
+                restored[side].restore(players[side].get_fleet(destroyed=True), players[side].get_maps()[0],
+                                       shots[side])
+            players = restored
+        for _, side, x, y, _, _, _, _, _ in RECORD.iter_unpack(self.__read(1 + self.__places + start, move - start)):
+            players[1 - side].receive_shot(x, y)
+        return players
+
+    def __get_checkpoint(self, move: int):
+        """
+        :param move: int - number of the move
+        :return: tuple - (move of the nearest checkpoint, shot points of both sides as lists of lists of bool),
+        (0, None) if there is none: a log written before the checkpoints or a short game
+        """
+        period = RECORD.unpack(self.__read(1 + self.__places + self.moves, 1))[5]  # b of END
+        if not period or move < period:
+            return 0, None
+        start = move // period * period
+        size = res.BOARD_SIZE + 2
+        first = 2 + self.__places + self.moves + (start // period - 1) * 2 * CHECKPOINT_RECORDS
+        records = list(RECORD.iter_unpack(self.__read(first, 2 * CHECKPOINT_RECORDS)))
+        if len(records) != 2 * CHECKPOINT_RECORDS or \
+                any(record[0] != CHECKPOINT or record[6] != start or record[7] != self.number for record in records):
+            return 0, None  # A damaged log, the game is replayed from its start
+        shots = []
+        for side in (game.PLAYER, game.ENEMY):
+            data = b"".join(bytes(record[2:6]) + record[8].to_bytes(4, "little") for record in records
+                            if record[1] == side)
+            bits = int.from_bytes(data, "little")
+            shots.append([[bool(bits >> x * size + y & 1) for y in range(size)] for x in range(size)])
+        return start, shots
+
+
+def generate(path: str, games: int, names: tuple):
+    """
+    Records bot-vs-bot games
+    :param path: str - the log
+    :param games: int - amount of games
+    :param names: tuple - names of the two bots in the registry (registry.py)
+    :return: None
+    """
+    import registry
+
+    writer = GameLogWriter(path)
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # Bots print every shot
+        for _ in range(games):
+            player, enemy = brain.get_random_player(), brain.get_random_player()
+            battle = game.Game(player, enemy, recorder=writer.begin(player, enemy))
+            players = registry.create_bot(names[0]), registry.create_bot(names[1])
+            while not battle.is_over() and len(battle.get_history()) < res.SPECTATE_MAX_SHOTS:
+                battle.play_bot(players[battle.get_turn()])
+            battle.end_record()
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recorded games")
+    parser.add_argument("log", nargs="?", default=res.Strings.GAME_LOG)
+    parser.add_argument("--generate", type=int, metavar="GAMES", help="records bot-vs-bot games")
+    parser.add_argument("--bots", nargs=2, default=("HardBot", "MediumBot"))
+    parser.add_argument("--game", type=int, help="shows a game")
+    parser.add_argument("--move", type=int, help="shows the position before the move of --game")
+    args = parser.parse_args()
+
+    if args.generate:
+        begin = time.perf_counter()
+        generate(args.log, args.generate, args.bots)
+        print("%d games recorded in %.2f s" % (args.generate, time.perf_counter() - begin))
+
+    log = GameLog(args.log)
+    if args.game is None:
+        winners = [0, 0, 0]
+        moves = 0
+        for replay in log:
+            winners[2 if replay.winner is None else replay.winner] += 1
+            moves += replay.moves
+        print("%d games, %d moves: player %d, enemy %d, abandoned %d" % (len(log), moves, *winners))
+    else:
+        replay = log.get_game(args.game)
+        move = replay.moves if args.move is None else args.move
+        player, enemy = replay.get_players(move)
+        print("Game %d, %d moves, winner: %s" % (replay.number, replay.moves, replay.winner))
+        for i in range(move):
+            side, x, y, result, _, decision = replay.get_move(i)
+            print("#%d %s %s %s %s" % (i, "player" if side == game.PLAYER else "enemy ", (x, y), result,
+                                       "(%d us)" % decision if decision else ""))
+        player.show_map()
+        enemy.show_map()
+    log.close()
+
+
+if __name__ == "__main__":
+    main()
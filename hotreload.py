@@ -0,0 +1,130 @@
+import argparse
+import os
+import time
+
+import res
+import asyncbots
+import registry as _registry
+from rules import Rules, DEFAULT_RULES
+
+
+class BotWatcher(object):
+    """
+    Development mode: notices the bots whose source files have changed, by comparing their modification times.
+    A poll is one stat per watched file
+    """
+
+    def __init__(self, registry: _registry.Registry = None):
+        """
+        :param registry: Registry - where the bots come from, the shared one by default
+        """
+        self.registry = registry if registry is not None else _registry.get_registry()
+        self.__files = {}  # path -> (modification time in ns, size)
+        self.__bots = {}  # name -> path
+
+    @staticmethod
+    def __stat(path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:  # Being saved by the editor, the next poll sees it
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def watch(self, name: str):
+        """
+        :param name: str - a bot of the registry that has been created
+        :return: bool - False if the bot has no source file (an engine, a bot of a zip)
+        """
+        if name.startswith(res.ENGINE_PREFIX):
+            return False
+        path = self.registry.get(name).get_source()
+        if path is None or not os.path.exists(path):
+            return False
+        self.__bots[name] = path
+        self.__files.setdefault(path, self.__stat(path))
+        return True
+
+    def poll(self):
+        """
+        :return: list - names of the watched bots whose files have changed since the last poll
+        """
+        changed = []
+        for path, known in self.__files.items():
+            current = self.__stat(path)
+            if current is not None and current != known:
+                self.__files[path] = current
+                changed.extend(name for name, source in self.__bots.items() if source == path)
+        return changed
+
+
+def migrate(bot, new_bot):
+    """
+    Gives the state of the bot to a bot of the new class through get_state and set_state (savegame.py)
+    :return: bool - True if the state has been kept, False if the new bot starts over
+    """
+    if not hasattr(bot, "get_state") or not hasattr(new_bot, "set_state"):
+        return False
+    try:
+        new_bot.set_state(bot.get_state())
+    except Exception as e:  # The layout of the state has changed
+        print("HotReload: the state of %s is not compatible, %s" % (type(bot).__name__, e))
+        return False
+    return True
+
+
+def reload_bot(registry: _registry.Registry, name: str, bot=None, rules: Rules = DEFAULT_RULES):
+    """
+    Reloads the module of the bot and replaces the bot by one of the new class with the same state
+    :param registry: Registry
+    :param name: str - name of the bot
+    :param bot: bot object that plays, None if only the class is reloaded
+    :param rules: Rules - of the game the bot plays
+    :return: tuple - (the new bot or None, True if the state has been kept, seconds of the reload)
+    """
+    begin = time.perf_counter()
+    bot_class = registry.reload(name)
+    new_bot, kept = None, False
+    if bot is not None:
+        new_bot = bot_class(rules)
+        kept = migrate(bot, new_bot)
+        if isinstance(bot, asyncbots.SyncBot):
+            new_bot = asyncbots.get_sync_bot(new_bot, bot.budget)
+    return new_bot, kept, time.perf_counter() - begin
+
+
+def bench(polls: int, files: int):
+    """
+    Cost of a poll of the watched files
+    :return: None
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        registry = _registry.Registry(directory, entry_points=False)
+        watcher = BotWatcher(registry)
+        for i in range(files):
+            path = os.path.join(directory, "bot%d.py" % i)
+            with open(path, "w") as file:
+                file.write("BOTS = {'Bot%d': {}}\n" % i)
+        registry.discover()
+        for i in range(files):
+            watcher.watch("Bot%d" % i)
+        begin = time.perf_counter()
+        for _ in range(polls):
+            watcher.poll()
+        elapsed = time.perf_counter() - begin
+    print("%d files: %.1f us per poll, %.4f%% of a %d ms poll period" % (
+        files, elapsed / polls * 1e6, elapsed / polls * 1e5 / res.RELOAD_POLL_TIME, res.RELOAD_POLL_TIME))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot reload of the bots, measures the watcher")
+    parser.add_argument("--polls", type=int, default=10000)
+    parser.add_argument("--files", type=int, nargs="*", default=[1, 5, 20])
+    args = parser.parse_args()
+    for files in args.files:
+        bench(args.polls, files)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import res
+import objects
+import brain
+import endgame
+from snapshot import SIZE, CELLS, get_around, Snapshot
+
+FULL = (1 << CELLS) - 1
+SHIPS = len(res.LIST_OF_SHIPS) + 1  # Ship ids 1..10 in the buffer, 0 is water
+SAMPLING_SHARE = 0.7  # of the move budget, the rest is for evaluating the points
+
+_buffer = None  # (samples, CELLS) int8 ship ids of the sampled fleets, in shared memory
+_memory = None
+_halos = {}  # ship mask -> the ship and the points around it
+_cells = {}  # ship mask -> its cells
+_estimators = {}  # (workers, budget, samples) -> Estimator, running across games
+
+
+def attach(name: str, samples: int):
+    """
+    Initializer of the workers: maps the sample buffer of the main process
+    :param name: str - name of the shared memory
+    :param samples: int - rows of the buffer
+    :return: None
+    """
+    global _buffer, _memory
+    try:
+        _memory = shared_memory.SharedMemory(name, track=False)
+    except TypeError:  # Before Python 3.13, the pool shares the resource tracker of the main process anyway
+        _memory = shared_memory.SharedMemory(name)
+    _buffer = np.ndarray((samples, CELLS), np.int8, _memory.buf)
+
+
+def get_halo(ship: int):
+    halo = _halos.get(ship)
+    if halo is None:
+        halo = _halos[ship] = get_around(ship)
+    return halo
+
+
+def get_cells(ship: int):
+    cells = _cells.get(ship)
+    if cells is None:
+        cells = _cells[ship] = [cell for cell in range(CELLS) if ship >> cell & 1]
+    return cells
+
+
+def draw_fleet(rng: random.Random, hits: int, lengths: tuple, placements: dict, groups: list, covers: list):
+    """
+    Places the ships one by one at random places that agree with the observed state
+    :return: list - ship masks, None if the ships left do not fit any more
+    """
+    blocked = covered = 0
+    rest = list(lengths)
+    fleet = []
+    for group, options in zip(groups, covers):
+        if group & blocked:
+            if group & covered != group:
+                return None
+            continue  # In a ship with a gap
+        options = [(length, ship) for length, ship in options
+                   if length in rest and not ship & blocked and not hits & ~ship & get_halo(ship)]
+        if not options:
+            return None
+        length, ship = rng.choice(options)
+        rest.remove(length)
+        fleet.append(ship)
+        blocked |= get_halo(ship)
+        covered |= ship
+    for length in rest:
+        options = [ship for ship in placements[length] if not ship & (blocked | hits)]
+        if not options:
+            return None
+        ship = rng.choice(options)
+        fleet.append(ship)
+        blocked |= get_halo(ship)
+    return fleet
+
+
+def sample(task: tuple, grids: np.ndarray = None):
+    """
+    Fills rows of the buffer with fleets that agree with the observed state until the deadline
+    :param task: tuple - (shots, hits, lengths, first row, rows, deadline, seed)
+    :param grids: numpy array - the buffer, the shared one of the worker if None
+    :return: tuple - (first row, amount of fleets)
+    """
+    shots, hits, lengths, first, rows, deadline, seed = task
+    grids = _buffer if grids is None else grids
+    rng = random.Random(seed)
+    free = FULL & ~shots | hits
+    placements = {length: endgame.get_placements(length, free, hits) for length in set(lengths)}
+    groups = endgame.get_groups(hits)
+    covers = [[(length, ship) for length in sorted(placements) for ship in placements[length]
+               if ship & group == group] for group in groups]
+
+    made = failed = 0
+    while made < rows and time.perf_counter() < deadline:
+        fleet = draw_fleet(rng, hits, lengths, placements, groups, covers)
+        if fleet is None:
+            failed += 1
+            if not made and failed > res.INFOGAIN_MAX_FAILURES:
+                break  # Nothing fits, what has been seen does not agree with the fleet
+            continue
+        row = grids[first + made]
+        row[:] = 0
+        for ship_id, ship in enumerate(fleet, 1):
+            row[get_cells(ship)] = ship_id
+        made += 1
+    return first, made
+
+
+def evaluate(task: tuple, grids: np.ndarray = None):
+    """
+    Splits the sampled fleets by what a shot at every point would show: miss, hit or destroyed
+    :param task: tuple - (points, (first row, rows) of the samples, shots)
+    :param grids: numpy array - the buffer, the shared one of the worker if None
+    :return: numpy array - (3, points) amount of fleets of every outcome
+    """
+    cells, ranges, shots = task
+    grids = _buffer if grids is None else grids
+    unshot = [cell for cell in range(CELLS) if not shots >> cell & 1]
+    counts = np.zeros((3, len(cells)), np.int64)
+    for first, rows in ranges:
+        fleets = grids[first:first + rows]
+        # Points of every ship that have not been shot, a shot at the last one destroys it
+        ids = fleets[:, unshot] + np.arange(rows, dtype=np.intp)[:, None] * SHIPS
+        left = np.bincount(ids.ravel(), minlength=rows * SHIPS).reshape(rows, -1)
+        ships = fleets[:, cells]
+        last = np.take_along_axis(left, ships.astype(np.intp), 1) == 1
+        water = ships == 0
+        counts[0] += water.sum(0)
+        counts[2] += (last & ~water).sum(0)
+    counts[1] = sum(rows for _, rows in ranges) - counts[0] - counts[2]
+    return counts
+
+
+class Estimator(object):
+    """
+    Expected information of a shot at every point: fleets that agree with what has been seen are sampled
+    and a shot is worth the entropy of its outcome over them. The samples live in one shared memory buffer,
+    workers of a process pool fill their own rows of it and then evaluate a share of the points over all rows,
+    so only the observed state and the counts cross the pipes.
+    """
+
+    def __init__(self, workers: int = res.INFOGAIN_WORKERS, budget: float = res.INFOGAIN_BUDGET,
+                 samples: int = res.INFOGAIN_SAMPLES):
+        """
+        :param workers: int - processes of the pool, 0 to work in this process, None for every core
+        :param budget: float - seconds per move
+        :param samples: int - most fleets per move
+        """
+        self.__workers = os.cpu_count() if workers is None else workers
+        self.__budget = budget
+        self.__samples = samples
+        self.__memory = shared_memory.SharedMemory(create=True, size=samples * CELLS)
+        self.__grids = np.ndarray((samples, CELLS), np.int8, self.__memory.buf)
+        self.__pool = None
+        if self.__workers:
+            self.__pool = multiprocessing.Pool(self.__workers, attach, (self.__memory.name, samples))
+        weakref.finalize(self, Estimator.__release, self.__pool, self.__memory)
+        self.stats = {"moves": 0, "samples": 0, "evaluated": 0, "time": 0.0}
+
+    @staticmethod
+    def __release(pool, memory):
+        """
+        :return: None
+        """
+        if pool is not None:
+            pool.terminate()
+        try:
+            memory.close()
+        except BufferError:
+            pass  # At exit the estimator may still view the buffer, it is freed with the process
+        memory.unlink()
+
+    def __map(self, function, tasks: list):
+        if self.__pool is None:
+            return [function(task, self.__grids) for task in tasks]
+        return self.__pool.map(function, tasks)
+
+    def get_shot(self, shots: int, hits: int, remaining: dict):
+        """
+        :param shots: int - bit mask of the shot points, the points around destroyed ships included
+        :param hits: int - bit mask of the hit points of ships that are not destroyed
+        :param remaining: dict - length -> amount of ships that are not destroyed
+        :return: tuple - (x, y) of the most informative shot, None if no fleet agrees with the observed state
+        """
+        points = self.get_shots(shots, hits, remaining, 1)
+        return points[0] if points else None
+
+    def get_shots(self, shots: int, hits: int, remaining: dict, amount: int):
+        """
+        The most informative points of one estimate, for a salvo
+        :param amount: int - amount of points
+        :return: list - (x, y) of the points, the most informative first; empty if no fleet agrees
+        """
+        begin = time.perf_counter()
+        lengths = tuple(sorted((length for length, amount in remaining.items() for _ in range(amount)), reverse=True))
+        parts = max(self.__workers, 1)
+        rows = self.__samples // parts
+        deadline = begin + self.__budget * SAMPLING_SHARE
+        seed = random.getrandbits(32)
+        ranges = self.__map(sample, [(shots, hits, lengths, part * rows, rows, deadline, seed + part)
+                                     for part in range(parts)])
+        total = sum(made for _, made in ranges)
+        if not total:
+            return []
+
+        cells = [cell for cell in range(CELLS) if not shots >> cell & 1]
+        chunks = [list(chunk) for chunk in np.array_split(cells, parts) if len(chunk)]
+        counts = np.concatenate(self.__map(evaluate, [(chunk, ranges, shots) for chunk in chunks]), 1)
+        probabilities = counts / total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entropy = -np.nansum(probabilities * np.log2(probabilities), 0)
+        # The most informative points, the likeliest hit among equal ones
+        best = sorted(range(len(cells)), key=lambda i: (-round(entropy[i], 9), probabilities[0, i]))[:amount]
+
+        self.stats["moves"] += 1
+        self.stats["samples"] += total
+        self.stats["evaluated"] += total * len(cells)
+        self.stats["time"] += time.perf_counter() - begin
+        return [(cells[i] // SIZE + 1, cells[i] % SIZE + 1) for i in best]
+
+    def get_telemetry(self):
+        """
+        :return: str - samples per second and fleet-point evaluations per second
+        """
+        stats = self.stats
+        elapsed = max(stats["time"], 1e-9)
+        return "infogain: %d workers, %d moves, %.0f samples/move, %.0f samples/s, %.0f evaluations/s" % (
+            self.__workers, stats["moves"], stats["samples"] / max(stats["moves"], 1),
+            stats["samples"] / elapsed, stats["evaluated"] / elapsed)
+
+
+def get_estimator(workers: int = res.INFOGAIN_WORKERS, budget: float = res.INFOGAIN_BUDGET,
+                  samples: int = res.INFOGAIN_SAMPLES):
+    """
+    Starts the pool on the first call, later calls return the same estimator
+    :return: Estimator
+    """
+    key = workers, budget, samples
+    estimator = _estimators.get(key)
+    if estimator is None:
+        estimator = _estimators[key] = Estimator(workers, budget, samples)
+    return estimator
+
+
+class Observer(object):
+    """
+    What a bot knows about the enemy fleet, from its own shots and their results
+    """
+
+    def __init__(self):
+        self.shots = 0
+        self.hits = 0  # Hit points of ships that are not destroyed
+        self.remaining = {}  # length -> amount of ships that are not destroyed
+        for length in res.LIST_OF_SHIPS:
+            self.remaining[length] = self.remaining.get(length, 0) + 1
+
+    def shot(self, x: int, y: int):
+        """
+        :return: None
+        """
+        self.shots |= 1 << (x - 1) * SIZE + y - 1
+
+    def hit(self, x: int, y: int):
+        """
+        :return: None
+        """
+        self.hits |= 1 << (x - 1) * SIZE + y - 1
+
+    def destroyed(self, x: int, y: int):
+        """
+        The ship is the hits touching the point, the points around it are empty
+        :return: None
+        """
+        bit = 1 << (x - 1) * SIZE + y - 1
+        ship = next(group for group in endgame.get_groups(self.hits | bit) if group & bit)
+        self.hits &= ~ship
+        self.shots |= get_halo(ship)
+        length = bin(ship).count("1")
+        if self.remaining.get(length):
+            self.remaining[length] -= 1
+
+
+def bench(workers: list, games: int, budget: float):
+    """
+    Plays games against random fleets with every amount of workers
+    :return: None
+    """
+    for amount in workers:
+        estimator = Estimator(amount, budget)
+        shots = 0
+        for _ in range(games):
+            state = Snapshot.from_player(brain.get_random_player())
+            observer = Observer()
+            while not state.is_over():
+                point = estimator.get_shot(observer.shots, observer.hits, observer.remaining)
+                if point is None:
+                    break
+                state, result = state.shoot(*point)
+                observer.shot(*point)
+                if result == objects.HIT:
+                    observer.hit(*point)
+                elif result == objects.DESTROYED:
+                    observer.destroyed(*point)
+                shots += 1
+        print("%s; %.1f shots per game" % (estimator.get_telemetry(), shots / games))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Information-gain targeting")
+    parser.add_argument("--workers", type=int, nargs="*", default=[0, 1, os.cpu_count()])
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=res.INFOGAIN_BUDGET)
+    args = parser.parse_args()
+    bench(args.workers, args.games, args.budget)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import functools
+import json
+import os
+import time
+import tkinter
+from collections import deque
+
+import res
+
+# Callbacks of these classes (module frames) are measured
+PROFILED_CLASSES = ("MapBuilder", "ArrangeFrame", "GameFrame", "MenuFrame", "HelpFrame")
+
+
+class TclCounter(object):
+    """
+    Stands in for the tkapp object of the root and counts the Tcl calls made through it.
+    Widgets copy the tk attribute of their master, so every widget created afterwards is counted.
+    """
+
+    def __init__(self, tk):
+        """
+        :param tk: tkapp - the original Tcl interpreter of the root
+        """
+        self.__tk = tk
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self.__tk.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.__tk, name)
+
+
+class Profiler(object):
+
+    def __init__(self, root: tkinter.Tk, heartbeat: int = res.PROFILER_HEARTBEAT):
+        """
+        :param root: Tk - root of the application, widgets must be created after install()
+        :param heartbeat: int - period of the event loop lag probe in ms
+        """
+        self.__root = root
+        self.__heartbeat = heartbeat
+        self.__start = time.perf_counter()
+        self.__counter = None
+
+        self.__events = deque(maxlen=res.PROFILER_MAX_EVENTS)  # Chrome trace events
+        self.__stats = {}  # callback name -> [calls, total us, max us, tcl calls]
+        self.__lag_total = 0
+        self.__lag_max = 0
+        self.__lag_samples = 0
+        self.__expected = None  # When the next heartbeat is expected
+
+        self.__hud = None
+        self.__hud_visible = False
+
+    def install(self):
+        """
+        Starts profiling: counts Tcl calls, wraps callbacks registered by the frames and starts the heartbeat
+        :return: None
+        """
+        self.__counter = TclCounter(self.__root.tk)
+        self.__root.tk = self.__counter
+
+        profiler = self
+        register = tkinter.Misc._register
+        after = tkinter.Misc.after
+        bind = tkinter.Misc.bind
+
+        def profiled_register(widget, func, subst=None, needcleanup=1):
+            return register(widget, profiler.wrap(func, "command"), subst, needcleanup)
+
+        def profiled_after(widget, ms, func=None, *args):
+            return after(widget, ms, func and profiler.wrap(func, "after"), *args)
+
+        def profiled_bind(widget, sequence=None, func=None, add=None):
+            return bind(widget, sequence, func and profiler.wrap(func, sequence), add)
+
+        tkinter.Misc._register = profiled_register
+        tkinter.Misc.after = profiled_after
+        tkinter.Misc.bind = profiled_bind
+
+        self.__hud = tkinter.Label(self.__root,
+                                   justify=tkinter.LEFT,
+                                   anchor=tkinter.NW,
+                                   bg="black",
+                                   fg="white",
+                                   font="courier 9")
+        self.__root.bind_all("<F12>", lambda e: self.toggle_hud())
+        self.__root.bind_all("<Shift-F12>", lambda e: self.export())
+
+        self.__expected = time.perf_counter() + self.__heartbeat / 1000
+        self.__root.after(self.__heartbeat, self.__on_heartbeat)
+        print("Profiler: installed, F12 - HUD, Shift+F12 - export", res.Strings.PROFILER_TRACE)
+
+    def wrap(self, func, kind: str):
+        """
+        Wraps a callback of the profiled frames, other callbacks are returned as they are
+        :param func: callable - the callback
+        :param kind: str - event sequence, "command" or "after"
+        :return: callable
+        """
+        target = getattr(func, "__func__", func)
+        qualname = getattr(target, "__qualname__", "")
+        if getattr(func, "profiled", False) or getattr(target, "__module__", None) != "frames" \
+                or qualname.split(".")[0] not in PROFILED_CLASSES:
+            return func
+
+        name = "%s %s" % (qualname.replace(".<locals>", "").replace(".<lambda>", ""), kind)
+
+        @functools.wraps(func)
+        def profiled(*args, **kwargs):
+            calls = self.__counter.calls
+            begin = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.__record(name, begin, time.perf_counter(), self.__counter.calls - calls)
+
+        profiled.profiled = True
+        return profiled
+
+    def __record(self, name: str, begin: float, end: float, tcl_calls: int):
+        """
+        :param name: str - name of the callback
+        :param begin: float - perf_counter at the start
+        :param end: float - perf_counter at the end
+        :param tcl_calls: int - Tcl calls made by the callback
+        :return: None
+        """
+        duration = (end - begin) * 1000000
+        self.__events.append({"name": name,
+                              "cat": "callback",
+                              "ph": "X",
+                              "ts": (begin - self.__start) * 1000000,
+                              "dur": duration,
+                              "pid": os.getpid(),
+                              "tid": 0,
+                              "args": {"tcl_calls": tcl_calls}})
+
+        stat = self.__stats.setdefault(name, [0, 0, 0, 0])
+        stat[0] += 1
+        stat[1] += duration
+        stat[2] = max(stat[2], duration)
+        stat[3] += tcl_calls
+
+    def __on_heartbeat(self):
+        """
+        Measures how late the event loop runs the periodic callback
+        :return: None
+        """
+        now = time.perf_counter()
+        lag = max(0.0, (now - self.__expected) * 1000)
+        self.__lag_total += lag
+        self.__lag_max = max(self.__lag_max, lag)
+        self.__lag_samples += 1
+        self.__events.append({"name": "event loop lag",
+                              "ph": "C",
+                              "ts": (now - self.__start) * 1000000,
+                              "pid": os.getpid(),
+                              "args": {"lag_ms": lag, "tcl_calls": self.__counter.calls}})
+
+        if self.__hud_visible and self.__lag_samples % max(1, res.PROFILER_HUD_REFRESH // self.__heartbeat) == 0:
+            self.__refresh_hud()
+
+        self.__expected = now + self.__heartbeat / 1000
+        self.__root.after(self.__heartbeat, self.__on_heartbeat)
+
+    def toggle_hud(self):
+        """
+        Shows or hides the on-screen statistics
+        :return: None
+        """
+        self.__hud_visible = not self.__hud_visible
+        if self.__hud_visible:
+            self.__refresh_hud()
+            self.__hud.place(relx=1, rely=0, anchor=tkinter.NE)
+            self.__hud.lift()
+        else:
+            self.__hud.place_forget()
+
+    def __refresh_hud(self):
+        """
+        :return: None - writes the statistics into the HUD label
+        """
+        lines = ["lag avg %6.2f ms  max %6.2f ms" % (self.__lag_total / max(1, self.__lag_samples), self.__lag_max),
+                 "tcl calls %d" % self.__counter.calls,
+                 "%-44s %6s %9s %9s %6s" % ("callback", "calls", "avg us", "max us", "tcl")]
+
+        top = sorted(self.__stats.items(), key=lambda item: item[1][1], reverse=True)[:res.PROFILER_HUD_ROWS]
+        for name, (calls, total, longest, tcl_calls) in top:
+            lines.append("%-44s %6d %9.0f %9.0f %6d" % (name[-44:], calls, total / calls, longest, tcl_calls))
+
+        self.__hud.config(text="\n".join(lines))
+
+    def export(self, path: str = res.Strings.PROFILER_TRACE):
+        """
+        Writes the recorded events in Chrome trace format (chrome://tracing, Perfetto)
+        :param path: str - path of the JSON file
+        :return: None
+        """
+        with open(path, "w") as file:
+            json.dump({"traceEvents": list(self.__events), "displayTimeUnit": "ms"}, file)
+        print("Profiler: %d events exported to %s" % (len(self.__events), path))
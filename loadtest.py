@@ -0,0 +1,147 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+import res
+
+
+class Stats(object):
+
+    def __init__(self):
+        self.latencies = []  # s from a shot to its result
+        self.moves = 0  # shots of both sides
+        self.games = 0
+        self.errors = 0
+        self.active = 0
+        self.max_active = 0
+
+
+async def play_game(host: str, port: int, bot: str, stats: Stats):
+    """
+    Plays one game against the server's bot, shooting at random points
+    :return: None
+    """
+    reader, writer = await asyncio.open_connection(host, port, limit=res.SERVER_MAX_LINE)
+    targets = [(x, y) for x in range(1, 11) for y in range(1, 11)]
+    random.shuffle(targets)
+    shot = set()
+    sent = {}  # id -> perf_counter of the shot
+    ids = iter(range(1, 1000))
+
+    def send(message):
+        writer.write(json.dumps(message).encode() + b"\n")
+
+    def shoot():
+        while targets:
+            x, y = targets.pop()
+            if (x, y) not in shot:
+                shot.add((x, y))
+                message_id = next(ids)
+                sent[message_id] = time.perf_counter()
+                send({"type": "shoot", "x": x, "y": y, "id": message_id})
+                return
+
+    send({"type": "join", "mode": "bot", "bot": bot})
+    send({"type": "arrange", "random": True})
+    await writer.drain()
+
+    stats.active += 1
+    stats.max_active = max(stats.max_active, stats.active)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                stats.errors += 1
+                return
+            message = json.loads(line)
+            kind = message["type"]
+
+            if kind == "start" and message["turn"] or kind == "turn" and message["yours"]:
+                shoot()
+            elif kind == "result":
+                stats.moves += 1
+                if message["by"] == "you":
+                    stats.latencies.append(time.perf_counter() - sent.pop(message["id"]))
+                    for x, y in message.get("ship", ()):  # Points around a destroyed ship are known
+                        shot.update((x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+            elif kind == "error":
+                stats.errors += 1
+                shoot()
+            elif kind == "over":
+                stats.games += 1
+                return
+            await writer.drain()
+    finally:
+        stats.active -= 1
+        writer.close()
+
+
+async def run(host: str, port: int, concurrency: int, duration: float, bot: str):
+    """
+    Keeps the given amount of games running for the given time
+    :return: Stats
+    """
+    stats = Stats()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await play_game(host, port, bot, stats)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats
+
+
+def wait_for_server(host: str, port: int, timeout: float = 10):
+    """
+    :return: None - waits until the server accepts connections
+    """
+    import socket
+
+    deadline = time.time() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of server.py on localhost")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=res.SERVER_PORT + 1)
+    parser.add_argument("--games", type=int, default=1000, help="concurrent games")
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--bot", default="HardBot")
+    parser.add_argument("--external", action="store_true", help="uses a running server instead of starting one")
+    args = parser.parse_args()
+
+    server = None
+    if not args.external:
+        server = subprocess.Popen([sys.executable, "server.py", "--host", args.host, "--port", str(args.port)])
+    try:
+        wait_for_server(args.host, args.port)
+        begin = time.perf_counter()
+        stats = asyncio.run(run(args.host, args.port, args.games, args.duration, args.bot))
+        elapsed = time.perf_counter() - begin
+    finally:
+        if server is not None:
+            server.terminate()
+
+    latencies = sorted(stats.latencies) or [0]
+    print("concurrent games: %d (max %d)" % (args.games, stats.max_active))
+    print("finished games:   %d, errors: %d" % (stats.games, stats.errors))
+    print("moves/sec:        %.0f" % (stats.moves / elapsed))
+    print("move latency:     p50 %.2f ms, p99 %.2f ms" % (latencies[len(latencies) // 2] * 1000,
+                                                          latencies[int(len(latencies) * 0.99)] * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,41 @@
+import argparse
+import os
+
+import startup
+
+timer = startup.StartupTimer()
+
 from tkinter import *
 from tkinter import messagebox as msb
-from PIL import ImageTk, Image, ImageOps
 
 import frames
 import res
 import objects
 import brain
-import bots
+import game
+from rules import Rules, DEFAULT_RULES
 
 
 class Main(object):
     time = 0
 
-    def __init__(self):
-
+    def __init__(self, bot_name: str = "HardBot", show_image: bool = True, profile: bool = False, server=None,
+                 log: str = res.Strings.GAME_LOG, rules: Rules = DEFAULT_RULES, save: str = res.Strings.SAVED_GAME,
+                 reload: bool = False):
+        """
+        :param bot_name: str - name of the bot in the registry (registry.py), imported when the game starts
+        :param show_image: bool - shows the background image if True
+        :param profile: bool - measures the Tk callbacks of the frames (F12 shows the HUD)
+        :param server: tuple - (host, port) of a game server that plays the enemy, None for the local bot
+        :param log: str - path of the game log that records every local game, None to not record
+        :param rules: Rules - size of the board and the fleet
+        :param save: str - where the game against the local bot is kept when the player leaves it
+        :param reload: bool - development mode, a bot whose source file changes is reloaded between moves
+        """
+        self.__rules = rules
         self.__root = Tk()
+        if profile:  # Must be installed before any frame registers a callback
+            timer.import_module("instrumentation").Profiler(self.__root).install()
         self.__root.title(res.Strings.APP_NAME)
         self.__root.minsize(res.Dimensions.APP_MIN_WIDTH,
                             res.Dimensions.APP_MIN_HEIGHT)
@@ -23,40 +44,161 @@ class Main(object):
         self.__root.protocol("WM_DELETE_WINDOW", self.on_exit_button_pressed)
 
         # Putting background image
-        image = Image.open(res.Strings.APP_BACKGROUND)
-        image = ImageOps.fit(image, [res.Dimensions.APP_MIN_WIDTH, res.Dimensions.APP_MIN_HEIGHT], Image.ANTIALIAS)
-        photo = ImageTk.PhotoImage(image)
-        self.__background = Label(self.__root,
-                                  image=photo)
-        self.__background.image = photo
-        self.__background.place(relx=0,
-                                rely=0,
-                                relwidth=1,
-                                relheight=1)
+        self.__background = None
+        if show_image:
+            self.__place_background()
 
         # Setting MainFrame
         self.__menu_frame = frames.MenuFrame(self)
         self.__arrange_frame = None
         self.__game_frame = None
+        self.__spectate_frame = None
         self.__menu_frame.place_frame()
-        self.__bot = bots.HardBot()
+        self.__bot_name = bot_name
+        self.__bot = None  # Created when the game starts
+        self.__runner = None  # Moves of an asynchronous bot in the Tk event loop (asyncbots.py)
+        self.__server = server
+        self.__remote = None
+        self.__log = log
+        self.__log_writer = None  # Opened with the first recorded game
+        self.__recorder = None
+        self.__save = save
+        self.__watcher = None
+        if reload:
+            self.__watcher = timer.import_module("hotreload").BotWatcher()
+            self.__root.after(res.RELOAD_POLL_TIME, self.__poll_bots)
 
         # Setting HelpFrame
         self.__help_frame = frames.HelpFrame(self)
 
-    def start(self):
+    def __place_background(self):
+        """
+        Puts the background image, fitted once and cached as PNG so that next starts need neither PIL nor resizing
+        :return: None
+        """
+        source = res.Strings.APP_BACKGROUND
+        width = res.Dimensions.APP_MIN_WIDTH
+        height = res.Dimensions.APP_MIN_HEIGHT
+
+        path = startup.get_background_cache_path(source, width, height)
+        if os.path.exists(path):
+            timer.mark("background (cache hit)")
+        else:
+            path = startup.create_background_cache(source, width, height)
+            if path is None:
+                print("Main: PIL is not installed, the background image is skipped")
+                return
+            timer.mark("background (cache miss)")
+
+        photo = PhotoImage(master=self.__root, file=path)
+        self.__background = Label(self.__root,
+                                  image=photo)
+        self.__background.image = photo
+        self.__background.place(relx=0,
+                                rely=0,
+                                relwidth=1,
+                                relheight=1)
+
+    def create_bot(self, name: str, asynchronous: bool = False):
+        """
+        Imports the module of the bot on the first game and creates the bot
+        :param name: str - name of the bot in the registry, or "engine:<command>" for an external engine
+        :param asynchronous: bool - its moves are asked for with request_shoot and request_salvo
+        :return: bot object
+        """
+        bot = timer.import_module("registry").create_bot(name, self.__rules, asynchronous)
+        if self.__watcher is not None:
+            self.__watcher.watch(name)
+        return bot
+
+    def __poll_bots(self):
+        """
+        Development mode: reloads the bots whose files have changed, the bot of the game goes on with its state.
+        Tk runs one callback at a time, so the reload is always between two moves
+        :return: None
+        """
+        if self.__runner is not None and self.__runner.is_running():  # Not in the middle of a move
+            self.__root.after(res.RELOAD_POLL_TIME, self.__poll_bots)
+            return
+        hotreload = timer.import_module("hotreload")
+        for name in self.__watcher.poll():
+            bot = self.__bot if name == self.__bot_name else None
+            try:
+                new_bot, kept, elapsed = hotreload.reload_bot(self.__watcher.registry, name, bot, self.__rules)
+            except Exception as e:  # A mistake in the file, the old bot goes on
+                print("Main: %s is not reloaded, %s: %s" % (name, type(e).__name__, e))
+                continue
+            if new_bot is not None:
+                self.__bot = new_bot
+            print("Main: %s is reloaded in %.1f ms%s" % (name, elapsed * 1000, "" if bot is None else
+                                                           ", its state is kept" if kept else ", it starts over"))
+        self.__root.after(res.RELOAD_POLL_TIME, self.__poll_bots)
+
+    def get_bots(self):
+        """
+        :return: list - BotInfo of the bots that can play with the rules, the plugins are looked for on the first call
+        """
+        return timer.import_module("registry").get_registry().get_bots(rules=self.__rules)
+
+    def get_bot_name(self):
+        """
+        :return: str - the bot of the next game
+        """
+        return self.__bot_name
+
+    def on_bot_chosen(self, name: str):
+        """
+        Callback: MenuFrame
+        :param name: str - the bot of the next games
+        :return: None
+        """
+        print("Main: the bot is", name)
+        self.__bot_name = name
+
+    def create_recorder(self, player: objects.Player, enemy: objects.Player, human: bool = False):
+        """
+        Opens the game log on the first game
+        :param human: bool - the side PLAYER is played by a human
+        :return: GameRecorder, None if the games are not recorded
+        """
+        if self.__log is None or self.__rules != DEFAULT_RULES:  # The log records classic 10x10 games only
+            return None
+        if self.__log_writer is None:
+            gamelog = timer.import_module("gamelog")
+            self.__log_writer = gamelog.GameLogWriter(self.__log)
+        return self.__log_writer.begin(player, enemy, humans=1 << game.PLAYER if human else 0)
+
+    def start(self, quit_after_startup: bool = False):
         """
         Starts the mainloop
+        :param quit_after_startup: bool - closes the window as soon as the first frame is shown
         :return: None
         """
+        self.__root.after_idle(self.__on_first_frame, quit_after_startup)
         self.__root.mainloop()
 
+    def __on_first_frame(self, quit_after_startup: bool):
+        """
+        Calls when the first frame has been drawn and the window is interactive
+        :param quit_after_startup: bool - closes the window if True
+        :return: None
+        """
+        timer.mark("first frame")
+        if quit_after_startup:
+            self.__root.destroy()
+
     def get_root(self):
         """
         :return: BaseWidget tkinter root (master)
         """
         return self.__root
 
+    def get_rules(self):
+        """
+        :return: Rules - size of the board and the fleet
+        """
+        return self.__rules
+
     # Menu frame
     def on_start_arrange_button_pressed(self):
         """
@@ -64,10 +206,56 @@ class Main(object):
         :return: None
         """
         print("Main: OnStartButtonPressed")
+        if self.__server is None:  # A heavy bot starts while the player arranges the ships
+            timer.import_module("registry").get_registry().warm_up(self.__bot_name, self.__rules)
         self.__menu_frame.displace_frame()
         self.__arrange_frame = frames.ArrangeFrame(self)
         self.__arrange_frame.place_frame()
 
+    def on_resume_button_pressed(self):
+        """
+        Callback: MenuFrame, goes on with the saved game and forgets it
+        :return: None
+        """
+        savegame = timer.import_module("savegame")
+        try:
+            saved = savegame.load(self.__save)
+        except (OSError, ValueError) as e:
+            print("Main: no saved game,", e)
+            msb.showinfo(res.Strings.APP_NAME, res.Strings.MenuFrame.MSG_NO_SAVED_GAME)
+            return
+        if saved.rules != self.__rules:
+            msb.showinfo(res.Strings.APP_NAME, res.Strings.MenuFrame.MSG_SAVED_GAME_RULES % saved.rules)
+            return
+        os.remove(self.__save)
+
+        print("Main: Game resumed!")
+        self.__menu_frame.displace_frame()
+        if game.ENEMY in saved.bots:
+            self.__bot_name = saved.bots[game.ENEMY][0]
+        self.__bot = self.create_bot(self.__bot_name, asynchronous=True)
+        savegame.set_bot_state(self.__bot, saved.bots.get(game.ENEMY, ("", b""))[1])
+        player, enemy = saved.players
+        # The log keeps whole games only, a resumed game is not recorded
+        self.__game_frame = frames.GameFrame(self, player, enemy, turn=saved.turn,
+                                             enemy_results=saved.results[game.ENEMY])
+        self.__game_frame.place_frame()
+
+    def __save_game(self):
+        """
+        Keeps the game against the local bot that goes on, with the state of the bot, so that it can be resumed
+        :return: None
+        """
+        state = self.__game_frame.get_state() if self.__game_frame is not None else None
+        if state is None or self.__bot is None:
+            return
+        savegame = timer.import_module("savegame")
+        player, enemy, turn, enemy_results = state
+        savegame.save(self.__save, savegame.SavedGame(player, enemy, turn, results=([], enemy_results),
+                                                      bots={game.ENEMY: (self.__bot_name,
+                                                                         savegame.get_bot_state(self.__bot))}))
+        print("Main: the game is saved to", self.__save)
+
     def on_help_button_pressed(self):
         """
         Callback: MenuFrame
@@ -76,6 +264,15 @@ class Main(object):
         self.__menu_frame.displace_frame()
         self.__help_frame.place_frame()
 
+    def on_spectate_button_pressed(self):
+        """
+        Callback: MenuFrame
+        :return: None
+        """
+        self.__menu_frame.displace_frame()
+        self.__spectate_frame = frames.SpectateFrame(self)
+        self.__spectate_frame.place_frame()
+
     def on_exit_button_pressed(self):
         """
         Callback: MenuFrame
@@ -85,6 +282,10 @@ class Main(object):
         dialog = msb.askokcancel(res.Strings.APP_NAME, res.Strings.MenuFrame.EXIT_DIALOG_MSG)
 
         if dialog:
+            if self.__runner is not None:
+                self.__runner.close()
+            if self.__save is not None:
+                self.__save_game()
             self.__root.destroy()
 
     # Arrange frame
@@ -96,7 +297,14 @@ class Main(object):
         """
         print("Main: Game started!")
         self.__arrange_frame.displace_frame()
-        self.__game_frame = frames.GameFrame(self, player, brain.get_random_player())
+        enemy = brain.get_hard_player(self.__rules)
+        if self.__server is None:
+            self.__bot = self.create_bot(self.__bot_name, asynchronous=True)
+            self.__recorder = self.create_recorder(player, enemy, human=True)
+        else:  # The enemy's fleet is known only to the server, nothing to record
+            netclient = timer.import_module("netclient")
+            self.__remote = netclient.RemoteGame(self.__root, self.__server[0], self.__server[1], bot=self.__bot_name)
+        self.__game_frame = frames.GameFrame(self, player, enemy, self.__remote, self.__recorder)
         self.__game_frame.place_frame()
 
     def on_arrange_back_button_pressed(self):
@@ -116,26 +324,128 @@ class Main(object):
         self.__help_frame.displace_frame()
         self.__menu_frame.place_frame()
 
+    # Spectate frame
+    def on_spectate_back_button_pressed(self):
+        """
+        Calls when the back button of the SpectateFrame is clicked
+        :return: None
+        """
+        self.__spectate_frame.destroy_frame()
+        self.__spectate_frame = None
+        self.__menu_frame.place_frame()
+
     # Game frame
     def on_game_back_button_pressed(self):
         """
         Calls when the start button of the ArrangeFrame is clicked
         :return:
         """
+        if self.__runner is not None:  # The move of an asynchronous bot is abandoned with the game
+            self.__runner.cancel()
+        if self.__save is not None:
+            self.__save_game()
         self.__game_frame.displace_frame()
+        self.__game_frame = None
         self.__menu_frame.place_frame()
         self.__bot = None
-        self.__bot = bots.HardBot()
+        if self.__recorder is not None:
+            self.__recorder.end()
+            self.__recorder = None
+        if self.__remote is not None:
+            self.__remote.close()
+            self.__remote = None
+
+    def __get_runner(self):
+        """
+        :return: TkRunner - the asyncio loop of the asynchronous bots in the Tk event loop, made on the first move
+        """
+        if self.__runner is None:
+            self.__runner = timer.import_module("asyncbots").TkRunner(self.__root)
+        return self.__runner
 
-    def get_shoot(self, sms: str):
+    def request_shoot(self, sms: str, defence: objects.Player, on_shoot):
         """
-        Callback to get shot coordinates from the opponent
+        Callback to get shot coordinates from the opponent. A synchronous bot answers at once, an asynchronous one
+        thinks in the Tk event loop and plays its best point at the deadline
         :param sms: str - command to the opponent
-        :return: tuple of two ints - (0: X coordinate, 1: Y coordinate)
+        :param defence: Player - the player that is shot at
+        :param on_shoot: function(tuple) - takes (x, y) when the opponent has chosen
+        :return: None
+        """
+        asyncbots = timer.import_module("asyncbots")
+        if not asyncbots.is_async(self.__bot):
+            on_shoot(self.__bot.say(sms))
+            return
+        self.__get_runner().start(asyncbots.get_move(self.__bot, sms, fallback=lambda: asyncbots.get_free_point(
+            defence)), on_shoot)
+
+    def request_salvo(self, defence: objects.Player, amount: int, results: list, on_salvo):
+        """
+        Callback to get a salvo from the opponent, resolved on the defence (game.fire_salvo)
+        :param defence: Player - the player that is shot at
+        :param amount: int - shots of the salvo
+        :param results: list - results of the opponent's previous salvo
+        :param on_salvo: function(tuple) - takes (list of (x, y), list of results, seconds the bot took)
+        :return: None
         """
-        return self.__bot.say(sms)
+        asyncbots = timer.import_module("asyncbots")
+        if not asyncbots.is_async(self.__bot):
+            on_salvo(game.fire_salvo(self.__bot, defence, amount, results))
+            return
+        self.__get_runner().start(asyncbots.fire_salvo(self.__bot, defence, amount, results), on_salvo)
+
+
+def main():
+    """
+    Parses the command line and runs the game
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=res.Strings.APP_NAME)
+    parser.add_argument("--bot", default="HardBot", help="a bot (python registry.py lists them) or engine:COMMAND")
+    parser.add_argument("--no-image", action="store_true", help="starts without the background image")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="plays against a game server (server.py)")
+    parser.add_argument("--log", default=res.Strings.GAME_LOG, help="records the games to this log (gamelog.py)")
+    parser.add_argument("--no-log", action="store_true", help="does not record the games")
+    parser.add_argument("--save", default=res.Strings.SAVED_GAME,
+                        help="keeps the game left for the menu or on exit here, to resume it")
+    parser.add_argument("--size", type=int, default=res.BOARD_SIZE,
+                        help="width and height of the board, the fleet grows with its area")
+    parser.add_argument("--salvo", type=int, metavar="N",
+                        help="every turn is a salvo of N shots, 0 for a shot per ship afloat")
+    parser.add_argument("--profile", action="store_true", help="measures the Tk callbacks, F12 shows the HUD")
+    parser.add_argument("--reload", action="store_true",
+                        help="development mode, reloads a bot between moves when its source file changes")
+    parser.add_argument("--startup-time", action="store_true", help="reports the start up milestones")
+    parser.add_argument("--quit-after-startup", action="store_true", help="exits after the first frame")
+    args = parser.parse_args()
+
+    timer.set_verbose(args.startup_time)
+    timer.mark("imports")
+
+    rules = Rules.scaled(args.size, args.salvo)
+    if args.bot.startswith(res.ENGINE_PREFIX):
+        if rules != DEFAULT_RULES:  # The handshake tells an engine "board 10" (engines.py)
+            parser.error("an engine plays the classic 10x10 game only")
+    else:
+        try:
+            info = timer.import_module("registry").get_registry().get(args.bot)
+        except ValueError as e:
+            parser.error(str(e))
+        if not info.supports(rules):  # Checked before the game starts, not when the bot is created
+            parser.error("%s plays only the standard 10x10 board" % args.bot)
+
+    if args.connect and rules != DEFAULT_RULES:
+        parser.error("the game server plays the classic 10x10 game only")
+    server = None
+    if args.connect:
+        host, _, port = args.connect.rpartition(":")
+        server = host or "127.0.0.1", int(port)
 
+    master = Main(args.bot, not args.no_image, args.profile, server, None if args.no_log else args.log, rules,
+                  args.save, args.reload)
+    timer.mark("window")
+    master.start(args.quit_after_startup)
 
-master = Main()
 
-master.start()
+if __name__ == "__main__":
+    main()
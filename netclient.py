@@ -0,0 +1,181 @@
+import itertools
+import json
+import queue
+import socket
+import threading
+import time
+
+import res
+
+
+class RemoteGame(object):
+    """
+    A persistent connection to server.py for the Tk GUI.
+    Network threads read and write the socket, the Tk loop only touches queues:
+    incoming messages are handed to the listener from after() callbacks.
+    After a dropped connection it reconnects and resumes the match, the server answers with its whole state.
+    """
+
+    def __init__(self, root, host: str, port: int, mode: str = "bot", bot: str = None):
+        """
+        :param root: tkinter widget - used to schedule the after() callbacks
+        :param host: str - address of the server
+        :param port: int - port of the server
+        :param mode: str - "bot" or "human"
+        :param bot: str - bot of the server to play against, the server's default if None
+        """
+        self.__root = root
+        self.__address = host, port
+        self.__join = {"type": "join", "mode": mode}
+        if bot is not None:
+            self.__join["bot"] = bot
+
+        self.__inbox = queue.Queue()  # Filled by the reading thread
+        self.__outbox = queue.Queue()  # Emptied by the writing thread
+        self.__socket = None
+        self.__closed = False
+        self.__listener = None
+        self.__fleet = None
+
+        self.__game_id = None
+        self.__token = None
+        self.__ids = itertools.count(1)
+        self.__sent = {}  # id -> perf_counter of the request
+        self.__poll_job = None
+        self.__ping_job = None
+        self.rtt = None  # ms, the last measured round trip
+
+    def start(self, listener, fleet: list):
+        """
+        Connects in the background and joins a match
+        :param listener: callable(dict) - called from the Tk loop with every message
+        :param fleet: list - [type, orientation, x, y] of every ship
+        :return: None
+        """
+        self.__listener = listener
+        self.__fleet = fleet
+        threading.Thread(target=self.__read_loop, daemon=True).start()
+        threading.Thread(target=self.__write_loop, daemon=True).start()
+        self.__poll_job = self.__root.after(res.CLIENT_POLL_TIME, self.__poll)
+        self.__ping_job = self.__root.after(res.CLIENT_PING_TIME, self.__ping)
+
+    def shoot(self, x: int, y: int):
+        """
+        Sends the shot without waiting for the answer
+        :return: True if the shot has been sent, False if the connection is down
+        """
+        return self.__request({"type": "shoot", "x": x, "y": y})
+
+    def close(self):
+        """
+        Leaves the match and stops the network threads
+        :return: None
+        """
+        self.__closed = True
+        for job in (self.__poll_job, self.__ping_job):
+            if job is not None:
+                self.__root.after_cancel(job)
+        self.__outbox.put(None)
+        sock = self.__socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __request(self, message: dict):
+        """
+        Queues a message with an id, its answer gives the round trip
+        :return: True if it has been queued
+        """
+        if self.__socket is None:
+            return False
+        message["id"] = next(self.__ids)
+        self.__sent[message["id"]] = time.perf_counter()
+        self.__outbox.put(message)
+        return True
+
+    # Tk thread
+    def __poll(self):
+        """
+        Applies the received messages
+        :return: None
+        """
+        while True:
+            try:
+                message = self.__inbox.get_nowait()
+            except queue.Empty:
+                break
+
+            sent = self.__sent.pop(message.get("id"), None)
+            if sent is not None:
+                self.rtt = (time.perf_counter() - sent) * 1000
+            if message.get("type") != "pong":
+                self.__listener(message)
+
+        if not self.__closed:
+            self.__poll_job = self.__root.after(res.CLIENT_POLL_TIME, self.__poll)
+
+    def __ping(self):
+        """
+        Measures the round trip while nobody shoots
+        :return: None
+        """
+        self.__request({"type": "ping"})
+        self.__ping_job = self.__root.after(res.CLIENT_PING_TIME, self.__ping)
+
+    # Network threads
+    def __read_loop(self):
+        """
+        Connects, joins or resumes the match and reads messages until the connection is closed
+        :return: None
+        """
+        attempt = 0
+        while not self.__closed:
+            try:
+                sock = socket.create_connection(self.__address, timeout=5)
+                sock.settimeout(None)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+                if self.__game_id is None:
+                    hello = [self.__join, {"type": "arrange", "ships": self.__fleet}]
+                else:
+                    hello = [{"type": "resume", "game": self.__game_id, "token": self.__token}]
+                sock.sendall(b"".join(json.dumps(message).encode() + b"\n" for message in hello))
+
+                self.__socket = sock
+                self.__inbox.put({"type": "connected"})
+                attempt = 0
+
+                for line in sock.makefile("rb"):
+                    message = json.loads(line)
+                    if message.get("type") == "joined":
+                        self.__game_id = message["game"]
+                        self.__token = message["token"]
+                    self.__inbox.put(message)
+            except (OSError, ValueError):
+                pass
+
+            self.__socket = None
+            if self.__closed:
+                break
+            self.__inbox.put({"type": "disconnected"})
+            time.sleep(res.CLIENT_RECONNECT_DELAYS[min(attempt, len(res.CLIENT_RECONNECT_DELAYS) - 1)])
+            attempt += 1
+
+    def __write_loop(self):
+        """
+        Sends the queued messages, those queued while the connection was down are dropped
+        :return: None
+        """
+        while True:
+            message = self.__outbox.get()
+            if message is None:
+                break
+            sock = self.__socket
+            if sock is None:
+                continue
+            try:
+                sock.sendall(json.dumps(message).encode() + b"\n")
+            except OSError:
+                pass
@@ -1,5 +1,6 @@
 from exceptions import ShipException
 from res import MyExceptions as Errors
+from rules import Rules, DEFAULT_RULES
 import res
 
 BATTLESHIP = 4
@@ -9,6 +10,12 @@ SUBMARINE = 1
 HORIZONTAL = 1
 VERTICAL = 2
 
+# Results of a shot
+MISS = "miss"
+HIT = "hit"
+DESTROYED = "destroyed"
+REPEATED = "repeated"  # The point is out of the map or has already been shot
+
 
 def get_list_of_ships():
     """
@@ -19,12 +26,13 @@ def get_list_of_ships():
 
 class Ship(object):
 
-    def __init__(self, tp: int, orientation: int, init_x: int, init_y: int) -> None:
+    def __init__(self, tp: int, orientation: int, init_x: int, init_y: int, rules: Rules = DEFAULT_RULES) -> None:
         """
         :param tp: int (1-4) - which type is a ship(BATTLESHIP, CRUISER, DESTROYER, SUBMARINE)
         :param orientation: int (1 or 2) - orientation of a ship (VERTICAL, HORIZONTAL)
-        :param init_y: int (1-10): X upper right coordinate of a ship
-        :param init_y: int (1-10): Y upper right coordinate of a ship
+        :param init_x: int (1-size): X upper right coordinate of a ship
+        :param init_y: int (1-size): Y upper right coordinate of a ship
+        :param rules: Rules - size of the board
         """
         self.__type = tp
         self.__orientation = orientation
@@ -34,8 +42,10 @@ class Ship(object):
         self.__health = tp
 
         # Check weather given ship is not out of the map
-        if 1 <= init_x <= 10 and 1 <= init_y <= 10 and \
-                (orientation == HORIZONTAL and init_x + tp <= 11 or orientation == VERTICAL and init_y + tp <= 11):
+        size = rules.size
+        if 1 <= init_x <= size and 1 <= init_y <= size and \
+                (orientation == HORIZONTAL and init_x + tp <= size + 1 or
+                 orientation == VERTICAL and init_y + tp <= size + 1):
 
             for i in range(self.__type):                    # Init coordinates Id and Destroyed param
 
@@ -75,8 +85,8 @@ class Ship(object):
     def hit(self, x, y):
         """
         Hit the part of the ship on the given coors
-        :param x: int (1-10) - X coordinate to check
-        :param y: int (1-10) - Y coordinate to check
+        :param x: int (1-size) - X coordinate to check
+        :param y: int (1-size) - Y coordinate to check
         :return: True if some part of the ship is destroyed, False otherwise
         """
         result = -1
@@ -94,7 +104,7 @@ class Ship(object):
     def mark_on_map(self, map_to_mark_on: list, ship_id: int):
         """
         Marks the ship to the given map
-        :param map_to_mark_on: map 10x10 list
+        :param map_to_mark_on: map list, padded by one point on every side
         :param ship_id: int - id of the ship
         :return: None
         """
@@ -122,7 +132,7 @@ class Ship(object):
 
     def is_possible_put_onto_map(self, map_to_mark_on: list):
         """
-        :param map_to_mark_on: Player map 10x10 list
+        :param map_to_mark_on: Player map list
         :return: True if it is possible to put onto the given map, False otherwise
         """
         x = self.__coordinate_x
@@ -156,32 +166,68 @@ class Ship(object):
         return self.__coordinate_y[index]
 
 
+class FleetStatus(object):
+    """
+    What is left of a fleet at one moment, made again by the Player after every change and not modified
+    """
+    __slots__ = ("placed", "alive", "types", "health")
+
+    def __init__(self, placed: int, alive: int, types: tuple, health: int):
+        """
+        :param placed: int - ships put on the map, the destroyed ones included
+        :param alive: int - ships that are not destroyed
+        :param types: tuple - ships that are not destroyed by type, types[0] is 0
+        :param health: int - points of the ships that are not destroyed and have not been hit
+        """
+        self.placed = placed
+        self.alive = alive
+        self.types = types
+        self.health = health
+
+    def __str__(self):
+        return "%d of %d ships, %d points left" % (self.alive, self.placed, self.health)
+
+
 class Player(object):
 
-    def __init__(self):
+    def __init__(self, rules: Rules = DEFAULT_RULES):
+        """
+        :param rules: Rules - size of the board and the fleet
+        """
+        self.__rules = rules
+        size = rules.size
         # Amount of ships for each type: NONE, 1: SUBMARINE, 2: DESTROYER, 3: CRUISER, 4: BATTLESHIP
-        self.__shipsAmount = [None, 0, 0, 0, 0]
-        # List of ships: [0]: BATTLESHIP, [1, 2]: CRUISER, [3, 5]: DESTROYER, [6, 9]: SUBMARINE
-        self.__ships = [None, None, None, None, None,
-                        None, None, None, None, None, None]
-        # Map of the player
-        self.__map = []
-
-        # Creates empty map, 0: empty space, 1: ship, indexes = [1, 10]
-        for i in range(12):
-            row = []
-            for j in range(12):
-                row.append(0)
-            self.__map.append(row)
+        self.__shipsAmount = [None] + [0] * rules.max_type
+        # List of ships by id, from 1: the longest ships first (BATTLESHIP, CRUISER, DESTROYER, SUBMARINE)
+        self.__ships = [None] * (rules.ships + 1)
+        self.__placed_ships = [None] * (rules.ships + 1)  # The same, destroyed ships are not removed from it
+        # Counters kept up to date by every change, so the status of the fleet is never counted again
+        self.__placed = 0  # Ships put on the map, the destroyed ones included
+        self.__alive = 0  # Ships that are not destroyed
+        self.__health = [0] * (rules.ships + 1)  # Points of every ship that have not been hit
+        self.__total_health = 0
+        self.__status = None  # FleetStatus, made again on the first call after a change
+        self.__sink_listeners = []
+        # Map of the player: 0: empty space, '.': next to a ship, ship id: ship, indexes = [1, size]
+        self.__map = [[0] * (size + 2) for _ in range(size + 2)]
+        # Shot points of the map, True if shot (points around destroyed ships are shot automatically)
+        self.__shots = [[False] * (size + 2) for _ in range(size + 2)]
+        self.__shot_amount = 0  # Points of the map that are shot, so the free ones are never counted again
 
     def __str__(self):
 
         string = ""
-        for i in range(10):
+        for i in range(self.__rules.ships):
             string += "\nShip #" + str(i+1) + " >>>>>>>>>>>>>>>>>>>>>>>\n" + str(self.__ships[i+1])
 
         return string
 
+    def get_rules(self):
+        """
+        :return: Rules - size of the board and the fleet
+        """
+        return self.__rules
+
     def get_point_on_map(self, x: int, y: int):
         """
         :param x: int - X coordinate of the map
@@ -190,57 +236,177 @@ class Player(object):
         """
         return self.__map[x][y]
 
+    def is_shot(self, x: int, y: int):
+        """
+        :param x: int - X coordinate of the map
+        :param y: int - y coordinate of the map
+        :return: True if the point has been shot, False otherwise
+        """
+        return self.__shots[x][y]
+
+    def get_shot_amount(self):
+        """
+        :return: int - points of the map that have been shot, the points around the destroyed ships included
+        """
+        return self.__shot_amount
+
+    def receive_shot(self, x: int, y: int):
+        """
+        Resolves the opponent's shot at the given point
+        :param x: int (1-size) - X coordinate of the shot
+        :param y: int (1-size) - Y coordinate of the shot
+        :return: str - MISS, HIT, DESTROYED or REPEATED
+        """
+        if not self.__rules.is_on_map(x, y) or self.__shots[x][y]:
+            return REPEATED
+        self.__shots[x][y] = True
+        self.__shot_amount += 1
+
+        point = self.__map[x][y]
+        if point == 0 or point == '.':
+            return MISS
+
+        ship = self.__ships[point]
+        ship.hit(x, y)
+        self.__health[point] -= 1
+        self.__total_health -= 1
+        self.__status = None
+        if self.__health[point]:
+            return HIT
+
+        self.__shoot_around(ship)
+        self.remove_ship(point)
+        return DESTROYED
+
+    def receive_salvo(self, points: list):
+        """
+        Resolves the shots of a salvo one after another, as receive_shot does, in one call
+        :param points: list - (x, y) of every shot
+        :return: list - MISS, HIT, DESTROYED or REPEATED of every shot
+        """
+        size = self.__rules.size
+        shots = self.__shots
+        mp = self.__map
+        ships = self.__ships
+        health = self.__health
+        results = []
+        append = results.append
+        for x, y in points:
+            if not (1 <= x <= size and 1 <= y <= size) or shots[x][y]:
+                append(REPEATED)
+                continue
+            shots[x][y] = True
+            self.__shot_amount += 1
+
+            point = mp[x][y]
+            if point == 0 or point == '.':
+                append(MISS)
+                continue
+
+            ship = ships[point]
+            ship.hit(x, y)
+            health[point] -= 1
+            self.__total_health -= 1
+            self.__status = None
+            if health[point]:
+                append(HIT)
+                continue
+
+            self.__shoot_around(ship)
+            self.remove_ship(point)
+            append(DESTROYED)
+        return results
+
+    def __shoot_around(self, ship: Ship):
+        """
+        Marks the points around a destroyed ship as shot, they cannot contain a ship.
+        The ship is a line, so they are the rectangle around it
+        :param ship: Ship - the destroyed ship
+        :return: None
+        """
+        size = self.__rules.size
+        last = ship.get_type() - 1
+        left, top = ship.get_x_at(0) - 1, ship.get_y_at(0) - 1
+        right, bottom = ship.get_x_at(last) + 1, ship.get_y_at(last) + 1
+        full = [True] * (bottom - top + 1)
+        for x in range(left, right + 1):
+            row = self.__shots[x]
+            if 1 <= x <= size:
+                self.__shot_amount += row[max(top, 1):min(bottom, size) + 1].count(False)
+            row[top:bottom + 1] = full
+
+    def get_alive_amount(self):
+        """
+        :return: int - ships that are placed and not destroyed
+        """
+        return self.__alive
+
+    def fleet_status(self):
+        """
+        :return: FleetStatus - ships placed, ships alive by type and points left, the same object until a change
+        """
+        if self.__status is None:
+            self.__status = FleetStatus(self.__placed, self.__alive, (0,) + tuple(self.__shipsAmount[1:]),
+                                        self.__total_health)
+        return self.__status
+
+    def add_sink_listener(self, listener):
+        """
+        :param listener: function(ship_id: int, ship: Ship) - called after a ship is destroyed (or removed)
+        :return: None
+        """
+        self.__sink_listeners.append(listener)
+
+    def remove_sink_listener(self, listener):
+        """
+        :return: None
+        """
+        self.__sink_listeners.remove(listener)
+
     def get_non_placed_amount(self, tp: int):
         """
         :param tp: int - type of the ship
         :return: int - amount of the given type
         """
-        return 5 - tp - self.__shipsAmount[tp]
+        return self.__rules.get_amount(tp) - self.__shipsAmount[tp]
 
     def is_some_ships_placed(self):
         """
         :return: True if at list one ship is placed else False
         """
-        for i in range(1, 11):
-            if self.__ships[i] is not None:
-                return True
-        return False
+        return self.__alive > 0
 
     def is_completed(self):
         """
         :return: True if player's all ships put on the map, False otherwise
         """
-        for i in range(1, 11):
-            if self.__ships[i] is None:
-                return False
-        return True
+        return self.__alive == self.__rules.ships
 
     def show_map(self):
         """
-        Prints the player's map X = [1, 10], Y = [1, 10]
+        Prints the player's map X = [1, size], Y = [1, size]
         :return: None
         """
-        for i in range(1, 11):
-            for j in range(1, 11):
+        for i in range(1, self.__rules.size + 1):
+            for j in range(1, self.__rules.size + 1):
                 print(self.__map[i][j], end=" ")
             print()
 
     def remove_ship(self, index: int):
         """
-        Removes the ship at the given point
+        Removes the ship of the given id when it is destroyed, then tells the sink listeners
         :param index: int - index of the ship
         :return: None
         """
+        ship = self.__ships[index]
         self.__ships[index] = None
-        if index == 1:
-            tp = 4
-        elif index in (2, 3):
-            tp = 3
-        elif index in (4, 5, 6):
-            tp = 2
-        else:
-            tp = 1
-        self.__shipsAmount[tp] -= 1
+        self.__shipsAmount[self.__rules.get_type(index)] -= 1
+        self.__alive -= 1
+        self.__total_health -= self.__health[index]
+        self.__health[index] = 0
+        self.__status = None
+        for listener in self.__sink_listeners:
+            listener(index, ship)
 
     def add_ship(self, ship: Ship):
         """
@@ -248,23 +414,102 @@ class Player(object):
         :return: True if the given ship placed successfully, False otherwise
         """
         tp = ship.get_type()
-        amount = self.__shipsAmount[tp]
+        amount = self.__shipsAmount[tp] if tp <= self.__rules.max_type else 0
 
-        if amount >= 5 - tp:
+        if amount >= self.__rules.get_amount(tp):
             raise ShipException("All " + str(tp) + "type ships have already placed", res.MyExceptions.MAP_ERROR)
 
         # Check adding possibilities
-        if amount < 5 - tp and ship.is_possible_put_onto_map(self.__map):
-            ship_id = amount + sum([i for i in range(5 - tp)]) + 1
+        if ship.is_possible_put_onto_map(self.__map):
+            ship_id = amount + self.__rules.get_first_id(tp)
             self.__ships[ship_id] = ship
+            self.__placed_ships[ship_id] = ship
             self.__shipsAmount[tp] += 1
+            self.__placed += 1
+            self.__alive += 1
+            self.__health[ship_id] = tp
+            self.__total_health += tp
+            self.__status = None
             ship.mark_on_map(self.__map, ship_id)
             return True
 
         return False
 
+    def get_maps(self):
+        """
+        :return: tuple - (map, shot points) of the player, the lists themselves that must not be modified
+        """
+        return self.__map, self.__shots
+
+    def restore(self, fleet: list, mp: list, shots: list):
+        """
+        Puts back a saved player (savegame.py) without placing its ships and shooting them again,
+        the player must be new
+        :param fleet: list - [type, orientation, x, y] of every ship by id, as get_fleet(destroyed=True)
+        :param mp: list - the map, as get_maps(), None to mark the ships on the empty map of the player
+        :param shots: list - the shot points, as get_maps()
+        :return: None
+        """
+        rules = self.__rules
+        if mp is not None:
+            self.__map = mp
+        self.__shots = shots
+        self.__shot_amount = sum(row[1:rules.size + 1].count(True) for row in shots[1:rules.size + 1])
+        for ship_id, (tp, orientation, x, y) in enumerate(fleet, 1):
+            ship = Ship(tp, orientation, x, y, rules)
+            if mp is None:
+                ship.mark_on_map(self.__map, ship_id)
+            dx, dy = (1, 0) if orientation == HORIZONTAL else (0, 1)
+            health = tp
+            for i in range(tp):
+                if shots[x + dx * i][y + dy * i]:
+                    ship.hit(x + dx * i, y + dy * i)
+                    health -= 1
+            self.__placed_ships[ship_id] = ship
+            self.__placed += 1
+            if health:
+                self.__ships[ship_id] = ship
+                self.__shipsAmount[tp] += 1
+                self.__alive += 1
+                self.__health[ship_id] = health
+                self.__total_health += health
+        self.__status = None
+
     def get_ship(self, index: int):
         """
         :return: list of Ships - ships of this player
         """
         return self.__ships[index]
+
+    def get_fleet(self, destroyed: bool = False):
+        """
+        :param destroyed: bool - the destroyed ships too, in the order of their ids
+        :return: list - [type, orientation, x, y] of every ship that is not destroyed
+        """
+        ships = self.__placed_ships if destroyed else self.__ships
+        fleet = []
+        for i in range(1, self.__rules.ships + 1):
+            ship = ships[i]
+            if ship is not None:
+                if ship.get_type() == 1 or ship.get_y_at(0) == ship.get_y_at(1):
+                    orientation = HORIZONTAL
+                else:
+                    orientation = VERTICAL
+                fleet.append([ship.get_type(), orientation, ship.get_x_at(0), ship.get_y_at(0)])
+        return fleet
+
+    def get_ship_points(self, x: int, y: int):
+        """
+        Works for destroyed ships too, they stay on the map
+        :param x: int - X coordinate of a point of the ship
+        :param y: int - Y coordinate of a point of the ship
+        :return: list - [x, y] of every point of the ship, sorted
+        """
+        point = self.__map[x][y]
+        points = [[x, y]]
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx, ny = x + dx, y + dy
+            while self.__map[nx][ny] == point:
+                points.append([nx, ny])
+                nx, ny = nx + dx, ny + dy
+        return sorted(points)
@@ -0,0 +1,363 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+import res
+import objects
+from objects import Ship, FleetStatus, MISS, HIT, DESTROYED, REPEATED
+from exceptions import ShipException
+from rules import Rules
+
+AROUND = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
+
+class ChunkedBitset(object):
+    """
+    Points of a board as bits of square chunks (res.OCEAN_CHUNK points per side), a chunk is allocated
+    when its first point is set, so an untouched part of the board costs nothing
+    """
+
+    def __init__(self, chunk: int = res.OCEAN_CHUNK):
+        """
+        :param chunk: int - points per side of a chunk
+        """
+        self.__chunk = chunk
+        self.__chunks = {}  # (chunk x, chunk y) -> int, bit (x % chunk) * chunk + y % chunk
+
+    def get(self, x: int, y: int):
+        """
+        :return: True if the point is set
+        """
+        chunk = self.__chunk
+        return bool(self.__chunks.get((x // chunk, y // chunk), 0) >> (x % chunk * chunk + y % chunk) & 1)
+
+    def set(self, x: int, y: int):
+        """
+        :return: True if the point has not been set before
+        """
+        chunk = self.__chunk
+        key = x // chunk, y // chunk
+        bits = self.__chunks.get(key, 0)
+        bit = 1 << (x % chunk * chunk + y % chunk)
+        if bits & bit:
+            return False
+        self.__chunks[key] = bits | bit
+        return True
+
+    def get_chunks(self):
+        """
+        :return: int - amount of allocated chunks
+        """
+        return len(self.__chunks)
+
+
+class OceanPlayer(object):
+    """
+    A player for very large boards: the map is not stored, the ships are kept by their points
+    in a hash (point -> ship id) and the shot points in a ChunkedBitset. Placement checks, shots
+    and the points around destroyed ships cost O(ship length) whatever the size of the board.
+    The methods are the ones of objects.Player.
+    """
+
+    def __init__(self, rules: Rules):
+        """
+        :param rules: Rules - size of the board and the fleet
+        """
+        self.__rules = rules
+        self.__amounts = [None] + [0] * rules.max_type  # Ships placed (and not destroyed) of every type
+        self.__ships = {}  # ship id -> Ship
+        self.__points = {}  # (x, y) -> ship id, destroyed ships stay
+        self.__shots = ChunkedBitset()
+        self.__placed = 0
+        self.__alive = 0
+        self.__health = {}  # ship id -> points that have not been hit
+        self.__total_health = 0
+        self.__status = None
+        self.__sink_listeners = []
+
+    def get_rules(self):
+        """
+        :return: Rules - size of the board and the fleet
+        """
+        return self.__rules
+
+    def get_point_on_map(self, x: int, y: int):
+        """
+        :return: the same as Player.get_point_on_map: ship id, '.' next to a ship or 0
+        """
+        ship_id = self.__points.get((x, y))
+        if ship_id is not None:
+            return ship_id
+        for dx, dy in AROUND:
+            if (x + dx, y + dy) in self.__points:
+                return '.'
+        return 0
+
+    def is_shot(self, x: int, y: int):
+        """
+        :return: True if the point has been shot, False otherwise
+        """
+        return self.__shots.get(x, y)
+
+    def receive_shot(self, x: int, y: int):
+        """
+        Resolves the opponent's shot at the given point
+        :param x: int (1-size) - X coordinate of the shot
+        :param y: int (1-size) - Y coordinate of the shot
+        :return: str - MISS, HIT, DESTROYED or REPEATED
+        """
+        if not self.__rules.is_on_map(x, y) or not self.__shots.set(x, y):
+            return REPEATED
+
+        point = self.__points.get((x, y))
+        if point is None:
+            return MISS
+
+        ship = self.__ships[point]
+        ship.hit(x, y)
+        self.__health[point] -= 1
+        self.__total_health -= 1
+        self.__status = None
+        if self.__health[point]:
+            return HIT
+
+        # Points around the destroyed ship cannot contain a ship
+        for i in range(ship.get_type()):
+            for dx, dy in AROUND:
+                nx, ny = ship.get_x_at(i) + dx, ship.get_y_at(i) + dy
+                if self.__rules.is_on_map(nx, ny):
+                    self.__shots.set(nx, ny)
+        self.remove_ship(point)
+        return DESTROYED
+
+    def receive_salvo(self, points: list):
+        """
+        :param points: list - (x, y) of every shot
+        :return: list - MISS, HIT, DESTROYED or REPEATED of every shot
+        """
+        return [self.receive_shot(x, y) for x, y in points]
+
+    def get_alive_amount(self):
+        """
+        :return: int - ships that are placed and not destroyed
+        """
+        return self.__alive
+
+    def fleet_status(self):
+        """
+        :return: FleetStatus - as Player.fleet_status
+        """
+        if self.__status is None:
+            self.__status = FleetStatus(self.__placed, self.__alive, (0,) + tuple(self.__amounts[1:]),
+                                        self.__total_health)
+        return self.__status
+
+    def add_sink_listener(self, listener):
+        """
+        :param listener: function(ship_id: int, ship: Ship) - called after a ship is destroyed (or removed)
+        :return: None
+        """
+        self.__sink_listeners.append(listener)
+
+    def remove_sink_listener(self, listener):
+        """
+        :return: None
+        """
+        self.__sink_listeners.remove(listener)
+
+    def get_non_placed_amount(self, tp: int):
+        """
+        :param tp: int - type of the ship
+        :return: int - amount of the given type
+        """
+        return self.__rules.get_amount(tp) - self.__amounts[tp]
+
+    def is_some_ships_placed(self):
+        """
+        :return: True if at list one ship is placed else False
+        """
+        return self.__alive > 0
+
+    def is_completed(self):
+        """
+        :return: True if player's all ships put on the map, False otherwise
+        """
+        return self.__alive == self.__rules.ships
+
+    def remove_ship(self, index: int):
+        """
+        Removes the ship of the given id, its points stay on the map
+        :param index: int - index of the ship
+        :return: None
+        """
+        ship = self.__ships[index]
+        self.__ships[index] = None
+        self.__amounts[self.__rules.get_type(index)] -= 1
+        self.__alive -= 1
+        self.__total_health -= self.__health[index]
+        self.__health[index] = 0
+        self.__status = None
+        for listener in self.__sink_listeners:
+            listener(index, ship)
+
+    def add_ship(self, ship: Ship):
+        """
+        A ship may not touch another one, even by a corner (Ship.mark_on_map)
+        :param ship: Ship - a ship which have to be added
+        :return: True if the given ship placed successfully, False otherwise
+        """
+        tp = ship.get_type()
+        amount = self.__amounts[tp] if tp <= self.__rules.max_type else 0
+        if amount >= self.__rules.get_amount(tp):
+            raise ShipException("All " + str(tp) + "type ships have already placed", res.MyExceptions.MAP_ERROR)
+
+        points = [(ship.get_x_at(i), ship.get_y_at(i)) for i in range(tp)]
+        for x, y in points:
+            for dx, dy in AROUND:
+                if (x + dx, y + dy) in self.__points:
+                    return False
+
+        ship_id = amount + self.__rules.get_first_id(tp)
+        self.__ships[ship_id] = ship
+        for point in points:
+            self.__points[point] = ship_id
+        self.__amounts[tp] += 1
+        self.__placed += 1
+        self.__alive += 1
+        self.__health[ship_id] = tp
+        self.__total_health += tp
+        self.__status = None
+        return True
+
+    def get_ship(self, index: int):
+        """
+        :return: Ship - the ship of the id, None if it is not placed or destroyed
+        """
+        return self.__ships.get(index)
+
+    def get_fleet(self):
+        """
+        :return: list - [type, orientation, x, y] of every ship that is not destroyed
+        """
+        fleet = []
+        for ship_id in sorted(self.__ships):
+            ship = self.__ships[ship_id]
+            if ship is not None:
+                if ship.get_type() == 1 or ship.get_y_at(0) == ship.get_y_at(1):
+                    orientation = objects.HORIZONTAL
+                else:
+                    orientation = objects.VERTICAL
+                fleet.append([ship.get_type(), orientation, ship.get_x_at(0), ship.get_y_at(0)])
+        return fleet
+
+    def get_ship_points(self, x: int, y: int):
+        """
+        Works for destroyed ships too, they stay on the map
+        :return: list - [x, y] of every point of the ship, sorted
+        """
+        point = self.__points.get((x, y))
+        points = [[x, y]]
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx, ny = x + dx, y + dy
+            while self.__points.get((nx, ny)) == point:
+                points.append([nx, ny])
+                nx, ny = nx + dx, ny + dy
+        return sorted(points)
+
+    def get_shot_chunks(self):
+        """
+        :return: int - chunks of the shot bitset that have been allocated
+        """
+        return self.__shots.get_chunks()
+
+
+def get_random_ocean(rules: Rules, rng: random.Random = random):
+    """
+    Places the fleet at random points, as brain.get_random_player does on a Player
+    :return: OceanPlayer
+    """
+    player = OceanPlayer(rules)
+    size = rules.size
+    for tp in rules.fleet:
+        while True:
+            orientation = rng.randint(1, 2)
+            if orientation == objects.HORIZONTAL:
+                x, y = rng.randint(1, size + 1 - tp), rng.randint(1, size)
+            else:
+                x, y = rng.randint(1, size), rng.randint(1, size + 1 - tp)
+            if player.add_ship(Ship(tp, orientation, x, y, rules)):
+                break
+    return player
+
+
+def measure_memory(create):
+    """
+    :param create: function - creates the measured object
+    :return: tuple - (the object, bytes allocated while it was created)
+    """
+    tracemalloc.start()
+    try:
+        created = create()
+        return created, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def bench(sizes: list, copies: int, shots: int, dense: int):
+    """
+    :param sizes: list - widths of the boards
+    :param copies: int - res.LIST_OF_SHIPS this many times is the fleet
+    :param shots: int - random shots per board
+    :param dense: int - objects.Player is measured too up to this width
+    :return: None
+    """
+    rng = random.Random(1)
+    for size in sizes:
+        rules = Rules(size, res.LIST_OF_SHIPS * copies)
+        player, memory = measure_memory(lambda: get_random_ocean(rules, rng))
+        points = [(rng.randint(1, size), rng.randint(1, size)) for _ in range(shots)]
+
+        def shoot():
+            for x, y in points:
+                player.receive_shot(x, y)
+
+        shot = measure_memory(shoot)[1]
+
+        player = get_random_ocean(rules, rng)
+        # Random shots, nearly all of them miss on a board this large
+        points = [(rng.randint(1, size), rng.randint(1, size)) for _ in range(shots)]
+        begin = time.perf_counter()
+        for x, y in points:
+            player.receive_shot(x, y)
+        random_rate = shots / (time.perf_counter() - begin)
+
+        # Every point of every ship, so that hits, sinkings and the points around them are resolved
+        points = [(ship[2] + i * (ship[1] == objects.HORIZONTAL), ship[3] + i * (ship[1] == objects.VERTICAL))
+                  for ship in player.get_fleet() for i in range(ship[0])]
+        begin = time.perf_counter()
+        for x, y in points:
+            player.receive_shot(x, y)
+        fleet_rate = len(points) / max(time.perf_counter() - begin, 1e-9)
+
+        line = "%s: ocean %.0f KB per player, %.0f KB more after %d random shots (%d chunks); " \
+               "%.0f random shots/s, %.0f fleet shots/s" % (rules, memory / 1024, shot / 1024, shots,
+                                                           player.get_shot_chunks(), random_rate, fleet_rate)
+        if size <= dense:
+            memory = measure_memory(lambda: objects.Player(rules))[1]
+            line += "; objects.Player %.0f KB empty" % (memory / 1024)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sparse boards for very large maps")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--copies", type=int, default=50, help="standard fleets in the fleet")
+    parser.add_argument("--shots", type=int, default=200000)
+    parser.add_argument("--dense", type=int, default=1000, help="measures objects.Player up to this width")
+    args = parser.parse_args()
+    bench(args.sizes, args.copies, args.shots, args.dense)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import time
+
+from res import Strings as String
+import res
+import objects
+import brain
+from snapshot import CELLS, Fleet, Snapshot, get_around
+
+MESSAGES = {objects.MISS: String.GameFrame.BOT_SHOOT, objects.REPEATED: String.GameFrame.BOT_SHOOT,
+            objects.HIT: String.GameFrame.BOT_HIT, objects.DESTROYED: String.GameFrame.BOT_DESTROYED}
+
+_registry = None  # registry.py, imported by the workers
+
+
+def get_key(fleet: list):
+    """
+    Ships of the same type can be swapped, so they are sorted
+    :param fleet: list - [type, orientation, x, y] of every ship
+    :return: tuple - the same for every order of the ships
+    """
+    return tuple(sorted(tuple(ship) for ship in fleet))
+
+
+def play(task: tuple):
+    """
+    Headless games of a bot against a fixed fleet, the bot is not shot at
+    :param task: tuple - (fleet, name of the bot in the registry, amount of games)
+    :return: tuple - (fleet key, shots of all games)
+    """
+    global _registry
+    fleet, name, games = task
+    if _registry is None:
+        import registry as _registry
+    first = Snapshot(Fleet.from_list(fleet))
+    shots = 0
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # Bots print every shot
+        for _ in range(games):
+            state = first
+            bot = _registry.create_bot(name)
+            message = String.GameFrame.BOT_SHOOT
+            moves = 0
+            while not state.is_over() and moves < res.PLACEMENT_MAX_SHOTS:
+                state, result = state.shoot(*bot.say(message))
+                message = MESSAGES[result]
+                moves += 1
+            shots += moves
+    return get_key(fleet), shots
+
+
+def mutate(fleet: list, rng: random.Random):
+    """
+    Moves one or two ships to random places where they do not touch the others
+    :param fleet: list - [type, orientation, x, y] of every ship in the order of res.LIST_OF_SHIPS
+    :return: list - a new fleet
+    """
+    masks = list(Fleet.from_list(fleet).masks[1:])
+    for index in rng.sample(range(len(masks)), rng.randint(1, 2)):
+        blocked = 0
+        for other, mask in enumerate(masks):
+            if other != index:
+                blocked |= get_around(mask)
+        tp = res.LIST_OF_SHIPS[index]
+        places = []
+        for cell in range(CELLS):
+            x, y = cell // res.BOARD_SIZE + 1, cell % res.BOARD_SIZE + 1
+            for orientation in (objects.HORIZONTAL, objects.VERTICAL) if tp > 1 else (objects.HORIZONTAL,):
+                if orientation == objects.HORIZONTAL and x + tp > res.BOARD_SIZE + 1 or \
+                        orientation == objects.VERTICAL and y + tp > res.BOARD_SIZE + 1:
+                    continue
+                mask = Fleet.from_list([[tp, orientation, x, y]]).masks[1]
+                if not mask & blocked:
+                    places.append(mask)
+        masks[index] = rng.choice(places)
+    return Fleet([0] + masks).to_list()
+
+
+class PlacementOptimizer(object):
+    """
+    Evolves fleets that the shooters need many shots to destroy. A fleet is worth the mean amount of shots
+    over headless games of every shooter; the games are played by a process pool on all cores
+    and the worth of every fleet is kept by its key, so a fleet is never played twice.
+    """
+
+    def __init__(self, shooters: tuple, games: int, workers: int = None):
+        """
+        :param shooters: tuple - names of the bots of the registry that shoot at the fleets
+        :param games: int - games of every shooter per fleet
+        :param workers: int - processes of the pool, None for every core
+        """
+        self.__shooters = shooters
+        self.__games = games
+        self.__workers = workers or os.cpu_count()
+        self.__pool = multiprocessing.Pool(self.__workers)
+        self.__fitness = {}  # fleet key -> mean shots
+        self.__fleets = {}  # fleet key -> fleet
+        self.played = 0
+
+    def close(self):
+        """
+        :return: None
+        """
+        self.__pool.terminate()
+
+    def evaluate(self, fleets: list):
+        """
+        Plays the fleets that have not been played yet
+        :param fleets: list - fleets
+        :return: list - mean shots of every fleet
+        """
+        tasks = []
+        for fleet in fleets:
+            key = get_key(fleet)
+            if key not in self.__fitness and key not in self.__fleets:
+                self.__fleets[key] = fleet
+                # Every shooter's games are split so that every core gets work even for a few fleets
+                parts = max(1, min(self.__games, self.__workers * 4 // max(len(fleets), 1)))
+                for name in self.__shooters:
+                    for part in range(parts):
+                        tasks.append((fleet, name, self.__games // parts + (part < self.__games % parts)))
+
+        shots = {}
+        for key, amount in self.__pool.imap_unordered(play, tasks):
+            shots[key] = shots.get(key, 0) + amount
+        for key, amount in shots.items():
+            self.__fitness[key] = amount / (self.__games * len(self.__shooters))
+        self.played += self.__games * len(self.__shooters) * len(shots)
+        return [self.__fitness[get_key(fleet)] for fleet in fleets]
+
+    def run(self, population: int, generations: int, seed: int = None):
+        """
+        Keeps the better half of every generation and fills the other half with mutants of tournament winners
+        :param population: int - fleets per generation
+        :param generations: int - amount of generations
+        :return: None
+        """
+        rng = random.Random(seed)
+        fleets = [brain.get_random_player().get_fleet() for _ in range(population)]
+        for generation in range(generations):
+            begin = time.perf_counter()
+            fitness = self.evaluate(fleets)
+            ranked = [fleet for _, fleet in sorted(zip(fitness, fleets), key=lambda pair: -pair[0])]
+            best = max(fitness)
+            print("generation %d: best %.2f, mean %.2f shots; %.0f games/s" % (
+                generation, best, sum(fitness) / len(fitness), self.played / max(time.perf_counter() - begin, 1e-9)))
+            self.played = 0
+
+            survivors = ranked[:population // 2]
+            children = []
+            while len(survivors) + len(children) < population:
+                parent = min(rng.sample(range(len(survivors)), min(3, len(survivors))))
+                children.append(mutate(survivors[parent], rng))
+            fleets = survivors + children
+
+    def get_library(self, size: int):
+        """
+        :param size: int - amount of fleets
+        :return: list - the hardest fleets found, hardest first, with their mean shots
+        """
+        keys = sorted(self.__fitness, key=lambda key: -self.__fitness[key])[:size]
+        return [{"ships": self.__fleets[key], "shots": round(self.__fitness[key], 2)} for key in keys]
+
+
+def save_library(path: str, library: list, shooters: tuple, games: int):
+    """
+    :return: None
+    """
+    with open(path, "w") as file:
+        json.dump({"shooters": list(shooters), "games": games, "fleets": library}, file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evolves fleets that are hard to destroy for the bots")
+    parser.add_argument("--shooters", nargs="*", default=list(res.PLACEMENT_SHOOTERS))
+    parser.add_argument("--games", type=int, default=20, help="games of every shooter per fleet")
+    parser.add_argument("--population", type=int, default=32)
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--workers", type=int, help="every core by default")
+    parser.add_argument("--size", type=int, default=100, help="fleets in the library")
+    parser.add_argument("--library", default=res.Strings.FLEET_LIBRARY)
+    args = parser.parse_args()
+
+    optimizer = PlacementOptimizer(tuple(args.shooters), args.games, args.workers)
+    try:
+        optimizer.run(args.population, args.generations)
+        library = optimizer.get_library(args.size)
+    finally:
+        optimizer.close()
+    save_library(args.library, library, args.shooters, args.games)
+    print("%d fleets saved to %s, the hardest needs %.2f shots" % (len(library), args.library, library[0]["shots"]))
+
+
+if __name__ == "__main__":
+    main()
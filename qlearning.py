@@ -0,0 +1,275 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+import res
+import objects
+import brain
+
+
+def get_classes(size: int, symmetric: bool = True):
+    """
+    Points of a square board that one of its 8 rotations and reflections turns into each other are a class,
+    a ship is as likely to be at any of them
+    :param size: int - side of the board
+    :param symmetric: bool - False makes every point a class of its own
+    :return: (np.ndarray, int) - (size + 2, size + 2) class of each point of the padded map, the amount of classes;
+    the border is the class after the last one
+    """
+    classes = np.empty((size + 2, size + 2), np.intp)
+    ids = {}
+    for x in range(size + 2):
+        for y in range(size + 2):
+            if not (1 <= x <= size and 1 <= y <= size):
+                continue
+            if symmetric:
+                i, j = min(x - 1, size - x), min(y - 1, size - y)
+                key = (min(i, j), max(i, j))
+            else:
+                key = (x, y)
+            classes[x][y] = ids.setdefault(key, len(ids))
+    amount = len(ids)
+    classes[0, :] = classes[-1, :] = classes[:, 0] = classes[:, -1] = amount
+    return classes, amount
+
+
+class QTable(object):
+    """
+    Expected reward of a shot at each point, kept per symmetry class, so a shot teaches all the equivalent points
+    """
+
+    def __init__(self, size: int, rate: float = res.Q_LEARNING_RATE, symmetric: bool = True):
+        self.size = size
+        self.rate = rate
+        self.classes, self.amount = get_classes(size, symmetric)
+        self.values = np.zeros(self.amount + 1)  # The border class is never learned and stays 0
+        self.__grid = np.zeros((size + 2, size + 2))
+        self.__current = np.empty(res.Q_REPLAY_BATCH)
+
+    def get_action(self, x: int, y: int):
+        """
+        :return: int - class of the point, the action stored in the replay buffer
+        """
+        return int(self.classes[x][y])
+
+    def get(self, x: int, y: int):
+        """
+        :return: float - expected reward of a shot at the point
+        """
+        return float(self.values[self.classes[x][y]])
+
+    def get_grid(self):
+        """
+        :return: np.ndarray - (size + 2, size + 2) expected rewards of the padded map, the same array every time;
+        the board is symmetric, so [x][y] and [y][x] are equal
+        """
+        np.take(self.values, self.classes, out=self.__grid)
+        return self.__grid
+
+    def learn(self, action: int, reward: float):
+        """
+        Moves the estimate of the class towards the reward
+        :param action: int - class of the point, from get_action
+        :param reward: float
+        :return: None
+        """
+        self.values[action] += self.rate * (reward - self.values[action])
+
+    def learn_batch(self, actions: np.ndarray, rewards: np.ndarray):
+        """
+        learn for a minibatch, without new arrays while the batch is not larger than res.Q_REPLAY_BATCH
+        :param actions: np.ndarray - classes of the points
+        :param rewards: np.ndarray - float rewards
+        :return: None
+        """
+        if len(actions) > len(self.__current):
+            self.__current = np.empty(len(actions))
+        current = self.__current[:len(actions)]
+        np.take(self.values, actions, out=current)
+        np.subtract(rewards, current, out=current)
+        current *= self.rate
+        np.add.at(self.values, actions, current)
+        self.values[self.amount] = 0
+
+    def clear(self):
+        self.values.fill(0)
+
+    def get_rows(self):
+        """
+        :return: list - lists of the expected rewards of the padded map, for the reinforcement data file
+        """
+        return self.get_grid().tolist()
+
+    def set_rows(self, rows: list):
+        """
+        Takes a padded map of rewards, the class gets the mean of its points. Old files summed rewards of a point
+        :param rows: list - lists of (size + 2) numbers
+        :return: None
+        """
+        grid = np.asarray(rows, float)
+        if grid.shape != self.classes.shape:
+            raise ValueError("A map of %d points per side is expected" % (self.size + 2))
+        sums = np.bincount(self.classes.ravel(), grid.ravel(), self.amount + 1)
+        cells = np.bincount(self.classes.ravel(), minlength=self.amount + 1)
+        self.values[:] = sums / cells
+        self.values[self.amount] = 0
+
+    def get_memory(self):
+        """
+        :return: int - bytes of the learned values
+        """
+        return self.values.nbytes
+
+
+class ReplayBuffer(object):
+    """
+    Fixed ring of (state, action, reward) transitions. Pushing and sampling write into arrays made once,
+    the oldest transitions are overwritten
+    """
+
+    def __init__(self, capacity: int = res.Q_REPLAY_CAPACITY, batch: int = res.Q_REPLAY_BATCH, seed: int = None):
+        self.capacity = capacity
+        self.batch = batch
+        self.states = np.zeros(capacity, np.int32)
+        self.actions = np.zeros(capacity, np.intp)
+        self.rewards = np.zeros(capacity)
+        self.__position = 0
+        self.__size = 0
+        self.__random = np.random.default_rng(seed)
+        self.__uniform = np.empty(batch)
+        self.__indices = np.empty(batch, np.intp)
+        self.__batch = (np.empty(batch, np.int32), np.empty(batch, np.intp), np.empty(batch))
+
+    def __len__(self):
+        return self.__size
+
+    def push(self, state: int, action: int, reward: float):
+        """
+        :param state: int - what the learner knew before the shot
+        :param action: int - class of the shot point
+        :param reward: float
+        :return: None
+        """
+        position = self.__position
+        self.states[position] = state
+        self.actions[position] = action
+        self.rewards[position] = reward
+        self.__position = (position + 1) % self.capacity
+        if self.__size < self.capacity:
+            self.__size += 1
+
+    def sample(self):
+        """
+        Draws transitions uniformly, with repeats
+        :return: (np.ndarray, np.ndarray, np.ndarray) - states, actions and rewards of the minibatch,
+        the same arrays every time, they are valid until the next call; None if the buffer is empty
+        """
+        if not self.__size:
+            return None
+        self.__random.random(out=self.__uniform)
+        self.__uniform *= self.__size
+        np.copyto(self.__indices, self.__uniform, casting="unsafe")  # floor, all of them are positive
+        states, actions, rewards = self.__batch
+        np.take(self.states, self.__indices, out=states)
+        np.take(self.actions, self.__indices, out=actions)
+        np.take(self.rewards, self.__indices, out=rewards)
+        return self.__batch
+
+    def clear(self):
+        self.__position = self.__size = 0
+
+
+class QLearner(object):
+    """
+    Learns each shot at once and replays a minibatch of the past ones after every res.Q_REPLAY_PERIOD shots
+    """
+
+    def __init__(self, size: int, buffer: ReplayBuffer = None, symmetric: bool = True):
+        self.table = QTable(size, symmetric=symmetric)
+        self.buffer = buffer if buffer is not None else ReplayBuffer()
+        self.__pending = 0
+        self.replays = 0
+
+    def remember(self, state: int, x: int, y: int, reward: float):
+        """
+        :param state: int - what the learner knew before the shot, the number of the move
+        :param x: int - shot point
+        :param y: int
+        :param reward: float
+        :return: None
+        """
+        action = self.table.get_action(x, y)
+        self.table.learn(action, reward)
+        self.buffer.push(state, action, reward)
+        self.__pending += 1
+        if self.__pending >= res.Q_REPLAY_PERIOD:
+            self.__pending = 0
+            self.replay()
+
+    def replay(self):
+        batch = self.buffer.sample()
+        if batch is not None:
+            _, actions, rewards = batch
+            self.table.learn_batch(actions, rewards)
+            self.replays += 1
+
+
+def get_rewards(games: int):
+    """
+    :return: np.ndarray - (size + 2, size + 2) mean reward of a shot at each point of the padded standard map
+    """
+    size = res.BOARD_SIZE
+    sums = np.zeros((size + 2, size + 2))
+    for _ in range(games):
+        player = brain.get_random_player()
+        for x in range(1, size + 1):
+            for y in range(1, size + 1):
+                if player.get_point_on_map(x, y) not in (0, '.'):
+                    sums[x][y] += res.Q_HIT_REWARD
+                else:
+                    sums[x][y] += res.Q_MISS_REWARD
+    return sums / games
+
+
+def bench(games: list, shots: int, seed: int):
+    """
+    Learns from random shots at random fleets, with and without the symmetry classes,
+    and prints how far the learned values are from the mean rewards of the points
+    :return: None
+    """
+    rng = random.Random(seed)
+    size = res.BOARD_SIZE
+    target = get_rewards(2000)[1:-1, 1:-1]
+    for symmetric in (False, True):
+        learner = QLearner(size, ReplayBuffer(seed=seed), symmetric)
+        played = 0
+        begin = time.perf_counter()
+        for amount in games:
+            for _ in range(amount - played):
+                player = brain.get_random_player()
+                for move in range(shots):
+                    x, y = rng.randint(1, size), rng.randint(1, size)
+                    result = player.receive_shot(x, y)
+                    reward = res.Q_MISS_REWARD if result in (objects.MISS, objects.REPEATED) else res.Q_HIT_REWARD
+                    learner.remember(move, x, y, reward)
+            played = amount
+            error = np.abs(learner.table.get_grid()[1:-1, 1:-1] - target).mean()
+            print("%s: %d games, mean error %.2f" % ("symmetric" if symmetric else "plain", amount, error))
+        elapsed = time.perf_counter() - begin
+        print("%d values, %d bytes; %.1f us per shot with %d replays" % (
+            learner.table.amount, learner.table.get_memory(), elapsed / (played * shots) * 1e6, learner.replays))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Symmetry-reduced Q-table with experience replay")
+    parser.add_argument("--games", type=int, nargs="*", default=[5, 20, 100])
+    parser.add_argument("--shots", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    bench(args.games, args.shots, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import argparse
+import contextlib
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# The master file: magic, version, active slot, values, merges; then two slots of float64 values.
+# A merge writes the slot that is not active, switches to it and counts itself, so a reader copies
+# the active slot and knows from the count that no merge has overwritten it meanwhile
+MAGIC = b"BSQS"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxxIQ")
+ACTIVE = 5  # offset of the active slot in the header
+MERGES = 12  # offset of the amount of merges
+
+# Every process appends (value, delta) records to a log of its own
+DELTA = np.dtype([("value", "<u4"), ("delta", "<f8")])
+
+MASTER = ".q"
+LOCK = ".lock"
+LOG = ".qlog"
+MERGING = ".merging"
+
+
+@contextlib.contextmanager
+def locked(file, blocking: bool = True):
+    """
+    Holds an exclusive lock of the open file
+    :param file: file - opened for writing
+    :param blocking: bool - False does not wait for the lock
+    :return: bool - True if the lock is held
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+    except OSError:
+        if blocking:
+            raise
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class QStore(object):
+    """
+    Q-values shared by the processes that learn them. A process appends the changes of its values to its own log
+    and whoever gets the lock folds every log into the memory-mapped master; readers take the values without a lock
+    """
+
+    def __init__(self, path: str, amount: int, initial: np.ndarray = None):
+        """
+        :param path: str - the master is path + ".q", the lock and the logs are next to it
+        :param amount: int - values in the store
+        :param initial: np.ndarray - values of a new store, zeros by default
+        """
+        self.path = path
+        self.amount = amount
+        self.__lock = open(path + LOCK, "a+b")
+        with locked(self.__lock):
+            if not os.path.exists(path + MASTER):
+                self.__create(initial)
+        self.__file = open(path + MASTER, "r+b")
+        self.__map = mmap.mmap(self.__file.fileno(), 0)
+        try:
+            magic, version, _, values, _ = HEADER.unpack_from(self.__map)
+        except struct.error:
+            magic, version, values = None, None, None
+        if magic != MAGIC or version != VERSION or values != amount or \
+                len(self.__map) != HEADER.size + 2 * amount * 8:
+            self.close()
+            raise ValueError("%s is not a store of %d values" % (path + MASTER, amount))
+        self.__slots = np.ndarray((2, amount), "<f8", self.__map, HEADER.size)
+        self.__base = np.zeros(amount)  # The values of the master that the process has learned from
+        self.__delta = np.zeros(amount)
+        self.merged = 0  # records folded by this process
+        self.merge_time = 0
+
+    def __create(self, initial: np.ndarray):
+        values = np.zeros(self.amount, "<f8") if initial is None else np.asarray(initial, "<f8")
+        temp = self.path + MASTER + ".tmp"
+        with open(temp, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, 0, self.amount, 0))
+            file.write(values.tobytes() * 2)
+        os.replace(temp, self.path + MASTER)
+
+    def get_log(self):
+        """
+        :return: str - the log of this process
+        """
+        return "%s.%d%s" % (self.path, os.getpid(), LOG)
+
+    def get_merges(self):
+        return HEADER.unpack_from(self.__map)[4]
+
+    def snapshot(self, out: np.ndarray = None):
+        """
+        Copies the values of one merge, never a mix of two; does not wait for the lock
+        :param out: np.ndarray - where to copy
+        :return: np.ndarray - out or a new array
+        """
+        if out is None:
+            out = np.empty(self.amount)
+        while True:
+            merges = struct.unpack_from("<Q", self.__map, MERGES)[0]
+            out[:] = self.__slots[self.__map[ACTIVE]]
+            if struct.unpack_from("<Q", self.__map, MERGES)[0] == merges:
+                return out
+
+    def append(self, deltas: np.ndarray):
+        """
+        Appends the non-zero changes to the log of the process, with one write
+        :param deltas: np.ndarray - a change of every value
+        :return: int - records written
+        """
+        changed = np.flatnonzero(deltas)
+        if not len(changed):
+            return 0
+        records = np.empty(len(changed), DELTA)
+        records["value"] = changed
+        records["delta"] = deltas[changed]
+        path = self.get_log()
+        while True:
+            with open(path, "ab", buffering=0) as file, locked(file):
+                # The merger may have taken the log between open and lock, then it is written again
+                try:
+                    current = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if os.path.samestat(os.fstat(file.fileno()), current):
+                    file.write(records.tobytes())
+                    return len(records)
+
+    def merge(self, blocking: bool = True):
+        """
+        Folds every log into the master
+        :param blocking: bool - False gives up if another process is merging
+        :return: int - records folded, None if the lock was not taken
+        """
+        with locked(self.__lock, blocking) as taken:
+            if not taken:
+                return None
+            begin = time.perf_counter()
+            prefix = os.path.basename(self.path) + "."
+            directory = os.path.dirname(self.path) or "."
+            merges = self.get_merges()
+            logs = []
+            for name in os.listdir(directory):
+                if not name.startswith(prefix):
+                    continue
+                path = os.path.join(directory, name)
+                if name.endswith(LOG):
+                    merging = "%s.%d%s" % (path, merges, MERGING)
+                    try:
+                        os.replace(path, merging)
+                    except FileNotFoundError:
+                        continue
+                    logs.append(merging)
+                elif name.endswith(MERGING):  # Left by a merger that has crashed
+                    logs.append(path)
+            if not logs:
+                return 0
+
+            active = self.__map[ACTIVE]
+            target = self.__slots[1 - active]
+            target[:] = self.__slots[active]
+            records = 0
+            for path in logs:
+                with open(path, "r+b") as file, locked(file):  # Waits for a write that has already begun
+                    data = file.read()
+                data = data[:len(data) // DELTA.itemsize * DELTA.itemsize]  # A process has died while writing
+                deltas = np.frombuffer(data, DELTA)
+                deltas = deltas[deltas["value"] < self.amount]
+                np.add.at(target, deltas["value"].astype(np.intp), deltas["delta"])
+                records += len(deltas)
+            self.__map[ACTIVE] = 1 - active
+            struct.pack_into("<Q", self.__map, MERGES, merges + 1)
+            for path in logs:
+                os.remove(path)
+            self.merged += records
+            self.merge_time += time.perf_counter() - begin
+            return records
+
+    def load(self, values: np.ndarray):
+        """
+        Takes the values of the store as the ones the process learns from
+        :param values: np.ndarray - the values of the process
+        :return: None
+        """
+        self.snapshot(self.__base)
+        values[:] = self.__base
+
+    def sync(self, values: np.ndarray):
+        """
+        Gives what the process has learned since the last sync to the store, merges if nobody else does
+        and takes the values of the store, with what the other processes have learned
+        :param values: np.ndarray - the values of the process, changed in place
+        :return: None
+        """
+        np.subtract(values, self.__base, out=self.__delta)
+        self.append(self.__delta)
+        self.merge(blocking=False)
+        self.load(values)
+
+    def close(self):
+        if getattr(self, "_QStore__slots", None) is not None:
+            del self.__slots
+        if getattr(self, "_QStore__map", None) is not None:
+            self.__map.close()
+            self.__map = None
+        if getattr(self, "_QStore__file", None) is not None:
+            self.__file.close()
+            self.__file = None
+        self.__lock.close()
+
+
+def hammer(path: str, amount: int, pushes: int, seed: int):
+    """
+    A process of the stress test: adds 1 to every value at a time, some of them merging
+    :return: (int, float) - records folded by the process and the time of its merges
+    """
+    rng = random.Random(seed)
+    store = QStore(path, amount)
+    ones = np.ones(amount)
+    for _ in range(pushes):
+        store.append(ones)
+        if rng.random() < 0.2:
+            store.merge(blocking=False)
+    merged, merge_time = store.merged, store.merge_time
+    store.close()
+    return merged, merge_time
+
+
+def check(path: str, amount: int, reads: int):
+    """
+    A reader of the stress test: a snapshot made of the logs of whole pushes has equal values
+    :return: int - snapshots with unequal values
+    """
+    store = QStore(path, amount)
+    values = np.empty(amount)
+    torn = 0
+    for _ in range(reads):
+        store.snapshot(values)
+        torn += values.min() != values.max()
+    store.close()
+    return torn
+
+
+def stress(path: str, processes: int, pushes: int, amount: int, readers: int = 1):
+    """
+    Many processes append and merge at once while others read
+    :return: (int, int, float, float) - final value of every entry (expected processes * pushes), torn snapshots,
+    records folded per second of merging, total time
+    """
+    QStore(path, amount).close()
+    begin = time.perf_counter()
+    with multiprocessing.Pool(processes + readers) as pool:
+        checks = [pool.apply_async(check, (path, amount, pushes * 2)) for _ in range(readers)]
+        results = pool.starmap(hammer, [(path, amount, pushes, seed) for seed in range(processes)])
+        torn = sum(result.get() for result in checks)
+    store = QStore(path, amount)
+    store.merge()
+    values = store.snapshot()
+    store.close()
+    merged = sum(records for records, _ in results) + store.merged
+    merge_time = sum(seconds for _, seconds in results) + store.merge_time
+    assert values.min() == values.max()
+    return values[0], torn, merged / merge_time if merge_time else 0, time.perf_counter() - begin
+
+
+def main():
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Stress test of the shared Q-store")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() * 2)
+    parser.add_argument("--pushes", type=int, default=500)
+    parser.add_argument("--values", type=int, default=16)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        value, torn, rate, elapsed = stress(os.path.join(directory, "q"), args.processes, args.pushes, args.values)
+    print("%d processes x %d pushes: every value %d (expected %d), %d torn snapshots, %.0f records/s merged, %.2f s" % (
+        args.processes, args.pushes, value, args.processes * args.pushes, torn, rate, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+import res
+from rules import Rules, DEFAULT_RULES
+
+# Plugin packages declare bots as entry points "Name = package.module:Class [difficulty heavy standard]"
+ENTRY_POINTS = "battleship.bots"
+DIFFICULTIES = ("easy", "medium", "hard")
+# A module of the plugin directory declares its bots without being imported:
+#   BOTS = {"CornerBot": {"difficulty": "easy"}, "DeepBot": {"class": "Deep", "heavy": True, "standard": True}}
+PLUGIN_BOTS = "BOTS"
+PLUGIN_MODULE = "battleship_plugin_"
+
+
+class BotInfo(object):
+    """
+    A bot that can be chosen. Its module is imported only when the bot is created or warmed up
+    """
+
+    def __init__(self, name: str, module: str, attribute: str = None, difficulty: str = "medium", heavy: bool = False,
+                 standard: bool = False, path: str = None, entry_point=None):
+        """
+        :param name: str - name of the bot in menus and on the command line
+        :param module: str - module of the bot class
+        :param attribute: str - the class in the module, name by default
+        :param difficulty: str - one of DIFFICULTIES
+        :param heavy: bool - its start is slow (NumPy, process pools), it is warmed up in the background
+        :param standard: bool - it plays the standard board only
+        :param path: str - file of a module of the plugin directory
+        :param entry_point: EntryPoint - of a plugin package
+        """
+        if difficulty not in DIFFICULTIES:
+            raise ValueError("Difficulty of %s must be one of %s" % (name, ", ".join(DIFFICULTIES)))
+        self.name = name
+        self.module = module
+        self.attribute = attribute or name
+        self.difficulty = difficulty
+        self.heavy = heavy
+        self.standard = standard
+        self.path = path
+        self.entry_point = entry_point
+
+    def __repr__(self):
+        return "%s (%s)" % (self.name, self.difficulty)
+
+    def supports(self, rules: Rules):
+        """
+        :return: bool - the bot can play with the rules
+        """
+        return not self.standard or rules.is_standard()
+
+    def load(self):
+        """
+        Imports the module of the bot
+        :return: class - the bot class
+        """
+        if self.entry_point is not None:
+            return self.entry_point.load()
+        module = sys.modules.get(self.module)
+        if module is None and self.path is not None:
+            spec = importlib.util.spec_from_file_location(self.module, self.path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[self.module] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                del sys.modules[self.module]
+                raise
+        elif module is None:
+            module = importlib.import_module(self.module)
+        return getattr(module, self.attribute)
+
+    def get_source(self):
+        """
+        :return: str - the file of the module of the bot, None if it has not been imported
+        """
+        if self.path is not None:
+            return self.path
+        module = sys.modules.get(self.module)
+        return getattr(module, "__file__", None)
+
+    def reload(self):
+        """
+        Executes the module of the bot again, the objects of the old classes keep working
+        :return: class - the new bot class
+        """
+        module = sys.modules.get(self.module)
+        if module is None:
+            return self.load()
+        if self.path is not None:  # Not found by the import system, it is loaded from its file again
+            del sys.modules[self.module]
+            try:
+                return self.load()
+            except BaseException:
+                sys.modules[self.module] = module
+                raise
+        return getattr(importlib.reload(module), self.attribute)
+
+
+BUILTIN = (BotInfo("HardBot", "bots", difficulty="hard"),
+           BotInfo("BattleshipBot", "bots", difficulty="hard", heavy=True),
+           BotInfo("Fati", "bots", difficulty="medium"),
+           BotInfo("MediumBot", "bots", difficulty="medium"),
+           BotInfo("EasyBot", "bots", difficulty="easy"),
+           BotInfo("InfoBot", "bots", difficulty="hard", heavy=True, standard=True),
+           BotInfo("DensityBot", "bots", difficulty="hard"))
+
+
+def read_plugin(path: str):
+    """
+    Reads the declaration of the bots of a module without importing it
+    :param path: str - a .py file
+    :return: list - BotInfo of every declared bot
+    """
+    import ast  # Deferred, like the plugins themselves
+
+    with open(path, "rb") as file:
+        tree = ast.parse(file.read(), path)
+    declared = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == PLUGIN_BOTS
+                                                for target in node.targets):
+            declared = ast.literal_eval(node.value)
+    if not isinstance(declared, dict):
+        return []
+    module = PLUGIN_MODULE + os.path.splitext(os.path.basename(path))[0]
+    return [BotInfo(name, module, options.get("class"), options.get("difficulty", "medium"),
+                    bool(options.get("heavy")), bool(options.get("standard")), path)
+            for name, options in declared.items()]
+
+
+def read_entry_points(group: str = ENTRY_POINTS):
+    """
+    :return: list - BotInfo of the bots of the installed plugin packages, nothing is imported
+    """
+    from importlib import metadata
+
+    try:
+        points = metadata.entry_points(group=group)
+    except TypeError:  # Before Python 3.10
+        points = metadata.entry_points().get(group, ())
+    return [read_entry_point(point) for point in points]
+
+
+def read_entry_point(point):
+    """
+    :param point: EntryPoint - "Name = module:Class [difficulty heavy standard]"
+    :return: BotInfo
+    """
+    tags = set(point.extras)
+    difficulty = next((tag for tag in DIFFICULTIES if tag in tags), "medium")
+    module, _, attribute = point.value.partition(":")
+    return BotInfo(point.name, module.strip(), attribute.split("[")[0].strip() or None, difficulty,
+                   "heavy" in tags, "standard" in tags, entry_point=point)
+
+
+class Registry(object):
+    """
+    Bots by name: the built-in ones, then the modules of the plugin directory, then the entry points.
+    A later bot with the name of an earlier one is skipped. The plugins are looked for only when a bot
+    is not built in or all of them are listed, reading the entry points takes ~0.1 s
+    """
+
+    def __init__(self, plugins: str = None, entry_points: bool = True):
+        """
+        :param plugins: str - directory of plugin modules, None for none
+        :param entry_points: bool - also looks for installed plugin packages
+        """
+        self.__plugins = plugins
+        self.__entry_points = entry_points
+        self.__discovered = False
+        self.__bots = {}
+        self.__classes = {}
+        self.__warm_ups = {}  # name -> Thread
+        self.__lock = threading.Lock()
+        for info in BUILTIN:
+            self.add(info)
+
+    def discover(self):
+        """
+        Reads the plugin directory and the entry points once
+        :return: None
+        """
+        if self.__discovered:
+            return
+        self.__discovered = True
+        if self.__plugins is not None and os.path.isdir(self.__plugins):
+            for name in sorted(os.listdir(self.__plugins)):
+                if name.endswith(".py") and not name.startswith("_"):
+                    try:
+                        infos = read_plugin(os.path.join(self.__plugins, name))
+                    except (SyntaxError, ValueError, AttributeError) as e:
+                        print("Registry: %s is skipped, %s" % (name, e))
+                        continue
+                    for info in infos:
+                        self.add(info)
+        if self.__entry_points:
+            for info in read_entry_points():
+                self.add(info)
+
+    def add(self, info: BotInfo):
+        """
+        :return: bool - False if there is a bot of the name already
+        """
+        if info.name in self.__bots:
+            print("Registry: %s is declared twice, %s is kept" % (info.name, self.__bots[info.name].module))
+            return False
+        self.__bots[info.name] = info
+        return True
+
+    def get(self, name: str):
+        """
+        :return: BotInfo
+        """
+        info = self.__bots.get(name)
+        if info is None:
+            self.discover()
+            info = self.__bots.get(name)
+        if info is None:
+            raise ValueError("Unknown bot %s, the bots are %s" % (name, ", ".join(self.__bots)))
+        return info
+
+    def get_bots(self, difficulty: str = None, rules: Rules = None):
+        """
+        :param difficulty: str - only the bots of it, every one for None
+        :param rules: Rules - only the bots that can play with them
+        :return: list - BotInfo
+        """
+        self.discover()
+        return [info for info in self.__bots.values()
+                if (difficulty is None or info.difficulty == difficulty) and (rules is None or info.supports(rules))]
+
+    def get_names(self, difficulty: str = None, rules: Rules = None):
+        return [info.name for info in self.get_bots(difficulty, rules)]
+
+    def get_bot_class(self, name: str):
+        """
+        Imports the module of the bot on the first call
+        :return: class
+        """
+        bot_class = self.__classes.get(name)
+        if bot_class is None:
+            with self.__lock:  # The warm-up thread may be importing it
+                bot_class = self.__classes.get(name)
+                if bot_class is None:
+                    bot_class = self.__classes[name] = self.get(name).load()
+        return bot_class
+
+    def reload(self, name: str):
+        """
+        Reloads the module of the bot, the other bots of the module get their new classes too
+        :return: class - the new class of the bot
+        """
+        info = self.get(name)
+        with self.__lock:
+            bot_class = info.reload()
+            for other in list(self.__classes):
+                if self.__bots[other].module == info.module:
+                    del self.__classes[other]
+            self.__classes[name] = bot_class
+        return bot_class
+
+    def create_bot(self, name: str, rules: Rules = DEFAULT_RULES, asynchronous: bool = False):
+        """
+        Waits for the warm-up of the bot if it runs
+        :param name: str - name of the bot, or "engine:<command>" for an external engine
+        :param rules: Rules - size of the board and the fleet
+        :param asynchronous: bool - the caller awaits the moves (asyncbots.py), otherwise an asynchronous bot
+        is given a synchronous say
+        :return: bot object
+        """
+        if name.startswith(res.ENGINE_PREFIX):
+            if rules != DEFAULT_RULES:
+                raise ValueError("an engine plays the classic 10x10 game only")
+            import engines
+
+            return engines.create_bot(name)
+        info = self.get(name)
+        if not info.supports(rules):
+            raise ValueError("%s plays only on the standard board" % name)
+        thread = self.__warm_ups.get(name)
+        if thread is not None:
+            thread.join()
+        bot = self.get_bot_class(name)(rules)
+        if not asynchronous:
+            import asyncbots
+
+            bot = asyncbots.get_sync_bot(bot)
+        return bot
+
+    def warm_up(self, name: str, rules: Rules = DEFAULT_RULES):
+        """
+        Starts a heavy bot in a background thread: imports its module and calls its warm_up(rules) if it has one,
+        so that its first move is as fast as the next ones
+        :return: Thread, None if the bot is not heavy or is warmed up already
+        """
+        if name.startswith(res.ENGINE_PREFIX) or name in self.__warm_ups:
+            return None
+        info = self.get(name)
+        if not info.heavy or not info.supports(rules):
+            return None
+        thread = threading.Thread(target=self.__warm_up, args=(name, rules), name="warm-up " + name, daemon=True)
+        self.__warm_ups[name] = thread
+        thread.start()
+        return thread
+
+    def __warm_up(self, name: str, rules: Rules):
+        begin = time.perf_counter()
+        try:
+            bot_class = self.get_bot_class(name)
+            if hasattr(bot_class, "warm_up"):
+                bot_class.warm_up(rules)
+        except Exception as e:  # The bot is created as usual and fails there if it must
+            print("Registry: warm-up of %s failed, %s" % (name, e))
+            return
+        print("Registry: %s is warmed up in %.2f s" % (name, time.perf_counter() - begin))
+
+
+_registry = None
+
+
+def get_registry():
+    """
+    Creates the registry on the first call, later calls return the same registry
+    :return: Registry
+    """
+    global _registry
+    if _registry is None:
+        _registry = Registry(res.Strings.BOT_PLUGINS)
+    return _registry
+
+
+def get_bot_class(name: str):
+    return get_registry().get_bot_class(name)
+
+
+def create_bot(name: str, rules: Rules = DEFAULT_RULES, asynchronous: bool = False):
+    return get_registry().create_bot(name, rules, asynchronous)
+
+
+def bench(registry: Registry, name: str):
+    """
+    Warms a bot up and times its first two moves
+    :return: None
+    """
+    import contextlib
+
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # Bots print every shot
+        begin = time.perf_counter()
+        thread = registry.warm_up(name)
+        if thread is not None:
+            thread.join()
+        warm_up = time.perf_counter() - begin
+        bot = registry.create_bot(name)
+        moves = []
+        for _ in range(2):
+            begin = time.perf_counter()
+            bot.say(res.Strings.GameFrame.BOT_SHOOT)
+            moves.append(time.perf_counter() - begin)
+    print("%s: warm-up %.3f s, then the first move %.3f s and the second %.3f s" % (name, warm_up, moves[0], moves[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lists the bots that can be chosen")
+    parser.add_argument("--difficulty", choices=DIFFICULTIES)
+    parser.add_argument("--plugins", default=res.Strings.BOT_PLUGINS, help="directory of plugin modules")
+    parser.add_argument("--warm-up", metavar="BOT", help="warms the bot up and times its first moves")
+    args = parser.parse_args()
+    registry = Registry(args.plugins)
+    for info in registry.get_bots(args.difficulty):
+        source = info.path or (info.entry_point.value if info.entry_point is not None else info.module)
+        print("%-16s %-7s %s%s%s" % (info.name, info.difficulty, source, ", heavy" if info.heavy else "",
+                                     ", standard board only" if info.standard else ""))
+    if args.warm_up:
+        bench(registry, args.warm_up)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,104 @@
 LIST_OF_SHIPS = (4, 3, 3, 2, 2, 2, 1, 1, 1, 1)
 BOT_SHOOT_TIME = {"shoot": 1000, "hit": 1500, "destroyed": 1500}
+PREVIEW_REFRESH_TIME = 16  # ms, the hover preview is repainted at most once per frame
+
+# Event loop profiler of the Tk frames (instrumentation.py)
+PROFILER_HEARTBEAT = 50  # ms, period of the event loop lag probe
+PROFILER_HUD_REFRESH = 500  # ms between two refreshes of the HUD
+PROFILER_HUD_ROWS = 8  # callbacks shown by the HUD, those that took the most time
+PROFILER_MAX_EVENTS = 200000  # events kept for the trace, the oldest are dropped
+
+# Spectate mode
+SPECTATE_SPEEDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, None)  # shots per second, None - as fast as possible
+SPECTATE_FRAME_TIME = 16  # ms, the boards are redrawn at most once per frame
+SPECTATE_BUDGET = 12  # ms of simulation per tick, so that the window stays responsive
+SPECTATE_MAX_SHOTS = 1000  # a game is a draw after this amount of shots
+SPECTATE_MAX_REPEATED = 100  # a bot that only repeats shots (or shoots off the map) this many times in a row loses
+
+# Game server
+SERVER_PORT = 5454
+SERVER_IDLE_TIMEOUT = 300  # s without a message before a client is disconnected
+SERVER_RESUME_TIMEOUT = 60  # s a disconnected client has to resume its match
+SERVER_QUEUE_SIZE = 256  # outgoing messages per connection before a slow client is disconnected
+SERVER_MAX_LINE = 4096  # bytes of one incoming message
+
+# Network client
+CLIENT_POLL_TIME = 15  # ms between checks of incoming messages
+CLIENT_PING_TIME = 2000  # ms between round-trip measurements
+CLIENT_RECONNECT_DELAYS = (0.5, 1, 2, 4, 8)  # s, the last one repeats
+
+# External engines
+BOARD_SIZE = 10
+ENGINE_PROTOCOL = 1
+ENGINE_PREFIX = "engine:"  # --bot "engine:./mybot --depth 3" runs an executable as the bot
+
+# Salvo mode
+SALVO_BY_SHIPS = 0  # Rules.salvo: a shot per ship afloat of the shooter
+
+# Scaling benchmark (scaling.py)
+SCALING_SIZES = (10, 20, 50, 100)  # boards, the fleet grows with the area
+SCALING_SHOOTERS = ("HardBot", "Fati", "MediumBot", "EasyBot")  # InfoBot is 10x10
+
+# Ocean mode (ocean.py)
+OCEAN_CHUNK = 64  # points per side of a chunk of the shot bitset, a chunk is one int of 4096 bits
+
+# Endgame solver (endgame.py)
+ENDGAME_THRESHOLD = 200  # fleets that agree with the observed state, more are not searched
+ENDGAME_DEADLINE = 0.2  # s per move, the bot's own heuristic is used after it
+ENDGAME_TABLE_SIZE = 200000  # observed states kept by the solver
+
+# Information-gain bot (infogain.py)
+INFOGAIN_WORKERS = None  # processes that sample and evaluate, None for every core
+INFOGAIN_BUDGET = 0.25  # s per move
+INFOGAIN_SAMPLES = 20000  # most fleets sampled per move
+INFOGAIN_MAX_FAILURES = 2000  # fleets that did not fit before the first one that did, then no fleet agrees
+
+# Reinforcement learning of BattleshipBot (qlearning.py)
+Q_LEARNING_RATE = 0.1  # share of the error of an estimate that one transition corrects
+Q_MISS_REWARD = -1
+Q_HIT_REWARD = 10
+Q_DESTROYED_REWARD = 50
+Q_REPLAY_CAPACITY = 4096  # transitions kept for replay, the oldest are overwritten
+Q_REPLAY_BATCH = 32  # transitions of a minibatch
+Q_REPLAY_PERIOD = 8  # new transitions between minibatches
+
+# Placement optimizer (placement.py)
+PLACEMENT_SHOOTERS = ("HardBot", "Fati")  # bots that aim; MediumBot and EasyBot mostly shoot at random
+PLACEMENT_MAX_SHOTS = 200  # a game is stopped after this amount of shots
+
+# Hot reload of the bots (hotreload.py)
+RELOAD_POLL_TIME = 500  # ms between checks of the source files of the bots
+
+# Asynchronous bots (asyncbots.py)
+ASYNC_MOVE_BUDGET = 0.5  # s, an asynchronous bot is cancelled after it and plays its best point so far
+ASYNC_PUMP_TIME = 5  # ms between two rounds of the event loop of the bots in the Tk event loop
 
 
 class Strings:
     APP_NAME = "BattleShip"
     APP_BACKGROUND = "drawable/battleship2.jpg"
+    APP_CACHE = "drawable/cache"
+    PROFILER_TRACE = "trace.json"
+    GAME_LOG = "games.log"
+    CORPUS = "corpus"
+    FLEET_LIBRARY = "hard_fleets.json"
+    SAVED_GAME = "saved_game.bin"
+    SERVER_SESSIONS = "sessions"
+    BOT_PLUGINS = "plugins"
     APP_MUSIC = "sound/jook.wave"
 
     class MenuFrame:
         TITLE = "Menu:"
         BUTTON_START = "GAME"
+        BUTTON_RESUME = "RESUME"
         BUTTON_HELP = "HELP"
+        BUTTON_SPECTATE = "SPECTATE"
         BUTTON_EXIT = "EXIT"
+        LABEL_BOT = "Bot:"
+        BOT_OPTION = "%s (%s)"  # name, difficulty
         EXIT_DIALOG_MSG = "Do you really want to exit?"
+        MSG_NO_SAVED_GAME = "There is no saved game."
+        MSG_SAVED_GAME_RULES = "The saved game is played on %s, start the app with them to resume it."
 
     class StatusFrame:
         MSG_CHOSE = "Ships:"
@@ -40,6 +126,7 @@ class Strings:
                  (3, "CRUISER"),
                  (2, "DESTROYER"),
                  (1, "SUBMARINE")]
+        SHIP_OF = "SHIP OF %d"  # a type of a custom fleet that has no name
 
     class GameFrame:
         TITLE_VICTORY = "Victory"
@@ -53,14 +140,29 @@ class Strings:
         WARNING_MISS = "miss!".upper()
         WARNING_HIT = "hit!".upper()
         WARNING_SHIP_DESTROYED = "Destroyed a ship!"
+        WARNING_SALVO = "Salvo: %d hit, %d destroyed"
+        WARNING_SALVO_AIMED = "Aimed %d of %d shots"
         WARNING_TURN_OF_ENEMY = "Now is the enemy's turn"
         WARNING_LAST_SHOT = "Last hit field: %s.  "
+        WARNING_WAITING_SERVER = "Waiting for the server..."
+        WARNING_CONNECTION_LOST = "Connection lost, reconnecting..."
+        RTT = "RTT: %.1f ms"
+        RTT_UNKNOWN = "RTT: -"
 
         BOT_SHOOT = "shoot"
         BOT_HIT = "hit"
         BOT_DESTROYED = "destroyed"
         BOT_ERROR = "error"
 
+    class SpectateFrame:
+        VERSUS = "vs"
+        SPEED = "Speed:"
+        SPEED_VALUE = "%d shots/s"
+        SPEED_MAX = "max"
+        SCORE = "Game #%d   %s %d : %d %s   draws: %d   %.0f shots/s"
+        BOT_FAILED = "%s failed: %s"
+        BOT_STUCK = "%s repeats its shots and loses the game"
+
     class HelpFrame:
         MSG_HELP = """
         Players:
@@ -80,6 +182,7 @@ class Strings:
 
 class MyExceptions:
     MAP_ERROR = "MapError"
+    ENGINE_ERROR = "EngineError"
 
 
 class Dimensions:
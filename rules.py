@@ -0,0 +1,106 @@
+import res
+
+DEFAULT_FLEET = tuple(sorted(res.LIST_OF_SHIPS, reverse=True))
+
+
+class Rules(object):
+    """
+    Size of the board, the ships of a fleet and the shots of a turn. Ship ids follow the fleet from the longest ship,
+    so the ships of one type have consecutive ids.
+    """
+
+    def __init__(self, size: int = res.BOARD_SIZE, fleet: tuple = res.LIST_OF_SHIPS, salvo: int = None):
+        """
+        :param size: int - width and height of the board
+        :param fleet: tuple - type (length) of every ship
+        :param salvo: int - shots of a turn: None for one shot that is repeated after a hit (the classic game),
+        res.SALVO_BY_SHIPS for one per ship afloat of the shooter, N for N
+        """
+        self.size = size
+        self.salvo = salvo
+        self.fleet = tuple(sorted(fleet, reverse=True))
+        self.ships = len(self.fleet)
+        self.max_type = self.fleet[0]
+        self.__amounts = [0] * (self.max_type + 1)
+        for tp in self.fleet:
+            self.__amounts[tp] += 1
+        self.__first_ids = [0] * (self.max_type + 1)
+        ship_id = 1
+        for tp in range(self.max_type, 0, -1):
+            self.__first_ids[tp] = ship_id
+            ship_id += self.__amounts[tp]
+        self.__types = (None,) + self.fleet  # ship id -> type
+
+    def __eq__(self, other):
+        return isinstance(other, Rules) and self.size == other.size and self.fleet == other.fleet and \
+            self.salvo == other.salvo
+
+    def __hash__(self):
+        return hash((self.size, self.fleet, self.salvo))
+
+    def __str__(self):
+        string = "%dx%d, %d ships" % (self.size, self.size, self.ships)
+        if self.salvo == res.SALVO_BY_SHIPS:
+            string += ", a salvo of a shot per ship"
+        elif self.salvo is not None:
+            string += ", salvos of %d shots" % self.salvo
+        return string
+
+    def get_amount(self, tp: int):
+        """
+        :param tp: int - type of the ship
+        :return: int - amount of ships of the type in a fleet
+        """
+        return self.__amounts[tp] if 0 < tp <= self.max_type else 0
+
+    def get_first_id(self, tp: int):
+        """
+        :param tp: int - type of the ship
+        :return: int - id of the first ship of the type
+        """
+        return self.__first_ids[tp]
+
+    def get_type(self, ship_id: int):
+        """
+        :param ship_id: int - id of the ship
+        :return: int - type of the ship
+        """
+        return self.__types[ship_id]
+
+    def is_standard(self):
+        """
+        :return: True for the 10x10 board and the standard fleet, whatever the shots of a turn
+        """
+        return self.size == res.BOARD_SIZE and self.fleet == DEFAULT_FLEET
+
+    def get_salvo(self, alive: int):
+        """
+        :param alive: int - ships of the shooter that are not destroyed
+        :return: int - shots of the shooter's turn, 1 in the classic game
+        """
+        if self.salvo is None:
+            return 1
+        if self.salvo == res.SALVO_BY_SHIPS:
+            return alive
+        return self.salvo
+
+    def is_on_map(self, x: int, y: int):
+        """
+        :return: True if the point is on the board
+        """
+        return 1 <= x <= self.size and 1 <= y <= self.size
+
+    @staticmethod
+    def scaled(size: int, salvo: int = None):
+        """
+        A board of the given size with the standard fleet repeated for every 10x10 of it, so that
+        the ships cover the same part of the board
+        :param size: int - width and height of the board
+        :param salvo: int - shots of a turn, see __init__
+        :return: Rules
+        """
+        copies = max(1, round(size * size / (res.BOARD_SIZE * res.BOARD_SIZE)))
+        return Rules(size, res.LIST_OF_SHIPS * copies, salvo)
+
+
+DEFAULT_RULES = Rules()
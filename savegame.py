@@ -0,0 +1,373 @@
+import argparse
+import array
+import contextlib
+import os
+import random
+import struct
+import sys
+import time
+
+from exceptions import ShipException
+import res
+import objects
+import brain
+import game
+from gamelog import RESULT_KINDS, KIND_RESULTS
+from rules import Rules
+
+MAGIC = b"BSSG"
+VERSION = 2  # 2: the shot points as a bitset, the maps are made again from the fleets
+# magic, version, size of the board, shots of a turn, side to shoot, winner, ships of a fleet,
+# shots of the history, bots, length of the extra data
+HEADER = struct.Struct("<4sBHhBBHIBI")
+SIDE = struct.Struct("<HH")  # ships placed, results of the last turn
+SHIP = struct.Struct("<BBHH")  # type, orientation, x, y
+SHOT = struct.Struct("<BHHB")  # side, x, y, result kind (gamelog.RESULT_KINDS)
+BOT = struct.Struct("<BBI")  # side, length of the name, length of the state
+BOT_STATE = struct.Struct("<BBB")  # numbers, lists of points, grids
+GRID = struct.Struct("<BH")  # 1 for cells of bool, side
+
+NO_SALVO = -1  # Rules.salvo is None, the classic game
+NO_WINNER = 255
+HALO = 255  # '.' of a map, the points around the ships
+HALO_ID = 0xFFFF  # The same in a map of ship ids
+
+
+def pack_grid(grid: list, typecode: str = "B"):
+    """
+    :param grid: list - square list of lists of int or bool, '.' is kept as HALO (HALO_ID)
+    :param typecode: str - array type of a cell, "B" for values up to 254, "H" for ship ids of large fleets
+    :return: bytes - the cells row by row
+    """
+    halo = HALO if typecode == "B" else HALO_ID
+    cells = array.array(typecode, [halo if value == "." else value for row in grid for value in row])
+    if sys.byteorder == "big":
+        cells.byteswap()  # The format is little-endian, as the structs
+    return cells.tobytes()
+
+
+def unpack_grid(data: bytes, side: int, typecode: str = "B", kind=int):
+    """
+    :param data: bytes - made by pack_grid
+    :param side: int - rows of the grid
+    :param kind: type - int or bool for the cells, HALO comes back as '.' for int
+    :return: list - list of lists
+    """
+    cells = array.array(typecode, data)
+    if sys.byteorder == "big":
+        cells.byteswap()
+    cells = cells.tolist()
+    if kind is bool:
+        return [list(map(bool, cells[row:row + side])) for row in range(0, side * side, side)]
+    halo = HALO if typecode == "B" else HALO_ID
+    if halo not in cells:
+        return [cells[row:row + side] for row in range(0, side * side, side)]
+    return [["." if value == halo else value for value in cells[row:row + side]] for row in range(0, side * side, side)]
+
+
+def pack_shots(shots: list, size: int):
+    """
+    :param shots: list - shot points of a player, as get_maps()
+    :param size: int - side of the board, the padding is not kept
+    :return: bytes - a bit of every point of the board, row by row, in (size * size + 7) // 8 bytes
+    """
+    bits = 0
+    for x in range(size, 0, -1):
+        row = shots[x]
+        for y in range(size, 0, -1):
+            bits = bits << 1 | row[y]
+    return bits.to_bytes((size * size + 7) // 8, "little")
+
+
+def unpack_shots(data: bytes, size: int, fleet: list):
+    """
+    :param data: bytes - made by pack_shots
+    :param size: int - side of the board
+    :param fleet: list - [type, orientation, x, y] of every ship, the padding around the destroyed ones is shot
+    as Player marks it
+    :return: list - shot points of the player, padded as get_maps()
+    """
+    cells = format(int.from_bytes(data, "little"), "0%db" % (size * size))[::-1]  # The first point first
+    shots = [[False] * (size + 2)]
+    for row in range(0, size * size, size):
+        shots.append([False] + [cell == "1" for cell in cells[row:row + size]] + [False])
+    shots.append([False] * (size + 2))
+    for tp, orientation, x, y in fleet:
+        dx, dy = (1, 0) if orientation == objects.HORIZONTAL else (0, 1)
+        if all(shots[x + dx * i][y + dy * i] for i in range(tp)):
+            for row in shots[x - 1:x + dx * (tp - 1) + 2]:
+                row[y - 1:y + dy * (tp - 1) + 2] = [True] * (dy * (tp - 1) + 3)
+    return shots
+
+
+def pack_bot_state(numbers: tuple, lists: tuple = (), grids: tuple = ()):
+    """
+    A compact state for the get_state() of a bot
+    :param numbers: tuple - int values
+    :param lists: tuple - lists of (x, y) points, the coordinates must not be negative
+    :param grids: tuple - square lists of lists of bool or of int up to 254, as the hit maps of the bots
+    :return: bytes
+    """
+    parts = [BOT_STATE.pack(len(numbers), len(lists), len(grids)), struct.pack("<%di" % len(numbers), *numbers)]
+    for points in lists:
+        parts.append(struct.pack("<H%dH" % (len(points) * 2), len(points), *(c for point in points for c in point)))
+    for grid in grids:
+        parts.append(GRID.pack(isinstance(grid[0][0], bool), len(grid)))
+        parts.append(pack_grid(grid))
+    return b"".join(parts)
+
+
+def unpack_bot_state(data: bytes):
+    """
+    :param data: bytes - made by pack_bot_state
+    :return: tuple - (list of numbers, list of lists of (x, y), list of grids)
+    """
+    amount, lists, grids = BOT_STATE.unpack_from(data)
+    offset = BOT_STATE.size
+    numbers = list(struct.unpack_from("<%di" % amount, data, offset))
+    offset += 4 * amount
+    points = []
+    for _ in range(lists):
+        length, = struct.unpack_from("<H", data, offset)
+        coordinates = struct.unpack_from("<%dH" % (length * 2), data, offset + 2)
+        points.append(list(zip(coordinates[::2], coordinates[1::2])))
+        offset += 2 + 4 * length
+    cells = []
+    for _ in range(grids):
+        boolean, side = GRID.unpack_from(data, offset)
+        offset += GRID.size
+        cells.append(unpack_grid(data[offset:offset + side * side], side, kind=bool if boolean else int))
+        offset += side * side
+    return numbers, points, cells
+
+
+def get_bot_state(bot):
+    """
+    :param bot: object - a bot, its state is kept if it has get_state()
+    :return: bytes - the state, empty for a bot without the hook
+    """
+    return bot.get_state() if hasattr(bot, "get_state") else b""
+
+
+def set_bot_state(bot, state: bytes):
+    """
+    :param bot: object - a new bot of the same class, a bot without set_state() starts over
+    :return: None
+    """
+    if state and hasattr(bot, "set_state"):
+        bot.set_state(state)
+
+
+class SavedGame(object):
+    """
+    An unfinished game: both fleets with their damage, whose turn it is, the shots and the states of the bots.
+    A fleet is kept as its ships and a bitset of its shot points: loading puts the ships on a new map and
+    gives both to the Player without shooting the ships again.
+    """
+
+    def __init__(self, player: objects.Player, enemy: objects.Player, turn: int, winner: int = None,
+                 history: list = (), results: tuple = None, bots: dict = None, extra: bytes = b""):
+        """
+        :param player: Player - the side PLAYER
+        :param enemy: Player - the side ENEMY, with the same rules
+        :param turn: int - the side that shoots next
+        :param winner: int - the side that won, None if the battle goes on
+        :param history: list - (side, x, y, result) of every shot, empty if it is not kept
+        :param results: tuple - results of the last turn (salvo) of each side
+        :param bots: dict - side -> (name of the bot, its state from get_bot_state)
+        :param extra: bytes - anything the owner of the game keeps with it
+        """
+        self.rules = player.get_rules()
+        self.players = (player, enemy)
+        self.turn = turn
+        self.winner = winner
+        self.history = history
+        self.results = results or ([], [])
+        self.bots = bots or {}
+        self.extra = extra
+
+    @staticmethod
+    def from_game(battle: game.Game, bots: dict = None, extra: bytes = b""):
+        """
+        :param battle: Game - the game
+        :param bots: dict - side -> (name of the bot, the bot)
+        :return: SavedGame
+        """
+        states = {side: (name, get_bot_state(bot)) for side, (name, bot) in (bots or {}).items()}
+        return SavedGame(battle.get_player(game.PLAYER), battle.get_player(game.ENEMY), battle.get_turn(),
+                         battle.get_winner(), battle.get_history(),
+                         (battle.get_results(game.PLAYER), battle.get_results(game.ENEMY)), states, extra)
+
+    def get_game(self, recorder=None):
+        """
+        :param recorder: GameRecorder - records the rest of the game, None to not record
+        :return: Game - goes on from the saved position
+        """
+        battle = game.Game(self.players[game.PLAYER], self.players[game.ENEMY], self.turn, recorder)
+        battle.restore(self.history, self.results, self.winner)
+        return battle
+
+    def create_bot(self, side: int, create):
+        """
+        :param side: int - the side of the bot
+        :param create: function(name: str) - creates a bot by its name
+        :return: object - the bot with its saved state, None if the side is not played by a bot
+        """
+        if side not in self.bots:
+            return None
+        name, state = self.bots[side]
+        bot = create(name)
+        set_bot_state(bot, state)
+        return bot
+
+    def dumps(self):
+        """
+        :return: bytes - the game in the binary format of this module
+        """
+        rules = self.rules
+        bots = sorted(self.bots.items())
+        parts = [HEADER.pack(MAGIC, VERSION, rules.size, NO_SALVO if rules.salvo is None else rules.salvo,
+                             self.turn, NO_WINNER if self.winner is None else self.winner, rules.ships,
+                             len(self.history), len(bots), len(self.extra)),
+                 bytes(rules.fleet)]
+        for player, results in zip(self.players, self.results):
+            fleet = player.get_fleet(destroyed=True)
+            parts.append(SIDE.pack(len(fleet), len(results)))
+            parts.extend(SHIP.pack(*ship) for ship in fleet)
+            parts.append(pack_shots(player.get_maps()[1], rules.size))
+            parts.append(bytes(RESULT_KINDS[result] for result in results))
+        parts.extend(SHOT.pack(side, x, y, RESULT_KINDS[result]) for side, x, y, result in self.history)
+        for side, (name, state) in bots:
+            name = name.encode()
+            parts.append(BOT.pack(side, len(name), len(state)) + name + state)
+        parts.append(self.extra)
+        return b"".join(parts)
+
+    @staticmethod
+    def loads(data: bytes):
+        """
+        :param data: bytes - made by dumps
+        :return: SavedGame
+        """
+        try:
+            magic, version, size, salvo, turn, winner, ships, shots, bots, extra = HEADER.unpack_from(data)
+            if magic != MAGIC:
+                raise ValueError("not a saved game")
+            if version != VERSION:
+                raise ValueError("saved game version %d is not supported" % version)
+            offset = HEADER.size
+            rules = Rules(size, tuple(data[offset:offset + ships]), None if salvo == NO_SALVO else salvo)
+            offset += ships
+
+            players = []
+            results = []
+            bitset = (size * size + 7) // 8
+            for _ in (game.PLAYER, game.ENEMY):
+                placed, last = SIDE.unpack_from(data, offset)
+                if placed != ships:
+                    raise ValueError("a fleet of the saved game is not complete")
+                offset += SIDE.size
+                fleet = list(SHIP.iter_unpack(data[offset:offset + placed * SHIP.size]))
+                offset += placed * SHIP.size
+                if len(data) < offset + bitset:
+                    raise ValueError("the saved game is damaged")
+                shot = unpack_shots(data[offset:offset + bitset], size, fleet)
+                offset += bitset
+                player = objects.Player(rules)
+                player.restore(fleet, None, shot)
+                results.append([KIND_RESULTS[kind] for kind in data[offset:offset + last]])
+                offset += last
+                players.append(player)
+
+            history = [(side, x, y, KIND_RESULTS[kind])
+                       for side, x, y, kind in SHOT.iter_unpack(data[offset:offset + shots * SHOT.size])]
+            offset += shots * SHOT.size
+            states = {}
+            for _ in range(bots):
+                side, name, length = BOT.unpack_from(data, offset)
+                offset += BOT.size
+                states[side] = data[offset:offset + name].decode(), data[offset + name:offset + name + length]
+                offset += name + length
+        except (struct.error, KeyError, IndexError, TypeError, UnicodeDecodeError, ShipException):
+            raise ValueError("the saved game is damaged")
+        return SavedGame(players[0], players[1], turn, None if winner == NO_WINNER else winner, history,
+                         tuple(results), states, data[offset:offset + extra])
+
+
+def save(path: str, saved: SavedGame):
+    """
+    Writes the game to a temporary file that replaces the old one, so a crash never leaves half a game
+    :return: None
+    """
+    with open(path + ".tmp", "wb") as file:
+        file.write(saved.dumps())
+    os.replace(path + ".tmp", path)
+
+
+def load(path: str):
+    """
+    :return: SavedGame
+    """
+    with open(path, "rb") as file:
+        return SavedGame.loads(file.read())
+
+
+def bench(games: int, shots: int, bot: str):
+    """
+    Saves and loads games stopped after the given amount of shots, with the state of a bot
+    :return: None
+    """
+    import registry
+
+    saved = []
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # Bots print every shot
+        for _ in range(games):
+            battle = game.Game(brain.get_random_player(), brain.get_random_player())
+            shooter = registry.create_bot(bot)
+            while not battle.is_over() and len(battle.get_history()) < shots:
+                if battle.get_turn() == game.ENEMY:
+                    battle.play_bot(shooter)
+                else:
+                    battle.shoot(random.randint(1, res.BOARD_SIZE), random.randint(1, res.BOARD_SIZE))
+            saved.append(SavedGame.from_game(battle, {game.ENEMY: (bot, shooter)}))
+
+    begin = time.perf_counter()
+    data = [state.dumps() for state in saved]
+    dumped = time.perf_counter() - begin
+    begin = time.perf_counter()
+    loaded = [SavedGame.loads(blob) for blob in data]
+    elapsed = time.perf_counter() - begin
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):
+        begin = time.perf_counter()
+        for state in loaded:
+            state.create_bot(game.ENEMY, registry.create_bot)
+        created = time.perf_counter() - begin
+
+    for before, after in zip(saved, loaded):
+        assert after.dumps() == before.dumps(), "the game has changed on the way"
+    print("%d games of %d shots: %.0f bytes per game; save %.1f us, load %.1f us, %s with its state %.1f us "
+          "per game" % (games, shots, sum(map(len, data)) / games, dumped * 1e6 / games, elapsed * 1e6 / games,
+                        bot, created * 1e6 / games))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Saved games")
+    parser.add_argument("path", nargs="?", help="shows a saved game")
+    parser.add_argument("--games", type=int, default=1000, help="games of the benchmark")
+    parser.add_argument("--shots", type=int, default=60, help="shots before a game of the benchmark is saved")
+    parser.add_argument("--bot", default="HardBot", help="bot of the registry whose state is saved")
+    args = parser.parse_args()
+
+    if args.path is None:
+        bench(args.games, args.shots, args.bot)
+        return
+    saved = load(args.path)
+    print("%s; %s to shoot, %d shots kept, bots: %s" % (
+        saved.rules, "player" if saved.turn == game.PLAYER else "enemy", len(saved.history),
+        ", ".join("%s (%d bytes)" % (name, len(state)) for name, state in saved.bots.values()) or "none"))
+    for player in saved.players:
+        print(player.fleet_status())
+
+
+if __name__ == "__main__":
+    main()
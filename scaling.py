@@ -0,0 +1,145 @@
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from res import Strings as String
+import res
+import objects
+import brain
+from rules import Rules
+
+MESSAGES = {objects.MISS: String.GameFrame.BOT_SHOOT, objects.REPEATED: String.GameFrame.BOT_SHOOT,
+            objects.HIT: String.GameFrame.BOT_HIT, objects.DESTROYED: String.GameFrame.BOT_DESTROYED}
+BAR = 40  # characters of the longest bar
+SHOTS = 20000  # shots resolved at least for every board
+
+
+def measure_placement(rules: Rules, repeats: int):
+    """
+    :return: float - seconds to arrange one random fleet
+    """
+    begin = time.perf_counter()
+    for _ in range(repeats):
+        brain.get_random_player(rules)
+    return (time.perf_counter() - begin) / repeats
+
+
+def measure_shots(rules: Rules, repeats: int, salvo: bool = False):
+    """
+    Shoots every point of random fleets in a random order
+    :param salvo: bool - all the shots are one salvo (Player.receive_salvo)
+    :return: float - seconds per Player.receive_shot
+    """
+    points = [(x, y) for x in range(1, rules.size + 1) for y in range(1, rules.size + 1)]
+    repeats = max(repeats, SHOTS // len(points))
+    elapsed = 0.0
+    for _ in range(repeats):
+        player = brain.get_random_player(rules)
+        random.shuffle(points)
+        begin = time.perf_counter()
+        if salvo:
+            player.receive_salvo(points)
+        else:
+            for x, y in points:
+                player.receive_shot(x, y)
+        elapsed += time.perf_counter() - begin
+    return elapsed / (repeats * len(points))
+
+
+def measure_bot(rules: Rules, name: str, moves: int):
+    """
+    The bot shoots at a random fleet; at most half of the board is shot
+    :return: float - seconds per move of the bot
+    """
+    import registry
+
+    player = brain.get_random_player(rules)
+    moves = min(moves, rules.size * rules.size // 2)
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # Bots print every shot
+        bot = registry.create_bot(name, rules)
+        message = String.GameFrame.BOT_SHOOT
+        elapsed = 0.0
+        for _ in range(moves):
+            begin = time.perf_counter()
+            x, y = bot.say(message)
+            elapsed += time.perf_counter() - begin
+            message = MESSAGES[player.receive_shot(x, y)]
+            if not player.is_some_ships_placed():  # Every ship is destroyed
+                break
+    return elapsed / moves
+
+
+def plot(title: str, unit: str, rows: list):
+    """
+    Prints a bar for every board, scaled to the longest one
+    :param rows: list - (label, seconds)
+    :return: None
+    """
+    print(title)
+    longest = max(value for _, value in rows) or 1
+    for label, value in rows:
+        print("  %-8s %-*s %10.2f %s" % (label, BAR, "#" * max(1, round(BAR * value / longest)), value * 1e6, unit))
+
+
+def bench(sizes: list, shooters: list, repeats: int, moves: int, output: str = None):
+    """
+    :param sizes: list - widths of the boards, every board has res.LIST_OF_SHIPS for every 10x10 of it
+    :param shooters: list - names of the bots of bots.py
+    :param output: str - path of a chart made with matplotlib, if it is installed
+    :return: dict - name of the measure -> [(label, seconds), ...]
+    """
+    results = {"placement": [], "shot": [], "salvo": []}
+    for name in shooters:
+        results[name] = []
+    for size in sizes:
+        rules = Rules.scaled(size)
+        label = "%dx%d" % (size, size)
+        results["placement"].append((label, measure_placement(rules, repeats)))
+        results["shot"].append((label, measure_shots(rules, repeats)))
+        results["salvo"].append((label, measure_shots(rules, repeats, True)))
+        for name in shooters:
+            results[name].append((label, measure_bot(rules, name, moves)))
+        print("%s measured" % rules)
+
+    plot("placement (brain.get_random_player)", "us per fleet", results["placement"])
+    plot("shot resolution (Player.receive_shot)", "us per shot", results["shot"])
+    plot("salvo resolution (Player.receive_salvo)", "us per shot", results["salvo"])
+    for name in shooters:
+        plot("%s.say" % name, "us per move", results[name])
+
+    if output is not None:
+        try:
+            import matplotlib
+            matplotlib.use("Agg")
+            from matplotlib import pyplot
+        except ImportError:
+            print("matplotlib is not installed, no chart")
+            return results
+        for name, rows in results.items():
+            pyplot.plot(sizes, [value * 1e6 for _, value in rows], marker="o", label=name)
+        pyplot.xlabel("board width")
+        pyplot.ylabel("us")
+        pyplot.yscale("log")
+        pyplot.legend()
+        pyplot.savefig(output)
+        print("chart saved to", output)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of placement, shots and bot moves by board size")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(res.SCALING_SIZES))
+    parser.add_argument("--shooters", nargs="*", default=list(res.SCALING_SHOOTERS))
+    parser.add_argument("--repeats", type=int, default=3, help="fleets per board")
+    parser.add_argument("--moves", type=int, default=200, help="moves of every bot per board")
+    parser.add_argument("--plot", metavar="PNG", help="also draws a chart (needs matplotlib)")
+    args = parser.parse_args()
+    if "InfoBot" in args.shooters:
+        parser.error("InfoBot plays the standard board only")
+    bench(args.sizes, args.shooters, args.repeats, args.moves, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import itertools
+import json
+import os
+import secrets
+import time
+
+from exceptions import ShipException
+from res import Strings as String
+import res
+import objects
+import brain
+import game
+
+MODE_BOT = "bot"
+MODE_HUMAN = "human"
+SESSION = ".bin"  # Extension of the suspended matches
+
+
+class ClientGone(Exception):
+    pass
+
+
+class Connection(object):
+    """
+    A newline-delimited JSON connection. Outgoing messages go through a bounded queue,
+    a client that does not read them is disconnected instead of growing the server's memory.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, idle_timeout: float):
+        self.__reader = reader
+        self.__writer = writer
+        self.__idle_timeout = idle_timeout
+        self.__queue = asyncio.Queue(maxsize=res.SERVER_QUEUE_SIZE)
+        self.__sender = asyncio.ensure_future(self.__send_loop())
+        self.closed = False
+
+    async def receive(self):
+        """
+        :return: dict - the next message, raises ClientGone if the client left or was idle for too long
+        """
+        try:
+            line = await asyncio.wait_for(self.__reader.readline(), self.__idle_timeout)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):  # ValueError: the line is too long
+            raise ClientGone()
+        if not line:
+            raise ClientGone()
+
+        try:
+            message = json.loads(line)
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            self.send({"type": "error", "message": "invalid JSON"})
+            return {}
+        return message
+
+    def send(self, message: dict):
+        """
+        Queues a message, disconnects a client that does not keep up
+        :param message: dict - the message
+        :return: None
+        """
+        if self.closed:
+            return
+        try:
+            self.__queue.put_nowait(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        except asyncio.QueueFull:
+            self.close()
+
+    async def __send_loop(self):
+        """
+        Writes the queued messages, waits for the socket buffer to drain (backpressure)
+        :return: None
+        """
+        try:
+            while True:
+                data = await self.__queue.get()
+                self.__writer.write(data)
+                while not self.__queue.empty():  # Coalesces whatever is already queued into one drain
+                    self.__writer.write(self.__queue.get_nowait())
+                await self.__writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.closed = True
+            self.__writer.close()
+
+    def close(self):
+        """
+        :return: None
+        """
+        self.closed = True
+        self.__sender.cancel()
+
+
+class Match(object):
+    """
+    A game of two sides, each side is a connection or a bot
+    """
+
+    def __init__(self, server, match_id: int):
+        self.server = server
+        self.id = match_id
+        self.connections = [None, None]
+        self.tokens = [None, None]  # Secret of each side, needed to resume the match
+        self.players = [None, None]
+        self.bot = None
+        self.bot_name = None
+        self.game = None
+        self.abandon_jobs = [None, None]  # Ends the match if the client does not come back
+
+    def add_bot(self, side: int, name: str):
+        """
+        The bot plays the given side with a fleet of the library of hard fleets, if there is one
+        :return: None
+        """
+        self.bot = self.server.create_bot(name)
+        self.bot_name = name
+        self.players[side] = brain.get_hard_player()
+
+    def arrange(self, side: int, message: dict):
+        """
+        :param side: int - the side that arranges
+        :param message: dict - "arrange" message
+        :return: None - starts the game when both fleets are ready
+        """
+        if self.players[side] is not None:
+            raise ValueError("the fleet has already been arranged")
+
+        if message.get("random"):
+            player = brain.get_random_player()
+        else:
+            player = objects.Player()
+            try:
+                for tp, orientation, x, y in message.get("ships", []):
+                    if not player.add_ship(objects.Ship(tp, orientation, x, y)):
+                        raise ValueError("ships overlap or touch each other")
+            except (ShipException, TypeError) as e:
+                raise ValueError(str(e))
+            if not player.is_completed():
+                raise ValueError("all ships must be placed")
+
+        self.players[side] = player
+        self.send(side, {"type": "arranged", "ships": player.get_fleet()})
+
+        if None not in self.players:
+            self.game = game.Game(self.players[0], self.players[1])
+            for i in (0, 1):
+                self.send(i, {"type": "start", "turn": self.game.get_turn() == i})
+
+    async def shoot(self, side: int, message: dict):
+        """
+        :param side: int - the side that shoots
+        :param message: dict - "shoot" message
+        :return: None
+        """
+        if self.game is None or self.game.is_over():
+            raise ValueError("the game is not running")
+        if self.game.get_turn() != side:
+            raise ValueError(String.GameFrame.WARNING_TURN_OF_ENEMY)
+
+        x, y = message.get("x"), message.get("y")
+        defence = self.game.get_player(1 - side)
+        if type(x) is not int or type(y) is not int or not defence.get_rules().is_on_map(x, y) \
+                or defence.is_shot(x, y):
+            raise ValueError("invalid shot")
+
+        self.__resolve(side, x, y, self.game.shoot(x, y), message.get("id"))
+
+        # The bot answers at once, until it misses
+        while self.bot is not None and not self.game.is_over() and self.game.get_turn() != side:
+            begin = time.perf_counter()
+            x, y = await self.server.get_move(self.bot, self.game.get_message(), self.game.get_player(side))
+            self.__resolve(1 - side, x, y, self.game.shoot(x, y, time.perf_counter() - begin), None)
+
+    def __resolve(self, side: int, x: int, y: int, result: str, message_id):
+        """
+        Lets both sides know the result of the shot
+        :return: None
+        """
+        self.server.moves += 1
+        shot = {"type": "result", "x": x, "y": y, "result": result}
+        if result == objects.DESTROYED:
+            shot["ship"] = self.game.get_player(1 - side).get_ship_points(x, y)
+
+        self.send(side, dict(shot, by="you", id=message_id))
+        self.send(1 - side, dict(shot, by="enemy"))
+
+        if self.game.is_over():
+            for i in (0, 1):
+                self.send(i, {"type": "over", "winner": "you" if self.game.get_winner() == i else "enemy"})
+            self.server.finish(self)
+        else:
+            for i in (0, 1):
+                self.send(i, {"type": "turn", "yours": self.game.get_turn() == i})
+
+    def send(self, side: int, message: dict):
+        if self.connections[side] is not None:
+            self.connections[side].send(message)
+
+    def leave(self, side: int, connection: Connection):
+        """
+        Calls when the client of the side has gone, it can resume the match for a while
+        :param connection: Connection - the connection that has gone, the side may have been resumed already
+        :return: None
+        """
+        if self.connections[side] is not connection:
+            return
+        self.connections[side] = None
+        if self.game is not None and self.game.is_over():
+            return
+        if self.bot is None and self.connections[1 - side] is None and self.tokens[1 - side] is None:
+            self.server.finish(self)  # Nobody has joined yet
+            return
+        if self.game is not None and self.server.sessions is not None and \
+                (self.bot is not None or self.connections[1 - side] is None):
+            self.server.suspend(self)  # Nobody is connected, the match waits on disk
+            return
+        self.abandon_jobs[side] = asyncio.get_event_loop().call_later(self.server.resume_timeout, self.abandon, side)
+
+    def abandon(self, side: int):
+        """
+        The client of the side has not come back, the opponent wins
+        :return: None
+        """
+        self.abandon_jobs[side] = None
+        if self.connections[side] is None:
+            self.send(1 - side, {"type": "over", "winner": "you", "reason": "abandoned"})
+            self.server.finish(self)
+
+    def resume(self, side: int, connection: Connection):
+        """
+        Attaches the reconnected client and sends the whole state of the match
+        :return: None
+        """
+        if self.connections[side] is not None:
+            # The client is back before its old connection has been found gone, as while the bot thinks
+            self.connections[side].close()
+        if self.abandon_jobs[side] is not None:
+            self.abandon_jobs[side].cancel()
+            self.abandon_jobs[side] = None
+        self.connections[side] = connection
+
+        state = {"type": "state", "game": self.id, "side": side, "started": self.game is not None,
+                 "turn": self.game is not None and self.game.get_turn() == side, "shots": [], "received": []}
+        if self.players[side] is not None:
+            state["fleet"] = self.players[side].get_fleet()
+        if self.game is not None:
+            for shooter, x, y, result in self.game.get_history():
+                if result == objects.REPEATED:
+                    continue
+                if shooter == side:
+                    shot = [x, y, result]
+                    if result == objects.DESTROYED:
+                        shot.append(self.game.get_player(1 - side).get_ship_points(x, y))
+                    state["shots"].append(shot)
+                else:
+                    state["received"].append([x, y, result])
+        connection.send(state)
+
+
+class GameServer(object):
+
+    def __init__(self, bot: str = "HardBot", idle_timeout: float = res.SERVER_IDLE_TIMEOUT,
+                 resume_timeout: float = res.SERVER_RESUME_TIMEOUT, sessions: str = None):
+        """
+        :param bot: str - default bot of the human-vs-bot matches
+        :param idle_timeout: float - seconds without a message before a client is disconnected
+        :param resume_timeout: float - seconds a disconnected client has to resume its match
+        :param sessions: str - directory of the suspended matches, a match that nobody is connected to is saved
+        there (savegame.py) and can be resumed at any time; None to keep it in memory for resume_timeout only
+        """
+        self.__bot = bot
+        self.__idle_timeout = idle_timeout
+        self.resume_timeout = resume_timeout
+        self.sessions = sessions
+        first = 1
+        if sessions is not None:
+            os.makedirs(sessions, exist_ok=True)
+            # A restarted server must not give the id of a suspended match to a new one
+            first += max((int(name.split(".")[0]) for name in os.listdir(sessions) if name.endswith(SESSION)),
+                         default=0)
+        self.__ids = itertools.count(first)
+        self.__matches = {}
+        self.__waiting = None  # A human match waiting for the second player
+        self.__bot_classes = {}
+        # Bots share module state (Q-values, process pools), so the moves are made one at a time, off the event loop
+        self.__bot_thread = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="bots")
+        self.moves = 0
+        self.games = 0
+
+    def create_bot(self, name: str):
+        """
+        :param name: str - name of the bot in the registry (registry.py)
+        :return: bot object
+        """
+        if name not in self.__bot_classes:
+            import registry
+
+            self.__bot_classes[name] = registry.get_bot_class(name)  # ValueError for an unknown bot
+        return self.__bot_classes[name]()
+
+    async def get_move(self, bot, value: str, defence: objects.Player):
+        """
+        Awaits the shot of a bot: an asynchronous bot runs in the event loop with a budget (asyncbots.py),
+        a synchronous one in the thread of the bots, so that the other matches go on meanwhile
+        :param bot: object - the bot
+        :param value: str - the command
+        :param defence: Player - the player the bot shoots at
+        :return: tuple - (x, y)
+        """
+        import asyncbots
+
+        if asyncbots.is_async(bot):
+            return await asyncbots.get_move(bot, value, fallback=lambda: asyncbots.get_free_point(defence))
+        return await asyncio.get_event_loop().run_in_executor(self.__bot_thread, bot.say, value)
+
+    def get_active(self):
+        """
+        :return: int - amount of running matches
+        """
+        return len(self.__matches)
+
+    def finish(self, match: Match):
+        """
+        :return: None - forgets the match
+        """
+        if self.__matches.pop(match.id, None) is not None:
+            self.games += 1
+        for job in match.abandon_jobs:
+            if job is not None:
+                job.cancel()
+        if self.__waiting is match:
+            self.__waiting = None
+
+    def __get_session(self, match_id: int):
+        """
+        :return: str - path of the suspended match
+        """
+        return os.path.join(self.sessions, "%d%s" % (match_id, SESSION))
+
+    def suspend(self, match: Match):
+        """
+        Saves the match to the sessions directory and forgets it
+        :return: None
+        """
+        savegame = self.__import_savegame()
+        bots = {1: (match.bot_name, match.bot)} if match.bot is not None else None
+        extra = json.dumps({"tokens": match.tokens}).encode()
+        savegame.save(self.__get_session(match.id), savegame.SavedGame.from_game(match.game, bots, extra))
+        self.__matches.pop(match.id, None)
+        for job in match.abandon_jobs:
+            if job is not None:
+                job.cancel()
+
+    def __load(self, match_id: int, token: str):
+        """
+        Brings a suspended match back if the token is one of its sides'
+        :return: Match - the match, None if there is none
+        """
+        if self.sessions is None or type(match_id) is not int:
+            return None
+        savegame = self.__import_savegame()
+        path = self.__get_session(match_id)
+        try:
+            saved = savegame.load(path)
+        except (OSError, ValueError):
+            return None
+        tokens = json.loads(saved.extra)["tokens"]
+        if not any(known is not None and secrets.compare_digest(known, token) for known in tokens):
+            return None
+
+        match = Match(self, match_id)
+        match.tokens = tokens
+        match.players = list(saved.players)
+        match.game = saved.get_game()
+        if 1 in saved.bots:
+            match.bot_name = saved.bots[1][0]
+            match.bot = saved.create_bot(1, self.create_bot)
+        os.remove(path)
+        self.__matches[match_id] = match
+        return match
+
+    @staticmethod
+    def __import_savegame():
+        import savegame  # Deferred, only a server with a sessions directory needs it
+
+        return savegame
+
+    def __join(self, connection: Connection, message: dict):
+        """
+        :return: tuple - (Match, side)
+        """
+        mode = message.get("mode", MODE_BOT)
+        if mode == MODE_HUMAN:
+            if self.__waiting is not None:
+                match, side = self.__waiting, 1
+                self.__waiting = None
+            else:
+                match, side = Match(self, next(self.__ids)), 0
+                self.__waiting = match
+        elif mode == MODE_BOT:
+            match, side = Match(self, next(self.__ids)), 0
+            match.add_bot(1, message.get("bot", self.__bot))
+        else:
+            raise ValueError("unknown mode " + str(mode))
+
+        self.__matches[match.id] = match
+        match.connections[side] = connection
+        match.tokens[side] = secrets.token_hex(8)
+        connection.send({"type": "joined", "game": match.id, "side": side, "token": match.tokens[side]})
+        if mode == MODE_HUMAN and side == 1:
+            match.send(0, {"type": "opponent"})
+        return match, side
+
+    def __resume(self, connection: Connection, message: dict):
+        """
+        :return: tuple - (Match, side)
+        """
+        token = str(message.get("token"))
+        match = self.__matches.get(message.get("game")) or self.__load(message.get("game"), token)
+        for side in (0, 1):
+            if match is not None and match.tokens[side] is not None \
+                    and secrets.compare_digest(match.tokens[side], token):
+                match.resume(side, connection)
+                return match, side
+        raise ValueError("unknown game")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves one client
+        :return: None
+        """
+        connection = Connection(reader, writer, self.__idle_timeout)
+        match, side = None, None
+        try:
+            while not connection.closed:
+                message = await connection.receive()
+                kind = message.get("type")
+                try:
+                    if kind == "join" and match is None:
+                        match, side = self.__join(connection, message)
+                    elif kind == "resume" and match is None:
+                        match, side = self.__resume(connection, message)
+                    elif kind == "arrange" and match is not None:
+                        match.arrange(side, message)
+                    elif kind == "shoot" and match is not None:
+                        await match.shoot(side, message)
+                    elif kind == "ping":
+                        connection.send({"type": "pong", "id": message.get("id")})
+                    elif kind is not None:
+                        raise ValueError("unexpected message " + str(kind))
+                except ValueError as e:
+                    connection.send({"type": "error", "message": str(e), "id": message.get("id")})
+        except ClientGone:
+            pass
+        finally:
+            if match is not None:
+                match.leave(side, connection)
+            connection.close()
+
+    async def start(self, host: str, port: int):
+        """
+        :return: asyncio.Server - the listening server
+        """
+        return await asyncio.start_server(self.handle, host, port, limit=res.SERVER_MAX_LINE)
+
+
+async def serve(host: str, port: int, bot: str, sessions: str = None):
+    server = GameServer(bot, sessions=sessions)
+    listener = await server.start(host, port)
+    print("Server: listening on %s:%d" % (host, port))
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # Bots print every shot
+        async with listener:
+            await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=String.APP_NAME + " server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=res.SERVER_PORT)
+    parser.add_argument("--bot", default="HardBot", help="bot of the human-vs-bot matches")
+    parser.add_argument("--sessions", nargs="?", const=String.SERVER_SESSIONS, metavar="DIR",
+                        help="suspends the matches nobody is connected to to this directory instead of ending them")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.bot, args.sessions))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
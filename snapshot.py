@@ -0,0 +1,262 @@
+import argparse
+import copy
+import time
+import tracemalloc
+
+import res
+import objects
+import brain
+
+SIZE = res.BOARD_SIZE
+CELLS = SIZE * SIZE
+
+
+def get_cell(x: int, y: int):
+    """
+    :param x: int (1-10) - X coordinate
+    :param y: int (1-10) - Y coordinate
+    :return: int - bit of the point in the masks, (x - 1) * SIZE + (y - 1)
+    """
+    return (x - 1) * SIZE + y - 1
+
+
+def get_around(mask: int):
+    """
+    :param mask: int - bit mask of the points of a ship
+    :return: int - bit mask of the ship and the points around it
+    """
+    around = 0
+    for cell in range(CELLS):
+        if mask >> cell & 1:
+            x, y = divmod(cell, SIZE)
+            for nx in range(max(x - 1, 0), min(x + 2, SIZE)):
+                for ny in range(max(y - 1, 0), min(y + 2, SIZE)):
+                    around |= 1 << nx * SIZE + ny
+    return around
+
+
+class Fleet(object):
+    """
+    The placement of the ships, it never changes during a game and is shared by all its snapshots
+    """
+
+    def __init__(self, ships: list):
+        """
+        :param ships: list - bit mask of the points of every ship by its id, index 0 is unused
+        """
+        self.masks = tuple(ships)
+        self.around = tuple(get_around(mask) for mask in ships)  # Shot when the ship is destroyed
+        self.ids = [0] * CELLS  # Ship id of every point, 0 is water
+        for ship_id, mask in enumerate(ships):
+            for cell in range(CELLS):
+                if ship_id and mask >> cell & 1:
+                    self.ids[cell] = ship_id
+        self.ids = tuple(self.ids)
+
+    @staticmethod
+    def from_list(fleet: list):
+        """
+        :param fleet: list - [type, orientation, x, y] of every ship in the order of res.LIST_OF_SHIPS
+        :return: Fleet
+        """
+        ships = [0]
+        for tp, orientation, x, y in fleet:
+            mask = 0
+            for i in range(tp):
+                if orientation == objects.HORIZONTAL:
+                    mask |= 1 << get_cell(x + i, y)
+                else:
+                    mask |= 1 << get_cell(x, y + i)
+            ships.append(mask)
+        return Fleet(ships)
+
+    def to_list(self):
+        """
+        :return: list - [type, orientation, x, y] of every ship, as Player.get_fleet
+        """
+        fleet = []
+        for mask in self.masks[1:]:
+            first = (mask & -mask).bit_length() - 1
+            tp = bin(mask).count("1")
+            orientation = objects.HORIZONTAL if tp == 1 or mask >> first + SIZE & 1 else objects.VERTICAL
+            fleet.append([tp, orientation, first // SIZE + 1, first % SIZE + 1])
+        return fleet
+
+
+class Snapshot(object):
+    """
+    An immutable state of one fleet under fire, for bots that look ahead.
+    Shot points are a bit mask (a Python int) and the placement is a Fleet shared by all snapshots,
+    so forking is free, a shot makes a new snapshot of a few words and the old one stays valid.
+    Every snapshot remembers the one it came from, undo is returning to it.
+    """
+    __slots__ = ("fleet", "shots", "alive", "parent", "move")
+
+    def __init__(self, fleet: Fleet, shots: int = 0, alive: int = None, parent=None, move: tuple = None):
+        """
+        :param fleet: Fleet - the placement of the ships
+        :param shots: int - bit mask of the shot points
+        :param alive: int - amount of ships that are not destroyed, counted from the shots if None
+        :param parent: Snapshot - the state before the last shot
+        :param move: tuple - (x, y, result) of the last shot
+        """
+        self.fleet = fleet
+        self.shots = shots
+        if alive is None:
+            alive = sum(1 for mask in fleet.masks[1:] if mask & ~shots)
+        self.alive = alive
+        self.parent = parent
+        self.move = move
+
+    @staticmethod
+    def from_player(player: objects.Player):
+        """
+        Takes the map and the shot points of the player, destroyed ships included
+        :param player: Player - a player with all ships placed
+        :return: Snapshot
+        """
+        ships = [0] * (len(res.LIST_OF_SHIPS) + 1)
+        shots = 0
+        for x in range(1, SIZE + 1):
+            for y in range(1, SIZE + 1):
+                point = player.get_point_on_map(x, y)
+                if point != 0 and point != '.':
+                    ships[point] |= 1 << get_cell(x, y)
+                if player.is_shot(x, y):
+                    shots |= 1 << get_cell(x, y)
+        return Snapshot(Fleet(ships), shots)
+
+    def to_player(self):
+        """
+        :return: Player - a new player with the same ships and shot points
+        """
+        player = objects.Player()
+        for tp, orientation, x, y in self.fleet.to_list():
+            player.add_ship(objects.Ship(tp, orientation, x, y))
+        for cell in range(CELLS):
+            if self.shots >> cell & 1:
+                player.receive_shot(cell // SIZE + 1, cell % SIZE + 1)
+        return player
+
+    def fork(self):
+        """
+        A snapshot never changes, so the fork is the snapshot itself
+        :return: Snapshot
+        """
+        return self
+
+    def shoot(self, x: int, y: int):
+        """
+        The rules of Player.receive_shot, without changing this snapshot
+        :param x: int (1-10) - X coordinate of the shot
+        :param y: int (1-10) - Y coordinate of the shot
+        :return: tuple - (Snapshot after the shot, MISS, HIT, DESTROYED or REPEATED); self after a REPEATED shot
+        """
+        if not (1 <= x <= SIZE and 1 <= y <= SIZE):
+            return self, objects.REPEATED
+        cell = get_cell(x, y)
+        bit = 1 << cell
+        if self.shots & bit:
+            return self, objects.REPEATED
+        shots = self.shots | bit
+
+        ship_id = self.fleet.ids[cell]
+        if not ship_id:
+            return Snapshot(self.fleet, shots, self.alive, self, (x, y, objects.MISS)), objects.MISS
+        if self.fleet.masks[ship_id] & ~shots:
+            return Snapshot(self.fleet, shots, self.alive, self, (x, y, objects.HIT)), objects.HIT
+        # Points around the destroyed ship cannot contain a ship
+        return Snapshot(self.fleet, shots | self.fleet.around[ship_id], self.alive - 1, self,
+                        (x, y, objects.DESTROYED)), objects.DESTROYED
+
+    def undo(self):
+        """
+        :return: Snapshot - the state before the last shot, None for the first snapshot
+        """
+        return self.parent
+
+    def get_moves(self):
+        """
+        :return: list - (x, y, result) of every shot since the first snapshot
+        """
+        moves = []
+        state = self
+        while state.parent is not None:
+            moves.append(state.move)
+            state = state.parent
+        return moves[::-1]
+
+    def is_shot(self, x: int, y: int):
+        """
+        :return: True if the point has been shot
+        """
+        return bool(self.shots >> get_cell(x, y) & 1)
+
+    def get_ship_id(self, x: int, y: int):
+        """
+        :return: int - id of the ship at the point, 0 for water
+        """
+        return self.fleet.ids[get_cell(x, y)]
+
+    def is_over(self):
+        """
+        :return: True if all ships are destroyed
+        """
+        return self.alive == 0
+
+
+def bench(count: int):
+    """
+    Forks/sec, shots/sec and memory per snapshot against deep copies of Player
+    :param count: int - amount of forks and shots
+    :return: None
+    """
+    player = brain.get_random_player()
+    for x, y in ((1, 1), (5, 5), (10, 10)):
+        player.receive_shot(x, y)
+    state = Snapshot.from_player(player)
+    cells = [(cell // SIZE + 1, cell % SIZE + 1) for cell in range(CELLS) if not state.shots >> cell & 1]
+
+    begin = time.perf_counter()
+    for _ in range(count // 100):
+        copy.deepcopy(player)
+    elapsed = time.perf_counter() - begin
+    print("copy.deepcopy(Player): %12.0f forks/sec" % (count // 100 / elapsed))
+    begin = time.perf_counter()
+    for _ in range(count):
+        state.fork()
+    elapsed = time.perf_counter() - begin
+    print("Snapshot.fork:         %12.0f forks/sec" % (count / elapsed))
+
+    begin = time.perf_counter()
+    for i in range(count // 100):
+        copy.deepcopy(player).receive_shot(*cells[i % len(cells)])
+    elapsed = time.perf_counter() - begin
+    print("deepcopy + shot:       %12.0f shots/sec" % (count // 100 / elapsed))
+    begin = time.perf_counter()
+    for i in range(count):
+        state.shoot(*cells[i % len(cells)])
+    elapsed = time.perf_counter() - begin
+    print("Snapshot.shoot:        %12.0f shots/sec" % (count / elapsed))
+
+    # Memory of the states kept by a search: a chain of shots and the branches of one position
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copies = [copy.deepcopy(player) for _ in range(1000)]
+    print("Player copy:           %12.0f bytes" % ((tracemalloc.get_traced_memory()[0] - before) / len(copies)))
+    del copies
+    before = tracemalloc.get_traced_memory()[0]
+    children = [state.shoot(x, y)[0] for x, y in cells]
+    print("Snapshot:              %12.0f bytes" % ((tracemalloc.get_traced_memory()[0] - before) / len(children)))
+    tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Immutable game states for bots that look ahead")
+    parser.add_argument("--count", type=int, default=1000000)
+    args = parser.parse_args()
+    bench(args.count)
+
+
+if __name__ == "__main__":
+    main()
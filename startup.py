@@ -0,0 +1,156 @@
+import importlib
+import os
+import sys
+import time
+
+import res
+
+
+class StartupTimer(object):
+    """
+    Measures the time from the start of the process to the first interactive frame.
+    Lazily imported modules are reported in the same format as `python -X importtime`.
+    """
+
+    def __init__(self, verbose: bool = False):
+        """
+        :param verbose: bool - prints every import and mark as soon as it happens
+        """
+        self.__start = time.perf_counter()
+        self.__verbose = verbose
+        self.__marks = []  # (label, microseconds since start)
+        self.__imports = []  # (module name, microseconds)
+
+    def set_verbose(self, verbose: bool):
+        """
+        :param verbose: bool - prints every import and mark as soon as it happens
+        :return: None
+        """
+        self.__verbose = verbose
+
+    def import_module(self, name: str):
+        """
+        Imports the module and records how long it took
+        :param name: str - name of the module
+        :return: module - the imported module
+        """
+        already_loaded = name in sys.modules
+        begin = time.perf_counter()
+        module = importlib.import_module(name)
+        elapsed = int((time.perf_counter() - begin) * 1000000)
+
+        if not already_loaded:
+            self.__imports.append((name, elapsed))
+            if self.__verbose:
+                print("import time: %9d | %10d | %s (lazy)" % (elapsed, elapsed, name), file=sys.stderr)
+        return module
+
+    def mark(self, label: str):
+        """
+        Records a milestone of the start up
+        :param label: str - name of the milestone
+        :return: int - microseconds since the start
+        """
+        elapsed = int((time.perf_counter() - self.__start) * 1000000)
+        self.__marks.append((label, elapsed))
+        if self.__verbose:
+            print("startup: %10d us | %s" % (elapsed, label), file=sys.stderr)
+        return elapsed
+
+
+def get_background_cache_path(source: str, width: int, height: int):
+    """
+    :param source: str - path of the source image
+    :param width: int - width of the window
+    :param height: int - height of the window
+    :return: str - path of the pre-scaled background, keyed by the source mtime and the window size
+    """
+    name = os.path.splitext(os.path.basename(source))[0]
+    mtime = os.stat(source).st_mtime_ns
+    return os.path.join(res.Strings.APP_CACHE, "%s_%dx%d_%d.png" % (name, width, height, mtime))
+
+
+def create_background_cache(source: str, width: int, height: int):
+    """
+    Fits the source image to the window and saves it as PNG, which tkinter reads without PIL
+    :param source: str - path of the source image
+    :param width: int - width of the window
+    :param height: int - height of the window
+    :return: str - path of the cached image, None if PIL is not installed
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+
+    path = get_background_cache_path(source, width, height)
+    prefix = os.path.splitext(os.path.basename(source))[0] + "_"
+    os.makedirs(res.Strings.APP_CACHE, exist_ok=True)
+
+    # Removes the stale images of the same source
+    for name in os.listdir(res.Strings.APP_CACHE):
+        if name.startswith(prefix):
+            os.remove(os.path.join(res.Strings.APP_CACHE, name))
+
+    resampling = getattr(Image, "Resampling", Image).LANCZOS  # Image.ANTIALIAS was removed in Pillow 10
+    image = ImageOps.fit(Image.open(source), (width, height), resampling)
+    image.save(path)
+    return path
+
+
+def clear_background_cache():
+    """
+    Removes all pre-scaled backgrounds
+    :return: None
+    """
+    if os.path.isdir(res.Strings.APP_CACHE):
+        for name in os.listdir(res.Strings.APP_CACHE):
+            os.remove(os.path.join(res.Strings.APP_CACHE, name))
+
+
+def measure(args: list):
+    """
+    Starts the game once, waits for the first interactive frame and parses the timings
+    :param args: list of str - extra arguments for main.py
+    :return: tuple - (first frame us, total eager import us, list of report lines)
+    """
+    import re
+    import subprocess
+
+    command = [sys.executable, "-X", "importtime", "main.py", "--startup-time", "--quit-after-startup"] + args
+    process = subprocess.run(command, capture_output=True, text=True)
+
+    imports = 0
+    first_frame = None
+    lines = []
+    for line in process.stderr.splitlines():
+        found = re.match(r"import time:\s+(\d+) \|", line)
+        if found:
+            imports += int(found.group(1))
+        elif line.startswith("startup:"):
+            lines.append(line)
+            if line.endswith("first frame"):
+                first_frame = int(line.split()[1])
+
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr)
+    return first_frame, imports, lines
+
+
+def main():
+    """
+    Reports cold (no background cache) and warm start up times
+    :return: None
+    """
+    args = sys.argv[1:]
+
+    clear_background_cache()
+    for title in ("cold", "warm"):
+        first_frame, imports, lines = measure(args)
+        print("%s start: first frame %.1f ms, imports %.1f ms" % (title, first_frame / 1000, imports / 1000))
+        for line in lines:
+            print("    " + line)
+
+
+if __name__ == "__main__":
+    main()
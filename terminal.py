@@ -0,0 +1,355 @@
+import argparse
+import contextlib
+import curses
+import os
+import time
+
+from res import Strings as String
+import objects
+import brain
+import game
+
+# Cells
+CELL_EMPTY = "."
+CELL_SHIP = "#"
+CELL_MISS = "*"
+CELL_HIT = "x"
+CELL_DESTROYED = "X"
+
+BOARD_TOP = 3
+PLAYER_LEFT = 4
+ENEMY_LEFT = 40
+BOT_SHOOT_DELAY = 250  # ms between the bot's shots, so that they can be followed
+
+KEYS_UP = (curses.KEY_UP, ord("k"))
+KEYS_DOWN = (curses.KEY_DOWN, ord("j"))
+KEYS_LEFT = (curses.KEY_LEFT, ord("h"))
+KEYS_RIGHT = (curses.KEY_RIGHT, ord("l"))
+KEYS_ENTER = (curses.KEY_ENTER, ord("\n"), ord(" "))
+
+
+class Screen(object):
+    """
+    Keeps what has been drawn and writes only the cells that have changed
+    """
+
+    def __init__(self, window):
+        """
+        :param window: curses window
+        """
+        self.__window = window
+        self.__drawn = {}  # (row, col) -> (text, attr)
+        self.__written = 0  # Cells written since the last flush
+        self.__render_time = 0.0  # Seconds spent since the last take_stats
+
+    def put(self, row: int, col: int, text: str, attr: int = 0):
+        """
+        Draws the text if it differs from what is already there
+        :return: None
+        """
+        if self.__drawn.get((row, col)) != (text, attr):
+            self.__drawn[(row, col)] = text, attr
+            self.__written += 1
+            try:
+                self.__window.addstr(row, col, text, attr)
+            except curses.error:  # Out of a small terminal
+                pass
+
+    def line(self, row: int, text: str, attr: int = 0):
+        """
+        Draws a full width line
+        :return: None
+        """
+        width = self.__window.getmaxyx()[1] - 1
+        self.put(row, 0, text[:width].ljust(width), attr)
+
+    def flush(self, begin: float):
+        """
+        Sends the changes to the terminal
+        :param begin: float - perf_counter when the rendering started
+        :return: None
+        """
+        self.__window.noutrefresh()
+        curses.doupdate()
+        self.__render_time += time.perf_counter() - begin
+
+    def take_stats(self):
+        """
+        :return: tuple - (render ms, cells written) since the last call
+        """
+        stats = self.__render_time * 1000, self.__written
+        self.__render_time = 0.0
+        self.__written = 0
+        return stats
+
+    def clear(self):
+        """
+        Forgets everything, e.g. after the terminal is resized
+        :return: None
+        """
+        self.__drawn = {}
+        self.__window.clear()
+
+
+class TerminalGame(object):
+
+    def __init__(self, window, bot_name: str):
+        """
+        :param window: curses window
+        :param bot_name: str - name of the bot in the registry (registry.py)
+        """
+        self.__window = window
+        self.__screen = Screen(window)
+        self.__bot_name = bot_name
+        self.__quiet = open(os.devnull, "w")  # Bots print to stdout, which would break the screen
+
+        self.__colors = {}
+        self.__init_colors()
+
+        self.__player = objects.Player()
+        self.__game = None
+        self.__bot = None
+        self.__cursor = [1, 1]
+        self.__chosen_ship = objects.BATTLESHIP
+        self.__orientation = objects.HORIZONTAL
+        self.__message = ""
+        self.__render_stats = ""
+
+    def __init_colors(self):
+        """
+        :return: None - sets up the attributes of the cells
+        """
+        attrs = {CELL_EMPTY: 0, CELL_SHIP: 0, CELL_MISS: 0, CELL_HIT: curses.A_BOLD, CELL_DESTROYED: curses.A_BOLD}
+        if curses.has_colors():
+            curses.start_color()
+            colors = {CELL_SHIP: curses.COLOR_GREEN, CELL_MISS: curses.COLOR_YELLOW,
+                      CELL_HIT: curses.COLOR_RED, CELL_DESTROYED: curses.COLOR_MAGENTA}
+            for i, (cell, color) in enumerate(colors.items()):
+                curses.init_pair(i + 1, color, curses.COLOR_BLACK)
+                attrs[cell] |= curses.color_pair(i + 1)
+        self.__colors = attrs
+
+    def run(self):
+        """
+        Arrange phase, battle phase and the result, again and again until the player quits
+        :return: None
+        """
+        curses.curs_set(0)
+        self.__window.keypad(True)
+        while self.__arrange() and self.__battle():
+            self.__player = objects.Player()
+            self.__chosen_ship = objects.BATTLESHIP
+
+    # Arrange phase
+    def __arrange(self):
+        """
+        :return: True if the battle should start, False if the player quits
+        """
+        self.__message = "Arrows: move, R: rotate, Enter: place, A: random, C: clear, S: start, Q: quit"
+        while True:
+            self.__render()
+            key = self.__window.getch()
+
+            if key in (ord("q"), ord("Q")):
+                return False
+            elif self.__move_cursor(key):
+                continue
+            elif key in (ord("r"), ord("R")):
+                self.__orientation = objects.VERTICAL if self.__orientation == objects.HORIZONTAL \
+                    else objects.HORIZONTAL
+            elif key in (ord("a"), ord("A")):
+                self.__player = brain.get_random_player()
+            elif key in (ord("c"), ord("C")):
+                self.__player = objects.Player()
+                self.__chosen_ship = objects.BATTLESHIP
+                self.__message = String.StatusFrame.WARNING_SHIPS_CLEARED
+            elif key in KEYS_ENTER:
+                self.__place_ship()
+            elif key in (ord("s"), ord("S")):
+                if self.__player.is_completed():
+                    return True
+                self.__message = String.StatusFrame.WARNING_PUT_ALL_SHIPS
+            elif key == curses.KEY_RESIZE:
+                self.__screen.clear()
+
+    def __place_ship(self):
+        """
+        Places the chosen ship at the cursor
+        :return: None
+        """
+        name = String.StatusFrame.SHIPS[4 - self.__chosen_ship][1]
+        try:
+            ship = objects.Ship(self.__chosen_ship, self.__orientation, *self.__cursor)
+            added = self.__player.add_ship(ship)
+        except objects.ShipException:
+            added = False
+
+        if not added:
+            self.__message = String.StatusFrame.WARNING_CANNOT_PUT % name
+        elif self.__player.is_completed():
+            self.__message = String.StatusFrame.WARNING_CAN_START
+        else:
+            while self.__player.get_non_placed_amount(self.__chosen_ship) == 0:
+                self.__chosen_ship -= 1
+            self.__message = ""
+
+    # Battle phase
+    def __battle(self):
+        """
+        :return: True if the player wants another game, False if the player quits
+        """
+        import registry
+
+        self.__bot = registry.create_bot(self.__bot_name)
+        self.__game = game.Game(self.__player, brain.get_hard_player())
+        self.__message = String.GameFrame.TURN_OF_PLAYER + "  Arrows: aim, Enter: shoot, Q: quit"
+        self.__screen.take_stats()
+
+        while not self.__game.is_over():
+            self.__render()
+            key = self.__window.getch()
+
+            if key in (ord("q"), ord("Q")):
+                return False
+            elif self.__move_cursor(key):
+                continue
+            elif key in KEYS_ENTER:
+                self.__shoot()
+            elif key == curses.KEY_RESIZE:
+                self.__screen.clear()
+
+        if self.__game.get_winner() == game.PLAYER:
+            self.__message = String.GameFrame.MSG_VICTORY.replace("\n", " ")
+        else:
+            self.__message = String.GameFrame.MSG_DEFEAT.replace("\n", " ")
+        self.__message += "  N: new game, Q: quit"
+        self.__render()
+
+        while True:
+            key = self.__window.getch()
+            if key in (ord("n"), ord("N")):
+                self.__game = None
+                return True
+            if key in (ord("q"), ord("Q")):
+                return False
+
+    def __shoot(self):
+        """
+        The player shoots at the cursor, then the bot shoots until it misses
+        :return: None
+        """
+        x, y = self.__cursor
+        if self.__game.get_player(game.ENEMY).is_shot(x, y):
+            return
+
+        result = self.__game.shoot(x, y)
+        self.__message = String.GameFrame.WARNING_LAST_SHOT % str((x, y)) + result.upper()
+
+        while self.__game.get_turn() == game.ENEMY and not self.__game.is_over():
+            self.__render()
+            curses.napms(BOT_SHOOT_DELAY)
+            with contextlib.redirect_stdout(self.__quiet):
+                x, y, result = self.__game.play_bot(self.__bot)
+            self.__message = String.GameFrame.TURN_OF_ENEMY + "  " \
+                + String.GameFrame.WARNING_LAST_SHOT % str((x, y)) + result.upper()
+
+        # Rendering cost of the whole turn: the player's shot and all bot's shots
+        render_ms, cells = self.__screen.take_stats()
+        self.__render_stats = "render %.2f ms / turn, %d cells" % (render_ms, cells)
+
+    def __move_cursor(self, key: int):
+        """
+        :param key: int - the pressed key
+        :return: True if the key moved the cursor
+        """
+        if key in KEYS_UP:
+            self.__cursor[1] = max(1, self.__cursor[1] - 1)
+        elif key in KEYS_DOWN:
+            self.__cursor[1] = min(10, self.__cursor[1] + 1)
+        elif key in KEYS_LEFT:
+            self.__cursor[0] = max(1, self.__cursor[0] - 1)
+        elif key in KEYS_RIGHT:
+            self.__cursor[0] = min(10, self.__cursor[0] + 1)
+        else:
+            return False
+        return True
+
+    # Rendering
+    def __render(self):
+        """
+        Draws both boards and the status lines, only changed cells reach the terminal
+        :return: None
+        """
+        begin = time.perf_counter()
+        screen = self.__screen
+
+        screen.put(1, PLAYER_LEFT, String.GameFrame.PLAYER_SHIPS)
+        self.__render_board(self.__player, PLAYER_LEFT, True, self.__game is None)
+
+        if self.__game is not None:
+            screen.put(1, ENEMY_LEFT, String.GameFrame.ENEMY_SHIPS)
+            self.__render_board(self.__game.get_player(game.ENEMY), ENEMY_LEFT, False, True)
+            status = "  ".join("%s %d" % (name[0] + name[1:].lower(), self.__get_alive(tp))
+                               for tp, name in String.StatusFrame.SHIPS)
+            screen.line(BOARD_TOP + 12, String.GameFrame.ENEMY_SHIPS + " " + status)
+        else:
+            name = String.StatusFrame.SHIPS[4 - self.__chosen_ship][1]
+            orientation = "horizontal" if self.__orientation == objects.HORIZONTAL else "vertical"
+            screen.line(BOARD_TOP + 12, "%s %s (%d left), %s" % (String.StatusFrame.MSG_CHOSEN, name,
+                        self.__player.get_non_placed_amount(self.__chosen_ship), orientation))
+
+        screen.line(BOARD_TOP + 13, self.__message)
+        screen.line(BOARD_TOP + 14, self.__render_stats, curses.A_DIM)
+        screen.flush(begin)
+
+    def __render_board(self, player: objects.Player, left: int, own: bool, with_cursor: bool):
+        """
+        :param player: Player - the player whose map is drawn
+        :param left: int - the left column of the board
+        :param own: bool - shows the ships that have not been hit if True
+        :param with_cursor: bool - highlights the cursor on this board
+        :return: None
+        """
+        for i in range(1, 11):
+            self.__screen.put(BOARD_TOP - 1, left + i * 3, " " + "ABCDEFGHIJ"[i - 1] + " ")
+            self.__screen.put(BOARD_TOP + i - 1, left, "%2d " % i)
+
+        for y in range(1, 11):
+            for x in range(1, 11):
+                cell = self.__get_cell(player, x, y, own)
+                attr = self.__colors[cell]
+                if with_cursor and [x, y] == self.__cursor:
+                    attr |= curses.A_REVERSE
+                self.__screen.put(BOARD_TOP + y - 1, left + x * 3, " " + cell + " ", attr)
+
+    @staticmethod
+    def __get_cell(player: objects.Player, x: int, y: int, own: bool):
+        """
+        :return: str - the character of the cell
+        """
+        point = player.get_point_on_map(x, y)
+        is_ship = point != 0 and point != '.'
+        if not player.is_shot(x, y):
+            return CELL_SHIP if is_ship and own else CELL_EMPTY
+        if not is_ship:
+            return CELL_MISS
+        return CELL_HIT if player.get_ship(point) is not None else CELL_DESTROYED
+
+    def __get_alive(self, tp: int):
+        """
+        :param tp: int - type of the ship
+        :return: int - amount of the enemy's ships of this type that are not destroyed
+        """
+        return self.__game.get_player(game.ENEMY).fleet_status().types[tp]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=String.APP_NAME + " (terminal)")
+    parser.add_argument("--bot", default="HardBot", help="a bot of the registry (python registry.py lists them)")
+    args = parser.parse_args()
+
+    curses.wrapper(lambda window: TerminalGame(window, args.bot).run())
+
+
+if __name__ == "__main__":
+    main()
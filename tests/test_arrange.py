@@ -0,0 +1,74 @@
+import unittest
+
+import frames
+import objects
+from res import Colors as Color
+from rules import Rules
+
+
+class Chosen:
+    """
+    The IntVar of the chosen ship type, without a Tk interpreter
+    """
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def arrange_frame(rules: Rules, tp: int, horizontal: bool):
+    """
+    :return: ArrangeFrame - with the state the preview mask is built from, no widgets
+    """
+    frame = frames.ArrangeFrame.__new__(frames.ArrangeFrame)
+    frame._ArrangeFrame__rules = rules
+    frame._ArrangeFrame__player = objects.Player(rules)
+    frame._ArrangeFrame__chosen_ship = Chosen(tp)
+    frame._ArrangeFrame__orientation = horizontal
+    frame._ArrangeFrame__preview_mask = None
+    return frame
+
+
+class PreviewMaskTest(unittest.TestCase):
+
+    def get_mask(self, frame):
+        return frame._ArrangeFrame__get_preview_mask()
+
+    def test_ship_fits_inside_the_map_only(self):
+        frame = arrange_frame(Rules(), 4, True)
+        mask = self.get_mask(frame)
+        self.assertTrue(mask[1][7][0])
+        self.assertFalse(mask[1][8][0])
+        fits, cells, background = mask[1][8]
+        self.assertEqual([point for point, _ in cells], [(8, 1), (9, 1), (10, 1)])
+        self.assertEqual(background, Color.ERROR_COLOR)
+        self.assertTrue(self.get_mask(arrange_frame(Rules(), 4, False))[7][1][0])
+
+    def test_occupied_cells_are_marked(self):
+        frame = arrange_frame(Rules(), 3, True)
+        frame._ArrangeFrame__player.add_ship(objects.Ship(1, objects.HORIZONTAL, 5, 5))
+        fits, cells, _ = self.get_mask(frame)[5][3]
+        self.assertTrue(fits)
+        self.assertEqual(dict(cells), {(3, 5): Color.SHIP_COLOR, (4, 5): Color.ERROR_COLOR,
+                                       (5, 5): Color.ERROR_COLOR})
+
+    def test_mask_is_cached_until_invalidated(self):
+        frame = arrange_frame(Rules.scaled(15), 2, True)
+        mask = self.get_mask(frame)
+        self.assertEqual(len(mask), 16)
+        self.assertIs(self.get_mask(frame), mask)
+        frame._ArrangeFrame__invalidate_preview_mask()
+        self.assertIsNot(self.get_mask(frame), mask)
+
+    def test_type_without_ships_left_marks_only_ships(self):
+        frame = arrange_frame(Rules(), 4, True)
+        frame._ArrangeFrame__player.add_ship(objects.Ship(4, objects.HORIZONTAL, 1, 1))
+        mask = self.get_mask(frame)
+        self.assertEqual(mask[1][1], (False, (), Color.SHIP_COLOR))
+        self.assertEqual(mask[5][5], (False, (), Color.MAP_COLOR))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import contextlib
+import io
+import time
+import unittest
+
+import asyncbots
+import bots
+import brain
+import game
+import registry
+from rules import Rules
+
+
+class SlowBot:
+    """
+    Thinks until it is cancelled, its best point gets better on every round
+    """
+
+    def __init__(self, rules=None):
+        self.best = None
+        self.cancelled = False
+
+    async def say(self, value, deadline):
+        try:
+            for x in range(1, 11):
+                self.best = (x, 1)
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+    def get_best(self):
+        return self.best
+
+
+class AsyncBotsTest(unittest.TestCase):
+
+    def test_sync_and_async_bots(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertFalse(asyncbots.is_async(bots.HardBot()))
+            self.assertTrue(asyncbots.is_async(bots.DensityBot()))
+            self.assertTrue(asyncbots.is_async(registry.create_bot("DensityBot", asynchronous=True)))
+            bot = registry.create_bot("DensityBot")
+            self.assertIsInstance(bot, asyncbots.SyncBot)
+            x, y = bot.say("shoot")
+        self.assertTrue(1 <= x <= 10 and 1 <= y <= 10)
+
+    def test_deadline_plays_the_best_point_so_far(self):
+        bot = SlowBot()
+        begin = time.perf_counter()
+        point = asyncio.run(asyncbots.get_move(bot, "shoot", 0.05))
+        self.assertLess(time.perf_counter() - begin, 1)
+        self.assertTrue(bot.cancelled)
+        self.assertIn(point, [(x, 1) for x in range(1, 6)])
+
+    def test_fallback_without_a_best_point(self):
+        bot = SlowBot()
+        bot.get_best = lambda: None
+        self.assertEqual(asyncio.run(asyncbots.get_move(bot, "shoot", 0.001, lambda: (3, 4))), (3, 4))
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(asyncbots.get_move(bot, "shoot", 0.001))
+
+    def test_abandoned_game_cancels_the_move(self):
+        bot = SlowBot()
+
+        async def abandon():
+            battle = game.Game(brain.get_random_player(), brain.get_random_player())
+            task = asyncio.ensure_future(asyncbots.play_game(battle, (bot, bot), budget=60))
+            await asyncio.sleep(0.02)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return battle
+
+        battle = asyncio.run(abandon())
+        self.assertTrue(bot.cancelled)
+        self.assertEqual(battle.get_history(), [])
+
+    def test_games_at_once(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            winners, moves = asyncio.run(asyncbots.play_games(4, ("DensityBot", "HardBot"), 0.5))
+        self.assertEqual(len(winners), 4)
+        self.assertNotIn(None, winners)
+        self.assertGreater(moves, 4 * 20)
+
+    def test_salvo_of_an_async_bot(self):
+        rules = Rules.scaled(10, 3)
+        battle = game.Game(brain.get_random_player(rules), brain.get_random_player(rules))
+        with contextlib.redirect_stdout(io.StringIO()):
+            players = bots.DensityBot(rules), bots.DensityBot(rules)
+            winner = asyncio.run(asyncbots.play_game(battle, players))
+        self.assertEqual(winner, battle.get_winner())
+        self.assertIsNotNone(winner)
+
+    def test_sync_bot_in_the_game_loop(self):
+        battle = game.Game(brain.get_random_player(), brain.get_random_player())
+        with contextlib.redirect_stdout(io.StringIO()):
+            players = registry.create_bot("DensityBot"), bots.HardBot()
+            while not battle.is_over():
+                battle.play_bot(players[battle.get_turn()])
+        self.assertIsNotNone(battle.get_winner())
+
+    def test_state_of_density_bot(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot = bots.DensityBot()
+            for sms in ("shoot", "shoot", "hit", "destroyed"):
+                asyncio.run(bot.say(sms, time.monotonic() + 1))
+            other = bots.DensityBot()
+            other.set_state(bot.get_state())
+        self.assertEqual(other.get_state(), bot.get_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
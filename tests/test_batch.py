@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+import batch
+import brain
+import objects
+
+SIZE = batch.SIZE
+
+
+class BatchBoardsTest(unittest.TestCase):
+
+    def test_same_results_as_player(self):
+        rng = np.random.default_rng(7)
+        players = [brain.get_random_player() for _ in range(8)]
+        boards = batch.BatchBoards.from_players(players)
+        copies = [objects.Player() for _ in players]
+        for copy, player in zip(copies, players):
+            for ship in player.get_fleet():
+                copy.add_ship(objects.Ship(*ship))
+        self.assertEqual(boards.get_alive().tolist(), [10] * len(players))
+
+        for _ in range(150):
+            cells = rng.integers(-3, batch.CELLS + 3, size=len(players))
+            codes = boards.shoot(cells)
+            for copy, cell, code in zip(copies, cells, codes):
+                x, y = (cell // SIZE + 1, cell % SIZE + 1) if 0 <= cell < batch.CELLS else (0, 0)
+                self.assertEqual(batch.RESULTS[int(code)], copy.receive_shot(x, y))
+                if code == batch.WIN:
+                    self.assertFalse(copy.is_some_ships_placed())
+
+        shots = boards.get_shots()
+        for i, copy in enumerate(copies):
+            expected = [[copy.is_shot(x, y) for y in range(1, SIZE + 1)] for x in range(1, SIZE + 1)]
+            self.assertEqual(shots[i].tolist(), expected)
+            self.assertEqual(int(boards.get_alive()[i]), len(copy.get_fleet()))
+
+    def test_sweep_ends_every_game(self):
+        boards = batch.BatchBoards(batch.random_grids(50, pool=10, seed=1))
+        results = np.stack([boards.shoot(np.full(len(boards), cell)) for cell in range(batch.CELLS)])
+        self.assertTrue(np.all(boards.get_alive() == 0))
+        self.assertTrue(np.all((results == batch.WIN).sum(0) == 1))
+        self.assertTrue(np.all((results == batch.SINK).sum(0) == 9))
+        self.assertTrue(np.all(boards.get_health()[:, 1:] == 0))
+
+    def test_views_are_read_only(self):
+        boards = batch.BatchBoards(batch.random_grids(2, pool=2, seed=2))
+        with self.assertRaises(ValueError):
+            boards.get_alive()[0] = 0
+        with self.assertRaises(ValueError):
+            boards.get_grids()[0, 0, 0] = 0
+        grid = boards.get_grids()[0]
+        ship = int(grid[grid > 0][0])
+        self.assertEqual(int(boards.get_health()[0, ship]), int((grid == ship).sum()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import contextlib
+import io
+import unittest
+
+import bots
+import brain
+import game
+from rules import Rules
+
+
+class RandomBotsTest(unittest.TestCase):
+
+    def test_shots_are_on_the_map(self):
+        for rules in (Rules(), Rules.scaled(15)):
+            bot = bots.EasyBot(rules)
+            shots = [bot.say("shoot") for _ in range(rules.size * rules.size)]
+            self.assertTrue(all(1 <= x <= rules.size and 1 <= y <= rules.size for x, y in shots))
+            self.assertEqual(len(bot.say_salvo([], 3)), 3)  # Repeated points are shot again
+
+    def test_medium_bot_does_not_repeat(self):
+        for rules in (Rules(), Rules.scaled(15)):
+            bot = bots.MediumBot(rules)
+            shots = [bot.say("hit" if i % 3 else "shoot") for i in range(rules.size * rules.size)]
+            self.assertEqual(len(set(shots)), len(shots))
+            self.assertTrue(all(1 <= x <= rules.size and 1 <= y <= rules.size for x, y in shots))
+            bot.say("shoot")  # Every point has been shot, the bot still answers
+
+    def test_medium_bot_salvo_is_capped_by_the_free_points(self):
+        bot = bots.MediumBot(Rules(salvo=3))
+        shots = []
+        for _ in range(40):
+            shots += bot.say_salvo([], 3)
+        self.assertEqual(len(shots), 100)
+        self.assertEqual(len(set(shots)), 100)
+
+    def test_medium_bot_follows_up_its_last_hit(self):
+        bot = bots.MediumBot()
+        x, y = bot.say("shoot")
+        neighbours = {(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)}
+        self.assertIn(bot.say("hit"), neighbours)
+
+    def test_games_finish(self):
+        for name in ("EasyBot", "MediumBot"):
+            battle = game.Game(brain.get_random_player(), brain.get_random_player())
+            players = getattr(bots, name)(), bots.HardBot()
+            with contextlib.redirect_stdout(io.StringIO()):
+                while not battle.is_over():
+                    battle.play_bot(players[battle.get_turn()])
+            if name == "MediumBot":
+                self.assertLessEqual(sum(side == game.PLAYER for side, _, _, _ in battle.get_history()), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
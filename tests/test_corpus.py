@@ -0,0 +1,99 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import brain
+import bots
+import corpus
+import game
+import gamelog
+import objects
+
+
+class CorpusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log = os.path.join(self.directory, "games.log")
+        self.histories = []
+        self.humans = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, games: int, humans: int = 0):
+        """
+        Appends the games to the log, the first one is played by the given humans
+        """
+        writer = gamelog.GameLogWriter(self.log)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(games):
+                player, enemy = brain.get_random_player(), brain.get_random_player()
+                battle = game.Game(player, enemy, recorder=writer.begin(player, enemy, humans=humans if i == 0 else 0))
+                players = bots.HardBot(), bots.Fati()
+                while not battle.is_over():
+                    battle.play_bot(players[battle.get_turn()])
+                battle.end_record()
+                self.histories.append(battle.get_history())
+                self.humans.append(humans if i == 0 else 0)
+        writer.close()
+
+    def test_consolidation_is_incremental(self):
+        self.record(3)
+        games = corpus.Corpus(os.path.join(self.directory, "corpus"))
+        self.assertEqual(games.consolidate(self.log), 3)
+        self.assertEqual(games.consolidate(self.log), 0)
+        self.assertEqual((len(games), games.get_version()), (3, 1))
+        self.record(2)
+        self.assertEqual(games.consolidate(self.log), 2)
+        reopened = corpus.Corpus(os.path.join(self.directory, "corpus"))
+        self.assertEqual((len(reopened), reopened.get_version()), (5, 2))
+
+    def test_queries(self):
+        self.record(4, humans=1 << game.PLAYER)
+        games = corpus.Corpus(os.path.join(self.directory, "corpus"))
+        games.consolidate(self.log)
+
+        heatmaps = games.placement_heatmaps()
+        for tp, count in ((1, 4), (2, 3), (3, 2), (4, 1)):  # Cells of the ships of the type in one fleet
+            self.assertAlmostEqual(heatmaps[tp].sum(), tp * count)
+        self.assertAlmostEqual(games.placement_heatmaps(humans_only=True)[4].sum(), 4)
+
+        cells, before = games.first_hits()
+        self.assertAlmostEqual(cells.sum(), 1)
+        shooters = sum(any(shooter == side and result in (objects.HIT, objects.DESTROYED)
+                           for shooter, _, _, result in history) for history in self.histories for side in (0, 1))
+        self.assertEqual(before.sum(), shooters)  # The loser may not have hit at all
+
+        histogram = games.shots_to_sink()
+        sunk = sum(result == objects.DESTROYED for history in self.histories for _, _, _, result in history)
+        self.assertEqual(histogram.sum(), sunk)
+        self.assertEqual(histogram[1, 1:].sum(), histogram[1].sum())  # A ship of one is sunk by one shot
+        self.assertEqual(histogram[4, :4].sum(), 0)
+
+        efficiency = games.bot_efficiency()
+        bot_shots = [shot for history, humans in zip(self.histories, self.humans) for shot in history
+                     if not humans >> shot[0] & 1]
+        self.assertEqual(efficiency["shots"].sum() + efficiency["out_of_map"], len(bot_shots))
+        self.assertEqual(efficiency["hits"].sum(),
+                         sum(result in (objects.HIT, objects.DESTROYED) for _, _, _, result in bot_shots))
+        self.assertTrue(np.all(efficiency["efficiency"] <= 1))
+
+    def test_results_are_cached_per_version(self):
+        self.record(2)
+        games = corpus.Corpus(os.path.join(self.directory, "corpus"))
+        games.consolidate(self.log)
+        first = games.first_hits()[1]
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "corpus", "cache", "first-hits-v1.npz")))
+        self.record(1)
+        games.consolidate(self.log)
+        self.assertEqual(games.first_hits()[1].sum(), first.sum() + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
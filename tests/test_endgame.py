@@ -0,0 +1,114 @@
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import bots
+import brain
+import endgame
+import game
+from rules import Rules
+from snapshot import CELLS, SIZE, Snapshot
+
+
+def get_endgame(seed: int, ships: int):
+    """
+    :return: Snapshot - a random fleet shot at random points until the given amount of ships is left
+    """
+    rng = random.Random(seed)
+    state = Snapshot.from_player(brain.get_random_player())
+    cells = list(range(CELLS))
+    rng.shuffle(cells)
+    for cell in cells:
+        if state.alive <= ships:
+            break
+        state = state.shoot(cell // SIZE + 1, cell % SIZE + 1)[0]
+    return state
+
+
+class HelpersTest(unittest.TestCase):
+
+    def test_placements(self):
+        everywhere = (1 << CELLS) - 1
+        self.assertEqual(len(endgame.get_placements(1, everywhere, 0)), CELLS)
+        self.assertEqual(len(endgame.get_placements(4, everywhere, 0)), 2 * (SIZE - 3) * SIZE)
+        # A place made only of hits is a ship that would already be destroyed
+        hits = endgame.get_mask([(1, 1), (2, 1)])
+        self.assertNotIn(hits, endgame.get_placements(2, everywhere, hits))
+
+    def test_groups_of_hits(self):
+        groups = endgame.get_groups(endgame.get_mask([(1, 1), (2, 2), (5, 5), (5, 6)]))
+        self.assertEqual(sorted(groups), sorted([endgame.get_mask([(1, 1), (2, 2)]), endgame.get_mask([(5, 5), (5, 6)])]))
+
+
+class SolverTest(unittest.TestCase):
+
+    def test_last_submarine_of_two_points(self):
+        solver = endgame.EndgameSolver()
+        free = endgame.get_mask([(2, 2), (8, 8)])
+        point = solver.get_shot(((1 << CELLS) - 1) & ~free, 0, {1: 1})
+        self.assertIn(point, [(2, 2), (8, 8)])
+        self.assertEqual((solver.stats["solved"], solver.stats["fleets"]), (1, 2))
+
+    def test_hit_ship_is_finished_next_to_the_hit(self):
+        solver = endgame.EndgameSolver()
+        hits = endgame.get_mask([(5, 5)])
+        free = endgame.get_mask([(4, 5), (6, 5), (5, 4), (5, 6)]) | hits
+        point = solver.get_shot(((1 << CELLS) - 1) & ~free | hits, hits, {2: 1})
+        self.assertIn(point, [(4, 5), (6, 5), (5, 4), (5, 6)])
+        self.assertEqual(solver.stats["fleets"], 4)
+
+    def test_gives_up(self):
+        solver = endgame.EndgameSolver(threshold=10)
+        self.assertIsNone(solver.get_shot(0, 0, {4: 1, 3: 2}))
+        self.assertEqual(solver.stats["too_many"], 1)
+        solver = endgame.EndgameSolver(deadline=0)
+        self.assertIsNone(solver.get_shot(0, 0, {1: 1}))
+        self.assertEqual(solver.stats["timeouts"], 1)
+        solver = endgame.EndgameSolver()
+        self.assertIsNone(solver.get_shot((1 << CELLS) - 1, 0, {1: 1}))  # No point is free
+        self.assertEqual(solver.stats["inconsistent"], 1)
+        self.assertIn("1 inconsistent", solver.get_telemetry())
+
+    def test_endgames_are_finished(self):
+        solver = endgame.EndgameSolver(deadline=5)
+        for seed in range(5):
+            state = get_endgame(seed, 2)
+            shots = 0
+            while not state.is_over():
+                point = solver.get_shot(*endgame.get_observation(state))
+                self.assertIsNotNone(point)
+                self.assertFalse(state.is_shot(*point))
+                state = state.shoot(*point)[0]
+                shots += 1
+            self.assertLess(shots, CELLS)
+
+
+class BattleshipBotTelemetryTest(unittest.TestCase):
+
+    def test_telemetry_is_not_printed(self):
+        directory = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                battle = game.Game(brain.get_random_player(), brain.get_random_player())
+                bot = bots.BattleshipBot()
+                players = bot, bots.HardBot()
+                while not battle.is_over():
+                    battle.play_bot(players[battle.get_turn()])
+                self.assertIsNone(bots.BattleshipBot(Rules.scaled(15)).get_endgame_telemetry())
+            telemetry = bot.get_endgame_telemetry()
+            self.assertTrue(telemetry.startswith("endgame: "))
+            self.assertNotIn("endgame: ", output.getvalue())
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import contextlib
+import io
+import shlex
+import unittest
+
+import bots
+import brain
+import engines
+import game
+import registry
+import res
+from exceptions import EngineException
+
+
+class SweepTest(unittest.TestCase):
+
+    def test_every_cell_once_then_again(self):
+        sweep = engines.Sweep()
+        shots = [sweep.say("shoot") for _ in range(res.BOARD_SIZE * res.BOARD_SIZE)]
+        self.assertEqual(len(set(shots)), len(shots))
+        self.assertEqual(shots[:2], [(1, 1), (1, 2)])
+        self.assertEqual(sweep.say("shoot"), (1, 1))
+
+
+class EngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = engines.Engine(engines.get_serve_command("Sweep"))
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_handshake_and_moves(self):
+        self.assertEqual(self.engine.name, "Sweep")
+        first, second = self.engine.new_game(), self.engine.new_game()
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.engine.ask(first, "shoot"), (1, 1))
+        self.assertEqual(self.engine.ask(first, "hit"), (1, 2))
+        self.assertEqual(self.engine.ask(second, "shoot"), (1, 1))  # Every game has a bot of its own
+        self.engine.end_game(first)
+        self.assertEqual(self.engine.new_game(), first)  # The slot is reused
+        self.engine.sync()
+
+    def test_pipelined_requests_are_answered_in_order(self):
+        slots = [self.engine.new_game() for _ in range(3)]
+        for slot in slots:
+            self.engine.request(slot, "shoot")
+        self.engine.flush()
+        with self.assertRaises(EngineException):
+            self.engine.sync()  # Not with unanswered moves
+        self.assertEqual([self.engine.read_move() for _ in slots], [(slot, 1, 1) for slot in slots])
+
+    def test_invalid_requests(self):
+        with self.assertRaises(EngineException):
+            self.engine.request(0, "miss")
+        process = self.engine._Engine__process
+        process.kill()
+        process.wait()
+        self.assertFalse(self.engine.is_alive())
+        with self.assertRaises(EngineException):
+            self.engine.ask(self.engine.new_game(), "shoot")
+
+    def test_batch(self):
+        winners, moves = engines.play_batch(self.engine, self.engine, 10)
+        self.assertEqual(len(winners), 10)
+        self.assertNotIn(None, winners)
+        self.assertLessEqual(moves, 10 * res.SPECTATE_MAX_SHOTS)
+        self.engine.sync()  # Nothing is left unanswered
+
+
+class EngineBotTest(unittest.TestCase):
+
+    def test_game_against_a_bot(self):
+        command = " ".join(shlex.quote(word) for word in engines.get_serve_command("HardBot"))
+        engine = engines.get_engine(command)
+        self.assertIs(engines.get_engine(command), engine)
+        try:
+            battle = game.Game(brain.get_random_player(), brain.get_random_player())
+            with contextlib.redirect_stdout(io.StringIO()):
+                players = registry.create_bot(res.ENGINE_PREFIX + command), bots.HardBot()
+                while not battle.is_over():
+                    battle.play_bot(players[battle.get_turn()])
+            self.assertIsNotNone(battle.get_winner())
+        finally:
+            engine.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
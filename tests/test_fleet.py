@@ -0,0 +1,91 @@
+import random
+import unittest
+
+import brain
+import objects
+from rules import Rules
+
+
+def count(player: objects.Player):
+    """
+    :return: tuple - (alive, alive by type, points left) counted over the map
+    """
+    fleet = player.get_fleet()
+    types = [0] * (player.get_rules().max_type + 1)
+    health = 0
+    for tp, _, x, y in fleet:
+        types[tp] += 1
+        health += sum(not player.is_shot(px, py) for px, py in player.get_ship_points(x, y))
+    return len(fleet), tuple(types), health
+
+
+def count_shots(player: objects.Player):
+    """
+    :return: int - shot points counted over the map
+    """
+    size = player.get_rules().size
+    return sum(player.is_shot(x, y) for x in range(1, size + 1) for y in range(1, size + 1))
+
+
+class FleetStatusTest(unittest.TestCase):
+
+    def test_counters_match_a_count_over_the_map(self):
+        rng = random.Random(4)
+        for rules in (Rules(), Rules.scaled(16)):
+            player = brain.get_random_player(rules)
+            status = player.fleet_status()
+            self.assertEqual((status.placed, status.alive, status.health), (rules.ships, rules.ships, sum(rules.fleet)))
+            self.assertTrue(player.is_completed())
+            while player.is_some_ships_placed():
+                if rng.random() < 0.5:
+                    player.receive_shot(rng.randint(1, rules.size), rng.randint(1, rules.size))
+                else:
+                    player.receive_salvo([(rng.randint(1, rules.size), rng.randint(1, rules.size)) for _ in range(3)])
+                status = player.fleet_status()
+                self.assertEqual((status.alive, status.types, status.health), count(player))
+                self.assertEqual(player.get_alive_amount(), status.alive)
+                self.assertEqual(player.get_shot_amount(), count_shots(player))
+            self.assertEqual(player.fleet_status().placed, rules.ships)
+
+    def test_status_is_made_again_after_a_change_only(self):
+        player = objects.Player()
+        player.add_ship(objects.Ship(2, objects.HORIZONTAL, 1, 1))
+        status = player.fleet_status()
+        player.receive_shot(5, 5)
+        self.assertIs(player.fleet_status(), status)
+        player.receive_shot(1, 1)
+        self.assertIsNot(player.fleet_status(), status)
+        self.assertEqual(str(player.fleet_status()), "1 of 1 ships, 1 points left")
+
+    def test_sink_listeners(self):
+        player = objects.Player()
+        player.add_ship(objects.Ship(2, objects.VERTICAL, 3, 3))
+        player.add_ship(objects.Ship(1, objects.HORIZONTAL, 8, 8))
+        sunk = []
+
+        def listener(ship_id, ship):
+            sunk.append((ship_id, ship.get_type(), player.get_ship(ship_id)))
+
+        player.add_sink_listener(listener)
+        player.receive_shot(3, 3)
+        self.assertEqual(sunk, [])
+        player.receive_shot(3, 4)
+        self.assertEqual(sunk, [(4, 2, None)])  # Told after the ship is removed
+        player.remove_sink_listener(listener)
+        player.receive_shot(8, 8)
+        self.assertEqual(len(sunk), 1)
+        self.assertFalse(player.is_some_ships_placed())
+
+    def test_restored_player_has_the_same_counters(self):
+        player = brain.get_random_player()
+        for x, y in ((1, 1), (2, 5), (6, 6), (10, 3), (4, 8), (7, 9)):
+            player.receive_shot(x, y)
+        restored = objects.Player()
+        restored.restore(player.get_fleet(True), *player.get_maps())
+        self.assertEqual(str(restored.fleet_status()), str(player.fleet_status()))
+        self.assertEqual(restored.fleet_status().types, player.fleet_status().types)
+        self.assertEqual(restored.get_shot_amount(), count_shots(player))
+
+
+if __name__ == "__main__":
+    unittest.main()
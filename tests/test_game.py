@@ -0,0 +1,83 @@
+import unittest
+
+import game
+import objects
+from res import Strings as String
+
+
+def player_with(*ships):
+    player = objects.Player()
+    for ship in ships:
+        player.add_ship(objects.Ship(*ship))
+    return player
+
+
+class ReceiveShotTest(unittest.TestCase):
+
+    def test_results(self):
+        player = player_with((2, objects.HORIZONTAL, 2, 2), (1, objects.HORIZONTAL, 9, 9))
+        self.assertEqual(player.receive_shot(5, 5), objects.MISS)
+        self.assertEqual(player.receive_shot(5, 5), objects.REPEATED)
+        self.assertEqual(player.receive_shot(0, 5), objects.REPEATED)
+        self.assertEqual(player.receive_shot(11, 1), objects.REPEATED)
+        self.assertEqual(player.receive_shot(2, 2), objects.HIT)
+        self.assertEqual(player.receive_shot(3, 2), objects.DESTROYED)
+        self.assertTrue(player.is_some_ships_placed())
+        self.assertEqual(player.receive_shot(9, 9), objects.DESTROYED)
+        self.assertFalse(player.is_some_ships_placed())
+
+    def test_points_around_a_destroyed_ship_are_shot(self):
+        player = player_with((2, objects.VERTICAL, 5, 5))
+        player.receive_shot(5, 5)
+        self.assertFalse(player.is_shot(4, 4))
+        player.receive_shot(5, 6)
+        around = [(x, y) for x in range(4, 7) for y in range(4, 8)]
+        self.assertTrue(all(player.is_shot(x, y) for x, y in around))
+        self.assertEqual(player.receive_shot(4, 7), objects.REPEATED)
+        self.assertFalse(player.is_shot(3, 5))
+
+
+class Bot:
+
+    def __init__(self, points):
+        self.points = list(points)
+        self.messages = []
+
+    def say(self, value):
+        self.messages.append(value)
+        return self.points.pop(0)
+
+
+class GameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.battle = game.Game(player_with((2, objects.HORIZONTAL, 1, 1)), player_with((1, objects.HORIZONTAL, 5, 5)))
+
+    def test_hit_keeps_the_turn_and_a_miss_passes_it(self):
+        battle = game.Game(player_with((2, objects.HORIZONTAL, 1, 1)), player_with((2, objects.HORIZONTAL, 5, 5)))
+        self.assertEqual(battle.shoot(5, 5), objects.HIT)
+        self.assertEqual(battle.get_turn(), game.PLAYER)
+        self.assertEqual(battle.shoot(9, 9), objects.MISS)
+        self.assertEqual(battle.get_turn(), game.ENEMY)
+        self.assertEqual(battle.shoot(1, 1), objects.HIT)
+        self.assertEqual(battle.shoot(1, 1), objects.REPEATED)  # A wasted shot passes the turn too
+        self.assertEqual(battle.get_turn(), game.PLAYER)
+        self.assertFalse(battle.is_over())
+        self.assertEqual(battle.get_history()[:2], [(game.PLAYER, 5, 5, objects.HIT), (game.PLAYER, 9, 9, objects.MISS)])
+
+    def test_bots_are_told_their_results(self):
+        enemy = Bot([(3, 3), (1, 1), (2, 1)])
+        player = Bot([(9, 9), (8, 8)])
+        self.assertEqual(self.battle.play_bot(player), (9, 9, objects.MISS))
+        self.assertEqual(self.battle.play_bot(enemy), (3, 3, objects.MISS))
+        self.battle.play_bot(player)
+        self.battle.play_bot(enemy)
+        self.assertEqual(self.battle.play_bot(enemy), (2, 1, objects.DESTROYED))
+        self.assertEqual(enemy.messages, [String.GameFrame.BOT_SHOOT, String.GameFrame.BOT_SHOOT,
+                                          String.GameFrame.BOT_HIT])
+        self.assertTrue(self.battle.is_over())
+        self.assertEqual(self.battle.get_winner(), game.ENEMY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import brain
+import bots
+import game
+import gamelog
+import objects
+
+
+def replay_from_start(replay: gamelog.GameReplay, move: int):
+    players = objects.Player(), objects.Player()
+    for kind, side, x, y, tp, orientation, _, _, _ in replay.events():
+        if kind == gamelog.PLACE:
+            players[side].add_ship(objects.Ship(tp, orientation, x, y))
+    for i in range(move):
+        side, x, y, _, _, _ = replay.get_move(i)
+        players[1 - side].receive_shot(x, y)
+    return players
+
+
+class GameLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "games.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, games: int):
+        writer = gamelog.GameLogWriter(self.path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(games):
+                player, enemy = brain.get_random_player(), brain.get_random_player()
+                battle = game.Game(player, enemy, recorder=writer.begin(player, enemy))
+                players = bots.HardBot(), bots.Fati()
+                while not battle.is_over():
+                    battle.play_bot(players[battle.get_turn()])
+                battle.end_record()
+        writer.close()
+        return gamelog.GameLog(self.path)
+
+    def assertSamePlayers(self, players, expected):
+        for side in (game.PLAYER, game.ENEMY):
+            self.assertEqual(players[side].get_maps(), expected[side].get_maps())
+            self.assertEqual(players[side].get_fleet(), expected[side].get_fleet())
+            self.assertEqual(str(players[side].fleet_status()), str(expected[side].fleet_status()))
+
+    def test_index_finds_every_game_and_move(self):
+        log = self.record(3)
+        self.assertEqual(len(log), 3)
+        for replay in log:
+            self.assertIsNotNone(replay.winner)
+            last = replay.get_move(replay.moves - 1)
+            self.assertEqual(last[3], objects.DESTROYED)
+            with self.assertRaises(IndexError):
+                replay.get_move(replay.moves)
+        with self.assertRaises(IndexError):
+            log.get_game(3)
+        log.close()
+
+    def test_positions_from_checkpoints(self):
+        log = self.record(2)
+        checkpoints = sum(kind == gamelog.CHECKPOINT for kind, *_ in log.events())
+        self.assertEqual(checkpoints, sum(replay.moves // gamelog.CHECKPOINT_MOVES for replay in log) * 2 *
+                         gamelog.CHECKPOINT_RECORDS)
+        for replay in log:
+            self.assertGreater(replay.moves, gamelog.CHECKPOINT_MOVES)
+            for move in range(replay.moves + 1):
+                self.assertSamePlayers(replay.get_players(move), replay_from_start(replay, move))
+        log.close()
+
+    def test_log_without_checkpoints(self):
+        period = gamelog.CHECKPOINT_MOVES
+        gamelog.CHECKPOINT_MOVES = 0  # As the logs written before the checkpoints
+        try:
+            log = self.record(1)
+        finally:
+            gamelog.CHECKPOINT_MOVES = period
+        self.assertFalse(any(kind == gamelog.CHECKPOINT for kind, *_ in log.events()))
+        replay = log.get_game(0)
+        self.assertSamePlayers(replay.get_players(replay.moves), replay_from_start(replay, replay.moves))
+        log.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import hotreload
+import registry
+from rules import DEFAULT_RULES
+
+SOURCE = '''
+BOTS = {"CountBot": {"difficulty": "easy"}}
+
+
+class CountBot:
+    def __init__(self, rules):
+        self.shots = 0
+
+    def say(self, value):
+        self.shots += 1
+        return %s
+
+    def get_state(self):
+        return bytes([self.shots])
+
+    def set_state(self, state):
+        %s
+'''
+
+
+class HotReloadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "count.py")
+        self.write("(1, 1)", "self.shots = state[0]")
+        self.registry = registry.Registry(self.directory, entry_points=False)
+        self.watcher = hotreload.BotWatcher(self.registry)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        sys.modules.pop(registry.PLUGIN_MODULE + "count", None)
+
+    def write(self, point: str, set_state: str, version: int = 0):
+        with open(self.path, "w") as file:
+            file.write(SOURCE % (point, set_state))
+        os.utime(self.path, ns=(version * 10 ** 9, version * 10 ** 9))  # Editors may save within one tick
+
+    def test_changed_bot_keeps_its_state(self):
+        bot = self.registry.create_bot("CountBot")
+        self.assertTrue(self.watcher.watch("CountBot"))
+        self.assertFalse(self.watcher.watch("engine:./mybot"))
+        bot.say("shoot")
+        bot.say("shoot")
+        self.assertEqual(self.watcher.poll(), [])
+
+        self.write("(2, 2)", "self.shots = state[0]", 1)
+        self.assertEqual(self.watcher.poll(), ["CountBot"])
+        self.assertEqual(self.watcher.poll(), [])
+        new_bot, kept, elapsed = hotreload.reload_bot(self.registry, "CountBot", bot, DEFAULT_RULES)
+        self.assertTrue(kept)
+        self.assertGreater(elapsed, 0)
+        self.assertEqual(new_bot.shots, 2)
+        self.assertEqual(new_bot.say("shoot"), (2, 2))
+        self.assertEqual(bot.say("shoot"), (1, 1))  # The old object keeps its class
+        self.assertIs(type(self.registry.create_bot("CountBot")), type(new_bot))
+
+    def test_incompatible_state_starts_over(self):
+        bot = self.registry.create_bot("CountBot")
+        bot.say("shoot")
+        self.write("(3, 3)", "raise ValueError('a new layout')", 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            new_bot, kept, _ = hotreload.reload_bot(self.registry, "CountBot", bot)
+        self.assertFalse(kept)
+        self.assertEqual(new_bot.shots, 0)
+
+    def test_broken_file_keeps_the_old_class(self):
+        bot_class = self.registry.get_bot_class("CountBot")
+        with open(self.path, "a") as file:
+            file.write("def broken(:\n")
+        with self.assertRaises(SyntaxError):
+            hotreload.reload_bot(self.registry, "CountBot")
+        self.assertIs(self.registry.get_bot_class("CountBot"), bot_class)
+        self.assertIs(sys.modules[registry.PLUGIN_MODULE + "count"].CountBot, bot_class)
+
+
+if __name__ == "__main__":
+    unittest.main()
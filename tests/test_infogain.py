@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+import endgame
+import infogain
+from snapshot import CELLS, SIZE
+
+
+class ObserverTest(unittest.TestCase):
+
+    def test_destroyed_ship_is_taken_from_the_hits(self):
+        observer = infogain.Observer()
+        self.assertEqual(observer.remaining, {4: 1, 3: 2, 2: 3, 1: 4})
+        for point in ((5, 5), (5, 6)):
+            observer.shot(*point)
+        observer.hit(5, 5)
+        observer.destroyed(5, 6)
+        self.assertEqual(observer.hits, 0)
+        self.assertEqual(observer.remaining[2], 2)
+        self.assertEqual(observer.shots, endgame.get_mask([(x, y) for x in range(4, 7) for y in range(4, 8)]))
+
+
+class SamplingTest(unittest.TestCase):
+
+    def test_samples_agree_with_the_observation(self):
+        shots = endgame.get_mask([(1, 1), (3, 3), (5, 5)])
+        hits = endgame.get_mask([(5, 5)])
+        lengths = (4, 3, 3, 2, 2, 2, 1, 1, 1, 1)
+        grids = np.zeros((50, CELLS), np.int8)
+        first, made = infogain.sample((shots, hits, lengths, 0, 50, float("inf"), 1), grids)
+        self.assertEqual((first, made), (0, 50))
+        self.assertTrue(np.all(grids[:, [0, 2 * SIZE + 2]] == 0))  # Misses
+        self.assertTrue(np.all(grids[:, 4 * SIZE + 4] > 0))  # The hit
+        self.assertTrue(all(sorted(np.bincount(row)[1:].tolist(), reverse=True) == list(lengths) for row in grids))
+
+        cells = [cell for cell in range(CELLS) if not shots >> cell & 1]
+        counts = infogain.evaluate((cells, [(0, 50)], shots), grids)
+        self.assertTrue(np.all(counts.sum(0) == 50))
+        self.assertTrue(np.all(counts >= 0))
+
+    def test_estimator(self):
+        estimator = infogain.Estimator(workers=0, budget=1, samples=200)  # The samples fill up long before
+        free = endgame.get_mask([(2, 2), (8, 8)])
+        self.assertIn(estimator.get_shot(((1 << CELLS) - 1) & ~free, 0, {1: 1}), [(2, 2), (8, 8)])
+        self.assertIsNone(estimator.get_shot((1 << CELLS) - 1, 0, {1: 1}))  # Nothing fits
+        shots = estimator.get_shots(0, 0, {4: 1, 3: 2, 2: 3, 1: 4}, 3)
+        self.assertEqual(len(set(shots)), 3)
+        self.assertTrue(estimator.get_telemetry().startswith("infogain: 0 workers, 2 moves"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import instrumentation
+
+
+class Tcl:
+    """
+    Stands in for the Tcl interpreter of a root
+    """
+
+    def call(self, *args):
+        return args
+
+    def eval(self, script):
+        return script
+
+
+def frames_callback(name: str):
+    def callback(tcl, amount):
+        for _ in range(amount):
+            tcl.call("update")
+        return amount
+
+    callback.__module__ = "frames"
+    callback.__qualname__ = name
+    return callback
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = instrumentation.Profiler(None)
+        self.tcl = instrumentation.TclCounter(Tcl())
+        self.profiler._Profiler__counter = self.tcl
+
+    def test_counter_passes_calls_through(self):
+        self.assertEqual(self.tcl.call("after", "idle"), ("after", "idle"))
+        self.assertEqual(self.tcl.eval("set x"), "set x")
+        self.assertEqual(self.tcl.calls, 1)
+
+    def test_only_callbacks_of_the_frames_are_wrapped(self):
+        callback = frames_callback("GameFrame.__on_tick")
+        wrapped = self.profiler.wrap(callback, "after")
+        self.assertIsNot(wrapped, callback)
+        self.assertIs(self.profiler.wrap(wrapped, "after"), wrapped)
+        other = frames_callback("SpectateHelper.step")
+        self.assertIs(self.profiler.wrap(other, "after"), other)
+        self.assertIs(self.profiler.wrap(print, "command"), print)
+
+    def test_calls_are_measured_and_exported(self):
+        wrapped = self.profiler.wrap(frames_callback("MapBuilder.<locals>.<lambda>"), "<Enter>")
+        self.assertEqual(wrapped(self.tcl, 3), 3)
+        wrapped(self.tcl, 1)
+        stats = self.profiler._Profiler__stats
+        self.assertEqual(list(stats), ["MapBuilder <Enter>"])
+        calls, total, longest, tcl_calls = stats["MapBuilder <Enter>"]
+        self.assertEqual((calls, tcl_calls), (2, 4))
+        self.assertGreaterEqual(total, longest)
+
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "trace.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.profiler.export(path)
+            with open(path) as file:
+                events = json.load(file)["traceEvents"]
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual([event["args"]["tcl_calls"] for event in events], [3, 1])
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in events))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import brain
+import netclient
+import objects
+import server
+
+
+class Root:
+    """
+    The after() of a Tk widget, the callbacks are run by the test
+    """
+
+    def __init__(self):
+        self.jobs = {}
+
+    def after(self, ms, callback):
+        job = object()
+        self.jobs[job] = callback
+        return job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run(self):
+        jobs, self.jobs = self.jobs, {}
+        for callback in jobs.values():
+            callback()
+
+
+class PlayerTest(unittest.TestCase):
+
+    def test_fleet_and_ship_points(self):
+        player = objects.Player()
+        player.add_ship(objects.Ship(3, objects.VERTICAL, 2, 4))
+        player.add_ship(objects.Ship(1, objects.HORIZONTAL, 9, 9))
+        self.assertEqual(player.get_fleet(), [[3, objects.VERTICAL, 2, 4], [1, objects.HORIZONTAL, 9, 9]])
+        self.assertEqual(player.get_ship_points(2, 5), [[2, 4], [2, 5], [2, 6]])
+        player.receive_shot(9, 9)
+        self.assertEqual(player.get_fleet(), [[3, objects.VERTICAL, 2, 4]])
+        self.assertEqual(player.get_fleet(True)[1], [1, objects.HORIZONTAL, 9, 9])
+        self.assertEqual(player.get_ship_points(9, 9), [[9, 9]])
+
+
+class RemoteGameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.listener = self.loop.run_until_complete(server.GameServer().start("127.0.0.1", 0))
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.listener.close()
+        self.loop.run_until_complete(self.cancel_connections())
+        self.loop.close()
+
+    @staticmethod
+    async def cancel_connections():
+        """
+        Cancels the tasks of the connections like asyncio.run does
+        """
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def wait_for(self, root, messages, kind):
+        """
+        Polls like the Tk loop until a message of the kind comes
+        :return: dict - the message
+        """
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            root.run()
+            for message in messages:
+                if message["type"] == kind:
+                    messages.remove(message)
+                    return message
+            time.sleep(0.01)
+        self.fail("no %s message" % kind)
+
+    def test_game_through_the_queues(self):
+        root = Root()
+        messages = []
+        remote = netclient.RemoteGame(root, "127.0.0.1", self.port)
+        remote.start(messages.append, brain.get_random_player().get_fleet())
+        self.wait_for(root, messages, "connected")
+        joined = self.wait_for(root, messages, "joined")
+        self.assertEqual(joined["side"], 0)
+        if not self.wait_for(root, messages, "start")["turn"]:
+            while not self.wait_for(root, messages, "turn")["yours"]:
+                pass
+
+        self.assertTrue(remote.shoot(1, 1))
+        result = self.wait_for(root, messages, "result")
+        self.assertEqual((result["x"], result["y"], result["by"]), (1, 1, "you"))
+        self.assertIsNotNone(remote.rtt)  # The answer has the id of the shot
+        remote.close()
+        self.assertEqual(root.jobs, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
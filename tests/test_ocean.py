@@ -0,0 +1,70 @@
+import random
+import unittest
+
+import objects
+import ocean
+from exceptions import ShipException
+from rules import Rules
+
+
+class ChunkedBitsetTest(unittest.TestCase):
+
+    def test_chunks_are_allocated_on_first_use(self):
+        bits = ocean.ChunkedBitset(8)
+        self.assertFalse(bits.get(100000, 3))
+        self.assertEqual(bits.get_chunks(), 0)
+        self.assertTrue(bits.set(100000, 3))
+        self.assertFalse(bits.set(100000, 3))
+        self.assertTrue(bits.set(100007, 0))
+        self.assertEqual(bits.get_chunks(), 1)
+        self.assertTrue(bits.set(100008, 0))
+        self.assertEqual(bits.get_chunks(), 2)
+        self.assertTrue(bits.get(100000, 3) and bits.get(100008, 0))
+        self.assertFalse(bits.get(100001, 3))
+
+
+class OceanPlayerTest(unittest.TestCase):
+
+    def test_same_as_player(self):
+        for size in (10, 23):
+            rules = Rules.scaled(size)
+            rng = random.Random(size)
+            sea = ocean.get_random_ocean(rules, rng)
+            player = objects.Player(rules)
+            for ship in sea.get_fleet():
+                self.assertTrue(player.add_ship(objects.Ship(*ship, rules)))
+            self.assertTrue(sea.is_completed() and player.is_completed())
+
+            sunk = []
+            sea.add_sink_listener(lambda ship_id, ship: sunk.append(ship_id))
+            while player.is_some_ships_placed():
+                x, y = rng.randint(0, size + 1), rng.randint(1, size)
+                self.assertEqual(sea.receive_shot(x, y), player.receive_shot(x, y))
+                self.assertEqual(str(sea.fleet_status()), str(player.fleet_status()))
+            self.assertFalse(sea.is_some_ships_placed())
+            self.assertEqual(sorted(sunk), list(range(1, rules.ships + 1)))
+            for x in range(1, size + 1):
+                for y in range(1, size + 1):
+                    self.assertEqual(sea.is_shot(x, y), player.is_shot(x, y))
+                    self.assertEqual(sea.get_point_on_map(x, y), player.get_point_on_map(x, y))
+
+    def test_huge_board(self):
+        rules = Rules(100000, (4, 3, 1))
+        sea = ocean.OceanPlayer(rules)
+        self.assertTrue(sea.add_ship(objects.Ship(4, objects.HORIZONTAL, 99997, 5, rules)))
+        self.assertFalse(sea.add_ship(objects.Ship(3, objects.VERTICAL, 99996, 6, rules)))  # Touches by a corner
+        self.assertTrue(sea.add_ship(objects.Ship(1, objects.HORIZONTAL, 1, 1, rules)))
+        self.assertEqual(sea.get_non_placed_amount(3), 1)
+        self.assertEqual(sea.receive_salvo([(1, 1), (1, 1), (100001, 1)]),
+                         [objects.DESTROYED, objects.REPEATED, objects.REPEATED])
+        self.assertTrue(sea.is_shot(2, 2))
+        self.assertEqual(sea.receive_shot(99998, 5), objects.HIT)
+        self.assertEqual(sea.get_ship_points(99998, 5), [[99997 + i, 5] for i in range(4)])
+        self.assertEqual(sea.get_alive_amount(), 1)
+        self.assertEqual(sea.get_shot_chunks(), 2)
+        with self.assertRaises(ShipException):
+            sea.add_ship(objects.Ship(4, objects.HORIZONTAL, 50, 50, rules))
+
+
+if __name__ == "__main__":
+    unittest.main()
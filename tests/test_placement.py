@@ -0,0 +1,91 @@
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import brain
+import objects
+import placement
+import res
+from rules import Rules
+
+
+def is_valid(fleet: list):
+    player = objects.Player()
+    return all(player.add_ship(objects.Ship(*ship)) for ship in fleet) and player.is_completed()
+
+
+class PlacementTest(unittest.TestCase):
+
+    def test_key_ignores_the_order_of_the_ships(self):
+        fleet = brain.get_random_player().get_fleet()
+        self.assertEqual(placement.get_key(fleet), placement.get_key(fleet[::-1]))
+
+    def test_mutants_are_valid_fleets(self):
+        rng = random.Random(5)
+        fleet = brain.get_random_player().get_fleet()
+        for _ in range(20):
+            mutant = placement.mutate(fleet, rng)
+            self.assertTrue(is_valid(mutant))
+            self.assertEqual([ship[0] for ship in mutant], list(res.LIST_OF_SHIPS))
+            self.assertIn(sum(ship not in fleet for ship in mutant), (0, 1, 2))  # A ship may land where it was
+        self.assertEqual(placement.mutate(fleet, random.Random(1)), placement.mutate(fleet, random.Random(1)))
+
+    def test_play(self):
+        fleet = brain.get_random_player().get_fleet()
+        key, shots = placement.play((fleet, "HardBot", 2))
+        self.assertEqual(key, placement.get_key(fleet))
+        self.assertTrue(2 * 20 <= shots <= 2 * res.PLACEMENT_MAX_SHOTS)
+
+
+class OptimizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+        brain._hard_fleets = None
+
+    def test_library(self):
+        optimizer = placement.PlacementOptimizer(("HardBot",), 1, workers=1)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                optimizer.run(4, 2, seed=3)
+            fleets = [brain.get_random_player().get_fleet()]
+            optimizer.evaluate(fleets)
+            optimizer.played = 0
+            optimizer.evaluate(fleets)  # Already played
+            self.assertEqual(optimizer.played, 0)
+            library = optimizer.get_library(3)
+        finally:
+            optimizer.close()
+
+        self.assertEqual(len(library), 3)
+        self.assertEqual([fleet["shots"] for fleet in library], sorted((fleet["shots"] for fleet in library),
+                                                                       reverse=True))
+        self.assertTrue(all(is_valid(fleet["ships"]) for fleet in library))
+
+        placement.save_library(res.Strings.FLEET_LIBRARY, library, ("HardBot",), 1)
+        with open(res.Strings.FLEET_LIBRARY) as file:
+            self.assertEqual(json.load(file)["shooters"], ["HardBot"])
+        brain._hard_fleets = None
+        fleets = [placement.get_key(fleet["ships"]) for fleet in library]
+        self.assertIn(placement.get_key(brain.get_hard_player().get_fleet()), fleets)
+
+    def test_random_player_without_a_library(self):
+        rules = Rules.scaled(10, True)
+        player = brain.get_hard_player(rules)  # The working directory has no library
+        self.assertIs(player.get_rules(), rules)
+        self.assertTrue(player.is_completed())
+
+
+if __name__ == "__main__":
+    unittest.main()
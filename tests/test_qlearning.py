@@ -0,0 +1,98 @@
+import tracemalloc
+import unittest
+
+import numpy as np
+
+import qlearning
+
+
+class ClassesTest(unittest.TestCase):
+
+    def test_symmetric_points_share_a_class(self):
+        size = 10
+        classes, amount = qlearning.get_classes(size)
+        self.assertEqual(amount, 15)
+        for x in range(1, size + 1):
+            for y in range(1, size + 1):
+                images = {(y, x), (size + 1 - x, y), (x, size + 1 - y), (size + 1 - y, size + 1 - x)}
+                self.assertEqual({classes[i][j] for i, j in images}, {classes[x][y]})
+        self.assertTrue((classes[0] == amount).all() and (classes[:, -1] == amount).all())
+
+    def test_plain_classes(self):
+        _, amount = qlearning.get_classes(7, symmetric=False)
+        self.assertEqual(amount, 49)
+        self.assertEqual(qlearning.get_classes(7)[1], 10)
+
+
+class QTableTest(unittest.TestCase):
+
+    def test_a_shot_teaches_every_equivalent_point(self):
+        table = qlearning.QTable(10, rate=0.5)
+        table.learn(table.get_action(1, 2), 10)
+        for x, y in ((1, 2), (2, 1), (10, 9), (9, 10), (1, 9), (2, 10), (10, 2), (9, 1)):
+            self.assertEqual(table.get(x, y), 5)
+        self.assertEqual(table.get(1, 1), 0)
+        self.assertEqual(table.get(0, 0), 0)
+
+    def test_batch_learns_as_single_updates(self):
+        table, single = qlearning.QTable(10), qlearning.QTable(10)
+        actions = np.array([0, 3, 7, 14])
+        rewards = np.array([10.0, -1.0, 50.0, 10.0])
+        table.learn_batch(actions, rewards)
+        for action, reward in zip(actions, rewards):
+            single.learn(action, reward)
+        np.testing.assert_allclose(table.values, single.values)
+
+    def test_rows_round_trip_and_old_maps(self):
+        table = qlearning.QTable(10)
+        for action in range(table.amount):
+            table.learn(action, action)
+        restored = qlearning.QTable(10)
+        restored.set_rows(table.get_rows())
+        np.testing.assert_allclose(restored.values, table.values)
+
+        old = [[0] * 12 for _ in range(12)]
+        old[1][1] = 40  # The corners are a class, the mean is taken
+        restored.set_rows(old)
+        self.assertEqual(restored.get(10, 10), 10)
+        with self.assertRaises(ValueError):
+            restored.set_rows([[0] * 5] * 5)
+
+
+class ReplayBufferTest(unittest.TestCase):
+
+    def test_ring_keeps_the_newest(self):
+        buffer = qlearning.ReplayBuffer(capacity=4, batch=64, seed=1)
+        self.assertIsNone(buffer.sample())
+        for i in range(6):
+            buffer.push(i, i, i * 10)
+        self.assertEqual(len(buffer), 4)
+        states, actions, rewards = buffer.sample()
+        self.assertEqual(set(states), {2, 3, 4, 5})
+        np.testing.assert_array_equal(actions, states)
+        np.testing.assert_array_equal(rewards, states * 10)
+
+    def test_hot_path_reuses_its_arrays(self):
+        learner = qlearning.QLearner(10, qlearning.ReplayBuffer(capacity=256, seed=2))
+        for i in range(300):
+            learner.remember(i, 1 + i % 10, 1 + i // 10 % 10, 10)
+        batch = learner.buffer.sample()
+        self.assertIs(learner.buffer.sample(), batch)
+        self.assertGreater(learner.replays, 0)
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            for i in range(2000):
+                learner.remember(i, 1 + i % 10, 1 + i // 10 % 10, -1)
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        domain = tracemalloc.DomainFilter(True, np.lib.tracemalloc_domain)
+        grown = sum(stat.size_diff for stat in after.filter_traces([domain]).compare_to(
+            before.filter_traces([domain]), "filename"))
+        self.assertLessEqual(grown, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import bots
+import qstore
+
+
+class QStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "q")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_new_store_starts_from_the_initial_values(self):
+        store = qstore.QStore(self.path, 4, np.arange(4.0))
+        np.testing.assert_array_equal(store.snapshot(), [0, 1, 2, 3])
+        store.close()
+        store = qstore.QStore(self.path, 4, np.zeros(4))  # An existing store keeps its values
+        np.testing.assert_array_equal(store.snapshot(), [0, 1, 2, 3])
+        store.close()
+        with self.assertRaises(ValueError):
+            qstore.QStore(self.path, 5)
+
+    def test_merge_folds_every_log(self):
+        store = qstore.QStore(self.path, 3)
+        store.append(np.array([1.0, 0, 2]))
+        store.append(np.array([0, 0.5, 0]))
+        self.assertEqual(store.get_merges(), 0)
+        np.testing.assert_array_equal(store.snapshot(), [0, 0, 0])
+        self.assertEqual(store.merge(), 3)
+        np.testing.assert_array_equal(store.snapshot(), [1, 0.5, 2])
+        self.assertEqual(store.merge(), 0)
+        self.assertEqual(store.get_merges(), 1)
+        self.assertEqual(sorted(os.listdir(self.directory)), ["q.lock", "q.q"])
+        store.close()
+
+    def test_logs_left_by_a_crash_are_merged(self):
+        store = qstore.QStore(self.path, 2)
+        records = np.zeros(2, qstore.DELTA)
+        records["value"] = (0, 7)  # The second one is out of the store
+        records["delta"] = (3, 1)
+        with open(self.path + ".99.qlog.4" + qstore.MERGING, "wb") as file:
+            file.write(records.tobytes() + b"\x01\x02")  # And a record cut short
+        self.assertEqual(store.merge(), 1)
+        np.testing.assert_array_equal(store.snapshot(), [3, 0])
+        store.close()
+
+    def test_sync_shares_what_stores_learn(self):
+        first, second = qstore.QStore(self.path, 2), qstore.QStore(self.path, 2)
+        a, b = np.zeros(2), np.zeros(2)
+        first.load(a)
+        second.load(b)
+        a[0] += 5
+        b[1] += 2
+        first.sync(a)
+        second.sync(b)
+        first.sync(a)
+        np.testing.assert_array_equal(a, [5, 2])
+        np.testing.assert_array_equal(b, [5, 2])
+        first.close()
+        second.close()
+
+    def test_many_processes(self):
+        value, torn, rate, _ = qstore.stress(self.path, 6, 150, 8, readers=2)
+        self.assertEqual(value, 6 * 150)
+        self.assertEqual(torn, 0)
+        self.assertGreater(rate, 0)
+
+
+class BattleshipBotStoreTest(unittest.TestCase):
+
+    def test_bot_learns_into_the_store(self):
+        directory = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            initial = [[0] * 12 for _ in range(12)]
+            initial[1][1] = 8
+            with open("reinforcement_data.json", "w") as file:
+                file.write(str(initial))
+            with contextlib.redirect_stdout(io.StringIO()):
+                bot = bots.BattleshipBot()
+                self.assertEqual(bot.get_reinforcement_data()[10][10], 2)  # The mean of the 4 corners
+                bot.say("shoot")
+                bot.say("hit")
+                other = bots.BattleshipBot()
+            self.assertEqual(other.get_reinforcement_data(), bot.get_reinforcement_data())
+            self.assertNotEqual(other.get_reinforcement_data()[1][1:11], initial[1][1:11])
+            with open("reinforcement_data.json") as file:
+                self.assertEqual(file.read(), str(initial))
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
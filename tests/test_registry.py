@@ -0,0 +1,99 @@
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+from importlib import metadata
+
+import registry
+from rules import Rules, DEFAULT_RULES
+
+PLUGIN = textwrap.dedent('''
+    import time
+
+    BOTS = {"CornerBot": {"difficulty": "easy"}, "SlowBot": {"class": "Slow", "heavy": True, "standard": True}}
+    warmed = []
+
+
+    class CornerBot:
+        def __init__(self, rules):
+            self.size = rules.size
+
+        def say(self, value):
+            return self.size, self.size
+
+
+    class Slow(CornerBot):
+        @staticmethod
+        def warm_up(rules):
+            time.sleep(0.05)
+            warmed.append(rules.size)
+''')
+
+
+class RegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, "corner.py"), "w") as file:
+            file.write(PLUGIN)
+        with open(os.path.join(self.directory, "broken.py"), "w") as file:
+            file.write("BOTS = {'Broken': {'difficulty': 'impossible'}}\n")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.registry = registry.Registry(self.directory, entry_points=False)
+            self.registry.discover()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        sys.modules.pop(registry.PLUGIN_MODULE + "corner", None)
+
+    def test_builtin_bots_by_difficulty_and_rules(self):
+        names = self.registry.get_names()
+        self.assertEqual(names[:6], ["HardBot", "BattleshipBot", "Fati", "MediumBot", "EasyBot", "InfoBot"])
+        self.assertEqual(self.registry.get_names("easy"), ["EasyBot", "CornerBot"])
+        self.assertNotIn("InfoBot", self.registry.get_names(rules=Rules.scaled(20)))
+        self.assertNotIn("Broken", names)
+        with self.assertRaises(ValueError):
+            self.registry.get("NoBot")
+        with self.assertRaises(ValueError):
+            self.registry.create_bot("InfoBot", Rules.scaled(20))
+        with self.assertRaises(ValueError):  # An engine is not started for a board it does not play
+            self.registry.create_bot("engine:./nosuchengine", Rules(salvo=3))
+
+    def test_plugin_is_imported_when_chosen(self):
+        module = registry.PLUGIN_MODULE + "corner"
+        self.assertIn("CornerBot", self.registry.get_names())
+        self.assertNotIn(module, sys.modules)
+        bot = self.registry.create_bot("CornerBot", Rules.scaled(12))
+        self.assertIn(module, sys.modules)
+        self.assertEqual(bot.say("shoot"), (12, 12))
+        self.assertIs(self.registry.get_bot_class("SlowBot"), sys.modules[module].Slow)
+
+    def test_heavy_bot_is_warmed_up_once_before_it_is_created(self):
+        self.assertIsNone(self.registry.warm_up("CornerBot"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            thread = self.registry.warm_up("SlowBot", DEFAULT_RULES)
+            self.assertIsNotNone(thread)
+            self.assertIsNone(self.registry.warm_up("SlowBot", DEFAULT_RULES))
+            self.registry.create_bot("SlowBot")
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(sys.modules[registry.PLUGIN_MODULE + "corner"].warmed, [10])
+
+    def test_entry_point(self):
+        point = metadata.EntryPoint("DeepBot", "deep.bots:Deep [hard heavy]", registry.ENTRY_POINTS)
+        info = registry.read_entry_point(point)
+        self.assertEqual((info.name, info.module, info.attribute, info.difficulty, info.heavy, info.standard),
+                         ("DeepBot", "deep.bots", "Deep", "hard", True, False))
+
+    def test_builtin_bots_are_created(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name in ("HardBot", "Fati", "MediumBot", "EasyBot"):
+                bot = self.registry.create_bot(name, Rules.scaled(12))
+                self.assertEqual(type(bot).__name__, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import contextlib
+import io
+import unittest
+
+import bots
+import brain
+import game
+import objects
+import res
+from rules import Rules, DEFAULT_RULES
+
+
+class RulesTest(unittest.TestCase):
+
+    def test_standard_rules(self):
+        rules = Rules()
+        self.assertEqual(rules, DEFAULT_RULES)
+        self.assertEqual(hash(rules), hash(DEFAULT_RULES))
+        self.assertEqual(rules.fleet, (4, 3, 3, 2, 2, 2, 1, 1, 1, 1))
+        self.assertEqual([rules.get_amount(tp) for tp in range(6)], [0, 4, 3, 2, 1, 0])
+        self.assertEqual([rules.get_first_id(tp) for tp in (4, 3, 2, 1)], [1, 2, 4, 7])
+        self.assertEqual([rules.get_type(ship_id) for ship_id in range(1, 11)], list(rules.fleet))
+        self.assertTrue(rules.is_standard())
+        self.assertTrue(Rules(salvo=3).is_standard())
+        self.assertNotEqual(Rules(salvo=3), rules)
+        self.assertEqual(str(rules), "10x10, 10 ships")
+
+    def test_scaled_rules(self):
+        rules = Rules.scaled(20)
+        self.assertEqual((rules.size, rules.ships, rules.max_type), (20, 40, 4))
+        self.assertEqual(rules.get_amount(1), 16)
+        self.assertEqual(rules.get_first_id(3), 5)
+        self.assertFalse(rules.is_standard())
+        self.assertEqual(Rules.scaled(10), DEFAULT_RULES)
+        self.assertEqual(Rules.scaled(7).ships, 10)  # At least one fleet
+        self.assertTrue(rules.is_on_map(20, 1))
+        self.assertFalse(rules.is_on_map(21, 1))
+        self.assertFalse(Rules(12).is_standard())
+
+    def test_salvo(self):
+        self.assertEqual(Rules().get_salvo(7), 1)
+        self.assertEqual(Rules(salvo=3).get_salvo(7), 3)
+        self.assertEqual(Rules(salvo=res.SALVO_BY_SHIPS).get_salvo(7), 7)
+        self.assertEqual(str(Rules(salvo=3)), "10x10, 10 ships, salvos of 3 shots")
+        self.assertEqual(str(Rules(salvo=res.SALVO_BY_SHIPS)), "10x10, 10 ships, a salvo of a shot per ship")
+
+
+class ScaledGameTest(unittest.TestCase):
+
+    def test_player_of_a_big_board(self):
+        rules = Rules.scaled(15, 2)
+        player = brain.get_random_player(rules)
+        self.assertTrue(player.is_completed())
+        self.assertEqual(len(player.get_fleet()), rules.ships)
+        self.assertEqual(sorted(ship[0] for ship in player.get_fleet()), sorted(rules.fleet))
+        self.assertEqual(player.receive_shot(16, 1), objects.REPEATED)
+
+    def test_game_of_a_big_board(self):
+        rules = Rules.scaled(15)
+        battle = game.Game(brain.get_random_player(rules), brain.get_random_player(rules))
+        with contextlib.redirect_stdout(io.StringIO()):
+            players = bots.MediumBot(rules), bots.MediumBot(rules)
+            while not battle.is_over():
+                battle.play_bot(players[battle.get_turn()])
+        winner = battle.get_player(battle.get_winner())
+        self.assertTrue(winner.is_some_ships_placed())
+        self.assertTrue(all(1 <= x <= 15 and 1 <= y <= 15 for _, x, y, _ in battle.get_history()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import contextlib
+import io
+import unittest
+
+import bots
+import brain
+import game
+import objects
+import res
+from res import Strings as String
+from rules import Rules
+
+
+def player_with(rules: Rules, *ships):
+    player = objects.Player(rules)
+    for ship in ships:
+        player.add_ship(objects.Ship(*ship, rules))
+    return player
+
+
+class SayBot:
+    """
+    Aims one shot at a time and remembers what it has been told
+    """
+
+    def __init__(self, points):
+        self.points = list(points)
+        self.messages = []
+
+    def say(self, value):
+        self.messages.append(value)
+        return self.points.pop(0)
+
+
+class SalvoBot:
+
+    def __init__(self, points):
+        self.points = list(points)
+        self.results = []
+
+    def say_salvo(self, results, amount):
+        self.results.append(results)
+        salvo, self.points = self.points[:amount], self.points[amount:]
+        return salvo + [(10, 10)]  # One too many, it is cut off
+
+
+class SalvoTest(unittest.TestCase):
+
+    def test_salvo_is_resolved_as_single_shots(self):
+        rules = Rules(salvo=3)
+        points = [(2, 2), (3, 2), (2, 2), (0, 5), (9, 9), (4, 4), (5, 5)]
+        player = player_with(rules, (2, objects.HORIZONTAL, 2, 2), (1, objects.HORIZONTAL, 5, 5))
+        single = player_with(rules, (2, objects.HORIZONTAL, 2, 2), (1, objects.HORIZONTAL, 5, 5))
+        self.assertEqual(player.receive_salvo(points), [single.receive_shot(x, y) for x, y in points])
+        self.assertEqual(player.get_maps(), single.get_maps())
+        self.assertFalse(player.is_some_ships_placed())
+
+    def test_turn_passes_after_every_salvo(self):
+        rules = Rules(salvo=2)
+        battle = game.Game(player_with(rules, (1, objects.HORIZONTAL, 1, 1), (1, objects.HORIZONTAL, 9, 9)),
+                           player_with(rules, (1, objects.HORIZONTAL, 5, 5), (1, objects.HORIZONTAL, 7, 7)))
+        self.assertEqual(battle.get_salvo_size(), 2)
+        self.assertEqual(battle.shoot_salvo([(5, 5), (1, 1)]), [objects.DESTROYED, objects.MISS])
+        self.assertEqual(battle.get_turn(), game.ENEMY)  # A hit does not keep the turn
+
+        bot = SalvoBot([(3, 3), (9, 9), (1, 1)])
+        self.assertEqual(battle.play_salvo(bot), [(3, 3, objects.MISS), (9, 9, objects.DESTROYED)])
+        self.assertEqual(battle.get_results(game.ENEMY), [objects.MISS, objects.DESTROYED])
+
+        bot = SalvoBot([(7, 7), (8, 8)])
+        battle.play_salvo(bot)
+        self.assertEqual(bot.results[-1], [objects.DESTROYED, objects.MISS])  # Its own previous salvo
+        self.assertTrue(battle.is_over())
+        self.assertEqual(battle.get_winner(), game.PLAYER)
+        self.assertEqual(len(battle.get_history()), 6)  # The whole salvo is resolved
+
+    def test_bot_without_say_salvo_is_told_every_result(self):
+        rules = Rules(salvo=3)
+        defence = player_with(rules, (2, objects.HORIZONTAL, 2, 2), (1, objects.HORIZONTAL, 9, 9))
+        bot = SayBot([(2, 2), (3, 2), (5, 5)])
+        points, results, _ = game.fire_salvo(bot, defence, 3, [objects.MISS])
+        self.assertEqual(results, [objects.HIT, objects.DESTROYED, objects.MISS])
+        self.assertEqual(bot.messages, [String.GameFrame.BOT_SHOOT, String.GameFrame.BOT_HIT,
+                                        String.GameFrame.BOT_DESTROYED])
+        # The salvo stops at the last ship
+        bot = SayBot([(9, 9), (1, 1)])
+        self.assertEqual(game.fire_salvo(bot, defence, 3, results)[1], [objects.DESTROYED])
+
+    def test_salvo_by_ships(self):
+        rules = Rules(salvo=res.SALVO_BY_SHIPS)
+        battle = game.Game(brain.get_random_player(rules), brain.get_random_player(rules))
+        self.assertEqual(battle.get_salvo_size(), 10)
+        with contextlib.redirect_stdout(io.StringIO()):
+            players = bots.HardBot(rules), bots.MediumBot(rules)
+            sizes = []
+            while not battle.is_over():
+                sizes.append(battle.get_salvo_size())
+                battle.play_salvo(players[battle.get_turn()])
+        for side in (game.PLAYER, game.ENEMY):  # A side shoots less as it loses ships
+            self.assertEqual(sizes[side::2], sorted(sizes[side::2], reverse=True))
+        self.assertEqual(battle.get_player(battle.get_winner()).get_alive_amount(), sizes[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
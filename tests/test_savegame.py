@@ -0,0 +1,150 @@
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+
+import brain
+import bots
+import game
+import objects
+import savegame
+from rules import Rules
+
+
+def play(battle: game.Game, shots: int, rng: random.Random):
+    size = battle.get_player(game.PLAYER).get_rules().size
+    while not battle.is_over() and len(battle.get_history()) < shots:
+        battle.shoot(rng.randint(1, size), rng.randint(1, size))
+
+
+class SavedGameTest(unittest.TestCase):
+
+    def test_round_trip_keeps_the_game(self):
+        rng = random.Random(1)
+        for shots in (0, 1, 30, 70):
+            battle = game.Game(brain.get_random_player(), brain.get_random_player(), game.ENEMY)
+            play(battle, shots, rng)
+            data = savegame.SavedGame.from_game(battle).dumps()
+            saved = savegame.SavedGame.loads(data)
+            restored = saved.get_game()
+
+            self.assertEqual(saved.dumps(), data)
+            self.assertEqual(restored.get_turn(), battle.get_turn())
+            self.assertEqual(restored.get_history(), battle.get_history())
+            self.assertEqual(restored.get_message(), battle.get_message())
+            for side in (game.PLAYER, game.ENEMY):
+                before, after = battle.get_player(side), restored.get_player(side)
+                self.assertEqual(restored.get_results(side), battle.get_results(side))
+                self.assertEqual(after.get_maps(), before.get_maps())
+                self.assertEqual(after.get_fleet(destroyed=True), before.get_fleet(destroyed=True))
+                self.assertEqual(after.get_fleet(), before.get_fleet())
+                self.assertEqual(str(after.fleet_status()), str(before.fleet_status()))
+
+    def test_restored_game_goes_on_as_the_original(self):
+        rng = random.Random(2)
+        battle = game.Game(brain.get_random_player(), brain.get_random_player())
+        play(battle, 40, rng)
+        restored = savegame.SavedGame.loads(savegame.SavedGame.from_game(battle).dumps()).get_game()
+        points = [(x, y) for x in range(1, 11) for y in range(1, 11)]
+        rng.shuffle(points)
+        for x, y in points:
+            if battle.is_over():
+                break
+            self.assertEqual(restored.shoot(x, y), battle.shoot(x, y))
+            self.assertEqual(restored.get_turn(), battle.get_turn())
+        self.assertEqual(restored.get_winner(), battle.get_winner())
+
+    def test_salvo_rules_and_large_fleets(self):
+        rules = Rules.scaled(60, 0)
+        battle = game.Game(brain.get_random_player(rules), brain.get_random_player(rules))
+        rng = random.Random(3)
+        for _ in range(10):
+            battle.shoot_salvo([(rng.randint(1, 60), rng.randint(1, 60)) for _ in range(battle.get_salvo_size())])
+        saved = savegame.SavedGame.loads(savegame.SavedGame.from_game(battle).dumps())
+        self.assertEqual(saved.rules, rules)
+        restored = saved.get_game()
+        self.assertEqual(restored.get_salvo_size(), battle.get_salvo_size())
+        for side in (game.PLAYER, game.ENEMY):
+            self.assertEqual(restored.get_player(side).get_maps(), battle.get_player(side).get_maps())
+
+    def test_bot_state_survives(self):
+        rng = random.Random(4)
+        for name in ("HardBot", "Fati", "MediumBot"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                battle = game.Game(brain.get_random_player(), brain.get_random_player(), game.ENEMY)
+                bot = getattr(bots, name)()
+                while len(battle.get_history()) < 30 and not battle.is_over():
+                    if battle.get_turn() == game.ENEMY:
+                        battle.play_bot(bot)
+                    else:
+                        battle.shoot(rng.randint(1, 10), rng.randint(1, 10))
+                data = savegame.SavedGame.from_game(battle, {game.ENEMY: (name, bot)}).dumps()
+                saved = savegame.SavedGame.loads(data)
+                restored = saved.create_bot(game.ENEMY, lambda bot_name: getattr(bots, bot_name)())
+            self.assertIsInstance(restored, getattr(bots, name))
+            self.assertEqual(restored.get_state(), bot.get_state())
+
+    def test_bot_without_hooks_starts_over(self):
+        bot = bots.EasyBot()
+        self.assertEqual(savegame.get_bot_state(bot), b"")
+        savegame.set_bot_state(bot, b"")
+
+    def test_damaged_data_is_rejected(self):
+        data = savegame.SavedGame.from_game(game.Game(brain.get_random_player(), brain.get_random_player())).dumps()
+        for broken in (b"", b"XXXX" + data[4:], data[:4] + bytes([99]) + data[5:], data[:40]):
+            with self.assertRaises(ValueError):
+                savegame.SavedGame.loads(broken)
+
+    def test_save_and_load_file(self):
+        battle = game.Game(brain.get_random_player(), brain.get_random_player())
+        battle.shoot(5, 5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.bin")
+            savegame.save(path, savegame.SavedGame.from_game(battle, extra=b"owner"))
+            saved = savegame.load(path)
+            self.assertEqual(os.listdir(directory), ["game.bin"])
+        self.assertEqual(saved.extra, b"owner")
+        self.assertEqual(saved.history, battle.get_history())
+
+    def test_shots_are_a_bitset_of_the_board(self):
+        player = brain.get_random_player()
+        for tp, orientation, x, y in player.get_fleet()[-4:]:  # The submarines, some may be on an edge
+            player.receive_shot(x, y)
+        player.receive_shot(1, 1)
+        player.receive_shot(10, 7)
+        data = savegame.pack_shots(player.get_maps()[1], 10)
+        self.assertEqual(len(data), 13)
+        self.assertEqual(savegame.unpack_shots(data, 10, player.get_fleet(destroyed=True)), player.get_maps()[1])
+
+    def test_bot_state_packing(self):
+        grid = [[bool((x * y) % 3) for x in range(12)] for y in range(12)]
+        numbers = [0, -5, 7]
+        points = [(1, 2), (10, 10)]
+        values = [[x + y for x in range(12)] for y in range(12)]
+        state = savegame.pack_bot_state(numbers, (points, []), (grid, values))
+        self.assertEqual(savegame.unpack_bot_state(state), (numbers, [points, []], [grid, values]))
+
+
+class PlayerRestoreTest(unittest.TestCase):
+
+    def test_restore_counts_destroyed_ships(self):
+        player = brain.get_random_player()
+        tp, _, x, y = player.get_fleet()[-1]  # A submarine
+        player.receive_shot(x, y)
+        battleship = player.get_fleet()[0]
+        player.receive_shot(battleship[2], battleship[3])
+
+        restored = objects.Player()
+        mp, shots = player.get_maps()
+        restored.restore(player.get_fleet(destroyed=True), [list(row) for row in mp], [list(row) for row in shots])
+        self.assertEqual(tp, objects.SUBMARINE)
+        self.assertEqual(restored.get_alive_amount(), 9)
+        self.assertIsNone(restored.get_ship(restored.get_point_on_map(x, y)))
+        self.assertEqual(restored.fleet_status().health, player.fleet_status().health)
+        self.assertEqual(restored.receive_shot(x, y), objects.REPEATED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import threading
+import unittest
+
+import objects
+import res
+import server
+
+
+class Client:
+    """
+    A client of the newline-delimited JSON protocol
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, port: int):
+        return cls(*await asyncio.open_connection("127.0.0.1", port, limit=res.SERVER_MAX_LINE))
+
+    async def send(self, message: dict):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+    async def receive(self, *kinds):
+        """
+        :return: dict - the next message of one of the kinds, the others are skipped
+        """
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), 5)
+            if not line:
+                raise ConnectionError("the server has closed the connection")
+            message = json.loads(line)
+            if not kinds or message["type"] in kinds:
+                return message
+
+    def close(self):
+        self.writer.close()
+
+
+def run(test, **kwargs):
+    """
+    Runs test(game_server, port) against a server on a free port
+    """
+    async def run_test():
+        game_server = server.GameServer(**kwargs)
+        listener = await game_server.start("127.0.0.1", 0)
+        try:
+            return await test(game_server, listener.sockets[0].getsockname()[1])
+        finally:
+            listener.close()
+
+    return asyncio.run(run_test())
+
+
+async def play_out(client: Client):
+    """
+    Shoots every point in order until the game is over, the points around a destroyed ship are refused
+    :return: dict - the "over" message
+    """
+    targets = [(x, y) for x in range(1, 11) for y in range(1, 11)]
+    while True:
+        message = await client.receive("turn", "over", "start", "error")
+        if message["type"] == "over":
+            return message
+        if message["type"] == "error" or message.get("yours", message.get("turn")):
+            x, y = targets.pop()
+            await client.send({"type": "shoot", "x": x, "y": y})
+
+
+class SlowBot:
+    """
+    Shoots every point in order, each move waits until the test lets it go
+    """
+
+    def __init__(self):
+        self.points = [(x, y) for x in range(1, 11) for y in range(1, 11)]
+        self.thinking = threading.Event()
+        self.go = threading.Event()
+
+    def say(self, value):
+        self.thinking.set()
+        self.go.wait(5)
+        return self.points.pop(0)
+
+
+class ServerTest(unittest.TestCase):
+
+    def test_game_against_the_bot(self):
+        async def test(game_server, port):
+            client = await Client.connect(port)
+            await client.send({"type": "join", "mode": "bot"})
+            joined = await client.receive()
+            self.assertEqual((joined["type"], joined["side"]), ("joined", 0))
+            await client.send({"type": "arrange", "random": True})
+            arranged = await client.receive("arranged")
+            self.assertEqual(len(arranged["ships"]), 10)
+            over = await play_out(client)
+            self.assertIn(over["winner"], ("you", "enemy"))
+            client.close()
+            self.assertEqual((game_server.games, game_server.get_active()), (1, 0))
+            self.assertGreaterEqual(game_server.moves, 20)
+
+        run(test)
+
+    def test_invalid_messages_are_answered_with_errors(self):
+        async def test(game_server, port):
+            client = await Client.connect(port)
+            client.writer.write(b"not json\n")
+            self.assertEqual((await client.receive())["message"], "invalid JSON")
+            await client.send({"type": "shoot", "x": 1, "y": 1, "id": 1})
+            self.assertEqual((await client.receive())["type"], "error")  # Not in a match
+            await client.send({"type": "join", "mode": "bot", "bot": "NoSuchBot"})
+            self.assertEqual((await client.receive())["type"], "error")
+            await client.send({"type": "join", "mode": "bot"})
+            await client.receive("joined")
+            await client.send({"type": "arrange", "ships": [[4, objects.HORIZONTAL, 1, 1], [3, objects.HORIZONTAL, 1, 2]]})
+            self.assertEqual((await client.receive())["message"], "ships overlap or touch each other")
+            await client.send({"type": "arrange", "random": True})
+            start = await client.receive("start")
+            if not start["turn"]:
+                while not (await client.receive("turn"))["yours"]:
+                    pass
+            await client.send({"type": "shoot", "x": 11, "y": 1, "id": 7})
+            error = await client.receive()
+            self.assertEqual((error["type"], error["id"]), ("error", 7))
+            await client.send({"type": "ping", "id": 8})
+            self.assertEqual(await client.receive(), {"type": "pong", "id": 8})
+            client.close()
+
+        run(test)
+
+    def test_other_clients_are_served_while_the_bot_thinks(self):
+        async def test(game_server, port):
+            bot = SlowBot()
+            game_server._GameServer__bot_classes["SlowBot"] = lambda: bot
+            client, other = await Client.connect(port), await Client.connect(port)
+            await client.send({"type": "join", "mode": "bot", "bot": "SlowBot"})
+            await client.send({"type": "arrange", "random": True})
+            targets = [(x, y) for x in range(1, 11) for y in range(1, 11)]
+            message = await client.receive("start")
+            while not bot.thinking.is_set():  # Shoots until the bot has the turn
+                if message["type"] == "error" or message.get("yours", message.get("turn")):
+                    x, y = targets.pop()
+                    await client.send({"type": "shoot", "x": x, "y": y})
+                message = await client.receive("turn", "error")
+            await other.send({"type": "ping", "id": 1})
+            self.assertEqual(await other.receive(), {"type": "pong", "id": 1})
+            self.assertFalse(bot.go.is_set())
+            bot.go.set()
+            self.assertEqual((await client.receive("result"))["by"], "enemy")
+            client.close()
+            other.close()
+
+        run(test)
+
+    def test_two_humans(self):
+        async def test(game_server, port):
+            first, second = await Client.connect(port), await Client.connect(port)
+            await first.send({"type": "join", "mode": "human"})
+            self.assertEqual((await first.receive())["side"], 0)
+            await second.send({"type": "join", "mode": "human"})
+            self.assertEqual((await second.receive())["side"], 1)
+            self.assertEqual(await first.receive(), {"type": "opponent"})
+            for client in (first, second):
+                await client.send({"type": "arrange", "random": True})
+            results = await asyncio.gather(play_out(first), play_out(second))
+            self.assertEqual(sorted(over["winner"] for over in results), ["enemy", "you"])
+            first.close()
+            second.close()
+
+        run(test)
+
+    def test_idle_client_is_disconnected(self):
+        async def test(game_server, port):
+            client = await Client.connect(port)
+            with self.assertRaises(ConnectionError):
+                await client.receive()
+            client.close()
+
+        run(test, idle_timeout=0.1)
+
+    def test_resume_with_the_token(self):
+        async def test(game_server, port):
+            client = await Client.connect(port)
+            await client.send({"type": "join", "mode": "bot"})
+            joined = await client.receive("joined")
+            await client.send({"type": "arrange", "random": True})
+            fleet = (await client.receive("arranged"))["ships"]
+            if not (await client.receive("start"))["turn"]:
+                while not (await client.receive("turn"))["yours"]:
+                    pass
+            await client.send({"type": "shoot", "x": 5, "y": 5})
+            shot = await client.receive("result")
+            await client.receive("turn")
+            client.close()
+
+            client = await Client.connect(port)
+            await client.send({"type": "resume", "game": joined["game"], "token": "0" * 16})
+            self.assertEqual((await client.receive())["message"], "unknown game")
+            await client.send({"type": "resume", "game": joined["game"], "token": joined["token"]})
+            state = await client.receive()
+            self.assertEqual((state["type"], state["side"]), ("state", 0))
+            self.assertTrue(all(ship in fleet for ship in state["fleet"]))  # The bot may have destroyed some
+            self.assertTrue(state["started"])
+            self.assertEqual(state["shots"][0][:3], [5, 5, shot["result"]])
+            client.close()
+
+        run(test)
+
+    def test_abandoned_match_is_won_by_the_opponent(self):
+        async def test(game_server, port):
+            first, second = await Client.connect(port), await Client.connect(port)
+            await first.send({"type": "join", "mode": "human"})
+            await second.send({"type": "join", "mode": "human"})
+            await second.receive("joined")
+            second.close()
+            over = await first.receive("over")
+            self.assertEqual((over["winner"], over["reason"]), ("you", "abandoned"))
+            self.assertEqual(game_server.get_active(), 0)
+            first.close()
+
+        run(test, resume_timeout=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
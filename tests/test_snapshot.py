@@ -0,0 +1,65 @@
+import random
+import unittest
+
+import brain
+import objects
+import snapshot
+
+SIZE = snapshot.SIZE
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_same_results_as_player(self):
+        random.seed(3)
+        player = brain.get_random_player()
+        state = snapshot.Snapshot.from_player(player)
+        self.assertEqual(state.fleet.to_list(), player.get_fleet())
+        while not state.is_over():
+            x, y = random.randint(0, SIZE + 1), random.randint(0, SIZE + 1)
+            state, result = state.shoot(x, y)
+            self.assertEqual(result, player.receive_shot(x, y))
+        self.assertFalse(player.is_some_ships_placed())
+        self.assertTrue(all(state.is_shot(x, y) == player.is_shot(x, y)
+                            for x in range(1, SIZE + 1) for y in range(1, SIZE + 1)))
+
+    def test_fork_and_undo_leave_the_states_unchanged(self):
+        state = snapshot.Snapshot.from_player(brain.get_random_player())
+        fork = state.fork()
+        x, y = next((x, y) for x in range(1, SIZE + 1) for y in range(1, SIZE + 1) if state.get_ship_id(x, y))
+        hit, result = fork.shoot(x, y)
+        self.assertIn(result, (objects.HIT, objects.DESTROYED))
+        self.assertFalse(state.is_shot(x, y))
+        self.assertTrue(hit.is_shot(x, y))
+        self.assertIs(hit.shoot(x, y)[0], hit)  # A repeated shot changes nothing
+        self.assertIs(hit.undo(), state)
+        self.assertIsNone(state.undo())
+
+        other, _ = state.shoot(1, 1)
+        last, _ = other.shoot(SIZE, SIZE)
+        self.assertEqual([move[:2] for move in last.get_moves()], [(1, 1), (SIZE, SIZE)])
+        self.assertEqual(hit.get_moves(), [(x, y, result)])
+
+    def test_player_round_trip(self):
+        player = brain.get_random_player()
+        for x, y in ((1, 1), (5, 5), (7, 2), (3, 9)):
+            player.receive_shot(x, y)
+        restored = snapshot.Snapshot.from_player(player).to_player()
+        self.assertEqual(restored.get_maps(), player.get_maps())
+        self.assertEqual(restored.get_fleet(), player.get_fleet())
+
+    def test_destroyed_ship_marks_the_points_around(self):
+        fleet = [[4, objects.HORIZONTAL, 1, 1], [3, objects.VERTICAL, 10, 1], [3, objects.VERTICAL, 1, 3],
+                 [2, objects.HORIZONTAL, 4, 5], [2, objects.HORIZONTAL, 8, 8], [2, objects.VERTICAL, 6, 8],
+                 [1, objects.HORIZONTAL, 3, 10], [1, objects.HORIZONTAL, 10, 10], [1, objects.HORIZONTAL, 7, 3],
+                 [1, objects.HORIZONTAL, 3, 7]]
+        state = snapshot.Snapshot(snapshot.Fleet.from_list(fleet))
+        self.assertEqual(state.fleet.to_list(), fleet)
+        state, result = state.shoot(7, 3)
+        self.assertEqual((result, state.alive), (objects.DESTROYED, 9))
+        self.assertTrue(all(state.is_shot(x, y) for x in range(6, 9) for y in range(2, 5)))
+        self.assertFalse(state.is_shot(5, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
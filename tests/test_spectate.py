@@ -0,0 +1,112 @@
+import contextlib
+import io
+import unittest
+
+import bots
+import frames
+import game
+import res
+from rules import Rules
+
+
+class Label:
+    """
+    A label of a map, without a Tk interpreter
+    """
+
+    def config(self, **kwargs):
+        pass
+
+
+class Name:
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class RepeatingBot:
+    """
+    Always shoots the same point
+    """
+
+    def __init__(self, rules=None):
+        pass
+
+    def say(self, value):
+        return 1, 1
+
+    def say_salvo(self, results, amount):
+        return [(1, 1)] * amount
+
+
+class Context:
+
+    def __init__(self, bots: dict):
+        self.bots = bots
+
+    def create_bot(self, name: str):
+        return self.bots[name]()
+
+    def create_recorder(self, player, enemy):
+        return None
+
+
+def spectate_frame(rules: Rules, names: tuple, bots: dict):
+    """
+    :return: SpectateFrame - with the state the games are played from, no widgets
+    """
+    frame = frames.SpectateFrame.__new__(frames.SpectateFrame)
+    frame._SpectateFrame__context = Context(bots)
+    frame._SpectateFrame__rules = rules
+    frame._SpectateFrame__bot_names = [Name(name) for name in names]
+    frame._SpectateFrame__labels = [Label(), Label()]
+    frame._SpectateFrame__game = None
+    frame._SpectateFrame__version = 0
+    frame._SpectateFrame__games = 0
+    frame._SpectateFrame__wins = [0, 0]
+    frame._SpectateFrame__draws = 0
+    frame._SpectateFrame__total_shots = 0
+    frame._SpectateFrame__new_game()
+    return frame
+
+
+class SpectateTest(unittest.TestCase):
+
+    def play_game(self, frame):
+        games = frame._SpectateFrame__games
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(res.SPECTATE_MAX_SHOTS + 1):
+                frame._SpectateFrame__step()
+                if frame._SpectateFrame__games > games:
+                    return
+        self.fail("the game has not ended")
+
+    def test_stuck_bot_loses(self):
+        for rules in (Rules(), Rules(salvo=3)):
+            frame = spectate_frame(rules, ("Repeating", "Hard"), {"Repeating": RepeatingBot, "Hard": bots.HardBot})
+            self.play_game(frame)
+            self.assertEqual(frame._SpectateFrame__wins, [0, 1])
+            self.assertEqual(frame._SpectateFrame__draws, 0)
+
+    def test_both_stuck_bots_end_the_game(self):
+        frame = spectate_frame(Rules(), ("Repeating", "Repeating"), {"Repeating": RepeatingBot})
+        self.play_game(frame)
+        self.assertEqual(sum(frame._SpectateFrame__wins), 1)
+        self.assertLess(frame._SpectateFrame__total_shots, res.SPECTATE_MAX_SHOTS)
+
+    def test_broken_bot_loses(self):
+        class BrokenBot(RepeatingBot):
+            def say(self, value):
+                raise ValueError("broken")
+
+        frame = spectate_frame(Rules(), ("Broken", "Repeating"), {"Broken": BrokenBot, "Repeating": RepeatingBot})
+        self.play_game(frame)
+        self.assertEqual(frame._SpectateFrame__wins, [0, 1])
+        self.assertEqual(frame._SpectateFrame__game.get_history(), [])  # The next game has started
+
+
+if __name__ == "__main__":
+    unittest.main()
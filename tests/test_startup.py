@@ -0,0 +1,54 @@
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import res
+import startup
+
+
+class StartupTest(unittest.TestCase):
+
+    def test_timer_records_lazy_imports_once(self):
+        timer = startup.StartupTimer()
+        sys.modules.pop("colorsys", None)
+        module = timer.import_module("colorsys")
+        self.assertIs(timer.import_module("colorsys"), module)
+        self.assertEqual([name for name, _ in timer._StartupTimer__imports], ["colorsys"])
+        self.assertGreaterEqual(timer.mark("first"), 0)
+        self.assertLessEqual(timer.mark("first"), timer.mark("second"))
+        stderr = io.StringIO()
+        timer.set_verbose(True)
+        with contextlib.redirect_stderr(stderr):
+            timer.mark("verbose")
+        self.assertIn("| verbose", stderr.getvalue())
+
+    def test_cache_path_follows_the_source_and_the_window(self):
+        directory = tempfile.mkdtemp()
+        try:
+            source = os.path.join(directory, "sea.jpg")
+            with open(source, "wb") as file:
+                file.write(b"image")
+            path = startup.get_background_cache_path(source, 800, 600)
+            self.assertTrue(path.startswith(os.path.join(res.Strings.APP_CACHE, "sea_800x600_")))
+            self.assertNotEqual(path, startup.get_background_cache_path(source, 1024, 600))
+            os.utime(source, ns=(0, 1))
+            self.assertNotEqual(path, startup.get_background_cache_path(source, 800, 600))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_main_does_not_import_the_bots(self):
+        code = "import sys, main; print(' '.join(name for name in ('bots', 'registry', 'numpy', 'PIL') " \
+               "if name in sys.modules))"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.returncode, 0, output.stderr)
+        self.assertEqual(output.stdout.strip(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import terminal
+
+
+class Window:
+
+    def __init__(self):
+        self.calls = []
+
+    def addstr(self, row, col, text, attr):
+        self.calls.append((row, col, text, attr))
+
+    def getmaxyx(self):
+        return 24, 11
+
+    def clear(self):
+        self.calls.append("clear")
+
+
+class ScreenTest(unittest.TestCase):
+
+    def test_only_changed_cells_are_written(self):
+        window = Window()
+        screen = terminal.Screen(window)
+        screen.put(1, 2, "~")
+        screen.put(1, 2, "~")
+        screen.put(1, 2, "~", 1)
+        screen.put(1, 3, "X")
+        self.assertEqual(window.calls, [(1, 2, "~", 0), (1, 2, "~", 1), (1, 3, "X", 0)])
+        self.assertEqual(screen.take_stats()[1], 3)
+        self.assertEqual(screen.take_stats()[1], 0)
+
+    def test_line_and_clear(self):
+        window = Window()
+        screen = terminal.Screen(window)
+        screen.line(0, "a long message")
+        screen.line(0, "a long messag")  # The same once cut to the width
+        self.assertEqual(window.calls, [(0, 0, "a long mes", 0)])
+        screen.clear()
+        screen.line(0, "a long message")
+        self.assertEqual(window.calls[1:], ["clear", (0, 0, "a long mes", 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()